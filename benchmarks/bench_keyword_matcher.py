@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+关键词匹配微基准测试
+对比逐关键词 `in` 检查的旧实现与预编译 KeywordMatcher 在合成语料上的耗时；
+--whole-word 时 KeywordMatcher 使用整词 token 索引（结果与子串匹配不同，不做一致性校验）；
+--profiles 时对比每个档案各用一个 KeywordMatcher 与多档案合并的 ProfileMatcher；
+--prefilter 时对比不限制 arXiv 分类与每个分类都限定 arXiv 分类（arxiv_categories 预筛选）的耗时
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from corpus import generate_corpus, scale_config
+from keyword_matcher import KeywordMatcher, ProfileMatcher
+
+
+def legacy_categorize(paper, keywords_map, system_keywords, categories_config):
+    """旧实现：遍历每个分类、每个关键词做子串检查"""
+    categories = []
+    text = f"{paper.title} {paper.summary}".lower()
+    for category_name, category_config in categories_config.items():
+        keywords = keywords_map.get(category_config.get('keywords'), [])
+        if any(kw.lower() in text for kw in keywords):
+            if category_config.get('requires_system', False):
+                if any(sys_kw.lower() in text for sys_kw in system_keywords):
+                    categories.append(category_name)
+            else:
+                categories.append(category_name)
+    return categories
+
+
+def run(papers: int, extra_groups: int, whole_word: bool = False) -> dict:
+    """运行一次对比，返回耗时统计"""
+    base_config = json.loads((Path(__file__).parent.parent / "config.json").read_text(encoding='utf-8'))
+    config = scale_config(base_config, extra_groups)
+    corpus = generate_corpus(papers, config)
+    keywords_map, system_keywords, categories_config = (
+        config['keywords'], config['system_keywords'], config['categories']
+    )
+
+    start = time.perf_counter()
+    # 旧流程对每篇匹配论文会执行两次扫描（_check_keywords + _categorize_paper）
+    legacy_results = []
+    for paper in corpus:
+        tags = legacy_categorize(paper, keywords_map, system_keywords, categories_config)
+        if tags:
+            tags = legacy_categorize(paper, keywords_map, system_keywords, categories_config)
+        legacy_results.append(tags)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matching = {"whole_word": True, "stemming": True} if whole_word else None
+    matcher = KeywordMatcher(keywords_map, system_keywords, categories_config, matching)
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    matcher_results = [matcher.match_paper(paper) for paper in corpus]
+    matcher_seconds = time.perf_counter() - start
+
+    if not whole_word and legacy_results != matcher_results:
+        raise AssertionError("KeywordMatcher 与旧实现的结果不一致")
+
+    return {
+        "papers": papers,
+        "mode": "whole_word" if whole_word else "substring",
+        "categories": len(categories_config),
+        "matched": sum(1 for tags in matcher_results if tags),
+        "legacy_seconds": round(legacy_seconds, 4),
+        "matcher_build_seconds": round(build_seconds, 4),
+        "matcher_seconds": round(matcher_seconds, 4),
+        "matcher_us_per_paper": round(matcher_seconds * 1e6 / papers, 2),
+        "speedup": round(legacy_seconds / matcher_seconds, 2) if matcher_seconds else None,
+    }
+
+
+def run_profiles(papers: int, extra_groups: int, profiles: int, whole_word: bool = False) -> dict:
+    """对比多个档案分别匹配与合并匹配的耗时（各档案共享基础关键词，追加的合成关键词组各不相同）"""
+    base_config = json.loads((Path(__file__).parent.parent / "config.json").read_text(encoding='utf-8'))
+    configs = {f"profile{i}": scale_config(base_config, extra_groups, seed=i) for i in range(profiles)}
+    for config in configs.values():
+        config['matching'] = {"whole_word": True, "stemming": True} if whole_word else {}
+    corpus = generate_corpus(papers, configs["profile0"])
+
+    matchers = {
+        name: KeywordMatcher(c['keywords'], c['system_keywords'], c['categories'], c['matching'])
+        for name, c in configs.items()
+    }
+    start = time.perf_counter()
+    separate_results = []
+    for paper in corpus:
+        matched = {}
+        for name, matcher in matchers.items():
+            categories = matcher.match_paper(paper)
+            if categories:
+                matched[name] = categories
+        separate_results.append(matched)
+    separate_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    combined = ProfileMatcher(configs)
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    combined_results = [combined.match_paper(paper) for paper in corpus]
+    combined_seconds = time.perf_counter() - start
+
+    if separate_results != combined_results:
+        raise AssertionError("ProfileMatcher 与各档案单独匹配的结果不一致")
+
+    return {
+        "papers": papers,
+        "mode": "whole_word" if whole_word else "substring",
+        "profiles": profiles,
+        "categories_per_profile": len(configs["profile0"]['categories']),
+        "separate_seconds": round(separate_seconds, 4),
+        "combined_build_seconds": round(build_seconds, 4),
+        "combined_seconds": round(combined_seconds, 4),
+        "speedup": round(separate_seconds / combined_seconds, 2) if combined_seconds else None,
+    }
+
+
+def run_prefilter(papers: int, extra_groups: int, allowed: list, metrics: bool = False) -> dict:
+    """对比不限制 arXiv 分类与所有分类都只允许 allowed 中的 arXiv 分类时的匹配耗时"""
+    from metrics import RunMetrics
+
+    base_config = json.loads((Path(__file__).parent.parent / "config.json").read_text(encoding='utf-8'))
+    config = scale_config(base_config, extra_groups)
+    corpus = generate_corpus(papers, config)
+    restricted = {name: dict(c, arxiv_categories=allowed) for name, c in config['categories'].items()}
+
+    matcher = KeywordMatcher(config['keywords'], config['system_keywords'], config['categories'])
+    start = time.perf_counter()
+    open_results = [matcher.match_paper(paper) for paper in corpus]
+    open_seconds = time.perf_counter() - start
+
+    prefiltered = KeywordMatcher(config['keywords'], config['system_keywords'], restricted)
+    run_metrics = RunMetrics() if metrics else None
+    start = time.perf_counter()
+    prefiltered_results = [prefiltered.match_paper(paper, metrics) for paper in corpus]
+    if run_metrics is not None:
+        prefiltered.report_prefilter(run_metrics)
+    prefiltered_seconds = time.perf_counter() - start
+
+    allowed_set = set(allowed)
+    expected = [tags if allowed_set.intersection(c.split(".", 1)[0] for c in paper.categories)
+                or allowed_set.intersection(paper.categories) else []
+                for paper, tags in zip(corpus, open_results)]
+    if prefiltered_results != expected:
+        raise AssertionError("预筛选后的结果与不限制时按 arXiv 分类过滤的结果不一致")
+
+    rejected = sum(1 for paper in corpus if not prefiltered.eligible(paper.categories))
+    return {
+        "papers": papers,
+        "allowed": allowed,
+        "categories": len(restricted),
+        "rejected_before_text": rejected,
+        "metrics": metrics,
+        "open_seconds": round(open_seconds, 4),
+        "prefiltered_seconds": round(prefiltered_seconds, 4),
+        "speedup": round(open_seconds / prefiltered_seconds, 2) if prefiltered_seconds else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='关键词匹配微基准测试')
+    parser.add_argument('--papers', type=int, default=100000, help='合成论文数量（默认：100000）')
+    parser.add_argument('--extra-groups', type=int, nargs='+', default=[0, 100, 300],
+                        help='追加的合成关键词组数量，可指定多个（默认：0 100 300）')
+    parser.add_argument('--whole-word', action='store_true', help='KeywordMatcher 使用整词 token 索引')
+    parser.add_argument('--profiles', type=int, default=0,
+                        help='对比多档案分别匹配与合并匹配（档案数量，默认：0 表示不对比）')
+    parser.add_argument('--prefilter', nargs='+', default=None, metavar='ARXIV_CATEGORY',
+                        help='对比所有分类都限定为这些 arXiv 分类时的预筛选耗时（如 cs.DC）')
+    parser.add_argument('--metrics', action='store_true', help='--prefilter 时同时记录各分类的预筛选计数')
+    args = parser.parse_args()
+
+    for extra_groups in args.extra_groups:
+        if args.prefilter:
+            result = run_prefilter(args.papers, extra_groups, args.prefilter, args.metrics)
+        elif args.profiles:
+            result = run_profiles(args.papers, extra_groups, args.profiles, args.whole_word)
+        else:
+            result = run(args.papers, extra_groups, args.whole_word)
+        print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+匹配论文记录的内存基准测试（tracemalloc）
+对比旧版每篇 12 个键的字典与 PaperRecord（以及保存后释放摘要的 PaperRecord）的内存占用
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from corpus import generate_corpus
+from paper_record import PaperRecord
+from paper_store import PaperStore
+
+TAGS = ["KV Cache", "LLM Inference"]
+
+
+def legacy_record(paper, tags):
+    """旧实现：每篇论文一个字典，每篇都调用 datetime.now()"""
+    return {
+        'id': paper.entry_id,
+        'arxiv_id': paper.entry_id.split('/')[-1],
+        'title': paper.title,
+        'authors': [author.name for author in paper.authors],
+        'summary': paper.summary,
+        'published': paper.published.isoformat(),
+        'updated': paper.updated.isoformat(),
+        'categories': list(paper.categories),
+        'tags': list(tags),
+        'pdf_url': paper.pdf_url,
+        'arxiv_url': paper.entry_id,
+        'found_date': datetime.now().isoformat()
+    }
+
+
+def _retained(config: dict, papers: int, build, after=None):
+    """
+    生成语料并构建记录，丢弃语料（模拟释放 arxiv.Result）后统计记录仍占用的内存
+
+    Returns:
+        (构建耗时, 保留的字节数, 记录列表)
+    """
+    corpus = generate_corpus(papers, config)
+    tracemalloc.start()
+    # 模拟解析结果：语料中的字符串在测量开始后才分配，计入记录保留的内存
+    for paper in corpus:
+        paper.title = paper.title.encode().decode()
+        paper.summary = paper.summary.encode().decode()
+        paper.categories = [c.encode().decode() for c in paper.categories]
+    start = time.perf_counter()
+    records = build(corpus)
+    seconds = time.perf_counter() - start
+    if after is not None:
+        after(records)
+    del corpus
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return seconds, retained, records
+
+
+def run(papers: int) -> dict:
+    """分别测量旧版字典、PaperRecord、保存后释放摘要的 PaperRecord 的内存"""
+    config = json.loads((Path(__file__).parent.parent / "config.json").read_text(encoding='utf-8'))
+
+    legacy_seconds, legacy_bytes, _ = _retained(config, papers, lambda c: [legacy_record(p, TAGS) for p in c])
+
+    found_date = datetime.now().isoformat()
+    build = lambda c: [PaperRecord.from_result(p, TAGS, found_date) for p in c]
+    record_seconds, record_bytes, _ = _retained(config, papers, build)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PaperStore(tmp)
+
+        def save_and_detach(records):
+            store.append([r.to_dict() for r in records])
+            for record in records:
+                record.detach_summary(store)
+
+        _, detached_bytes, records = _retained(config, papers, build, after=save_and_detach)
+        sample = records[:1000]
+        start = time.perf_counter()
+        for record in sample:
+            record.summary
+        lazy_seconds = (time.perf_counter() - start) / len(sample)
+
+    return {
+        "papers": papers,
+        "legacy_dict_bytes": legacy_bytes,
+        "record_bytes": record_bytes,
+        "record_detached_bytes": detached_bytes,
+        "legacy_bytes_per_paper": round(legacy_bytes / papers, 1),
+        "record_bytes_per_paper": round(record_bytes / papers, 1),
+        "record_detached_bytes_per_paper": round(detached_bytes / papers, 1),
+        "legacy_build_seconds": round(legacy_seconds, 4),
+        "record_build_seconds": round(record_seconds, 4),
+        "lazy_summary_load_us": round(lazy_seconds * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='匹配论文记录内存基准测试')
+    parser.add_argument('--papers', type=int, default=100000, help='合成论文数量（默认：100000）')
+    args = parser.parse_args()
+    print(json.dumps(run(args.papers), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
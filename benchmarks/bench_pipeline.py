@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+抓取 → 匹配 → 保存 → 报告 流程的离线基准测试
+在合成语料上分别计时 _check_keywords、_categorize_paper、save_papers（空目录 / 已有大量论文）、
+generate_markdown_report（仅 Markdown / 全部格式 / 论文集合未变化时的重复生成）和 _print_category_summary，结果以 JSON 输出，
+可与之前保存的结果对比以发现性能回退
+"""
+
+import argparse
+import json
+import logging
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from corpus import generate_corpus, scale_config
+import arxiv_fetcher
+from paper_record import PaperRecord
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def _quiet_logging():
+    """
+    丢弃日志输出但保留 INFO 级别：日志记录的构造开销仍计入耗时，
+    避免大量控制台输出干扰计时
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(logging.NullHandler())
+    root.setLevel(logging.INFO)
+
+
+def _git_revision() -> str:
+    """当前代码的 git 提交（不可用时返回空字符串）"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def _best_of(repeat: int, setup: Callable, stage: Callable) -> float:
+    """
+    重复运行一个阶段并返回最短耗时
+
+    Args:
+        repeat: 重复次数
+        setup: 每次运行前调用（不计时），返回值传给 stage
+        stage: 被计时的函数
+    """
+    best = None
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        stage(state)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+class PipelineBench:
+    """在临时目录中构建 ArxivPaperFetcher 并计时各个阶段"""
+
+    def __init__(self, workdir: Path, config: Dict):
+        """
+        Args:
+            workdir: 临时工作目录（结果目录、配置文件和去重索引都放在这里）
+            config: 基准测试使用的配置
+        """
+        self.workdir = workdir
+        self.config_file = workdir / "config.json"
+        config = dict(config, cache={"enabled": False}, seen_db=str(workdir / "seen_papers.db"))
+        self.config_file.write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+        arxiv_fetcher.RESULT_DIR = workdir / "result"
+        self._dirs = 0
+
+    def fetcher(self, data_dir: Path = None) -> arxiv_fetcher.ArxivPaperFetcher:
+        """创建抓取器；未指定数据目录时使用新的空目录"""
+        if data_dir is None:
+            self._dirs += 1
+            data_dir = self.workdir / f"data_{self._dirs}"
+        return arxiv_fetcher.ArxivPaperFetcher(data_dir=str(data_dir), config_file=str(self.config_file))
+
+    def prepare_existing(self, papers: List) -> Path:
+        """预先写入大量已有论文，作为“已有大文件”场景的模板目录"""
+        template = self.workdir / "existing_template"
+        fetcher = self.fetcher(template)
+        fetcher.paper_store.append([PaperRecord.from_result(p, ["Other"], "2025-01-01T00:00:00").to_dict()
+                                    for p in papers])
+        fetcher.recorded_paper_ids.close()
+        fetcher.watermarks.close()
+        return template
+
+    def copy_of(self, template: Path) -> arxiv_fetcher.ArxivPaperFetcher:
+        """复制模板目录并在副本上创建抓取器"""
+        self._dirs += 1
+        data_dir = self.workdir / f"data_{self._dirs}"
+        shutil.copytree(template, data_dir)
+        return self.fetcher(data_dir)
+
+
+def _with_offset_ids(papers: List, prefix: str) -> List:
+    """改写合成论文的 ID，使两份语料的 ID 不重叠"""
+    for paper in papers:
+        arxiv_id = paper.entry_id.rsplit('/', 1)[-1].replace("2501.", prefix, 1)
+        paper.entry_id = f"http://arxiv.org/abs/{arxiv_id}"
+        paper.pdf_url = f"http://arxiv.org/pdf/{arxiv_id}"
+    return papers
+
+
+def run(papers: int, keyword_density: float, extra_groups: int, existing: int, repeat: int) -> Dict:
+    """运行全部阶段并返回结果字典"""
+    base_config = json.loads((PROJECT_ROOT / "config.json").read_text(encoding='utf-8'))
+    config = scale_config(base_config, extra_groups)
+    corpus = generate_corpus(papers, config, keyword_density=keyword_density)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        bench = PipelineBench(Path(tmp), config)
+        fetcher = bench.fetcher()
+        matched = [(paper, fetcher._categorize_paper(paper)) for paper in corpus if fetcher._check_keywords(paper)]
+        found_date = datetime.now().isoformat()
+
+        def build_records(_=None) -> List[PaperRecord]:
+            return [PaperRecord.from_result(paper, tags, found_date) for paper, tags in matched]
+
+        results["check_keywords"] = _best_of(
+            repeat, lambda: corpus, lambda c: [fetcher._check_keywords(p) for p in c])
+        results["categorize_paper"] = _best_of(
+            repeat, lambda: corpus, lambda c: [fetcher._categorize_paper(p) for p in c])
+
+        results["save_papers_cold"] = _best_of(
+            repeat, lambda: (bench.fetcher(), build_records()), lambda s: s[0].save_papers(s[1]))
+
+        template = bench.prepare_existing(_with_offset_ids(generate_corpus(existing, config, seed=7), "2412."))
+        results["save_papers_existing"] = _best_of(
+            repeat, lambda: (bench.copy_of(template), build_records()), lambda s: s[0].save_papers(s[1]))
+
+        results["generate_markdown_report"] = _best_of(
+            repeat, lambda: (bench.fetcher(), build_records()), lambda s: s[0].generate_markdown_report(s[1]))
+
+        def all_formats_fetcher(data_dir: Path = None) -> arxiv_fetcher.ArxivPaperFetcher:
+            report_fetcher = bench.fetcher(data_dir)
+            report_fetcher.report_config = {"formats": ["markdown", "html", "json_feed"]}
+            return report_fetcher
+
+        results["generate_report_all_formats"] = _best_of(
+            repeat, lambda: (all_formats_fetcher(), build_records()), lambda s: s[0].generate_markdown_report(s[1]))
+        unchanged = all_formats_fetcher()
+        unchanged.generate_markdown_report(build_records())
+        results["generate_report_unchanged"] = _best_of(
+            repeat, lambda: (all_formats_fetcher(unchanged.data_dir), build_records()),
+            lambda s: s[0].generate_markdown_report(s[1]))
+        results["print_category_summary"] = _best_of(
+            repeat, build_records, fetcher._print_category_summary)
+
+    per_paper = {"check_keywords": papers, "categorize_paper": papers}
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "params": {
+            "papers": papers,
+            "keyword_density": keyword_density,
+            "extra_groups": extra_groups,
+            "existing": existing,
+            "repeat": repeat,
+            "categories": len(config['categories']),
+            "matched": len(matched),
+        },
+        "results": {
+            name: {
+                "seconds": round(seconds, 6),
+                "us_per_paper": round(seconds * 1e6 / max(1, per_paper.get(name, len(matched))), 3),
+            }
+            for name, seconds in results.items()
+        },
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    与基线结果对比
+
+    Args:
+        current: 本次结果
+        baseline: 基线结果（之前保存的 JSON）
+        tolerance: 允许的相对变慢比例（0.2 表示 20%）
+
+    Returns:
+        回退描述列表，为空表示没有回退
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("seconds"):
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: {base['seconds']:.4f}s -> {result['seconds']:.4f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='抓取/匹配/保存/报告流程基准测试')
+    parser.add_argument('--papers', type=int, default=20000, help='合成论文数量（默认：20000）')
+    parser.add_argument('--keyword-density', type=float, default=0.05, help='含关键词的论文比例（默认：0.05）')
+    parser.add_argument('--extra-groups', type=int, default=0, help='追加的合成关键词组数量（默认：0）')
+    parser.add_argument('--existing', type=int, default=50000,
+                        help='“已有大文件”场景中预先保存的论文数量（默认：50000）')
+    parser.add_argument('--repeat', type=int, default=3, help='每个阶段重复次数，取最短耗时（默认：3）')
+    parser.add_argument('--output', type=str, default=None, help='结果 JSON 输出路径')
+    parser.add_argument('--compare', type=str, default=None, help='与之前保存的结果 JSON 对比')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='对比时允许的变慢比例（默认：0.2）')
+    args = parser.parse_args()
+
+    _quiet_logging()
+    result = run(args.papers, args.keyword_density, args.extra_groups, args.existing, max(1, args.repeat))
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare(result, baseline, args.tolerance)
+        for line in regressions:
+            print(f"性能回退: {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+服务端关键词过滤基准测试
+在本地 arXiv API 替身上放置一天的合成论文（少量含有配置中的关键词），分别全量扫描窗口和按 QueryPlanner 规划的查询抓取，
+比较请求页数、接收字节数、耗时与召回率（ArxivPaperFetcher.verify_query_plan），结果以 JSON 输出；
+本地替身没有网络延迟，实际运行时间主要由 arXiv 的请求间隔决定，因此同时给出按该间隔估算的耗时
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "test"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from atom_fixture_server import AtomFixtureServer, make_entry
+from corpus import ARXIV_CATEGORIES, FILLER_WORDS
+import arxiv_fetcher
+from arxiv_api import ARXIV_REQUEST_INTERVAL
+
+
+def generate_entries(count: int, keyword_density: float, config: dict, seed: int = 42) -> list:
+    """生成一天内的合成论文条目，按比例注入配置中的关键词"""
+    rng = random.Random(seed)
+    keywords = [kw if isinstance(kw, str) else kw['keyword'] for kws in config['keywords'].values() for kw in kws]
+    now = datetime.now(timezone.utc)
+    entries = []
+    for i in range(count):
+        summary = rng.choices(FILLER_WORDS, k=150)
+        if rng.random() < keyword_density:
+            summary.insert(rng.randrange(len(summary)), rng.choice(keywords))
+            summary.insert(rng.randrange(len(summary)), rng.choice(config['system_keywords']))
+        submitted = (now - timedelta(seconds=20 * (i + 1))).strftime("%Y-%m-%dT%H:%M:%SZ")
+        entries.append(make_entry(f"2501.{i:05d}v1", " ".join(rng.choices(FILLER_WORDS, k=10)).capitalize(),
+                                  " ".join(summary), submitted, categories=rng.sample(ARXIV_CATEGORIES, 2)))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='服务端关键词过滤基准测试')
+    parser.add_argument('--papers', type=int, default=4000, help='窗口内的合成论文数量（默认：4000，约为 arXiv 一天的投稿量）')
+    parser.add_argument('--keyword-density', type=float, default=0.01, help='含有关键词的论文比例（默认：0.01）')
+    parser.add_argument('--page-size', type=int, default=200, help='每页论文数（默认：200）')
+    parser.add_argument('--max-query-length', type=int, default=1000, help='单个查询的最大长度（默认：1000）')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        arxiv_fetcher.RESULT_DIR = Path(tmp) / "result"
+        fetcher = arxiv_fetcher.ArxivPaperFetcher(data_dir=str(Path(tmp) / "data"), config_file="config.json")
+        entries = generate_entries(args.papers, args.keyword_density, fetcher.config)
+        with AtomFixtureServer(entries) as server:
+            fetcher.fetch_config.update({"base_url": server.base_url, "request_interval": 0,
+                                         "page_size": args.page_size, "max_query_length": args.max_query_length})
+            report = fetcher.verify_query_plan(days_back=1, max_results=args.papers)
+        fetcher.close()
+
+    full, pushdown = report["full_scan"], report["pushdown"]
+    full_estimate = round(full["seconds"] + (full["pages"] - 1) * ARXIV_REQUEST_INTERVAL, 1)
+    pushdown_estimate = round(pushdown["seconds"] + (pushdown["pages"] - 1) * ARXIV_REQUEST_INTERVAL, 1)
+    print(json.dumps({
+        "papers": args.papers,
+        "keyword_density": args.keyword_density,
+        "queries": len(report["queries"]),
+        "full_scan": full,
+        "pushdown": pushdown,
+        "recall": report["recall"],
+        "bytes_reduction": round(full["bytes"] / max(1, pushdown["bytes"]), 1),
+        "pages_reduction": round(full["pages"] / max(1, pushdown["pages"]), 1),
+        # 每页之间至少间隔 ARXIV_REQUEST_INTERVAL 秒（本地耗时主要是替身服务器逐条求值查询的开销）
+        "estimated_seconds_at_rate_limit": {"full_scan": full_estimate, "pushdown": pushdown_estimate},
+        "estimated_speedup": round(full_estimate / max(1e-9, pushdown_estimate), 1),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+历史论文重新打标签的多进程扩展性基准测试
+在合成归档上分别以不同的工作进程数运行 ArchiveRetagger，输出吞吐量与相对单进程的加速比
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from corpus import generate_corpus, scale_config
+from paper_record import PaperRecord
+from paper_store import PaperStore
+from retag import ArchiveRetagger
+
+
+def build_archive(root: Path, config: dict, papers: int, days: int) -> Path:
+    """按天写入合成论文，标签均为 Other（模拟新增分类之前的归档）"""
+    archive = root / "paper_data_template"
+    archive.mkdir()
+    store = PaperStore(archive)
+    corpus = generate_corpus(papers, config, keyword_density=0.2)
+    per_day = max(1, papers // days)
+    for day in range(days):
+        chunk = corpus[day * per_day:(day + 1) * per_day]
+        store.append([PaperRecord.from_result(p, ["Other"], "2025-01-01T00:00:00").to_dict() for p in chunk],
+                     f"202501{day + 1:02d}")
+    return archive
+
+
+def run(papers: int, days: int, extra_groups: int, workers_list, chunk_size: int) -> list:
+    base_config = json.loads((Path(__file__).parent.parent / "config.json").read_text(encoding='utf-8'))
+    config = scale_config(base_config, extra_groups)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        template = build_archive(Path(tmp), config, papers, days)
+        baseline = None
+        for workers in workers_list:
+            data_dir = Path(tmp) / f"paper_data_{workers}"
+            shutil.copytree(template, data_dir)
+            retagger = ArchiveRetagger(config['keywords'], config['system_keywords'], config['categories'],
+                                       config['matching'], workers=workers, chunk_size=chunk_size)
+            start = time.perf_counter()
+            stats = retagger.run([PaperStore(data_dir)])
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            results.append({
+                "papers": stats["checked"],
+                "changed": stats["changed"],
+                "workers": workers,
+                "cpu_count": os.cpu_count(),
+                "seconds": round(seconds, 4),
+                "papers_per_second": round(stats["checked"] / seconds, 1),
+                "speedup": round(baseline / seconds, 2),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='重新打标签多进程扩展性基准测试')
+    parser.add_argument('--papers', type=int, default=200000, help='合成论文数量（默认：200000）')
+    parser.add_argument('--days', type=int, default=30, help='归档天数（每天一个分段，默认：30）')
+    parser.add_argument('--extra-groups', type=int, default=100, help='追加的合成关键词组数量（默认：100）')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='工作进程数（默认：1 2 4 8）')
+    parser.add_argument('--chunk-size', type=int, default=2000, help='每块论文数（默认：2000）')
+    args = parser.parse_args()
+
+    for result in run(args.papers, args.days, args.extra_groups, args.workers, args.chunk_size):
+        print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+全文检索索引基准测试
+流式生成合成论文写入 PaperSearchIndex，输出建索引吞吐量、数据库大小，以及各类查询的 p50/p95 延迟
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from corpus import ARXIV_CATEGORIES, FILLER_WORDS
+from search_index import PaperSearchIndex
+
+# 注入到部分论文中的领域短语与对应标签
+TOPICS = {
+    "kv cache": "KV Cache",
+    "mixture of experts": "MoE",
+    "speculative decoding": "Speculative Decoding",
+    "quantization": "Quantization",
+    "sparse attention": "Sparse Attention",
+}
+
+# 合成词表大小（模拟真实摘要中大量低频词）
+VOCAB_SIZE = 50000
+
+QUERIES = {
+    "term": {"query": "quantization"},
+    "phrase": {"query": '"kv cache"'},
+    "boolean": {"query": '"mixture of experts" AND routing'},
+    "rare_term": {"query": "w1234"},
+    "tag_filter": {"query": "attention", "tags": ["Sparse Attention"]},
+    "date_filter": {"query": '"speculative decoding"', "days": 7},
+    "tag_only": {"tags": ["MoE"]},
+}
+
+
+def iter_papers(count: int, topic_density: float, seed: int = 42):
+    """流式生成论文（不在内存中保留整个语料）"""
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(VOCAB_SIZE)]
+    rand = rng.random
+    topics = list(TOPICS.items())
+    base_time = datetime(2025, 1, 31, 20, 0)
+    for i in range(count):
+        # 低频词按对数均匀分布取样（近似 Zipf 词频）
+        words = rng.choices(FILLER_WORDS, k=100) + [vocab[int(VOCAB_SIZE ** rand()) - 1] for _ in range(50)]
+        tags = []
+        if rng.random() < topic_density:
+            phrase, tag = rng.choice(topics)
+            words.insert(rng.randrange(len(words)), phrase)
+            words.insert(rng.randrange(len(words)), "routing" if tag == "MoE" else "attention")
+            tags.append(tag)
+        yield {
+            "id": f"http://arxiv.org/abs/{i // 100000 + 2501}.{i % 100000:05d}v1",
+            "arxiv_id": f"{i // 100000 + 2501}.{i % 100000:05d}v1",
+            "title": " ".join(rng.choices(FILLER_WORDS, k=10)).capitalize(),
+            "summary": " ".join(words),
+            "authors": [f"Author {i % 997}", f"Author {i % 991}"],
+            "categories": rng.sample(ARXIV_CATEGORIES, 2),
+            # 每分钟一篇，覆盖约 count / 1440 天
+            "published": (base_time - timedelta(minutes=i)).isoformat(),
+            "tags": tags or ["Other"],
+        }
+
+
+def build(index: PaperSearchIndex, count: int, topic_density: float, batch: int) -> float:
+    """按批写入（每批一个事务，与 save_papers 一致），返回耗时（秒）"""
+    start = time.perf_counter()
+    papers = iter_papers(count, topic_density)
+    while True:
+        chunk = [paper for _, paper in zip(range(batch), papers)]
+        if not chunk:
+            break
+        index.add_many(chunk, "paper_data_bench")
+    return time.perf_counter() - start
+
+
+def measure(index: PaperSearchIndex, repeat: int, limit: int) -> dict:
+    """各类查询的延迟（毫秒）"""
+    results = {}
+    latest = date(2025, 1, 31)
+    for name, spec in QUERIES.items():
+        since = latest - timedelta(days=spec["days"]) if "days" in spec else None
+        timings = []
+        hits = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            hits = index.search(spec.get("query"), tags=spec.get("tags"), since=since, limit=limit)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results[name] = {
+            "hits": len(hits),
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全文检索索引基准测试')
+    parser.add_argument('--papers', type=int, default=200000, help='合成论文数量（默认：200000）')
+    parser.add_argument('--topic-density', type=float, default=0.05, help='含有领域短语的论文比例（默认：0.05）')
+    parser.add_argument('--batch', type=int, default=5000, help='每个事务写入的论文数（默认：5000）')
+    parser.add_argument('--repeat', type=int, default=20, help='每个查询的重复次数（默认：20）')
+    parser.add_argument('--limit', type=int, default=20, help='每次查询返回的结果数（默认：20）')
+    parser.add_argument('--db', type=str, default=None, help='索引数据库路径（默认：临时目录，运行结束后删除）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(args.db) if args.db else Path(tmp) / "search_index.db"
+        index = PaperSearchIndex(db_path)
+        if len(index) == 0:
+            seconds = build(index, args.papers, args.topic_density, args.batch)
+            index.optimize()
+        else:
+            seconds = None
+        result = {
+            "papers": len(index),
+            "build_seconds": round(seconds, 2) if seconds is not None else None,
+            "papers_per_second": round(args.papers / seconds, 1) if seconds else None,
+            "db_mb": round(sum(p.stat().st_size for p in db_path.parent.glob(db_path.name + "*")) / 2 ** 20, 1),
+            "queries": measure(index, args.repeat, args.limit),
+        }
+        index.close()
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
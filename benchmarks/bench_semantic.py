@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+语义分类阶段吞吐量基准测试（仅 CPU）
+分别测量向量化、质心打分，以及带磁盘向量缓存的批量分类在冷缓存 / 热缓存下的吞吐量
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from corpus import generate_corpus, scale_config
+from semantic_classifier import EmbeddingCache, SemanticClassifier, embedding_key
+
+
+def _rate(count: int, seconds: float) -> float:
+    return round(count / seconds, 1) if seconds else 0.0
+
+
+def run(papers: int, extra_groups: int, batch_size: int) -> dict:
+    base_config = json.loads((Path(__file__).parent.parent / "config.json").read_text(encoding='utf-8'))
+    config = scale_config(base_config, extra_groups)
+    # 所有分类都参与语义打分（以关键词组为质心）
+    for category in config['categories'].values():
+        category.setdefault('semantic', {"threshold": 0.1})
+    corpus = generate_corpus(papers, config, keyword_density=0.05)
+    items = [(embedding_key(p.entry_id), f"{p.title} {p.summary}") for p in corpus]
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+    classifier = SemanticClassifier(config['keywords'], config['categories'], base_config.get('semantic'))
+    result = {"papers": papers, "categories": len(classifier.categories), "batch_size": batch_size}
+
+    start = time.perf_counter()
+    vectors = [classifier.vectorizer.transform(text) for _, text in items]
+    result["vectorize_papers_per_second"] = _rate(papers, time.perf_counter() - start)
+    result["avg_features"] = round(sum(len(v[0]) for v in vectors) / papers, 1)
+
+    start = time.perf_counter()
+    for vector in vectors:
+        classifier.scores(vector)
+    result["score_papers_per_second"] = _rate(papers, time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        classifier.cache = EmbeddingCache(Path(tmp) / "embeddings.db", classifier.vectorizer.signature)
+        for label in ("cold_cache", "warm_cache"):
+            start = time.perf_counter()
+            matched = sum(1 for batch in batches for tags in classifier.classify_batch(batch) if tags)
+            result[f"{label}_papers_per_second"] = _rate(papers, time.perf_counter() - start)
+        result["matched"] = matched
+        result["cache_mb"] = round(classifier.cache.db_path.stat().st_size / 2 ** 20, 1)
+        classifier.cache.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='语义分类阶段吞吐量基准测试')
+    parser.add_argument('--papers', type=int, default=20000, help='合成论文数量（默认：20000）')
+    parser.add_argument('--extra-groups', type=int, nargs='+', default=[0, 100],
+                        help='追加的合成关键词组数量，每组一个语义分类（默认：0 100）')
+    parser.add_argument('--batch-size', type=int, default=256, help='每批分类的论文数（默认：256）')
+    args = parser.parse_args()
+
+    for extra_groups in args.extra_groups:
+        print(json.dumps(run(args.papers, extra_groups, args.batch_size), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
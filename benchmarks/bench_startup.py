@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+命令行启动耗时基准测试
+用 python -X importtime 测量导入 arxiv_fetcher 的累计耗时，并测量 run.py --help / search --help 的总耗时；
+检查导入时没有加载 arxiv 库等较重的模块，超出预算时以非零状态退出，防止启动耗时回退
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SRC_DIR = PROJECT_ROOT / "src"
+
+# 导入 arxiv_fetcher 时不应加载的模块（只在对应命令 / 代码路径中按需导入）
+LAZY_MODULES = [
+    "arxiv", "requests", "urllib.request", "concurrent.futures", "multiprocessing", "pstats", "http.server",
+    "arxiv_api", "pipeline", "retag", "sharded_fetch", "semantic_classifier", "daemon", "fetch_checkpoint",
+    "query_planner", "oai_harvest", "announcement_feed",
+]
+
+# 默认预算：导入 arxiv_fetcher 的累计耗时中位数（毫秒）
+DEFAULT_BUDGET_MS = 60.0
+
+
+def _env() -> Dict[str, str]:
+    # 允许写入字节码缓存：测量的是常规安装下（已有 .pyc）的启动耗时，而不是编译耗时
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def import_time_ms(module: str = "arxiv_fetcher") -> float:
+    """一次 python -X importtime 中 module 的累计导入耗时（毫秒）"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=SRC_DIR,
+                            env=_env(), capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"importtime 输出中没有 {module}")
+
+
+def wall_time_ms(args: List[str]) -> float:
+    """运行一次 python 命令的总耗时（毫秒，包括解释器启动）"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, env=_env(),
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def command_time_ms(args: List[str]) -> float:
+    """运行一次 run.py 命令的总耗时（毫秒）"""
+    return wall_time_ms([str(PROJECT_ROOT / "run.py"), *args])
+
+
+def loaded_lazy_modules() -> List[str]:
+    """导入 arxiv_fetcher 后已加载的“按需导入”模块"""
+    code = f"import json, sys, arxiv_fetcher; print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, env=_env(), capture_output=True,
+                            text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def _summary(samples: List[float]) -> Dict:
+    return {"median_ms": round(statistics.median(samples), 1), "min_ms": round(min(samples), 1)}
+
+
+def run(repeat: int) -> Dict:
+    # 预热一次：生成字节码缓存
+    import_time_ms()
+    command_time_ms(["--help"])
+    return {
+        "import_arxiv_fetcher": _summary([import_time_ms() for _ in range(repeat)]),
+        "run_help": _summary([command_time_ms(["--help"]) for _ in range(repeat)]),
+        "search_help": _summary([command_time_ms(["search", "--help"]) for _ in range(repeat)]),
+        "python_startup": _summary([wall_time_ms(["-c", "pass"]) for _ in range(repeat)]),
+        "loaded_lazy_modules": loaded_lazy_modules(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='命令行启动耗时基准测试')
+    parser.add_argument('--repeat', type=int, default=10, help='每项测量次数，取中位数（默认：10）')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f'导入 arxiv_fetcher 的累计耗时预算（毫秒，默认：{DEFAULT_BUDGET_MS}）')
+    args = parser.parse_args()
+
+    result = run(args.repeat)
+    result["budget_ms"] = args.budget_ms
+    print(json.dumps(result, ensure_ascii=False))
+
+    failures = []
+    if result["import_arxiv_fetcher"]["median_ms"] > args.budget_ms:
+        failures.append(f"导入耗时 {result['import_arxiv_fetcher']['median_ms']} ms 超出预算 {args.budget_ms} ms")
+    if result["loaded_lazy_modules"]:
+        failures.append(f"导入时加载了应按需导入的模块: {', '.join(result['loaded_lazy_modules'])}")
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
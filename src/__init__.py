@@ -2,8 +2,13 @@
 arXiv Paper Fetcher Package
 """
 
-from .arxiv_fetcher import ArxivPaperFetcher
-
 __all__ = ['ArxivPaperFetcher']
 __version__ = '1.0.0'
 
+
+def __getattr__(name):
+    # 首次访问时才导入抓取工具，导入包本身不加载任何依赖
+    if name == 'ArxivPaperFetcher':
+        from .arxiv_fetcher import ArxivPaperFetcher
+        return ArxivPaperFetcher
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
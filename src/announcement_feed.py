@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+arXiv 每日公告批次
+arXiv 每个工作日按固定截止时间发布一批公告，每个分类的 RSS 源（rss.arxiv.org）只包含最近一批：
+新投稿（new）、交叉列出（cross）、替换版本（replace / replace-cross）。
+按公告批次抓取不依赖 submittedDate 窗口，截止时间和周末附近既不会漏掉也不会重复，
+每批只需处理一次；响应按流解析，每条处理完即释放
+"""
+
+import logging
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Optional
+
+try:
+    from .arxiv_api import ArxivEntry, RateLimiter, fetch_with_retry, parse_rfc2822, split_authors
+    from .metrics import NULL_METRICS
+except ImportError:
+    from arxiv_api import ArxivEntry, RateLimiter, fetch_with_retry, parse_rfc2822, split_authors
+    from metrics import NULL_METRICS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEED_URL = "https://rss.arxiv.org/rss"
+
+# 公告类型：新投稿、交叉列出、替换版本、交叉列出论文的替换版本
+ANNOUNCE_TYPES = ("new", "cross", "replace", "replace-cross")
+
+_ARXIV = "{http://arxiv.org/schemas/atom}"
+_DC = "{http://purl.org/dc/elements/1.1/}"
+
+# <description>: "arXiv:2501.00001v1 Announce Type: new \nAbstract: ..."
+_DESCRIPTION_RE = re.compile(r"^\s*arXiv:(\S+)\s+Announce Type:\s*(\S+)\s*(?:Abstract:\s*)?(.*)$", re.DOTALL)
+
+
+class AnnouncedPaper(NamedTuple):
+    """公告中的一篇论文"""
+    entry: ArxivEntry
+    announce_type: str
+
+
+class AnnouncementBatch(NamedTuple):
+    """一个分类的一批公告"""
+    category: str
+    # 公告时间（RSS 频道的 pubDate），没有公告（如周末）时为 None
+    announced: Optional[datetime]
+    items: List[AnnouncedPaper]
+
+    @property
+    def batch_id(self) -> str:
+        """批次 ID：分类/公告日期，如 cs.DC/2025-01-02"""
+        return f"{self.category}/{self.announced.date().isoformat()}" if self.announced else ""
+
+
+def parse_item(item: ET.Element, announced: Optional[datetime]) -> Optional[AnnouncedPaper]:
+    """
+    将一条 RSS <item> 转换为 AnnouncedPaper（RSS 中没有提交时间，提交与更新时间均取公告时间）
+
+    Args:
+        item: <item> 元素
+        announced: 频道的公告时间（条目没有 pubDate 时使用）
+
+    Returns:
+        AnnouncedPaper；缺少论文编号的条目返回 None
+    """
+    match = _DESCRIPTION_RE.match(item.findtext("description") or "")
+    if match is None:
+        logger.warning(f"跳过无法解析的公告条目: {item.findtext('link')}")
+        return None
+    arxiv_id, description_type, abstract = match.groups()
+    announce_type = (item.findtext(f"{_ARXIV}announce_type") or description_type).strip()
+    stamp = parse_rfc2822(item.findtext("pubDate")) or announced or datetime.now(timezone.utc)
+    categories = [c.text.strip() for c in item.iterfind("category") if c.text and c.text.strip()]
+    entry = ArxivEntry(
+        entry_id=f"http://arxiv.org/abs/{arxiv_id}",
+        title=" ".join((item.findtext("title") or "").split()),
+        summary=abstract.strip(),
+        authors=split_authors(item.findtext(f"{_DC}creator")),
+        published=stamp,
+        updated=stamp,
+        categories=categories,
+        primary_category=categories[0] if categories else "",
+        pdf_url=f"http://arxiv.org/pdf/{arxiv_id}",
+    )
+    return AnnouncedPaper(entry, announce_type)
+
+
+def parse_feed(stream, category: str) -> AnnouncementBatch:
+    """
+    流式解析一个分类的 RSS 公告源：每条 <item> 转换后立即释放
+
+    Args:
+        stream: 响应内容的文件对象
+        category: 订阅的分类
+
+    Returns:
+        AnnouncementBatch
+    """
+    items = []
+    announced = None
+    in_item = False
+    channel = None
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if elem.tag == "channel":
+                channel = elem
+            elif elem.tag == "item":
+                in_item = True
+            continue
+        if elem.tag == "item":
+            in_item = False
+            paper = parse_item(elem, announced)
+            if paper is not None:
+                items.append(paper)
+            elem.clear()
+            if channel is not None:
+                channel.clear()
+        elif elem.tag == "pubDate" and not in_item:
+            announced = parse_rfc2822(elem.text)
+    return AnnouncementBatch(category, announced if items else None, items)
+
+
+class AnnouncementFeed:
+    """arXiv 分类公告 RSS 源客户端"""
+
+    def __init__(self, base_url: str = None, rate_limiter: RateLimiter = None, num_retries: int = 3,
+                 timeout: float = 60.0, metrics=None):
+        """
+        Args:
+            base_url: RSS 源地址前缀，默认为 arXiv 官方地址（分类附加在路径末尾）
+            rate_limiter: 共享限速器，默认新建一个 3 秒间隔的限速器
+            num_retries: 请求失败时的重试次数（503 时按 Retry-After 等待）
+            timeout: 单次请求超时（秒）
+            metrics: 运行指标（RunMetrics），None 表示不记录
+        """
+        self.base_url = (base_url or DEFAULT_FEED_URL).rstrip("/")
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.num_retries = num_retries
+        self.timeout = timeout
+        self.metrics = metrics or NULL_METRICS
+
+    def fetch_batch(self, category: str) -> AnnouncementBatch:
+        """
+        请求并流式解析一个分类的最新公告批次，失败时重试
+
+        Args:
+            category: arXiv 分类（如 cs.DC）
+
+        Returns:
+            AnnouncementBatch
+        """
+        batch = fetch_with_retry(f"{self.base_url}/{category}", lambda response: parse_feed(response, category),
+                                 self.rate_limiter, self.num_retries, self.timeout, self.metrics)
+        self.metrics.count("announced_papers", len(batch.items))
+        return batch
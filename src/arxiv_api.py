@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+arXiv API 轻量客户端
+直接请求 Atom 导出接口，支持自定义接口地址（便于离线测试）以及多线程共享的请求限速器；
+另含 OAI-PMH 收割与公告 RSS 源共用的带重试请求、RFC 2822 日期和作者列表解析
+"""
+
+import email.utils
+import logging
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+
+try:
+    from .metrics import NULL_METRICS
+except ImportError:
+    from metrics import NULL_METRICS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://export.arxiv.org/api/query"
+
+# arXiv API 使用规范：连续请求之间至少间隔 3 秒
+ARXIV_REQUEST_INTERVAL = 3.0
+
+USER_AGENT = "arxiv-paper-fetcher/1.0"
+
+# 提交日期在最近几天内的论文可能尚未公布（周末及公告延迟），
+# 查询窗口覆盖这段时间的缓存页面在联网模式下必须重新验证后才能使用
+OPEN_WINDOW_DAYS = 4
+
+# 服务端要求等待的时间超过该值（秒）时不再重试
+MAX_RETRY_AFTER = 600
+
+_SUBMITTED_RANGE_RE = re.compile(r"submittedDate:\[\s*\d+\s+TO\s+(\d{8})\d*\s*\]")
+
+# "Alice, Bob and Carol" / "Alice, Bob, and Carol"
+_AUTHOR_SPLIT_RE = re.compile(r"\s*,\s*(?:and\s+)?|\s+and\s+")
+
+T = TypeVar("T")
+
+_NS = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "arxiv": "http://arxiv.org/schemas/atom",
+    "opensearch": "http://a9.com/-/spec/opensearch/1.1/",
+}
+
+
+class ArxivAPIError(Exception):
+    """arXiv API 请求失败"""
+
+
+class CacheMissError(ArxivAPIError):
+    """离线模式下请求的页面不在缓存中"""
+
+
+class RateLimiter:
+    """线程安全的最小请求间隔限速器，可在多个客户端/线程之间共享"""
+
+    def __init__(self, min_interval: float = ARXIV_REQUEST_INTERVAL):
+        """
+        Args:
+            min_interval: 两次请求之间的最小间隔（秒）
+        """
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        """阻塞直到允许发出下一次请求"""
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(now, self._next_time)
+            self._next_time = scheduled + self.min_interval
+        delay = scheduled - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Author(NamedTuple):
+    """论文作者（与 arxiv.Result.Author 一样提供 name 属性）"""
+    name: str
+
+
+class ArxivEntry:
+    """
+    轻量论文记录
+
+    提供 fetch_daily_papers 读取的 arxiv.Result 同名属性：
+    entry_id, title, summary, authors, published, updated, categories, pdf_url
+    """
+
+    __slots__ = ('entry_id', 'title', 'summary', 'authors', 'published', 'updated',
+                 'categories', 'primary_category', 'pdf_url')
+
+    def __init__(self, entry_id: str, title: str, summary: str, authors: List[Author],
+                 published: datetime, updated: datetime, categories: List[str],
+                 primary_category: str = "", pdf_url: Optional[str] = None):
+        self.entry_id = entry_id
+        self.title = title
+        self.summary = summary
+        self.authors = authors
+        self.published = published
+        self.updated = updated
+        self.categories = categories
+        self.primary_category = primary_category
+        self.pdf_url = pdf_url
+
+    def __repr__(self) -> str:
+        return f"ArxivEntry({self.entry_id!r})"
+
+
+def _parse_datetime(text: str) -> datetime:
+    """解析 Atom 时间戳为带时区的 UTC 时间"""
+    dt = datetime.fromisoformat(text.strip().replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def parse_rfc2822(text: str) -> Optional[datetime]:
+    """解析 RFC 2822 日期（如 Thu, 2 Jan 2025 08:00:00 GMT）为 UTC 时间，无法解析时返回 None"""
+    try:
+        dt = email.utils.parsedate_to_datetime((text or "").strip())
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def split_authors(text: str) -> List[Author]:
+    """将逗号 / and 分隔的作者字符串拆分为作者列表（先合并空白）"""
+    return [Author(name) for name in _AUTHOR_SPLIT_RE.split(" ".join((text or "").split())) if name]
+
+
+def fetch_with_retry(url: str, parse: Callable[..., T], rate_limiter: RateLimiter, num_retries: int = 3,
+                     timeout: float = 60.0, metrics=None) -> T:
+    """
+    带限速和重试的 GET 请求，响应交给 parse 流式解析；503 时按 Retry-After 等待后重试
+
+    Args:
+        url: 请求 URL
+        parse: 解析函数，参数为响应的文件对象（其抛出的 ArxivAPIError 不重试）
+        rate_limiter: 共享限速器
+        num_retries: 失败时的重试次数
+        timeout: 单次请求超时（秒）
+        metrics: 运行指标（RunMetrics），None 表示不记录
+
+    Returns:
+        parse 的返回值
+
+    Raises:
+        ArxivAPIError: 重试次数用尽，或 Retry-After 超过 MAX_RETRY_AFTER
+    """
+    metrics = metrics or NULL_METRICS
+    last_error = None
+    for attempt in range(num_retries + 1):
+        with metrics.stage("rate_limit_wait"):
+            rate_limiter.wait()
+        metrics.count("pages_fetched")
+        logger.debug(f"请求页面: {url}")
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        try:
+            with metrics.stage("network"), urllib.request.urlopen(request, timeout=timeout) as response:
+                return parse(response)
+        except urllib.error.HTTPError as e:
+            last_error = e
+            retry_after = e.headers.get("Retry-After", "") if e.headers else ""
+            if e.code == 503 and retry_after.isdigit():
+                delay = int(retry_after)
+                if delay > MAX_RETRY_AFTER:
+                    break
+                logger.info(f"服务端要求 {delay} 秒后重试")
+                time.sleep(delay)
+        except (urllib.error.URLError, OSError, ET.ParseError) as e:
+            last_error = e
+        logger.warning(f"请求失败（第 {attempt + 1} 次）: {last_error}")
+    raise ArxivAPIError(f"请求失败: {url}: {last_error}")
+
+
+def parse_entry(entry: ET.Element) -> Optional[ArxivEntry]:
+    """
+    将 <entry> 元素转换为 ArxivEntry
+
+    Args:
+        entry: Atom entry 元素
+
+    Returns:
+        ArxivEntry，缺少必要字段时返回 None
+    """
+    entry_id = entry.findtext("atom:id", None, _NS)
+    published = entry.findtext("atom:published", None, _NS)
+    updated = entry.findtext("atom:updated", None, _NS)
+    if not entry_id or not published or not updated:
+        logger.warning(f"跳过缺少必要字段的条目: {entry_id}")
+        return None
+
+    pdf_url = None
+    for link in entry.iterfind("atom:link", _NS):
+        if link.get("title") == "pdf":
+            pdf_url = link.get("href")
+            break
+
+    primary = entry.find("arxiv:primary_category", _NS)
+    return ArxivEntry(
+        entry_id=entry_id,
+        title=re.sub(r"\s+", " ", entry.findtext("atom:title", "", _NS)),
+        summary=entry.findtext("atom:summary", "", _NS),
+        authors=[Author(a.findtext("atom:name", "", _NS)) for a in entry.iterfind("atom:author", _NS)],
+        published=_parse_datetime(published),
+        updated=_parse_datetime(updated),
+        categories=[c.get("term") for c in entry.iterfind("atom:category", _NS) if c.get("term")],
+        primary_category=primary.get("term", "") if primary is not None else "",
+        pdf_url=pdf_url,
+    )
+
+
+def parse_atom_feed(content: bytes) -> Tuple[int, List[ArxivEntry]]:
+    """
+    解析一页 arXiv API Atom 响应
+
+    Args:
+        content: 原始响应内容
+
+    Returns:
+        (结果总数, 本页论文列表)
+    """
+    root = ET.fromstring(content)
+    total_text = root.findtext("opensearch:totalResults", "0", _NS)
+    try:
+        total = int(total_text.strip())
+    except ValueError:
+        total = 0
+    entries = [e for e in (parse_entry(el) for el in root.iterfind("atom:entry", _NS)) if e is not None]
+    return total, entries
+
+
+def query_window_closed(query: str, now: datetime = None) -> bool:
+    """
+    判断查询的提交日期窗口是否已经结束（结果不会再变化）
+
+    Args:
+        query: arXiv 查询语句
+        now: 当前时间（UTC），默认取系统时间
+
+    Returns:
+        窗口结束日期早于最近 OPEN_WINDOW_DAYS 天时返回 True；没有日期条件的查询视为未结束
+    """
+    ends = _SUBMITTED_RANGE_RE.findall(query)
+    if not ends:
+        return False
+    now = now or datetime.now(timezone.utc)
+    cutoff = (now - timedelta(days=OPEN_WINDOW_DAYS)).strftime("%Y%m%d")
+    return max(ends) < cutoff
+
+
+class ArxivAPIClient:
+    """同步 arXiv API 客户端"""
+
+    def __init__(self, base_url: str = None, page_size: int = 100, num_retries: int = 3,
+                 rate_limiter: RateLimiter = None, timeout: float = 30.0, cache=None, offline: bool = False,
+                 metrics=None):
+        """
+        Args:
+            base_url: 查询接口地址，默认为 arXiv 官方导出接口
+            page_size: 每页论文数
+            num_retries: 请求失败或意外空页时的重试次数
+            rate_limiter: 共享限速器，默认新建一个 3 秒间隔的限速器
+            timeout: 单次请求超时（秒）
+            cache: 原始响应缓存（AtomResponseCache），None 表示不缓存
+            offline: 离线模式，只读取缓存，不发出任何网络请求
+            metrics: 运行指标（RunMetrics），None 表示不记录
+        """
+        self.base_url = base_url or DEFAULT_BASE_URL
+        self.page_size = page_size
+        self.num_retries = num_retries
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.timeout = timeout
+        self.cache = cache
+        self.offline = offline
+        self.network_requests = 0
+        self.metrics = metrics or NULL_METRICS
+
+    def format_url(self, query: str, start: int, page_size: int) -> str:
+        """构建一页查询的 URL"""
+        params = urllib.parse.urlencode({
+            "search_query": query,
+            "start": start,
+            "max_results": page_size,
+            "sortBy": "submittedDate",
+            "sortOrder": "descending",
+        })
+        return f"{self.base_url}?{params}"
+
+    def fetch_page(self, query: str, start: int, page_size: int) -> bytes:
+        """
+        请求一页原始 Atom 响应
+        缓存未过期且查询窗口已结束时直接使用缓存；否则（过期，或窗口覆盖最近几天）
+        发送条件请求重新验证；离线模式只读取缓存
+
+        Args:
+            query: arXiv 查询语句
+            start: 起始偏移
+            page_size: 本页大小
+
+        Returns:
+            原始响应内容
+        """
+        cached = self.cache.get(self.base_url, query, start, page_size) if self.cache is not None else None
+        if cached is not None and (self.offline or (cached.fresh and query_window_closed(query))):
+            self.metrics.count("cache_hits")
+            return cached.body
+        if self.offline:
+            raise CacheMissError(f"离线模式下缓存未命中: query={query!r}, start={start}")
+
+        headers = {"User-Agent": USER_AGENT}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        url = self.format_url(query, start, page_size)
+        with self.metrics.stage("rate_limit_wait"):
+            self.rate_limiter.wait()
+        self.network_requests += 1
+        self.metrics.count("pages_fetched")
+        logger.debug(f"请求页面: {url}")
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with self.metrics.stage("network"), urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached is not None:
+                self.metrics.count("not_modified")
+                self.cache.revalidated(self.base_url, query, start, page_size)
+                return cached.body
+            raise
+        self.metrics.count("bytes_received", len(body))
+
+        if self.cache is not None:
+            self.cache.put(self.base_url, query, start, page_size, body, etag, last_modified)
+        return body
+
+    def _fetch_parsed_page(self, query: str, start: int, page_size: int) -> Tuple[int, List[ArxivEntry]]:
+        """请求并解析一页，失败或非首页为空时重试"""
+        last_error = None
+        for attempt in range(self.num_retries + 1):
+            try:
+                body = self.fetch_page(query, start, page_size)
+                with self.metrics.stage("parse"):
+                    total, entries = parse_atom_feed(body)
+                if entries or start == 0 or start >= total:
+                    return total, entries
+                last_error = ArxivAPIError(f"意外的空页: query={query!r}, start={start}")
+                if self.cache is not None and not self.offline:
+                    self.cache.discard(self.base_url, query, start, page_size)
+            except CacheMissError:
+                raise
+            except (urllib.error.URLError, OSError, ET.ParseError) as e:
+                last_error = e
+            logger.warning(f"请求失败（第 {attempt + 1} 次）: {last_error}")
+        raise ArxivAPIError(f"请求失败: query={query!r}, start={start}: {last_error}")
+
+    def results(self, query: str, max_results: int = None, start: int = 0,
+                on_page: Callable[[int, int], None] = None) -> Iterator[ArxivEntry]:
+        """
+        逐页获取查询结果
+
+        Args:
+            query: arXiv 查询语句
+            max_results: 最大结果数（从偏移 0 起算），None 表示获取全部
+            start: 起始偏移（从检查点续跑时为已完成的页之后）
+            on_page: 每页论文全部被取走之后、请求下一页之前的回调 on_page(下一页偏移, 本次已产出的论文数)
+
+        Yields:
+            ArxivEntry
+        """
+        yielded = 0
+        while max_results is None or start < max_results:
+            page_size = self.page_size if max_results is None else min(self.page_size, max_results - start)
+            total, entries = self._fetch_parsed_page(query, start, page_size)
+            if not entries:
+                return
+            yield from entries
+            start += len(entries)
+            yielded += len(entries)
+            if start >= total:
+                return
+            if on_page is not None:
+                on_page(start, yielded)
@@ -4,49 +4,322 @@ arXiv Paper Fetcher Tool
 每天自动从 arXiv 获取更新的论文，并筛选出包含特定关键词的论文
 """
 
-import arxiv
 import json
 import os
-from datetime import datetime, timedelta
-from typing import List, Dict, Set
+import re
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import TYPE_CHECKING, List, Dict, Iterable, Optional, Tuple
 import logging
 from pathlib import Path
-
-# 配置日志
 import sys
 
-# 设置控制台输出编码为 UTF-8（Windows 兼容）
-if sys.platform == 'win32':
-    import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+# 导入本模块时只加载抓取主流程必需的轻量模块；arxiv 库、HTTP 客户端、流式流水线、分片抓取、
+# 重新打标签和语义分类等较重或只在部分命令中用到的模块在首次使用时再导入
+try:
+    from .keyword_matcher import KeywordMatcher, ProfileMatcher
+    from .metrics import NULL_METRICS, RunMetrics, run_profiled
+    from .paper_record import PaperRecord, to_json_dict
+    from .paper_store import PaperStore
+    from .report_renderer import ReportEngine, group_papers
+    from .response_cache import AtomResponseCache
+    from .search_index import PaperSearchIndex
+    from .seen_store import AnnouncementLog, PaperVersion, SeenPaperStore, WatermarkStore, content_hash
+except ImportError:
+    from keyword_matcher import KeywordMatcher, ProfileMatcher
+    from metrics import NULL_METRICS, RunMetrics, run_profiled
+    from paper_record import PaperRecord, to_json_dict
+    from paper_store import PaperStore
+    from report_renderer import ReportEngine, group_papers
+    from response_cache import AtomResponseCache
+    from search_index import PaperSearchIndex
+    from seen_store import AnnouncementLog, PaperVersion, SeenPaperStore, WatermarkStore, content_hash
+
+if TYPE_CHECKING:
+    import arxiv
+    from fetch_checkpoint import FetchCheckpoint
+    from query_planner import QueryPlanner
 
 # 获取项目根目录用于日志文件
 project_root = Path(__file__).parent.parent
 log_file = project_root / 'arxiv_fetcher.log'
+# 结果根目录：带日期的数据目录、全局去重索引和响应缓存默认都放在这里
+RESULT_DIR = project_root / 'result'
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# 档案名用作结果目录名（不能是 . 或 ..）
+PROFILE_NAME_PATTERN = re.compile(r'^(?!\.+$)[\w.-]+$')
+
+
+def setup_logging(level: int = logging.INFO):
+    """
+    配置命令行运行时的日志（控制台 + arxiv_fetcher.log）；只在 main() 中调用，导入本模块没有副作用
+    
+    Args:
+        level: 日志级别
+    """
+    # 设置控制台输出编码为 UTF-8（Windows 兼容）
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+    
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+
+
+def resolve_result_path(path: Optional[str], default_name: str, result_dir: Path = None) -> Path:
+    """
+    解析配置中的文件路径
+    
+    Args:
+        path: 配置的路径，None 表示使用结果目录下的默认文件
+        default_name: 默认文件名
+        result_dir: 结果目录，None 表示 result/
+        
+    Returns:
+        绝对路径（相对路径相对于项目根目录）
+    """
+    if path is None:
+        return (result_dir or RESULT_DIR) / default_name
+    path = Path(path)
+    return path if path.is_absolute() else project_root / path
+
+
+def default_config() -> Dict:
+    """
+    获取默认配置
+
+    Returns:
+        默认配置字典
+    """
+    return {
+        "keywords": {
+            "kv_cache": [
+                "KV cache",
+                "KV Cache",
+                "kv cache",
+                "KVCache"
+            ],
+            "llm_inference": [
+                "LLM inference",
+                "llm inference",
+                "large language model inference"
+            ],
+            "llm_training": [
+                "LLM training",
+                "llm training",
+                "large language model training"
+            ],
+            "llm_communication": [
+                "LLM communication",
+                "llm communication",
+                "communication optimization",
+                "communication efficient",
+                "allreduce",
+                "all-gather",
+                "collective communication",
+                "gradient communication",
+                "communication compression"
+            ],
+            "video_generation": [
+                "video generation",
+                "video synthesis",
+                "video generation model"
+            ]
+        },
+        "system_keywords": [
+            "system",
+            "systems",
+            "architecture",
+            "framework",
+            "platform",
+            "infrastructure",
+            "deployment",
+            "serving",
+            "serving system",
+            "inference system",
+            "training system",
+            "runtime",
+            "engine",
+            "pipeline"
+        ],
+        "categories": {
+            "KV Cache": {
+                "keywords": "kv_cache",
+                "requires_system": False
+            },
+            "LLM Inference": {
+                "keywords": "llm_inference",
+                "requires_system": False
+            },
+            "LLM Training (System)": {
+                "keywords": "llm_training",
+                "requires_system": True
+            },
+            "LLM Communication": {
+                "keywords": "llm_communication",
+                "requires_system": False
+            },
+            "Video Generation (System)": {
+                "keywords": "video_generation",
+                "requires_system": True
+            }
+        },
+        "matching": {
+            # 默认按子串匹配（与引入 matching 之前的行为一致）；整词、词干化和连字符折叠需显式开启
+            "whole_word": False,
+            "case_sensitive": False,
+            "proximity": 0,
+            "stemming": False,
+            "fold_hyphens": False
+        },
+        "fetch": {
+            "workers": 4,
+            "page_size": 200,
+            "request_interval": 3.0,
+            "shard_categories": [],
+            "incremental": False,
+            "watermark_overlap_hours": 1,
+            "checkpoint_pages": 5,
+            "pushdown": False,
+            "pushdown_categories": [],
+            "max_query_length": 1000
+        },
+        "harvest": {
+            "base_url": "https://oaipmh.arxiv.org/oai",
+            "sets": ["cs"],
+            "categories": []
+        },
+        "announcements": {
+            "enabled": False,
+            "base_url": "https://rss.arxiv.org/rss",
+            "categories": ["cs.DC", "cs.LG", "cs.CL"],
+            "types": ["new", "cross"]
+        },
+        "storage": {
+            "compress": False
+        },
+        "cache": {
+            "enabled": True,
+            "ttl_hours": 24,
+            "max_mb": 512
+        },
+        "search": {
+            "enabled": True
+        },
+        "report": {
+            "formats": ["markdown"]
+        },
+        "profiles": {},
+        "semantic": {
+            "enabled": False,
+            "batch_size": 256,
+            "ngram": 2
+        },
+        "daemon": {
+            "schedule": ["0 2 * * *"],
+            "host": "127.0.0.1",
+            "port": 8765,
+            "reload_interval": 5,
+            "run": {
+                "days_back": 1,
+                "incremental": True
+            }
+        }
+    }
+
+
+def load_config(config_file: str) -> Dict:
+    """
+    加载配置文件，如果不存在则使用默认配置
+    
+    Args:
+        config_file: 配置文件路径（相对于项目根目录）
+        
+    Returns:
+        配置字典
+    """
+    # 如果路径是相对路径，从项目根目录查找
+    config_path = Path(config_file)
+    if not config_path.is_absolute():
+        config_path = project_root / config_file
+    
+    if config_path.exists():
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            logger.info(f"已加载配置文件: {config_file}")
+            return config
+        except Exception as e:
+            logger.warning(f"加载配置文件失败: {e}，使用默认配置")
+            return default_config()
+    else:
+        logger.info(f"配置文件不存在: {config_file}，使用默认配置")
+        return default_config()
+
+
+def open_search_index(config: Dict, result_dir: Path = None) -> Optional[PaperSearchIndex]:
+    """按配置 search 段打开全文检索索引（跨日期目录全局共享，默认位于结果目录下的 search_index.db），未启用时返回 None"""
+    search_config = config.get('search', {})
+    if not search_config.get('enabled', True):
+        return None
+    return PaperSearchIndex(resolve_result_path(search_config.get('path'), "search_index.db", result_dir))
+
+
+def rebuild_search_index(search_index: PaperSearchIndex, data_dirs: List = None, compress: bool = False) -> int:
+    """
+    从已保存的论文重建全文检索索引
+    
+    Args:
+        search_index: 全文检索索引
+        data_dirs: 数据目录列表，None 表示 result/ 下所有 paper_data_* 目录
+        compress: 论文存储是否使用 gzip 压缩
+        
+    Returns:
+        索引的论文数量
+    """
+    try:
+        from .retag import archive_stores
+    except ImportError:
+        from retag import archive_stores
+    
+    if data_dirs is None:
+        data_dirs = sorted(p for p in RESULT_DIR.glob("paper_data_*") if p.is_dir())
+    total = search_index.rebuild(archive_stores(data_dirs, compress=compress))
+    logger.info(f"全文检索索引重建完成：{len(data_dirs)} 个数据目录，{total} 篇论文")
+    return total
+
 
 class ArxivPaperFetcher:
     """arXiv 论文抓取和筛选工具"""
     
-    def __init__(self, data_dir: str = None, config_file: str = "config.json"):
+    def __init__(self, data_dir: str = None, config_file: str = "config.json", metrics: RunMetrics = None,
+                 profiles: Dict[str, str] = None, profile_name: str = None):
         """
         初始化抓取工具
         
         Args:
-            data_dir: 数据存储目录，如果为 None 则使用带日期的目录名
+            data_dir: 数据存储目录，如果为 None 则使用带日期的目录名；配置了多个档案时为各档案数据目录的父目录
             config_file: 配置文件路径，如果为 None 则使用默认关键词
+            metrics: 运行指标（阶段耗时、计数、写入字节数），None 表示不记录
+            profiles: 档案名 -> 档案配置文件路径，None 表示使用配置 profiles 段；
+                配置了档案时只抓取一次，每篇论文按所有档案的关键词分类，结果分别写入各档案的目录
+            profile_name: 作为某个档案的输出目标创建（由多档案抓取工具内部使用）：
+                结果、去重索引等默认放在 result/<档案名>/ 下，不抓取论文
         """
+        self.metrics = metrics or NULL_METRICS
+        self.profile_name = profile_name
+        # 结果目录：带日期的数据目录、去重索引等默认放在这里
+        self.result_dir = RESULT_DIR / profile_name if profile_name else RESULT_DIR
+        
         # 获取项目根目录（src 的父目录）
         project_root = Path(__file__).parent.parent
         
@@ -55,165 +328,166 @@ class ArxivPaperFetcher:
             config_file_path = project_root / config_file
         else:
             config_file_path = Path(config_file)
-        self.config = self._load_config(str(config_file_path))
-        
-        # 如果没有指定目录，使用带日期的目录名（放在 result 目录下）
-        if data_dir is None:
-            date_str = datetime.now().strftime("%Y.%m.%d")
-            result_dir = project_root / "result"
-            data_dir = result_dir / f"paper_data_{date_str}"
-        else:
-            # 如果指定了目录，转换为 Path 对象
-            data_dir = Path(data_dir)
-        
-        self.data_dir = Path(data_dir)
-        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.config = load_config(str(config_file_path))
         
         # 从配置中获取关键词和分类信息
         self.keywords_map = self.config.get('keywords', {})
         self.system_keywords = self.config.get('system_keywords', [])
         self.categories_config = self.config.get('categories', {})
+        self.fetch_config = self.config.get('fetch', {})
+        self.storage_config = self.config.get('storage', {})
+        self.report_config = self.config.get('report', {})
         
-        # 已记录的论文ID集合（用于去重）
-        self.recorded_papers_file = self.data_dir / "recorded_papers.json"
+        # 多档案：每个档案是一个只负责分类和输出的抓取工具，共用本工具的抓取、缓存和增量水位线
+        self.profiles: Dict[str, ArxivPaperFetcher] = {}
+        if profile_name is None:
+            if profiles is None:
+                profiles = self.config.get('profiles') or {}
+            for name, profile_config in profiles.items():
+                if not PROFILE_NAME_PATTERN.match(name):
+                    raise ValueError(f"档案名只能包含字母、数字、下划线、点和连字符（且不能只由点组成）: {name!r}")
+                profile_path = Path(profile_config)
+                if not profile_path.is_absolute():
+                    profile_path = project_root / profile_path
+                if not profile_path.exists():
+                    raise ValueError(f"档案 {name} 的配置文件不存在: {profile_config}")
+                self.profiles[name] = ArxivPaperFetcher(
+                    data_dir=str(Path(data_dir) / name) if data_dir is not None else None,
+                    config_file=str(profile_path), metrics=metrics, profile_name=name,
+                )
+        self.profile_matcher = None
+        if self.profiles:
+            self.profile_matcher = ProfileMatcher({name: p.config for name, p in self.profiles.items()})
+            logger.info(f"多档案抓取: {', '.join(self.profiles)}")
+        
+        # 数据目录及其中的 JSONL 论文存储
+        self.set_data_dir(data_dir)
+        
+        # 预编译关键词匹配器（每篇论文只扫描一次文本）
+        self.matching_config = self.config.get('matching', {})
+        self.keyword_matcher = KeywordMatcher(
+            self.keywords_map, self.system_keywords, self.categories_config, self.matching_config
+        )
+        
+        # 可选的语义分类阶段（在关键词匹配之后，按批次对论文与分类质心计算相似度）
+        self.semantic_config = self.config.get('semantic', {})
+        self.semantic_classifier = None
+        if self.semantic_config.get('enabled', False):
+            try:
+                from .semantic_classifier import EmbeddingCache, SemanticClassifier
+            except ImportError:
+                from semantic_classifier import EmbeddingCache, SemanticClassifier
+            embedding_path = resolve_result_path(self.semantic_config.get('cache_path'), "embeddings.db",
+                                                 self.result_dir)
+            self.semantic_config = dict(self.semantic_config, cache_path=str(embedding_path))
+            classifier = SemanticClassifier(self.keywords_map, self.categories_config, self.semantic_config)
+            if classifier:
+                classifier.cache = EmbeddingCache(embedding_path, classifier.vectorizer.signature)
+                self.semantic_classifier = classifier
+            else:
+                logger.warning("已启用语义分类，但没有分类配置 semantic 段")
+        # 每批检查的论文数（语义阶段按批查询向量缓存并打分）
+        self.classify_batch_size = max(1, int(self.semantic_config.get('batch_size', 256))) \
+            if self.semantic_classifier is not None else 1
+        if self.profiles:
+            self.classify_batch_size = max(p.classify_batch_size for p in self.profiles.values())
+        
+        # 本次运行发现论文的时间（所有匹配论文共用）
+        self._found_date = datetime.now().isoformat()
+        
+        # 已记录的论文索引（用于去重，跨日期目录全局共享）
+        # 默认位于 result/seen_papers.db（与 --data-dir 无关，档案为 result/<档案名>/seen_papers.db），
+        # 可通过配置 seen_db 指定
+        self.seen_db_file = resolve_result_path(self.config.get('seen_db'), "seen_papers.db", self.result_dir)
         self.recorded_paper_ids = self._load_recorded_papers()
+        # 增量抓取水位线（与去重索引共用同一个数据库；档案不抓取论文，没有水位线）
+        self.watermarks = WatermarkStore(self.seen_db_file) if profile_name is None else None
+        # 已处理的 arXiv 公告批次（公告批次模式）
+        self.announcement_log = AnnouncementLog(self.seen_db_file) if profile_name is None else None
+        
+        # 请求限速器（首次请求时创建；同一个抓取工具的多次运行共用，连续运行之间也保持请求间隔）
+        self.rate_limiter = None
+        
+        # arXiv API 原始响应缓存（默认与全局去重索引一起放在 result/ 目录）
+        self.response_cache = None
+        cache_config = self.config.get('cache', {})
+        if profile_name is None and cache_config.get('enabled', True):
+            self.response_cache = AtomResponseCache(
+                resolve_result_path(cache_config.get('path'), "api_cache.db"),
+                ttl_seconds=cache_config.get('ttl_hours', 24) * 3600,
+                max_bytes=int(cache_config.get('max_mb', 512) * 1024 * 1024),
+            )
+        
+        # 全文检索索引（跨日期目录全局共享，默认位于结果目录下的 search_index.db）
+        self.search_index = open_search_index(self.config, self.result_dir)
     
-    def _load_config(self, config_file: str) -> Dict:
+    def set_data_dir(self, data_dir: str = None):
         """
-        加载配置文件，如果不存在则使用默认配置
+        设置数据目录并打开其中的论文存储（守护进程跨天运行时每次运行前调用，其余已加载的状态保持不变）
         
         Args:
-            config_file: 配置文件路径（相对于项目根目录）
-            
-        Returns:
-            配置字典
+            data_dir: 数据存储目录，如果为 None 则使用带日期的目录名；配置了多个档案时为各档案数据目录的父目录
         """
-        # 如果路径是相对路径，从项目根目录查找
-        config_path = Path(config_file)
-        if not config_path.is_absolute():
-            project_root = Path(__file__).parent.parent
-            config_path = project_root / config_file
+        if self.profiles:
+            # 各档案写入自己的数据目录（指定目录时为其下以档案名命名的子目录），本工具不保存论文
+            for name, profile in self.profiles.items():
+                profile.set_data_dir(str(Path(data_dir) / name) if data_dir is not None else None)
+            self.data_dir = Path(data_dir) if data_dir is not None else self.result_dir
+            self.recorded_papers_file = self.data_dir / "recorded_papers.json"
+            self.paper_store = None
+            return
         
-        if config_path.exists():
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                logger.info(f"已加载配置文件: {config_file}")
-                return config
-            except Exception as e:
-                logger.warning(f"加载配置文件失败: {e}，使用默认配置")
-                return self._get_default_config()
-        else:
-            logger.info(f"配置文件不存在: {config_file}，使用默认配置")
-            return self._get_default_config()
-    
-    def _get_default_config(self) -> Dict:
-        """
-        获取默认配置
+        # 如果没有指定目录，使用带日期的目录名（放在结果目录下）
+        if data_dir is None:
+            date_str = datetime.now().strftime("%Y.%m.%d")
+            data_dir = self.result_dir / f"paper_data_{date_str}"
         
-        Returns:
-            默认配置字典
-        """
-        return {
-            "keywords": {
-                "kv_cache": [
-                    "KV cache",
-                    "KV Cache",
-                    "kv cache",
-                    "KVCache"
-                ],
-                "llm_inference": [
-                    "LLM inference",
-                    "llm inference",
-                    "large language model inference"
-                ],
-                "llm_training": [
-                    "LLM training",
-                    "llm training",
-                    "large language model training"
-                ],
-                "llm_communication": [
-                    "LLM communication",
-                    "llm communication",
-                    "communication optimization",
-                    "communication efficient",
-                    "allreduce",
-                    "all-gather",
-                    "collective communication",
-                    "gradient communication",
-                    "communication compression"
-                ],
-                "video_generation": [
-                    "video generation",
-                    "video synthesis",
-                    "video generation model"
-                ]
-            },
-            "system_keywords": [
-                "system",
-                "systems",
-                "architecture",
-                "framework",
-                "platform",
-                "infrastructure",
-                "deployment",
-                "serving",
-                "serving system",
-                "inference system",
-                "training system",
-                "runtime",
-                "engine",
-                "pipeline"
-            ],
-            "categories": {
-                "KV Cache": {
-                    "keywords": "kv_cache",
-                    "requires_system": False
-                },
-                "LLM Inference": {
-                    "keywords": "llm_inference",
-                    "requires_system": False
-                },
-                "LLM Training (System)": {
-                    "keywords": "llm_training",
-                    "requires_system": True
-                },
-                "LLM Communication": {
-                    "keywords": "llm_communication",
-                    "requires_system": False
-                },
-                "Video Generation (System)": {
-                    "keywords": "video_generation",
-                    "requires_system": True
-                }
-            }
-        }
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.recorded_papers_file = self.data_dir / "recorded_papers.json"
+        
+        # 追加写入的 JSONL 论文存储（旧版 papers_YYYYMMDD.json 会被转换为分段）
+        self.paper_store = PaperStore(self.data_dir, compress=self.storage_config.get('compress', False))
+        if self.paper_store.migrate_legacy_files():
+            logger.info("已将旧版论文 JSON 文件转换为 JSONL 分段")
+    
+    def close(self):
+        """关闭去重索引、响应缓存、全文检索索引和向量缓存的数据库连接（包括各档案的）"""
+        for profile in self.profiles.values():
+            profile.close()
+        self.recorded_paper_ids.close()
+        if self.watermarks is not None:
+            self.watermarks.close()
+        if self.announcement_log is not None:
+            self.announcement_log.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+        if self.search_index is not None:
+            self.search_index.close()
+        if self.semantic_classifier is not None:
+            self.semantic_classifier.cache.close()
     
-    def _load_recorded_papers(self) -> Set[str]:
-        """加载已记录的论文ID"""
+    def _load_recorded_papers(self) -> SeenPaperStore:
+        """打开全局已记录论文索引，并迁移旧版 recorded_papers.json"""
+        store = SeenPaperStore(self.seen_db_file)
         if self.recorded_papers_file.exists():
+            count = store.import_legacy_file(self.recorded_papers_file)
+            migrated_file = self.recorded_papers_file.with_name("recorded_papers.json.migrated")
             try:
-                with open(self.recorded_papers_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return set(data.get('paper_ids', []))
+                self.recorded_papers_file.replace(migrated_file)
+                logger.info(f"已将 {count} 条旧版记录迁移到 {self.seen_db_file}")
             except Exception as e:
-                logger.warning(f"加载已记录论文失败: {e}")
-                return set()
-        return set()
+                logger.warning(f"重命名旧版已记录论文文件失败: {e}")
+        return store
     
     def _save_recorded_papers(self):
         """保存已记录的论文ID"""
         try:
-            data = {
-                'paper_ids': list(self.recorded_paper_ids),
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(self.recorded_papers_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.recorded_paper_ids.commit()
         except Exception as e:
             logger.error(f"保存已记录论文失败: {e}")
     
-    def _check_keywords(self, paper: arxiv.Result) -> bool:
+    def _check_keywords(self, paper: "arxiv.Result") -> bool:
         """
         检查论文是否包含关键词（基于配置文件）
         
@@ -223,388 +497,1281 @@ class ArxivPaperFetcher:
         Returns:
             如果包含关键词返回 True，否则返回 False
         """
-        text_to_check = f"{paper.title} {paper.summary}".lower()
+        return bool(self.keyword_matcher.match_paper(paper))
+    
+    def _categorize_paper(self, paper: "arxiv.Result") -> List[str]:
+        """
+        对论文进行分类（基于配置文件）
         
-        # 遍历所有分类配置
-        for category_name, category_config in self.categories_config.items():
-            keyword_group = category_config.get('keywords')
-            requires_system = category_config.get('requires_system', False)
+        Args:
+            paper: arxiv 论文对象
             
-            # 获取该分类的关键词列表
-            keywords = self.keywords_map.get(keyword_group, [])
+        Returns:
+            分类标签列表
+        """
+        categories = self.keyword_matcher.match_paper(paper)
+        return categories if categories else ["Other"]
+    
+    def _shared_rate_limiter(self) -> "RateLimiter":
+        """请求限速器：跨运行共用（检索、OAI-PMH 与公告源请求共享同一间隔），间隔以当前配置为准"""
+        try:
+            from .arxiv_api import ARXIV_REQUEST_INTERVAL, RateLimiter
+        except ImportError:
+            from arxiv_api import ARXIV_REQUEST_INTERVAL, RateLimiter
+        
+        interval = self.fetch_config.get('request_interval', ARXIV_REQUEST_INTERVAL)
+        if self.rate_limiter is None:
+            self.rate_limiter = RateLimiter(interval)
+        self.rate_limiter.min_interval = interval
+        return self.rate_limiter
+    
+    def _make_api_client(self, offline: bool = False, use_cache: bool = True,
+                         metrics: RunMetrics = None) -> "ArxivAPIClient":
+        """
+        根据 fetch / cache 配置创建 arXiv API 客户端
+        
+        Args:
+            offline: 是否只读取缓存
+            use_cache: 是否使用响应缓存（配置启用时）
+            metrics: 运行指标，None 表示使用本工具的运行指标
             
-            # 检查是否包含该分类的关键词
-            if any(kw.lower() in text_to_check for kw in keywords):
-                # 如果需要 system 限制，检查是否包含 system 关键词
-                if requires_system:
-                    if any(sys_kw.lower() in text_to_check for sys_kw in self.system_keywords):
-                        return True
-                else:
-                    return True
+        Returns:
+            ArxivAPIClient
+        """
+        try:
+            from .arxiv_api import ArxivAPIClient
+        except ImportError:
+            from arxiv_api import ArxivAPIClient
         
-        return False
+        return ArxivAPIClient(
+            base_url=self.fetch_config.get('base_url'),
+            page_size=self.fetch_config.get('page_size', 200),
+            rate_limiter=self._shared_rate_limiter(),
+            cache=self.response_cache if use_cache else None,
+            offline=offline,
+            metrics=metrics or self.metrics,
+        )
     
-    def _categorize_paper(self, paper: arxiv.Result) -> List[str]:
+    def _fetch_sharded_results(self, start_date: datetime, end_date: datetime, streaming: bool = False,
+                               cutoffs: Dict[str, datetime] = None) -> Iterable:
         """
-        对论文进行分类（基于配置文件）
+        按天（以及配置中的 arXiv 分类）拆分日期窗口并发抓取
         
         Args:
-            paper: arxiv 论文对象
+            start_date: 起始时间
+            end_date: 结束时间
+            streaming: 是否在论文到达时立即产出（不等待全部分片完成）
+            cutoffs: 增量抓取截止时间（键为分类，"*" 表示不分分类）
             
         Returns:
-            分类标签列表
+            合并去重后的论文列表（streaming 时为迭代器）
         """
-        categories = []
-        text = f"{paper.title} {paper.summary}".lower()
+        try:
+            from .sharded_fetch import ShardedFetcher, build_shards
+        except ImportError:
+            from sharded_fetch import ShardedFetcher, build_shards
         
-        # 遍历所有分类配置
-        for category_name, category_config in self.categories_config.items():
-            keyword_group = category_config.get('keywords')
-            requires_system = category_config.get('requires_system', False)
+        client = self._make_api_client()
+        shard_categories = self.fetch_config.get('shard_categories')
+        shards = build_shards(start_date.date(), end_date.date(), shard_categories)
+        planner = self._query_planner()
+        if planner is not None:
+            filters = planner.filters(max(len(shard.query) for shard in shards))
+            shards = build_shards(start_date.date(), end_date.date(), shard_categories, filters=filters)
+        logger.info(f"分片抓取: {len(shards)} 个分片，并发数 {self.fetch_config.get('workers', 4)}")
+        sharded_fetcher = ShardedFetcher(client, workers=self.fetch_config.get('workers', 4), cutoffs=cutoffs)
+        if streaming:
+            return sharded_fetcher.iter_fetch(shards)
+        return sharded_fetcher.fetch(shards)
+    
+    def _query_planner(self, required: bool = False) -> Optional["QueryPlanner"]:
+        """
+        服务端查询规划器（配置 fetch.pushdown 启用）：把各输出目标的分类关键词编译为查询条件
+        
+        Args:
+            required: 不论配置是否启用都创建规划器，关键词无法下推时抛出 ValueError（用于查看和校验查询规划）
+        
+        Returns:
+            QueryPlanner；未启用或关键词无法下推时为 None（全量抓取窗口内的论文）
+        """
+        if not required and not self.fetch_config.get('pushdown', False):
+            return None
+        try:
+            from .query_planner import MAX_QUERY_LENGTH, QueryPlanner
+        except ImportError:
+            from query_planner import MAX_QUERY_LENGTH, QueryPlanner
+        
+        try:
+            planner = QueryPlanner(
+                [(t.keywords_map, t.categories_config, t.matching_config) for t in self.targets],
+                categories=self.fetch_config.get('pushdown_categories'),
+                max_length=self.fetch_config.get('max_query_length', MAX_QUERY_LENGTH),
+            )
+        except ValueError as e:
+            if required:
+                raise
+            logger.warning(f"{e}，本次全量抓取")
+            return None
+        if any(t.semantic_classifier is not None for t in self.targets):
+            logger.warning("已启用语义分类：服务端关键词过滤会漏掉只靠语义分类命中的论文")
+        return planner
+    
+    def _iter_planned_results(self, queries: List[str], max_results: int, cutoff: Optional[datetime]):
+        """
+        依次抓取拆分后的多个查询，按 entry_id 合并去重
+        
+        Args:
+            queries: 查询语句列表
+            max_results: 每个查询的最大结果数
+            cutoff: 增量抓取截止时间
             
-            # 获取该分类的关键词列表
-            keywords = self.keywords_map.get(keyword_group, [])
+        Yields:
+            去重后的论文
+        """
+        client = self._make_api_client()
+        seen_ids = set()
+        for query in queries:
+            results = client.results(query, max_results=max_results)
+            if cutoff is not None:
+                results = self._stop_at_cutoff(results, cutoff)
+            for paper in results:
+                if paper.entry_id not in seen_ids:
+                    seen_ids.add(paper.entry_id)
+                    yield paper
+        logger.info(f"共 {len(queries)} 个查询，合并去重后 {len(seen_ids)} 篇论文")
+    
+    def _replay_cached_results(self, start_date: datetime, end_date: datetime):
+        """
+        离线重放：只从响应缓存中读取日期窗口内的论文，不发出网络请求
+        （只解析查询区间与窗口重叠的缓存页面）
+        
+        Args:
+            start_date: 起始时间
+            end_date: 结束时间
             
-            # 检查是否包含该分类的关键词
-            if any(kw.lower() in text for kw in keywords):
-                # 如果需要 system 限制，检查是否包含 system 关键词
-                if requires_system:
-                    if any(sys_kw.lower() in text for sys_kw in self.system_keywords):
-                        categories.append(category_name)
-                else:
-                    categories.append(category_name)
+        Yields:
+            窗口内的论文（按 entry_id 去重）
+        """
+        if self.response_cache is None:
+            raise RuntimeError("离线模式需要在配置中启用 cache")
+        try:
+            from .arxiv_api import DEFAULT_BASE_URL, parse_atom_feed
+        except ImportError:
+            from arxiv_api import DEFAULT_BASE_URL, parse_atom_feed
         
-        return categories if categories else ["Other"]
+        first_day = start_date.strftime("%Y%m%d")
+        last_day = end_date.strftime("%Y%m%d")
+        seen_ids = set()
+        pages = 0
+        base_url = self.fetch_config.get('base_url') or DEFAULT_BASE_URL
+        for body in self.response_cache.iter_pages(base_url, first_day, last_day):
+            pages += 1
+            self.metrics.count("cache_hits")
+            with self.metrics.stage("parse"):
+                _, entries = parse_atom_feed(body)
+            for entry in entries:
+                if entry.entry_id in seen_ids:
+                    continue
+                if first_day <= entry.published.strftime("%Y%m%d") <= last_day:
+                    seen_ids.add(entry.entry_id)
+                    yield entry
+        logger.info(f"离线重放: 读取 {pages} 个缓存页面，窗口内共 {len(seen_ids)} 篇论文")
+    
+    def _watermark_keys(self, sharded: bool) -> List[str]:
+        """当前抓取模式下的水位线键：分片模式按配置的分类，否则为 "*"（不分分类）"""
+        categories = self.fetch_config.get('shard_categories') if sharded else None
+        return list(categories) if categories else ["*"]
+    
+    def _watermark_cutoffs(self, keys: List[str]) -> Dict[str, datetime]:
+        """各水位线键的增量截止时间（水位线减去配置的重叠时长）"""
+        overlap = timedelta(hours=self.fetch_config.get('watermark_overlap_hours', 1))
+        cutoffs = {}
+        for key in keys:
+            watermark = self.watermarks.get(key)
+            if watermark is not None:
+                cutoffs[key] = watermark - overlap
+        return cutoffs
     
-    def fetch_daily_papers(self, days_back: int = 1, max_results: int = 1000) -> List[Dict]:
+    @staticmethod
+    def _stop_at_cutoff(results: Iterable, cutoff: datetime):
+        """结果按提交时间从新到旧排列：遇到不晚于截止时间的论文即停止（不再翻页）"""
+        for paper in results:
+            if paper.published <= cutoff:
+                logger.info(f"已到达增量水位线 {cutoff.isoformat()}，停止翻页")
+                return
+            yield paper
+    
+    def _track_watermarks(self, results: Iterable, keys: List[str], limit: int = None,
+                          newest: Dict[str, datetime] = None):
         """
-        获取最近几天的论文
+        透传论文并记录每个水位线键的最新提交时间；迭代完整结束后才推进水位线
         
         Args:
-            days_back: 回溯天数，默认1天（今天）
-            max_results: 最大结果数
+            results: 论文对象迭代器
+            keys: 水位线键
+            limit: 结果数上限（达到上限说明窗口内可能还有更早的论文未取到，此时不推进水位线）
+            newest: 记录最新提交时间的字典（原地更新；从检查点续跑时包含之前已抓取页的进度）
+        """
+        if newest is None:
+            newest = {}
+        count = 0
+        for paper in results:
+            count += 1
+            for key in keys:
+                if key == "*" or key in paper.categories:
+                    if key not in newest or paper.published > newest[key]:
+                        newest[key] = paper.published
+            yield paper
+        if limit is not None and count >= limit:
+            logger.warning(f"结果数达到上限 {limit}，本次不推进增量水位线")
+            return
+        for key, timestamp in newest.items():
+            self.watermarks.advance(key, timestamp)
+    
+    def _iter_results(self, days_back: int = 1, max_results: int = 1000, sharded: bool = False,
+                      offline: bool = False, streaming: bool = False, incremental: bool = False,
+                      checkpoint: "FetchCheckpoint" = None) -> Iterable:
+        """
+        按抓取模式返回原始论文迭代器
+        
+        Args:
+            days_back: 回溯天数
+            max_results: 最大结果数（分片模式下不限制）
+            sharded: 是否按天/分类拆分并发抓取
+            offline: 是否只重放缓存中的页面（不访问网络）
+            streaming: 分片模式下是否在分片完成时立即产出结果（不等待全部分片）
+            incremental: 是否只抓取比水位线更新的论文（离线重放时忽略）
+            checkpoint: 页级抓取检查点（只用于单查询抓取）；已载入状态时沿用其中的查询，从已完成的页之后继续
             
         Returns:
-            筛选后的论文列表
+            论文对象迭代器
         """
-        logger.info(f"开始获取最近 {days_back} 天的 arXiv 论文...")
-        
         # 计算日期范围
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
         
-        # 构建查询：获取最近更新的论文
-        # arXiv 使用日期格式：YYYYMMDD
-        date_str = start_date.strftime("%Y%m%d")
-        query = f"submittedDate:[{date_str}000000 TO {end_date.strftime('%Y%m%d')}235959]"
+        if offline:
+            return self._replay_cached_results(start_date, end_date)
         
-        logger.info(f"查询条件: {query}")
+        keys = self._watermark_keys(sharded)
+        cutoffs = self._watermark_cutoffs(keys) if incremental else {}
+        if sharded:
+            results = self._fetch_sharded_results(start_date, end_date, streaming=streaming, cutoffs=cutoffs)
+            return self._track_watermarks(results, keys)
         
-        # 搜索论文
-        search = arxiv.Search(
-            query=query,
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.SubmittedDate,
-            sort_order=arxiv.SortOrder.Descending
-        )
+        cutoff = cutoffs.get("*")
+        if cutoff is not None:
+            # 窗口起点收缩到水位线所在日期
+            start_date = max(start_date, cutoff.astimezone().replace(tzinfo=None))
+            logger.info(f"增量抓取：水位线截止时间 {cutoff.isoformat()}")
         
-        matched_papers = []
-        total_checked = 0
+        start = 0
+        if checkpoint is not None and checkpoint.state is not None:
+            # 续跑：沿用检查点中的查询（窗口不随当前时间变化），从最后完成的页之后继续
+            state = checkpoint.state
+            if state['complete']:
+                logger.info("检查点中的抓取已完整结束，不再请求")
+                return self._track_watermarks(iter(()), keys, newest=checkpoint.newest)
+            query, max_results, start = state['query'], state['max_results'], state['offset']
+            logger.info(f"从检查点继续: {query}，已完成 {state['pages']} 页，从偏移 {start} 继续")
+        else:
+            # 构建查询：获取最近更新的论文
+            # arXiv 使用日期格式：YYYYMMDD
+            date_str = start_date.strftime("%Y%m%d")
+            query = f"submittedDate:[{date_str}000000 TO {end_date.strftime('%Y%m%d')}235959]"
+            planner = self._query_planner()
+            if planner is not None:
+                queries = planner.queries(query)
+                if len(queries) > 1:
+                    # 多个查询的结果取并集（按查询拆分后不使用页级检查点）
+                    logger.info(f"服务端关键词过滤: 拆分为 {len(queries)} 个查询")
+                    results = self._iter_planned_results(queries, max_results, cutoff)
+                    # 任一查询达到上限时并集也至少有 max_results 篇，水位线同样不会推进
+                    return self._track_watermarks(results, keys, limit=max_results)
+                query = queries[0]
+            logger.info(f"查询条件: {query}")
+            if checkpoint is not None:
+                checkpoint.begin(query, max_results, [target.profile_name for target in self.targets],
+                                 self._found_date)
+        
+        # 搜索论文（启用缓存或检查点时通过自带的客户端分页请求，以便之后离线重放 / 从某一页继续）
+        if self.response_cache is not None or checkpoint is not None:
+            results = self._make_api_client().results(
+                query, max_results=max_results, start=start,
+                on_page=checkpoint.page_done if checkpoint is not None else None,
+            )
+        else:
+            import arxiv
+            search = arxiv.Search(
+                query=query,
+                max_results=max_results,
+                sort_by=arxiv.SortCriterion.SubmittedDate,
+                sort_order=arxiv.SortOrder.Descending
+            )
+            results = arxiv.Client().results(search)
+        if cutoff is not None:
+            results = self._stop_at_cutoff(results, cutoff)
+        return self._track_watermarks(results, keys, limit=max_results - start if max_results else None,
+                                      newest=checkpoint.newest if checkpoint is not None else None)
+    
+    def _check_revision(self, paper, unchanged: List, revised: Dict[str, PaperVersion]) -> bool:
+        """
+        检查论文是否为已保存论文的修订版：标题和摘要未变化的加入 unchanged（不再分类），有变化的记入 revised
         
+        Args:
+            paper: arxiv 论文对象（不在去重索引中）
+            unchanged: (论文, 之前的版本) 列表
+            revised: entry_id -> 之前的版本
+            
+        Returns:
+            是否需要分类
+        """
+        previous = self.recorded_paper_ids.previous_version(paper.entry_id)
+        if previous is None:
+            return True
+        if content_hash(paper.title, paper.summary) == previous.content_hash:
+            self.metrics.count("revisions_unchanged")
+            unchanged.append((paper, previous))
+            return False
+        self.metrics.count("revisions_changed")
+        revised[paper.entry_id] = previous
+        return True
+    
+    def _bump_unchanged_revisions(self, revisions: List[Tuple[object, PaperVersion]]):
+        """
+        处理标题和摘要未变化的修订版：只把已保存记录的 updated 更新为新版本的时间（原地覆盖，不进入报告），
+        并立即在去重索引中记录新版本号
+        
+        Args:
+            revisions: (论文, 之前的版本) 列表
+        """
+        if not revisions:
+            return
+        by_dir: Dict[Optional[str], List[Tuple[object, PaperVersion]]] = {}
+        for paper, previous in revisions:
+            by_dir.setdefault(previous.data_dir, []).append((paper, previous))
+        for data_dir, items in by_dir.items():
+            if data_dir is not None and Path(data_dir) == self.data_dir:
+                store = self.paper_store
+            elif data_dir is not None and Path(data_dir).is_dir():
+                store = PaperStore(data_dir, compress=self.storage_config.get('compress', False))
+            else:
+                store = None
+            updated = []
+            for paper, previous in items:
+                stored = store.get(previous.entry_id) if store is not None else None
+                if stored is None:
+                    logger.warning(f"找不到修订版 {paper.entry_id} 的已保存记录 {previous.entry_id}，只记录版本号")
+                    continue
+                stored['updated'] = paper.updated.isoformat() if isinstance(paper.updated, datetime) else paper.updated
+                updated.append(stored)
+            if updated:
+                with self.metrics.stage("save"):
+                    store.replace(updated)
+                    if self.search_index is not None:
+                        self.search_index.add_many(updated, data_dir)
+                logger.info(f"{len(updated)} 篇论文的修订版标题和摘要未变化，已更新 {data_dir} 中记录的更新时间")
+        self.recorded_paper_ids.record_unchanged_revisions(paper.entry_id for paper, _ in revisions)
+    
+    def _classify_results(self, papers: List, retag: bool = False) -> List[PaperRecord]:
+        """
+        批量检查论文：跳过已记录的论文和内容未变化的修订版，匹配关键词，再（启用时）对整批论文做语义分类，构建论文记录
+        
+        Args:
+            papers: arxiv 论文对象列表
+            retag: 重新打标签（离线重放）：不跳过已记录的论文，并沿用已保存记录的 found_date
+            
+        Returns:
+            匹配论文的 PaperRecord 列表（保持输入顺序，并记录其 ID）
+        """
+        metrics = self.metrics
+        candidates = []
+        batch_ids = set()
+        unchanged = []
+        revised = {}
+        for paper in papers:
+            metrics.count("papers_checked")
+            # 跳过已记录的论文（包括同一批中重复出现的论文）
+            if not retag and (paper.entry_id in self.recorded_paper_ids or paper.entry_id in batch_ids):
+                metrics.count("papers_skipped_seen")
+                continue
+            batch_ids.add(paper.entry_id)
+            if not retag and not self._check_revision(paper, unchanged, revised):
+                continue
+            # 检查关键词并分类（单次扫描）
+            with metrics.stage("match"):
+                categories = self.keyword_matcher.match_paper(paper, metrics.enabled)
+            candidates.append((paper, categories))
+        if metrics.enabled:
+            self.keyword_matcher.report_prefilter(metrics)
+        self._bump_unchanged_revisions(unchanged)
+        return self._build_records(candidates, retag, revised)
+    
+    def _classify_targets(self, papers: List, retag: bool = False) -> List[Tuple["ArxivPaperFetcher", PaperRecord]]:
+        """
+        批量检查论文并分发到输出目标：未配置档案时为本工具，否则用合并匹配器对每篇论文只扫描一次，
+        得到所有档案的分类，再由各档案按自己的去重索引和语义分类构建论文记录
+        
+        Args:
+            papers: arxiv 论文对象列表
+            retag: 重新打标签（离线重放）：不跳过已记录的论文
+            
+        Returns:
+            (输出目标, PaperRecord) 列表
+        """
+        if not self.profiles:
+            return [(self, record) for record in self._classify_results(papers, retag=retag)]
+        
+        metrics = self.metrics
+        candidates = {profile: [] for profile in self.profiles.values()}
+        unchanged = {profile: [] for profile in self.profiles.values()}
+        revised = {profile: {} for profile in self.profiles.values()}
+        batch_ids = set()
+        for paper in papers:
+            metrics.count("papers_checked")
+            if not retag and paper.entry_id in batch_ids:
+                metrics.count("papers_skipped_seen")
+                continue
+            batch_ids.add(paper.entry_id)
+            # 所有档案都已记录（或修订版内容未变化）的论文不再匹配
+            pending = [(name, profile) for name, profile in self.profiles.items()
+                       if retag or (paper.entry_id not in profile.recorded_paper_ids
+                                    and profile._check_revision(paper, unchanged[profile], revised[profile]))]
+            if not pending:
+                metrics.count("papers_skipped_seen")
+                continue
+            with metrics.stage("match"):
+                matched = self.profile_matcher.match_paper(paper, metrics.enabled)
+            for name, profile in pending:
+                categories = matched.get(name, [])
+                # 未命中关键词的论文只有启用语义分类的档案需要
+                if categories or profile.semantic_classifier is not None:
+                    candidates[profile].append((paper, categories))
+        if metrics.enabled:
+            self.profile_matcher.report_prefilter(metrics)
+        
+        routed = []
+        for profile, profile_candidates in candidates.items():
+            profile._bump_unchanged_revisions(unchanged[profile])
+            routed.extend((profile, record)
+                          for record in profile._build_records(profile_candidates, retag, revised[profile]))
+        return routed
+    
+    def _build_records(self, candidates: List[Tuple], retag: bool = False,
+                       revised: Dict[str, PaperVersion] = None) -> List[PaperRecord]:
+        """
+        对关键词匹配后的候选论文做语义分类（启用时），构建匹配论文的记录并加入去重索引（同时记录内容哈希）
+        
+        Args:
+            candidates: (arxiv 论文对象, 关键词分类列表) 列表
+            retag: 重新打标签（离线重放）：沿用已保存记录的 found_date
+            revised: 标题或摘要有变化的修订版：entry_id -> 之前的版本，记录中标记为修订版
+            
+        Returns:
+            匹配论文的 PaperRecord 列表（保持输入顺序）
+        """
+        metrics = self.metrics
+        profile_tag = f" [{self.profile_name}]" if self.profile_name else ""
+        semantic = None
+        if self.semantic_classifier is not None and candidates:
+            try:
+                from .semantic_classifier import embedding_key
+            except ImportError:
+                from semantic_classifier import embedding_key
+            classifier = self.semantic_classifier
+            hits = classifier.cache_hits
+            with metrics.stage("semantic"):
+                semantic = classifier.classify_batch(
+                    [(embedding_key(paper.entry_id), f"{paper.title} {paper.summary}") for paper, _ in candidates]
+                )
+            metrics.count("embedding_cache_hits", classifier.cache_hits - hits)
+        
+        records = []
+        for i, (paper, categories) in enumerate(candidates):
+            extra = []
+            if semantic is not None:
+                # 语义分类同样受 arXiv 分类预筛选限制
+                extra = [c for c in self.keyword_matcher.filter_categories(semantic[i], paper.categories)
+                         if c not in categories]
+            if extra:
+                if not categories:
+                    metrics.count("papers_semantic_only")
+                # 合并后按配置中的分类顺序排列
+                found = set(categories).union(extra)
+                categories = [c for c in self.categories_config if c in found]
+            if not categories:
+                continue
+            if metrics.enabled:
+                for category in categories:
+                    metrics.count("papers_matched", label=f"{self.profile_name}/{category}" if self.profile_name else category)
+            
+            record = PaperRecord.from_result(paper, categories, self._found_date)
+            if retag:
+                stored = self.paper_store.get(paper.entry_id)
+                if stored is not None:
+                    record.found_date = stored.get('found_date', record.found_date)
+                    record.revision_of = stored.get('revision_of')
+            previous = revised.get(paper.entry_id) if revised else None
+            if previous is not None:
+                record.revision_of = f"v{previous.version}"
+            self.recorded_paper_ids.add(paper.entry_id, content_hash(paper.title, paper.summary), self.data_dir)
+            
+            logger.info(f"找到匹配论文{profile_tag}: {paper.title[:60]}...")
+            logger.info(f"  分类: {', '.join(categories)}")
+            if extra:
+                logger.info(f"  语义分类: {', '.join(extra)}")
+            logger.info(f"  arXiv ID: {record.arxiv_id}")
+            if record.revision_of:
+                logger.info(f"  修订版：标题或摘要相对 {record.revision_of} 有变化")
+            records.append(record)
+        return records
+    
+    def fetch_daily_papers(self, days_back: int = 1, max_results: int = 1000, sharded: bool = False,
+                           offline: bool = False, incremental: bool = False,
+                           resume: bool = False) -> List[PaperRecord]:
+        """
+        获取最近几天的论文
+        
+        Args:
+            days_back: 回溯天数，默认1天（今天）
+            max_results: 最大结果数（分片模式下不限制）
+            sharded: 是否按天/分类拆分并发抓取
+            offline: 是否只重放缓存中的页面（不访问网络）
+            incremental: 是否只抓取比水位线更新的论文
+            resume: 是否从上次中断的抓取检查点继续
+            
+        Returns:
+            筛选后的论文记录列表（PaperRecord，可像字典一样按字段读取）
+        """
+        if self.profiles:
+            raise RuntimeError("已配置多个档案，请使用 fetch_profile_papers")
+        return self._fetch_with_checkpoint(days_back, max_results, sharded, offline, incremental, resume)[self]
+    
+    def fetch_profile_papers(self, days_back: int = 1, max_results: int = 1000, sharded: bool = False,
+                             offline: bool = False, incremental: bool = False,
+                             resume: bool = False) -> Dict[str, List[PaperRecord]]:
+        """
+        多档案：只抓取一次，按各档案的关键词筛选论文
+        
+        Args:
+            days_back: 回溯天数，默认1天（今天）
+            max_results: 最大结果数（分片模式下不限制）
+            sharded: 是否按天/分类拆分并发抓取
+            offline: 是否只重放缓存中的页面（不访问网络）
+            incremental: 是否只抓取比水位线更新的论文
+            resume: 是否从上次中断的抓取检查点继续
+            
+        Returns:
+            档案名 -> 该档案筛选后的论文记录列表
+        """
+        if not self.profiles:
+            raise RuntimeError("没有配置档案（配置 profiles 段）")
+        matches = self._fetch_with_checkpoint(days_back, max_results, sharded, offline, incremental, resume)
+        return {name: matches[profile] for name, profile in self.profiles.items()}
+    
+    def _fetch_with_checkpoint(self, days_back: int, max_results: int, sharded: bool, offline: bool,
+                               incremental: bool, resume: bool) -> Dict["ArxivPaperFetcher", List[PaperRecord]]:
+        """抓取并筛选论文；抓取完整结束后删除检查点（论文由调用方处理）"""
+        checkpoint = self._open_checkpoint(sharded, offline, False, resume)
+        matches = self._fetch_matches(days_back, max_results, sharded, offline, incremental, checkpoint, resume)
+        if checkpoint is not None:
+            checkpoint.clear()
+        return matches
+    
+    @property
+    def targets(self) -> List["ArxivPaperFetcher"]:
+        """输出目标：配置了档案时为各档案，否则为本工具"""
+        return list(self.profiles.values()) or [self]
+    
+    def _start_run(self):
+        """开始一次运行：同一次运行中发现的论文共用一个发现时间，各档案使用本工具当前的运行指标"""
+        found_date = datetime.now().isoformat()
+        self._found_date = found_date
+        for profile in self.profiles.values():
+            profile._found_date = found_date
+            profile.metrics = self.metrics
+    
+    def _open_checkpoint(self, sharded: bool, offline: bool, streaming: bool,
+                         resume: bool) -> Optional["FetchCheckpoint"]:
+        """
+        打开页级抓取检查点（只用于单查询的批量抓取；配置 fetch.checkpoint_pages 为 0 时不使用）
+        
+        Args:
+            sharded: 是否使用分片并发抓取
+            offline: 是否只重放缓存中的页面
+            streaming: 是否使用流式流水线
+            resume: 是否从已有检查点继续
+            
+        Returns:
+            FetchCheckpoint，当前抓取模式不使用检查点时为 None
+        """
+        every_pages = self.fetch_config.get('checkpoint_pages', 5)
+        if sharded or offline or streaming or not every_pages:
+            if resume:
+                raise ValueError("--resume 只支持单查询的批量抓取（不能与 --sharded / --offline / --streaming 一起使用，"
+                                 "且配置 fetch.checkpoint_pages 不能为 0）")
+            return None
+        try:
+            from .fetch_checkpoint import FetchCheckpoint
+        except ImportError:
+            from fetch_checkpoint import FetchCheckpoint
+        
+        checkpoint = FetchCheckpoint(self.result_dir / "fetch_checkpoint", every_pages)
+        if not resume and checkpoint.load() is not None:
+            logger.warning("存在上次未完成的抓取检查点（可用 --resume 继续），本次从头开始并覆盖")
+        return checkpoint
+    
+    def _restore_checkpoint(self, checkpoint: "FetchCheckpoint", matches: Dict["ArxivPaperFetcher", List]) -> bool:
+        """
+        载入检查点中已匹配的论文（重新加入各输出目标的去重索引，跳过已保存的），沿用检查点的发现时间
+        
+        Returns:
+            是否载入了检查点（没有可继续的检查点时返回 False）
+        """
+        try:
+            restored = checkpoint.resume()
+        except FileNotFoundError:
+            logger.info("没有可继续的抓取检查点，从头开始")
+            return False
+        state = checkpoint.state
+        by_name = {target.profile_name: target for target in self.targets}
+        if state['targets'] != list(by_name):
+            raise ValueError(f"检查点的输出目标 {state['targets']} 与当前配置的档案 {list(by_name)} 不一致")
+        for target in self.targets:
+            target._found_date = state['found_date']
+        for profile_name, paper in restored:
+            target = by_name[profile_name]
+            record = PaperRecord.from_dict(paper)
+            if record.entry_id in target.recorded_paper_ids:
+                # 上次运行在保存阶段失败前已保存的论文
+                continue
+            matches[target].append(record)
+            target.recorded_paper_ids.add(record.entry_id, content_hash(record.title, record.summary), target.data_dir)
+        logger.info(f"已从检查点载入 {len(restored)} 篇匹配论文（已检查 {state['checked']} 篇）")
+        return True
+    
+    def _rollback_recorded_papers(self):
+        """丢弃本次运行加入去重索引但尚未保存的论文（运行失败时调用，下次运行会重新处理）"""
+        for target in self.targets:
+            target.recorded_paper_ids.rollback()
+    
+    def _fetch_announcements(self) -> Dict["ArxivPaperFetcher", List[PaperRecord]]:
+        """
+        按公告批次抓取并筛选论文：请求配置 announcements.categories 中每个分类的最新公告批次，
+        跳过已处理过的批次（及没有公告的日子），按 announcements.types 保留公告类型，
+        多个分类中重复出现的论文（交叉列出）只处理一次
+        
+        Returns:
+            {输出目标: 匹配论文记录列表}
+        """
         try:
-            for paper in arxiv.Client().results(search):
-                total_checked += 1
-                
-                # 跳过已记录的论文
-                if paper.entry_id in self.recorded_paper_ids:
+            from .announcement_feed import ANNOUNCE_TYPES, AnnouncementFeed
+        except ImportError:
+            from announcement_feed import ANNOUNCE_TYPES, AnnouncementFeed
+        
+        announcement_config = self.config.get('announcements', {})
+        categories = announcement_config.get('categories') or []
+        if not categories:
+            raise ValueError("公告批次模式需要在配置 announcements.categories 中指定订阅的分类")
+        types = set(announcement_config.get('types') or ANNOUNCE_TYPES)
+        unknown = types.difference(ANNOUNCE_TYPES)
+        if unknown:
+            raise ValueError(f"未知的公告类型 {sorted(unknown)}，可选: {', '.join(ANNOUNCE_TYPES)}")
+        feed = AnnouncementFeed(base_url=announcement_config.get('base_url'), rate_limiter=self._shared_rate_limiter(),
+                                metrics=self.metrics)
+        
+        logger.info(f"按公告批次抓取（分类: {', '.join(categories)}；类型: {', '.join(sorted(types))}）")
+        self._start_run()
+        papers = []
+        seen_ids = set()
+        with self.metrics.stage("fetch"):
+            for category in categories:
+                batch = feed.fetch_batch(category)
+                if batch.announced is None:
+                    logger.info(f"{category} 没有新的公告")
                     continue
-                
-                # 检查关键词
-                if self._check_keywords(paper):
-                    categories = self._categorize_paper(paper)
-                    paper_info = {
-                        'id': paper.entry_id,
-                        'arxiv_id': paper.entry_id.split('/')[-1],
-                        'title': paper.title,
-                        'authors': [author.name for author in paper.authors],
-                        'summary': paper.summary,
-                        'published': paper.published.isoformat(),
-                        'updated': paper.updated.isoformat(),
-                        'categories': paper.categories,
-                        'tags': categories,
-                        'pdf_url': paper.pdf_url,
-                        'arxiv_url': paper.entry_id,
-                        'found_date': datetime.now().isoformat()
-                    }
-                    matched_papers.append(paper_info)
-                    self.recorded_paper_ids.add(paper.entry_id)
-                    
-                    logger.info(f"找到匹配论文: {paper.title[:60]}...")
-                    logger.info(f"  分类: {', '.join(categories)}")
-                    logger.info(f"  arXiv ID: {paper.entry_id.split('/')[-1]}")
+                latest = self.announcement_log.latest(category)
+                if latest is not None and batch.announced.date() <= latest:
+                    logger.info(f"公告批次 {batch.batch_id} 已处理过，跳过")
+                    self.metrics.count("announcement_batches_skipped")
+                    continue
+                kept = 0
+                for item in batch.items:
+                    if item.announce_type not in types or item.entry.entry_id in seen_ids:
+                        continue
+                    seen_ids.add(item.entry.entry_id)
+                    papers.append(item.entry)
+                    kept += 1
+                self.announcement_log.add(batch.batch_id, category, batch.announced.date(), kept)
+                self.metrics.count("announcement_batches")
+                logger.info(f"公告批次 {batch.batch_id}: {len(batch.items)} 条公告，处理 {kept} 篇")
+        
+        matches = {target: [] for target in self.targets}
+        for start in range(0, len(papers), self.classify_batch_size):
+            for target, record in self._classify_targets(papers[start:start + self.classify_batch_size]):
+                matches[target].append(record)
+        return matches
+    
+    def _fetch_matches(self, days_back: int, max_results: int, sharded: bool, offline: bool,
+                       incremental: bool, checkpoint: "FetchCheckpoint" = None,
+                       resume: bool = False) -> Dict["ArxivPaperFetcher", List[PaperRecord]]:
+        """
+        抓取并筛选论文
+        
+        Args:
+            checkpoint: 页级抓取检查点，None 表示不使用
+            resume: 是否从检查点继续
+        
+        Returns:
+            输出目标 -> 匹配论文记录列表
+        """
+        logger.info(f"开始获取最近 {days_back} 天的 arXiv 论文...")
+        self._start_run()
+        
+        matches = {target: [] for target in self.targets}
+        if resume:
+            self._restore_checkpoint(checkpoint, matches)
+        total_checked = 0
+        total_matched = sum(len(records) for records in matches.values())
+        
+        try:
+            with self.metrics.stage("fetch"):
+                results = iter(self._iter_results(days_back, max_results, sharded=sharded, offline=offline,
+                                                  incremental=incremental, checkpoint=checkpoint))
+                if checkpoint is not None and checkpoint.state is None:
+                    # 本次抓取模式没有开始检查点（服务端关键词过滤拆分为多个查询）
+                    checkpoint = None
+                error = None
+                while error is None:
+                    batch = []
+                    try:
+                        for paper in islice(results, self.classify_batch_size):
+                            batch.append(paper)
+                    except Exception as e:
+                        # 请求下一页失败：先处理本批已取到的论文，检查点可以确认到最后一个完整的页
+                        error = e
+                    if not batch:
+                        break
+                    position = total_checked
+                    total_checked += len(batch)
+                    routed = self._classify_targets(batch, retag=offline)
+                    for target, record in routed:
+                        matches[target].append(record)
+                    total_matched += len(routed)
+                    if checkpoint is not None:
+                        positions = {paper.entry_id: position + i for i, paper in enumerate(batch)}
+                        checkpoint.add_matches((positions[record.entry_id], target.profile_name, record.to_dict())
+                                               for target, record in routed)
+                        if checkpoint.advance(total_checked):
+                            self.metrics.count("checkpoints_saved")
+                if error is not None:
+                    raise error
+            if checkpoint is not None:
+                checkpoint.finish(total_checked)
         
         except Exception as e:
             logger.error(f"获取论文时出错: {e}")
+            if checkpoint is not None and checkpoint.state is not None:
+                checkpoint.advance(total_checked)
+                checkpoint.save()
+                logger.info(f"已保存抓取检查点（已完成 {checkpoint.state['pages']} 页），使用 --resume 从该页继续")
+            self._rollback_recorded_papers()
             raise
         
-        logger.info(f"共检查 {total_checked} 篇论文，找到 {len(matched_papers)} 篇匹配论文")
+        logger.info(f"共检查 {total_checked} 篇论文，找到 {total_matched} 篇匹配论文")
         
-        return matched_papers
+        return matches
     
-    def save_papers(self, papers: List[Dict], filename: str = None):
+    def save_papers(self, papers: List, filename: str = None, by_submission_date: bool = False):
         """
-        保存论文信息到文件
+        保存论文信息到文件（追加写入新的 JSONL 分段）
+        
+        保存后 PaperRecord 的摘要从内存中释放，之后按需从存储读取
         
         Args:
-            papers: 论文信息列表
-            filename: 文件名，如果为 None 则使用日期命名
+            papers: 论文记录列表（PaperRecord 或 JSON 结构的字典）
+            filename: 兼容参数，指定时额外导出该名称的旧版 JSON 文件
+            by_submission_date: 按论文的提交日期写入各自日期的分段（批量收割历史论文时使用），
+                默认写入今天的分段
         """
         if not papers:
             logger.info("没有新论文需要保存")
             return
         
-        if filename is None:
-            date_str = datetime.now().strftime("%Y%m%d")
-            filename = f"papers_{date_str}.json"
-        
-        filepath = self.data_dir / filename
-        
-        # 如果文件已存在，合并数据
-        existing_papers = []
-        if filepath.exists():
+        with self.metrics.stage("save"):
+            # 与已保存记录完全相同的论文（离线重放时标签未变化）不再重复写入
+            changed = []
+            for paper in papers:
+                data = to_json_dict(paper)
+                if self.paper_store.get(data['id']) != data:
+                    changed.append(data)
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-                    existing_papers = existing_data.get('papers', [])
+                if by_submission_date:
+                    groups = {}
+                    for data in changed:
+                        date_str = (data.get('published') or '')[:10].replace('-', '')
+                        groups.setdefault(date_str or None, []).append(data)
+                    segments = self.paper_store.append_by_date(groups)
+                else:
+                    segments = [segment for segment in [self.paper_store.append(changed)] if segment is not None]
+                for segment in segments:
+                    self.metrics.add_file_bytes("save", segment)
+                if segments:
+                    logger.info(f"已保存 {len(changed)} 篇论文到 {', '.join(str(s) for s in segments)}")
+                    # 更新全文检索索引（单个事务）；失败时不提交去重索引，下次运行会重新处理这些论文
+                    if self.search_index is not None:
+                        self.search_index.add_many(changed, self.data_dir)
             except Exception as e:
-                logger.warning(f"读取已有文件失败: {e}")
+                logger.error(f"保存论文失败: {e}")
+                raise
         
-        # 合并并去重
-        all_papers = existing_papers + papers
-        seen_ids = set()
-        unique_papers = []
-        for paper in all_papers:
-            if paper['id'] not in seen_ids:
-                seen_ids.add(paper['id'])
-                unique_papers.append(paper)
-        
-        # 保存
-        data = {
-            'fetch_date': datetime.now().isoformat(),
-            'total_papers': len(unique_papers),
-            'papers': unique_papers
-        }
+        for paper in papers:
+            if isinstance(paper, PaperRecord):
+                paper.detach_summary(self.paper_store)
         
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            logger.info(f"已保存 {len(unique_papers)} 篇论文到 {filepath}")
-        except Exception as e:
-            logger.error(f"保存论文失败: {e}")
-            raise
+        if filename is not None:
+            self.export_papers_json(filename)
         
         # 更新已记录论文列表
         self._save_recorded_papers()
     
-    def generate_markdown_report(self, papers: List[Dict], output_file: str = None):
+    def export_papers_json(self, filename: str = None, date_str: str = None) -> Path:
+        """
+        按需导出旧版格式的论文 JSON 文件（{'fetch_date', 'total_papers', 'papers'}）
+        
+        Args:
+            filename: 文件名，如果为 None 则使用日期命名
+            date_str: 导出日期（YYYYMMDD），默认今天
+            
+        Returns:
+            导出文件路径
+        """
+        date_str = date_str or datetime.now().strftime("%Y%m%d")
+        if filename is None:
+            filename = f"papers_{date_str}.json"
+        filepath = self.data_dir / filename
+        count = self.paper_store.export_json(filepath, date_str)
+        logger.info(f"已导出 {count} 篇论文到 {filepath}")
+        return filepath
+    
+    def report_engine(self, output_file: str = None) -> ReportEngine:
+        """
+        创建报告引擎（输出格式由配置 report.formats 指定，默认只生成 Markdown）
+        
+        Args:
+            output_file: Markdown 总览文件名（如果为 None 则使用 arxiv_report.md）
+        """
+        return ReportEngine(self.data_dir, list(self.categories_config.keys()),
+                            formats=self.report_config.get('formats', ['markdown']),
+                            overview_file=output_file or "arxiv_report.md")
+    
+    def generate_markdown_report(self, papers: List[Dict], output_file: str = None,
+                                 grouped: Dict[str, List[Dict]] = None):
         """
-        生成 Markdown 格式的报告，为每个分类生成单独的文件
+        生成报告（Markdown，以及配置中启用的 HTML / JSON Feed），为每个分类生成单独的文件；
+        论文集合与上次运行相同的分类文件不重新生成
         
         Args:
             papers: 论文信息列表
             output_file: 总览文件路径（如果为 None 则自动生成）
+            grouped: 已按分类分组的论文（group_papers 的结果），None 表示在此分组
         """
         if not papers:
             logger.info("没有论文需要生成报告")
             return
         
-        date_str = datetime.now().strftime("%Y%m%d")
-        
-        # 按分类组织论文
-        papers_by_category = {}
-        for paper in papers:
-            tags = paper.get('tags', ['Other'])
-            for tag in tags:
-                if tag not in papers_by_category:
-                    papers_by_category[tag] = []
-                papers_by_category[tag].append(paper)
-        
-        # 从配置中获取分类顺序
-        category_order = list(self.categories_config.keys())
-        
-        # 为每个分类生成单独的文件
-        generated_files = []
-        for category in category_order:
-            if category in papers_by_category:
-                category_papers = papers_by_category[category]
-                
-                # 生成文件名（移除特殊字符，不加日期）
-                safe_category_name = category.replace(" ", "_").replace("(", "").replace(")", "").replace("/", "_")
-                category_file = f"{safe_category_name}.md"
-                category_filepath = self.data_dir / category_file
-                
-                # 生成该分类的 Markdown 内容
-                md_content = f"""# {category} - arXiv 论文报告
-
-**生成时间**: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-
-**分类**: {category}
-
-**论文数量**: {len(category_papers)} 篇
-
----
-
-"""
-                
-                for idx, paper in enumerate(category_papers, 1):
-                    authors_str = ", ".join(paper['authors'][:5])
-                    if len(paper['authors']) > 5:
-                        authors_str += f" et al. ({len(paper['authors'])} authors)"
-                    
-                    # 显示所有标签
-                    all_tags = paper.get('tags', [])
-                    tags_display = ', '.join(all_tags) if all_tags else 'Other'
-                    
-                    md_content += f"""## {idx}. {paper['title']}
-
-- **arXiv ID**: [{paper['arxiv_id']}]({paper['arxiv_url']})
-- **作者**: {authors_str}
-- **发布时间**: {paper['published']}
-- **arXiv分类**: {', '.join(paper['categories'])}
-- **标签**: {tags_display}
-- **PDF**: [下载链接]({paper['pdf_url']})
-
-**摘要**:
-{paper['summary']}
-
----
-
-"""
-                
-                try:
-                    with open(category_filepath, 'w', encoding='utf-8') as f:
-                        f.write(md_content)
-                    logger.info(f"已生成分类报告: {category_filepath}")
-                    generated_files.append((category, category_file))
-                except Exception as e:
-                    logger.error(f"生成分类报告失败 ({category}): {e}")
-        
-        # 生成总览文件
-        if output_file is None:
-            output_file = "arxiv_report.md"
-        
-        overview_filepath = self.data_dir / output_file
-        
-        # 生成总览内容
-        category_summary = []
-        for category in category_order:
-            if category in papers_by_category:
-                count = len(papers_by_category[category])
-                # 生成文件名（不加日期）
-                safe_category_name = category.replace(" ", "_").replace("(", "").replace(")", "").replace("/", "_")
-                category_file = f"{safe_category_name}.md"
-                category_summary.append(f"- **[{category}]({category_file})**: {count} 篇")
-        
-        overview_content = f"""# arXiv 论文筛选报告 - 总览
-
-**生成时间**: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-
-**总计**: {len(papers)} 篇论文
-
-## 📊 分类统计
-
-{chr(10).join(category_summary)}
-
----
-
-## 📁 详细报告
-
-每个分类的详细报告已单独生成，请点击上方链接查看。
-
-"""
-        
-        try:
-            with open(overview_filepath, 'w', encoding='utf-8') as f:
-                f.write(overview_content)
-            logger.info(f"已生成总览报告: {overview_filepath}")
-        except Exception as e:
-            logger.error(f"生成总览报告失败: {e}")
-            raise
+        with self.metrics.stage("report"):
+            if grouped is None:
+                grouped = group_papers(papers, list(self.categories_config.keys()))
+            for path in self.report_engine(output_file).write(grouped, len(papers)):
+                self.metrics.add_file_bytes("report", path)
     
-    def _print_category_summary(self, papers: List[Dict]):
+    def _print_category_summary(self, papers: List[Dict], grouped: Dict[str, List[Dict]] = None):
         """
         打印分类统计摘要
         
         Args:
             papers: 论文信息列表
+            grouped: 已按分类分组的论文（group_papers 的结果），None 表示在此分组
         """
-        # 按分类组织论文
-        papers_by_category = {}
-        for paper in papers:
-            tags = paper.get('tags', ['Other'])
-            for tag in tags:
-                if tag not in papers_by_category:
-                    papers_by_category[tag] = []
-                papers_by_category[tag].append(paper)
-        
-        # 从配置中获取分类显示顺序
-        category_order = list(self.categories_config.keys())
+        if grouped is None:
+            grouped = group_papers(papers, list(self.categories_config.keys()))
         
         logger.info("")
         logger.info("=" * 60)
         logger.info("📊 论文分类统计")
         logger.info("=" * 60)
         
-        for category in category_order:
-            if category in papers_by_category:
-                category_papers = papers_by_category[category]
-                logger.info(f"\n📁 {category}: {len(category_papers)} 篇")
-                logger.info("-" * 60)
-                for idx, paper in enumerate(category_papers, 1):
-                    # 显示所有标签
-                    all_tags = paper.get('tags', [])
-                    tags_str = ', '.join(all_tags) if len(all_tags) > 1 else ''
-                    tags_display = f" [{tags_str}]" if tags_str else ""
-                    logger.info(f"  {idx}. {paper['title'][:70]}...{tags_display}")
-                    logger.info(f"     arXiv ID: {paper['arxiv_id']}")
+        for category, category_papers in grouped.items():
+            logger.info(f"\n📁 {category}: {len(category_papers)} 篇")
+            logger.info("-" * 60)
+            for idx, paper in enumerate(category_papers, 1):
+                # 显示所有标签
+                all_tags = paper.get('tags', [])
+                tags_str = ', '.join(all_tags) if len(all_tags) > 1 else ''
+                tags_display = f" [{tags_str}]" if tags_str else ""
+                logger.info(f"  {idx}. {paper['title'][:70]}...{tags_display}")
+                logger.info(f"     arXiv ID: {paper['arxiv_id']}")
         
         logger.info("")
         logger.info("=" * 60)
     
-    def run_daily_fetch(self, days_back: int = 1, generate_report: bool = True):
+    def _run_streaming_fetch(self, days_back: int, generate_report: bool, sharded: bool,
+                             export_json: bool, offline: bool, incremental: bool = False):
+        """
+        使用流式流水线执行抓取：边拉取边匹配，匹配结果立即写入 JSONL 和分类报告
+        
+        Args:
+            days_back: 回溯天数
+            generate_report: 是否生成 Markdown 报告
+            sharded: 是否使用分片并发抓取
+            export_json: 是否额外导出旧版格式的 papers_YYYYMMDD.json
+            offline: 是否只重放缓存中的页面（不访问网络）
+            incremental: 是否只抓取比水位线更新的论文
+        """
+        try:
+            from .pipeline import StreamingPipeline
+        except ImportError:
+            from pipeline import StreamingPipeline
+        
+        logger.info(f"开始流式获取最近 {days_back} 天的 arXiv 论文...")
+        self._start_run()
+        results = self._iter_results(days_back, sharded=sharded, offline=offline, streaming=True,
+                                     incremental=incremental)
+        with self.metrics.stage("fetch"):
+            summaries = StreamingPipeline(self).run(results, generate_report=generate_report, retag=offline)
+        
+        for target, summary in summaries.items():
+            profile_tag = f"[{target.profile_name}] " if target.profile_name else ""
+            if summary:
+                if export_json:
+                    target.export_papers_json()
+                target._print_category_summary(summary)
+                logger.info(f"{profile_tag}任务完成！共找到 {len(summary)} 篇新论文")
+            else:
+                logger.info(f"{profile_tag}没有找到新的匹配论文")
+    
+    def harvest_archive(self, from_date: date, until_date: date = None, sets: List[str] = None,
+                        generate_report: bool = True, restart: bool = False) -> Dict:
+        """
+        通过 OAI-PMH 批量收割历史论文（用于用数月的论文初始化存档）：按 set 逐个收割，用 resumptionToken 翻页，
+        每页论文经同一分类与保存流程写入当前数据目录中各自提交日期的分段；每页保存后在检查点中记录下一页的 token，
+        中断后再次运行从该页继续（失败的一页不会留下已发布的分段或未保存的去重记录）
+        
+        Args:
+            from_date: OAI datestamp 下限（含）
+            until_date: OAI datestamp 上限（含），None 表示至今
+            sets: OAI set 列表（如 cs、physics:hep-th），None 表示使用配置 harvest.sets
+            generate_report: 是否在收割结束后生成报告
+            restart: 忽略已有检查点，从头开始
+            
+        Returns:
+            统计信息（pages / records / matched）
+        """
+        try:
+            from .oai_harvest import HarvestCheckpoint, OAIHarvester
+        except ImportError:
+            from oai_harvest import HarvestCheckpoint, OAIHarvester
+        
+        harvest_config = self.config.get('harvest', {})
+        sets = list(sets or harvest_config.get('sets') or [])
+        if not sets:
+            raise ValueError("没有指定要收割的 set（--set 或配置 harvest.sets）")
+        # set 粒度较粗（如整个 cs）时，只处理带有这些 arXiv 分类的论文
+        categories = set(harvest_config.get('categories') or [])
+        
+        harvester = OAIHarvester(base_url=harvest_config.get('base_url'), rate_limiter=self._shared_rate_limiter(),
+                                 metrics=self.metrics)
+        checkpoint = HarvestCheckpoint(
+            self.result_dir / "harvest_checkpoint.json",
+            {"from": from_date.isoformat(), "until": until_date.isoformat() if until_date else None,
+             "sets": sets, "categories": sorted(categories)},
+            restart=restart,
+        )
+        
+        logger.info(f"开始收割 {from_date} 至 {until_date or '今天'} 的论文（set: {', '.join(sets)}）")
+        self._start_run()
+        saved = {target: [] for target in self.targets}
+        stats = {"pages": 0, "records": 0, "matched": 0}
+        with self.metrics.stage("fetch"):
+            for set_spec in sets:
+                state = checkpoint.state(set_spec)
+                if state['complete']:
+                    logger.info(f"set {set_spec} 已收割完成，跳过")
+                    continue
+                for page in harvester.iter_pages(set_spec, from_date, until_date, token=state['token']):
+                    papers = [paper for paper in page.records
+                              if not categories or not categories.isdisjoint(paper.categories)]
+                    self.metrics.count("harvest_skipped_category", len(page.records) - len(papers))
+                    try:
+                        matches = {}
+                        for start in range(0, len(papers), self.classify_batch_size):
+                            batch = papers[start:start + self.classify_batch_size]
+                            for target, record in self._classify_targets(batch):
+                                matches.setdefault(target, []).append(record)
+                        # 先保存本页的匹配论文（并提交去重索引），再推进检查点
+                        for target, records in matches.items():
+                            target.save_papers(records, by_submission_date=True)
+                            saved[target].extend(records)
+                            stats["matched"] += len(records)
+                    except Exception as e:
+                        # 本页写了一半的分段已在 append_by_date 中丢弃；尚未保存的论文不提交去重索引，
+                        # 再次运行从检查点中本页的 token 重新处理
+                        logger.error(f"处理 set {set_spec} 的收割页失败: {e}")
+                        self._rollback_recorded_papers()
+                        raise
+                    checkpoint.advance(set_spec, page)
+                    stats["pages"] += 1
+                    stats["records"] += len(page.records)
+                    progress = f"/{page.complete_list_size}" if page.complete_list_size else ""
+                    logger.info(f"set {set_spec}: 已收割 {state['records']}{progress} 条记录，"
+                                f"本次共匹配 {stats['matched']} 篇")
+        checkpoint.remove()
+        
+        for target, papers in saved.items():
+            profile_tag = f"[{target.profile_name}] " if target.profile_name else ""
+            if not papers:
+                logger.info(f"{profile_tag}没有收割到新的匹配论文")
+                continue
+            grouped = group_papers(papers, list(target.categories_config.keys()))
+            if generate_report:
+                target.generate_markdown_report(papers, grouped=grouped)
+            target._print_category_summary(papers, grouped)
+        logger.info(f"收割完成：{stats['pages']} 页，{stats['records']} 条记录，匹配 {stats['matched']} 篇")
+        return stats
+    
+    def retag_archive(self, data_dirs: List = None, workers: int = None, chunk_size: int = 2000,
+                      restart: bool = False) -> Dict:
+        """
+        按当前分类配置对已保存的历史论文重新打标签（进程池并行，可从检查点续跑）
+        
+        Args:
+            data_dirs: 数据目录列表，None 表示结果目录下所有 paper_data_* 目录
+            workers: 工作进程数，默认 CPU 核数
+            chunk_size: 每块论文数
+            restart: 忽略已有检查点，从头开始
+            
+        Returns:
+            统计信息（checked / changed / segments）；配置了档案时为 档案名 -> 统计信息
+        """
+        if self.profiles:
+            # 各档案按自己的分类配置处理自己结果目录下的数据
+            if data_dirs is not None:
+                raise ValueError("配置了多个档案时不能指定数据目录（各档案处理自己的结果目录）")
+            return {name: profile.retag_archive(workers=workers, chunk_size=chunk_size, restart=restart)
+                    for name, profile in self.profiles.items()}
+        
+        try:
+            from .retag import ArchiveRetagger, archive_stores
+        except ImportError:
+            from retag import ArchiveRetagger, archive_stores
+        
+        if data_dirs is None:
+            data_dirs = sorted(p for p in self.result_dir.glob("paper_data_*") if p.is_dir())
+        logger.info(f"开始重新打标签：{len(data_dirs)} 个数据目录")
+        retagger = ArchiveRetagger(
+            self.keywords_map, self.system_keywords, self.categories_config, self.matching_config,
+            workers=workers, chunk_size=chunk_size,
+            checkpoint_file=self.result_dir / "retag_checkpoint.json", restart=restart,
+            semantic=self.semantic_config if self.semantic_classifier is not None else None,
+            search_index=self.search_index,
+        )
+        stores = archive_stores(data_dirs, compress=self.storage_config.get('compress', False))
+        return retagger.run(stores)
+    
+    def plan_queries(self, days_back: int = 1) -> List[str]:
+        """
+        按当前配置规划的服务端查询（不论 fetch.pushdown 是否启用）
+        
+        Args:
+            days_back: 回溯天数
+            
+        Returns:
+            查询语句列表
+        """
+        return self._query_planner(required=True).queries(self._window_query(days_back))
+    
+    @staticmethod
+    def _window_query(days_back: int) -> str:
+        """最近 days_back 天的提交日期查询条件"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days_back)
+        return f"submittedDate:[{start_date.strftime('%Y%m%d')}000000 TO {end_date.strftime('%Y%m%d')}235959]"
+    
+    def verify_query_plan(self, days_back: int = 1, max_results: int = 1000) -> Dict:
+        """
+        校验服务端关键词过滤的召回率：分别全量扫描窗口和按规划的查询抓取，用本地匹配器筛选后比较；
+        不读写响应缓存，也不修改去重索引
+        
+        Args:
+            days_back: 回溯天数
+            max_results: 每个查询的最大结果数
+            
+        Returns:
+            两种方式的查询数、论文数、请求页数、接收字节数、耗时和匹配数，召回率以及漏掉的论文
+        """
+        import time
+        
+        full_query = self._window_query(days_back)
+        queries = self._query_planner(required=True).queries(full_query)
+        matcher = self.profile_matcher or self.keyword_matcher
+        
+        def run(query_list: List[str]) -> Tuple[Dict, Dict]:
+            metrics = RunMetrics()
+            client = self._make_api_client(use_cache=False, metrics=metrics)
+            matched = {}
+            seen_ids = set()
+            started = time.perf_counter()
+            for query in query_list:
+                for paper in client.results(query, max_results=max_results):
+                    if paper.entry_id in seen_ids:
+                        continue
+                    seen_ids.add(paper.entry_id)
+                    categories = matcher.match_paper(paper)
+                    if categories:
+                        matched[paper.entry_id] = (paper, categories)
+            counters = metrics.to_dict()["counters"]
+            return matched, {
+                "queries": len(query_list),
+                "papers": len(seen_ids),
+                "pages": counters.get("pages_fetched", 0),
+                "bytes": counters.get("bytes_received", 0),
+                "seconds": round(time.perf_counter() - started, 3),
+                "matched": len(matched),
+            }
+        
+        logger.info(f"校验查询规划：全量扫描 {full_query}")
+        full_matches, full_stats = run([full_query])
+        logger.info(f"校验查询规划：服务端过滤 {len(queries)} 个查询")
+        planned_matches, planned_stats = run(queries)
+        missed = [
+            {"arxiv_id": paper.entry_id.split('/abs/')[-1], "title": paper.title, "categories": categories}
+            for entry_id, (paper, categories) in full_matches.items() if entry_id not in planned_matches
+        ]
+        recall = (len(full_matches) - len(missed)) / len(full_matches) if full_matches else 1.0
+        logger.info(f"服务端过滤召回率 {recall:.2%}（漏掉 {len(missed)} 篇），"
+                    f"论文数 {full_stats['papers']} -> {planned_stats['papers']}，"
+                    f"接收字节数 {full_stats['bytes']} -> {planned_stats['bytes']}")
+        return {
+            "queries": queries,
+            "full_scan": full_stats,
+            "pushdown": planned_stats,
+            "recall": round(recall, 4),
+            "missed": missed,
+        }
+    
+    def rebuild_search_index(self, data_dirs: List = None) -> int:
+        """
+        从已保存的论文重建全文检索索引
+        
+        Args:
+            data_dirs: 数据目录列表，None 表示结果目录下所有 paper_data_* 目录
+            
+        Returns:
+            索引的论文数量（配置了档案时为各档案之和）
+        """
+        if self.profiles:
+            if data_dirs is not None:
+                raise ValueError("配置了多个档案时不能指定数据目录（各档案处理自己的结果目录）")
+            return sum(profile.rebuild_search_index() for profile in self.profiles.values()
+                       if profile.search_index is not None)
+        if self.search_index is None:
+            raise RuntimeError("全文检索未启用（配置 search.enabled）")
+        if data_dirs is None:
+            data_dirs = sorted(p for p in self.result_dir.glob("paper_data_*") if p.is_dir())
+        return rebuild_search_index(self.search_index, data_dirs, compress=self.storage_config.get('compress', False))
+    
+    def run_daily_fetch(self, days_back: int = 1, generate_report: bool = True, sharded: bool = False,
+                        export_json: bool = False, offline: bool = False, streaming: bool = False,
+                        incremental: bool = None, resume: bool = False, announcements: bool = None):
         """
         执行每日抓取任务
         
         Args:
             days_back: 回溯天数
             generate_report: 是否生成 Markdown 报告
+            sharded: 是否使用分片并发抓取
+            export_json: 是否额外导出旧版格式的 papers_YYYYMMDD.json
+            offline: 是否只重放缓存中的页面（不访问网络）
+            streaming: 是否使用流式流水线（抓取、匹配、写入同时进行，不在内存中保留论文内容）
+            incremental: 是否只抓取比水位线更新的论文，None 表示使用配置 fetch.incremental
+            resume: 是否从上次中断的抓取检查点继续（只支持单查询的批量抓取）
+            announcements: 是否按 arXiv 每日公告批次抓取（忽略 days_back 与其他抓取模式），
+                None 表示使用配置 announcements.enabled
         """
+        if incremental is None:
+            incremental = self.fetch_config.get('incremental', False)
+        if announcements is None:
+            announcements = self.config.get('announcements', {}).get('enabled', False)
+        if announcements and (sharded or offline or streaming or resume):
+            raise ValueError("公告批次模式不能与 --sharded / --offline / --streaming / --resume 一起使用")
+        checkpoint = None if announcements else self._open_checkpoint(sharded, offline, streaming, resume)
         logger.info("=" * 60)
         logger.info("开始执行每日 arXiv 论文抓取任务")
         logger.info("=" * 60)
         
         try:
-            # 获取论文
-            papers = self.fetch_daily_papers(days_back=days_back)
+            if announcements:
+                for target, papers in self._fetch_announcements().items():
+                    target._publish_papers(papers, generate_report, export_json)
+                # 论文保存成功后才记录公告批次
+                self.announcement_log.commit()
+                return
             
-            if papers:
-                # 保存 JSON 数据
-                self.save_papers(papers)
-                
-                # 生成 Markdown 报告
-                if generate_report:
-                    self.generate_markdown_report(papers)
-                
-                # 输出分类统计
-                self._print_category_summary(papers)
-                
-                logger.info(f"任务完成！共找到 {len(papers)} 篇新论文")
-            else:
-                logger.info("没有找到新的匹配论文")
+            if streaming:
+                self._run_streaming_fetch(days_back, generate_report, sharded, export_json, offline, incremental)
+                self.watermarks.commit()
+                return
+            
+            # 获取论文（配置了档案时只抓取一次，按档案分别筛选）
+            matches = self._fetch_matches(days_back, 1000, sharded, offline, incremental, checkpoint, resume)
+            for target, papers in matches.items():
+                target._publish_papers(papers, generate_report, export_json)
+            
+            # 论文保存成功后才推进增量水位线、删除检查点
+            self.watermarks.commit()
+            if checkpoint is not None:
+                checkpoint.clear()
         
         except Exception as e:
             logger.error(f"任务执行失败: {e}")
+            self._rollback_recorded_papers()
+            self.announcement_log.rollback()
             raise
+        finally:
+            if self.response_cache is not None:
+                self.response_cache.flush_access()
+    
+    def _publish_papers(self, papers: List[PaperRecord], generate_report: bool, export_json: bool):
+        """
+        保存一次运行筛选出的论文，生成报告并输出分类统计
+        
+        Args:
+            papers: 匹配论文记录列表
+            generate_report: 是否生成 Markdown 报告
+            export_json: 是否额外导出旧版格式的 papers_YYYYMMDD.json
+        """
+        profile_tag = f"[{self.profile_name}] " if self.profile_name else ""
+        if not papers:
+            logger.info(f"{profile_tag}没有找到新的匹配论文")
+            return
+        
+        # 保存 JSONL 数据
+        self.save_papers(papers)
+        if export_json:
+            self.export_papers_json()
+        
+        # 按分类分组一次，报告与分类统计共用
+        grouped = group_papers(papers, list(self.categories_config.keys()))
+        
+        # 生成报告
+        if generate_report:
+            self.generate_markdown_report(papers, grouped=grouped)
+        
+        # 输出分类统计
+        self._print_category_summary(papers, grouped)
+        
+        logger.info(f"{profile_tag}任务完成！共找到 {len(papers)} 篇新论文")
 
 
 def main():
@@ -635,15 +1802,274 @@ def main():
         default='config.json',
         help='配置文件路径（默认：config.json，如果不存在则使用默认配置）'
     )
+    parser.add_argument(
+        '--sharded',
+        action='store_true',
+        help='按天（及配置中的 shard_categories）拆分窗口并发抓取，不受 max_results 限制'
+    )
+    parser.add_argument(
+        '--export-json',
+        action='store_true',
+        help='额外导出旧版格式的 papers_YYYYMMDD.json'
+    )
+    parser.add_argument(
+        '--offline', '--replay',
+        dest='offline',
+        action='store_true',
+        help='离线重放：只用缓存中的 API 页面重新筛选，不访问网络（需启用 cache）'
+    )
+    parser.add_argument(
+        '--streaming',
+        action='store_true',
+        help='流式模式：抓取、匹配与写入 JSONL/Markdown 同时进行，不在内存中保留论文内容'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        default=None,
+        help='增量抓取：只请求比上次水位线更新的论文，到达水位线即停止翻页（也可在配置 fetch.incremental 中启用）'
+    )
+    parser.add_argument(
+        '--announcements',
+        action='store_true',
+        default=None,
+        help='按 arXiv 每日公告批次抓取配置 announcements.categories 中的分类，每批只处理一次（也可在配置 announcements.enabled 中启用）'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='从上次中断的抓取检查点继续（沿用原查询，从最后完成的页开始；不支持 --sharded/--offline/--streaming）'
+    )
+    
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    retag_parser = subparsers.add_parser(
+        'retag',
+        help='按当前分类配置对已保存的历史论文重新打标签（多进程，可中断续跑）'
+    )
+    retag_parser.add_argument(
+        'dirs',
+        nargs='*',
+        help='要重新打标签的数据目录（默认：result/ 下所有 paper_data_* 目录）'
+    )
+    retag_parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='工作进程数（默认：CPU 核数）'
+    )
+    retag_parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=2000,
+        help='每次发送给工作进程的论文数（默认：2000）'
+    )
+    retag_parser.add_argument(
+        '--restart',
+        action='store_true',
+        help='忽略检查点，从头开始'
+    )
+    search_parser = subparsers.add_parser(
+        'search',
+        help='在已保存的全部论文中全文检索（BM25 排序，支持 "短语"、AND/OR/NOT 和标签/日期过滤）'
+    )
+    search_parser.add_argument(
+        'query',
+        nargs='?',
+        default=None,
+        help='检索式，例如 \'"kv cache" AND quantization\'、title:moe（省略时按过滤条件列出最新论文）'
+    )
+    search_parser.add_argument(
+        '--tag',
+        action='append',
+        default=None,
+        help='只返回带有该标签的论文（可重复指定，满足任一即可）'
+    )
+    search_parser.add_argument(
+        '--since',
+        type=str,
+        default=None,
+        help='提交日期下限 YYYY-MM-DD（含）'
+    )
+    search_parser.add_argument(
+        '--until',
+        type=str,
+        default=None,
+        help='提交日期上限 YYYY-MM-DD（含）'
+    )
+    search_parser.add_argument(
+        '--limit',
+        type=int,
+        default=20,
+        help='最大结果数（默认：20）'
+    )
+    search_parser.add_argument(
+        '--json',
+        action='store_true',
+        help='以 JSON Lines 格式输出结果'
+    )
+    search_parser.add_argument(
+        '--reindex',
+        action='store_true',
+        help='检索前从 result/ 下所有 paper_data_* 目录重建索引'
+    )
+    harvest_parser = subparsers.add_parser(
+        'harvest',
+        help='通过 OAI-PMH 批量收割历史论文（按 set 和日期范围，用 resumptionToken 翻页，中断后再次运行会从检查点继续）'
+    )
+    harvest_parser.add_argument(
+        '--from',
+        dest='from_date',
+        type=str,
+        required=True,
+        help='OAI datestamp 下限 YYYY-MM-DD（含）'
+    )
+    harvest_parser.add_argument(
+        '--until',
+        type=str,
+        default=None,
+        help='OAI datestamp 上限 YYYY-MM-DD（含，默认：至今）'
+    )
+    harvest_parser.add_argument(
+        '--set',
+        dest='sets',
+        action='append',
+        default=None,
+        help='OAI set（如 cs、physics:hep-th，可重复指定；默认：配置 harvest.sets）'
+    )
+    harvest_parser.add_argument(
+        '--restart',
+        action='store_true',
+        help='忽略检查点，从头开始'
+    )
+    plan_parser = subparsers.add_parser(
+        'plan',
+        help='输出按关键词配置规划的服务端查询（fetch.pushdown），可与全量扫描比较召回率'
+    )
+    plan_parser.add_argument(
+        '--verify',
+        action='store_true',
+        help='分别全量扫描和按规划的查询抓取最近 --days 天的论文，用本地匹配器比较召回率、论文数和接收字节数（JSON 输出）'
+    )
+    daemon_parser = subparsers.add_parser(
+        'daemon',
+        help='常驻运行：按配置 daemon.schedule 中的 cron 表达式定时抓取，配置变化时热重载，提供本地健康检查/指标接口'
+    )
+    daemon_parser.add_argument(
+        '--host',
+        type=str,
+        default=None,
+        help='状态接口监听地址（默认：配置 daemon.host 或 127.0.0.1）'
+    )
+    daemon_parser.add_argument(
+        '--port',
+        type=int,
+        default=None,
+        help='状态接口端口（默认：配置 daemon.port 或 8765）'
+    )
+    parser.add_argument(
+        '--metrics-json',
+        type=str,
+        default=None,
+        help='将本次运行的指标（阶段耗时、计数、写入字节数、峰值 RSS）写入 JSON 文件'
+    )
+    parser.add_argument(
+        '--metrics-prom',
+        type=str,
+        default=None,
+        help='将本次运行的指标以 Prometheus 文本格式写入文件（供 node_exporter textfile collector 读取）'
+    )
+    parser.add_argument(
+        '--cprofile',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help='在 cProfile 下运行并将统计结果保存到指定文件（可用 python -m pstats 查看；与关键词档案 profiles 无关）'
+    )
     
     args = parser.parse_args()
+    setup_logging()
     
-    # 创建抓取工具并执行
-    fetcher = ArxivPaperFetcher(data_dir=args.data_dir, config_file=args.config)
-    fetcher.run_daily_fetch(
-        days_back=args.days,
-        generate_report=not args.no_report
-    )
+    if args.command == 'daemon':
+        # 守护进程自己持有抓取工具，每次运行的指标通过 /metrics 接口导出
+        try:
+            from .daemon import FetchDaemon
+        except ImportError:
+            from daemon import FetchDaemon
+        FetchDaemon(config_file=args.config, data_dir=args.data_dir, host=args.host, port=args.port).run_forever()
+        return
+    
+    # 只有需要导出指标时才记录（否则为空操作）
+    metrics = RunMetrics() if (args.metrics_json or args.metrics_prom) else None
+    
+    def run():
+        if args.command == 'search':
+            # 检索只需要配置和全文检索索引，不创建抓取工具（不打开去重索引、响应缓存，也不创建当天的数据目录）
+            config = load_config(args.config)
+            search_index = open_search_index(config)
+            if search_index is None:
+                parser.error("全文检索未启用（配置 search.enabled）")
+            if args.reindex:
+                rebuild_search_index(search_index, compress=config.get('storage', {}).get('compress', False))
+            since, until = (datetime.strptime(value, '%Y-%m-%d').date() if value else None
+                            for value in (args.since, args.until))
+            hits = search_index.search(args.query, tags=args.tag, since=since, until=until, limit=args.limit)
+            for rank, hit in enumerate(hits, 1):
+                if args.json:
+                    print(json.dumps(hit._asdict(), ensure_ascii=False))
+                    continue
+                print(f"{rank}. {hit.title}")
+                print(f"   arXiv: {hit.arxiv_id} | 提交: {(hit.published or '')[:10]} | 标签: {', '.join(hit.tags)}")
+                if hit.snippet:
+                    print(f"   {' '.join(hit.snippet.split())}")
+            if not hits and not args.json:
+                print("没有匹配的论文")
+            return
+        
+        # 创建抓取工具并执行
+        fetcher = ArxivPaperFetcher(data_dir=args.data_dir, config_file=args.config, metrics=metrics)
+        if args.command == 'retag':
+            fetcher.retag_archive(data_dirs=args.dirs or None, workers=args.workers,
+                                  chunk_size=args.chunk_size, restart=args.restart)
+            return
+        if args.command == 'harvest':
+            from_date, until_date = (datetime.strptime(value, '%Y-%m-%d').date() if value else None
+                                     for value in (args.from_date, args.until))
+            fetcher.harvest_archive(from_date, until_date, sets=args.sets, generate_report=not args.no_report,
+                                    restart=args.restart)
+            return
+        if args.command == 'plan':
+            if args.verify:
+                print(json.dumps(fetcher.verify_query_plan(days_back=args.days), ensure_ascii=False, indent=2))
+            else:
+                for query in fetcher.plan_queries(days_back=args.days):
+                    print(query)
+            return
+        fetcher.run_daily_fetch(
+            days_back=args.days,
+            generate_report=not args.no_report,
+            sharded=args.sharded,
+            export_json=args.export_json,
+            offline=args.offline,
+            streaming=args.streaming,
+            incremental=args.incremental,
+            resume=args.resume,
+            announcements=args.announcements
+        )
+    
+    try:
+        if args.cprofile:
+            run_profiled(run, args.cprofile)
+        else:
+            run()
+    finally:
+        # 运行失败时也导出已记录的指标
+        if metrics is not None:
+            if args.metrics_json:
+                metrics.write_json(args.metrics_json)
+                logger.info(f"运行指标已写入 {args.metrics_json}")
+            if args.metrics_prom:
+                metrics.write_prometheus(args.metrics_prom)
+                logger.info(f"Prometheus 指标已写入 {args.metrics_prom}")
 
 
 if __name__ == "__main__":
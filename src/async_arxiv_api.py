@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+基于 asyncio 的 arXiv API 客户端
+通过保持连接（HTTP/1.1 keep-alive）的连接池请求 Atom 导出接口，响应边接收边增量解析；
+支持并发查询、共享限速以及带随机抖动的指数退避重试
+"""
+
+import asyncio
+import logging
+import random
+import ssl
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .arxiv_api import (ARXIV_REQUEST_INTERVAL, DEFAULT_BASE_URL, USER_AGENT, ArxivAPIError,
+                            ArxivEntry, parse_entry)
+except ImportError:
+    from arxiv_api import (ARXIV_REQUEST_INTERVAL, DEFAULT_BASE_URL, USER_AGENT, ArxivAPIError,
+                           ArxivEntry, parse_entry)
+
+logger = logging.getLogger(__name__)
+
+_ENTRY_TAG = "{http://www.w3.org/2005/Atom}entry"
+_TOTAL_TAG = "{http://a9.com/-/spec/opensearch/1.1/}totalResults"
+
+# 每次从连接读取的最大字节数
+_READ_CHUNK = 64 * 1024
+
+# 查询完成标记
+_QUERY_DONE = object()
+
+
+class _QueryError:
+    """在队列中传递并发查询的异常"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class HTTPStatusError(ArxivAPIError):
+    """服务器返回非 200 状态码"""
+
+    def __init__(self, status: int, url: str):
+        super().__init__(f"HTTP {status}: {url}")
+        self.status = status
+
+
+class AsyncRateLimiter:
+    """协程安全的最小请求间隔限速器，可在多个并发查询之间共享"""
+
+    def __init__(self, min_interval: float = ARXIV_REQUEST_INTERVAL):
+        """
+        Args:
+            min_interval: 两次请求之间的最小间隔（秒）
+        """
+        self.min_interval = min_interval
+        self._lock = asyncio.Lock()
+        self._next_time = 0.0
+
+    async def wait(self):
+        """等待直到允许发出下一次请求"""
+        async with self._lock:
+            now = time.monotonic()
+            scheduled = max(now, self._next_time)
+            self._next_time = scheduled + self.min_interval
+        delay = scheduled - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class _Connection:
+    """一条 HTTP/1.1 连接"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+
+    def close(self):
+        self.reusable = False
+        self.writer.close()
+
+
+class _ConnectionPool:
+    """按 (scheme, host, port) 复用空闲连接的连接池；slots 限制同时进行的请求数"""
+
+    def __init__(self, max_connections: int):
+        self._idle: Dict[Tuple[str, str, int], List[_Connection]] = {}
+        self.slots = asyncio.Semaphore(max_connections)
+        self.connections_opened = 0
+
+    async def connect(self, scheme: str, host: str, port: int) -> _Connection:
+        """取一条空闲连接，没有时新建（调用方需已持有 slots）"""
+        idle = self._idle.get((scheme, host, port))
+        while idle:
+            conn = idle.pop()
+            if not conn.reader.at_eof():
+                return conn
+            conn.close()
+        ssl_context = ssl.create_default_context() if scheme == "https" else None
+        reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    def release(self, key: Tuple[str, str, int], conn: _Connection):
+        if conn.reusable:
+            self._idle.setdefault(key, []).append(conn)
+        else:
+            conn.close()
+
+    def close(self):
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle.clear()
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Tuple[str, int, Dict[str, str]]:
+    """读取状态行和响应头"""
+    status_line = (await reader.readline()).decode("latin-1").strip()
+    if not status_line:
+        raise ConnectionError("连接已被服务器关闭")
+    version, status, *_ = status_line.split(" ", 2)
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return version, int(status), headers
+
+
+async def _iter_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> AsyncIterator[bytes]:
+    """按 Content-Length / chunked / 读到连接关闭 三种方式流式读取响应体"""
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                # 跳过 trailer
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            remaining = size
+            while remaining:
+                chunk = await reader.read(min(remaining, _READ_CHUNK))
+                if not chunk:
+                    raise ConnectionError("响应体不完整")
+                remaining -= len(chunk)
+                yield chunk
+            await reader.readline()
+    elif "content-length" in headers:
+        remaining = int(headers["content-length"])
+        while remaining:
+            chunk = await reader.read(min(remaining, _READ_CHUNK))
+            if not chunk:
+                raise ConnectionError("响应体不完整")
+            remaining -= len(chunk)
+            yield chunk
+    else:
+        while True:
+            chunk = await reader.read(_READ_CHUNK)
+            if not chunk:
+                return
+            yield chunk
+
+
+class AsyncArxivClient:
+    """asyncio arXiv API 客户端（需在同一事件循环中使用，用完后调用 aclose）"""
+
+    def __init__(self, base_url: str = None, page_size: int = 100, num_retries: int = 3,
+                 concurrency: int = 4, rate_limiter: AsyncRateLimiter = None, timeout: float = 30.0,
+                 backoff_base: float = 1.0, backoff_max: float = 30.0):
+        """
+        Args:
+            base_url: 查询接口地址，默认为 arXiv 官方导出接口
+            page_size: 每页论文数
+            num_retries: 请求失败或意外空页时的重试次数
+            concurrency: 最大并发请求数（即连接池大小）
+            rate_limiter: 共享限速器，默认新建一个 3 秒间隔的限速器
+            timeout: 单次请求的连接、发送和接收超时（秒），不含排队等待连接池和限速的时间
+            backoff_base: 重试退避的基础时长（秒），第 n 次重试的等待上限为 base * 2^n
+            backoff_max: 重试退避的最大时长（秒）
+        """
+        self.base_url = base_url or DEFAULT_BASE_URL
+        self.page_size = page_size
+        self.num_retries = num_retries
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = rate_limiter or AsyncRateLimiter()
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.network_requests = 0
+        parsed = urllib.parse.urlsplit(self.base_url)
+        self._scheme = parsed.scheme
+        self._host = parsed.hostname
+        self._port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        self._path = parsed.path or "/"
+        self._pool: Optional[_ConnectionPool] = None
+
+    @property
+    def connections_opened(self) -> int:
+        """已建立的连接数（连接复用时远小于请求数）"""
+        return self._pool.connections_opened if self._pool is not None else 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        """关闭连接池中的所有空闲连接"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def _target(self, query: str, start: int, page_size: int) -> str:
+        params = urllib.parse.urlencode({
+            "search_query": query,
+            "start": start,
+            "max_results": page_size,
+            "sortBy": "submittedDate",
+            "sortOrder": "descending",
+        })
+        return f"{self._path}?{params}"
+
+    async def _request_page(self, query: str, start: int, page_size: int) -> Tuple[int, List[ArxivEntry]]:
+        """
+        发送一次请求：先占用连接池名额，再等待限速，超时只计算连接、发送和接收的时间
+        （排队等待名额和限速的查询不会超时，实际发出的请求之间保持 min_interval）
+        """
+        if self._pool is None:
+            self._pool = _ConnectionPool(self.concurrency)
+        async with self._pool.slots:
+            await self.rate_limiter.wait()
+            self.network_requests += 1
+            return await asyncio.wait_for(self._exchange(self._target(query, start, page_size)), self.timeout)
+
+    async def _exchange(self, target: str) -> Tuple[int, List[ArxivEntry]]:
+        """在池中的连接上完成一次请求，边接收响应边增量解析"""
+        key = (self._scheme, self._host, self._port)
+        conn = await self._pool.connect(*key)
+        try:
+            request = (
+                f"GET {target} HTTP/1.1\r\n"
+                f"Host: {self._host}:{self._port}\r\n"
+                f"User-Agent: {USER_AGENT}\r\n"
+                "Accept-Encoding: identity\r\n"
+                "Connection: keep-alive\r\n\r\n"
+            )
+            conn.writer.write(request.encode("latin-1"))
+            await conn.writer.drain()
+            version, status, headers = await _read_headers(conn.reader)
+            if (version == "HTTP/1.0" or headers.get("connection", "").lower() == "close"
+                    or ("content-length" not in headers and "transfer-encoding" not in headers)):
+                conn.reusable = False
+
+            parser = ET.XMLPullParser(events=("end",)) if status == 200 else None
+            total = 0
+            entries: List[ArxivEntry] = []
+            async for chunk in _iter_body(conn.reader, headers):
+                if parser is None:
+                    continue
+                parser.feed(chunk)
+                for _, element in parser.read_events():
+                    if element.tag == _ENTRY_TAG:
+                        entry = parse_entry(element)
+                        if entry is not None:
+                            entries.append(entry)
+                        element.clear()
+                    elif element.tag == _TOTAL_TAG:
+                        total = int((element.text or "0").strip() or 0)
+            if parser is None:
+                raise HTTPStatusError(status, f"{self.base_url}{target[len(self._path):]}")
+            parser.close()
+            return total, entries
+        except BaseException:
+            conn.reusable = False
+            raise
+        finally:
+            self._pool.release(key, conn)
+
+    def _backoff(self, attempt: int) -> float:
+        """带随机抖动的指数退避时长（full jitter）"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def fetch_page(self, query: str, start: int, page_size: int) -> Tuple[int, List[ArxivEntry]]:
+        """
+        请求并解析一页，失败或非首页为空时按抖动退避重试
+
+        Args:
+            query: arXiv 查询语句
+            start: 起始偏移
+            page_size: 本页大小
+
+        Returns:
+            (结果总数, 本页论文列表)
+        """
+        last_error = None
+        for attempt in range(self.num_retries + 1):
+            if attempt:
+                await asyncio.sleep(self._backoff(attempt - 1))
+            try:
+                total, entries = await self._request_page(query, start, page_size)
+                if entries or start == 0 or start >= total:
+                    return total, entries
+                last_error = ArxivAPIError(f"意外的空页: query={query!r}, start={start}")
+            except (ArxivAPIError, OSError, ET.ParseError, ValueError, asyncio.TimeoutError) as e:
+                last_error = e
+            logger.warning(f"请求失败（第 {attempt + 1} 次）: {last_error}")
+        raise ArxivAPIError(f"请求失败: query={query!r}, start={start}: {last_error}")
+
+    async def results(self, query: str, max_results: int = None) -> AsyncIterator[ArxivEntry]:
+        """
+        逐页获取查询结果
+
+        Args:
+            query: arXiv 查询语句
+            max_results: 最大结果数，None 表示获取全部
+
+        Yields:
+            ArxivEntry
+        """
+        start = 0
+        while max_results is None or start < max_results:
+            page_size = self.page_size if max_results is None else min(self.page_size, max_results - start)
+            total, entries = await self.fetch_page(query, start, page_size)
+            if not entries:
+                return
+            for entry in entries:
+                yield entry
+            start += len(entries)
+            if start >= total:
+                return
+
+    async def results_many(self, queries: Iterable[str], max_results: int = None) -> AsyncIterator[ArxivEntry]:
+        """
+        并发执行多个查询（并发数受连接池大小限制），按到达顺序产出去重后的结果
+
+        Args:
+            queries: 查询语句列表
+            max_results: 每个查询的最大结果数
+
+        Yields:
+            按 entry_id 去重后的 ArxivEntry
+        """
+        out: asyncio.Queue = asyncio.Queue(self.page_size * self.concurrency)
+
+        async def run(query: str):
+            try:
+                async for entry in self.results(query, max_results):
+                    await out.put(entry)
+            except Exception as e:
+                await out.put(_QueryError(e))
+                return
+            await out.put(_QUERY_DONE)
+
+        tasks = [asyncio.ensure_future(run(q)) for q in queries]
+        seen_ids = set()
+        remaining = len(tasks)
+        try:
+            while remaining:
+                item = await out.get()
+                if item is _QUERY_DONE:
+                    remaining -= 1
+                elif isinstance(item, _QueryError):
+                    raise item.error
+                elif item.entry_id not in seen_ids:
+                    seen_ids.add(item.entry_id)
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
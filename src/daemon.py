@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+守护进程模式
+常驻进程按配置中的 cron 表达式定时执行抓取：关键词匹配器、去重索引、响应缓存和请求限速器在多次运行之间保持加载；
+配置文件变化时热重载；在本地提供健康检查（/healthz）与 Prometheus 指标（/metrics）接口；
+同一时间最多只有一次运行，上一次尚未结束时跳过本次触发（与任务计划程序的 IgnoreNew 策略一致）
+"""
+
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    from .arxiv_fetcher import ArxivPaperFetcher
+    from .metrics import NULL_METRICS, PROMETHEUS_PREFIX, RunMetrics
+except ImportError:
+    from arxiv_fetcher import ArxivPaperFetcher
+    from metrics import NULL_METRICS, PROMETHEUS_PREFIX, RunMetrics
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# 未配置 daemon.schedule 时每天凌晨 2 点运行（与任务计划程序的默认触发时间一致）
+DEFAULT_SCHEDULE = "0 2 * * *"
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# 检查配置文件是否变化的间隔（秒）
+DEFAULT_RELOAD_INTERVAL = 5.0
+
+# daemon.run 中允许的选项（即 run_daily_fetch 的参数）及默认值
+DEFAULT_RUN_OPTIONS = {
+    "days_back": 1,
+    "generate_report": True,
+    "sharded": False,
+    "export_json": False,
+    "offline": False,
+    "streaming": False,
+    "incremental": None,
+    "announcements": None,
+}
+
+_CRON_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# 分钟、小时、日、月、星期（0 和 7 都表示星期日）的取值范围
+_CRON_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_cron_field(text: str, low: int, high: int) -> FrozenSet[int]:
+    """解析 cron 表达式的一个字段（支持 *、a-b、列表和 /步长）"""
+    values = set()
+    for part in text.split(','):
+        base, slash, step_text = part.partition('/')
+        step = int(step_text) if slash else 1
+        if base == '*':
+            start, end = low, high
+        elif '-' in base:
+            start, end = (int(v) for v in base.split('-', 1))
+        else:
+            start = int(base)
+            # "5/10" 表示从 5 开始每 10 个单位
+            end = high if slash else start
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"取值超出范围 {low}-{high}: {part!r}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """五段式 cron 表达式（分 时 日 月 星期，本地时间），也支持 @daily / @hourly 等别名"""
+
+    def __init__(self, expression: str):
+        """
+        Args:
+            expression: cron 表达式，例如 "0 2 * * *"、"*/30 8-20 * * 1-5"
+
+        Raises:
+            ValueError: 表达式无效或永远不会触发
+        """
+        self.expression = expression.strip()
+        fields = _CRON_ALIASES.get(self.expression, self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"无效的 cron 表达式（需要 5 个字段）: {expression!r}")
+        try:
+            self.minutes, self.hours, self.days, self.months, weekdays = (
+                _parse_cron_field(text, low, high) for text, (low, high) in zip(fields, _CRON_RANGES))
+        except ValueError as e:
+            raise ValueError(f"无效的 cron 表达式 {expression!r}: {e}") from None
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        # 日和星期都受限制时满足其一即可（与 cron 的语义一致），否则两者都要满足
+        self._either_day = not fields[2].startswith('*') and not fields[4].startswith('*')
+        self.next_after(datetime(2000, 1, 1))
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r})"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_days = moment.day in self.days
+        in_weekdays = moment.isoweekday() % 7 in self.weekdays
+        return (in_days or in_weekdays) if self._either_day else (in_days and in_weekdays)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        计算严格晚于给定时间的下一个触发时间
+
+        Args:
+            moment: 起始时间（本地时间，不带时区）
+
+        Returns:
+            下一个触发时间（秒和微秒为 0）
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # 2 月 29 日之类的日期最多 8 年出现一次
+        last_year = moment.year + 8
+        while candidate.year <= last_year:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"cron 表达式永远不会触发: {self.expression!r}")
+
+
+def parse_daemon_config(config: Dict) -> Tuple[List[CronSchedule], Dict]:
+    """
+    解析配置中的 daemon 段
+
+    Args:
+        config: 完整配置字典
+
+    Returns:
+        (触发计划列表, run_daily_fetch 参数)
+
+    Raises:
+        ValueError: cron 表达式无效或 run 中有未知选项
+    """
+    daemon_config = config.get('daemon', {})
+    schedule = daemon_config.get('schedule', DEFAULT_SCHEDULE)
+    if isinstance(schedule, str):
+        schedule = [schedule]
+    schedules = [CronSchedule(expression) for expression in schedule]
+    run_options = daemon_config.get('run', {})
+    unknown = set(run_options) - set(DEFAULT_RUN_OPTIONS)
+    if unknown:
+        raise ValueError(f"daemon.run 中有未知选项: {', '.join(sorted(unknown))}")
+    return schedules, dict(DEFAULT_RUN_OPTIONS, **run_options)
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    """健康检查与指标接口：GET /healthz、GET /metrics、POST /run（立即触发一次运行）"""
+
+    def _reply(self, code: int, body: str, content_type: str = "application/json; charset=utf-8"):
+        data = body.encode('utf-8')
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        daemon = self.server.fetch_daemon
+        if path in ("/healthz", "/health"):
+            status = daemon.status()
+            self._reply(503 if status["status"] == "error" else 200,
+                        json.dumps(status, ensure_ascii=False, indent=2) + "\n")
+        elif path == "/metrics":
+            self._reply(200, daemon.to_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            self._reply(404, json.dumps({"error": "not found"}) + "\n")
+
+    def do_POST(self):
+        if urlsplit(self.path).path != "/run":
+            self._reply(404, json.dumps({"error": "not found"}) + "\n")
+        elif self.server.fetch_daemon.trigger("http"):
+            self._reply(202, json.dumps({"started": True}) + "\n")
+        else:
+            self._reply(409, json.dumps({"started": False, "error": "上一次运行尚未结束"}, ensure_ascii=False) + "\n")
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+class FetchDaemon:
+    """常驻进程：定时运行抓取，热重载配置，并提供健康检查与指标接口"""
+
+    def __init__(self, config_file: str = "config.json", data_dir: str = None, host: str = None,
+                 port: int = None):
+        """
+        Args:
+            config_file: 配置文件路径（相对路径相对于项目根目录）
+            data_dir: 固定的数据目录，None 表示每次运行使用当天的带日期目录
+            host: 状态接口监听地址，覆盖配置 daemon.host
+            port: 状态接口端口，覆盖配置 daemon.port（0 表示随机端口）
+        """
+        self.config_file = config_file
+        self.config_path = Path(config_file) if Path(config_file).is_absolute() else PROJECT_ROOT / config_file
+        self.data_dir = data_dir
+        self._host = host
+        self._port = port
+
+        # 运行锁：同一时间最多一次运行
+        self._run_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self.server: Optional[ThreadingHTTPServer] = None
+
+        self.started_at = datetime.now()
+        self.runs = {"success": 0, "failure": 0, "skipped": 0}
+        self.config_reloads = 0
+        self.last_run: Optional[Dict] = None
+        self.last_success: Optional[datetime] = None
+        self.last_metrics: Optional[RunMetrics] = None
+        self.next_run: Optional[datetime] = None
+
+        self._config_stamp = self._stat_config()
+        self.fetcher = ArxivPaperFetcher(data_dir=data_dir, config_file=config_file)
+        self.schedules, self.run_options = parse_daemon_config(self.fetcher.config)
+
+    @property
+    def daemon_config(self) -> Dict:
+        return self.fetcher.config.get('daemon', {})
+
+    @property
+    def running(self) -> bool:
+        return self._run_lock.locked()
+
+    def _stat_config(self) -> Optional[Tuple[int, int]]:
+        """配置文件的 (修改时间, 大小)，文件不存在时为 None"""
+        try:
+            stat = self.config_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def next_fire(self, after: datetime) -> Optional[datetime]:
+        """所有触发计划中最早的下一次触发时间，没有计划时为 None"""
+        return min((schedule.next_after(after) for schedule in self.schedules), default=None)
+
+    def check_reload(self) -> bool:
+        """
+        配置文件变化时重新加载：先校验新配置，成功后创建新的抓取工具并关闭旧的；
+        新配置无效时继续使用当前配置；正在运行时推迟到运行结束后
+
+        Returns:
+            是否已重新加载
+        """
+        stamp = self._stat_config()
+        if stamp == self._config_stamp:
+            return False
+        if stamp is None:
+            logger.warning(f"配置文件不存在: {self.config_path}，继续使用当前配置")
+            self._config_stamp = stamp
+            return False
+        if not self._run_lock.acquire(blocking=False):
+            return False
+        try:
+            self._config_stamp = stamp
+            try:
+                with open(self.config_path, 'r', encoding='utf-8') as f:
+                    schedules, run_options = parse_daemon_config(json.load(f))
+                fetcher = ArxivPaperFetcher(data_dir=self.data_dir, config_file=self.config_file)
+            except Exception as e:
+                logger.error(f"重新加载配置失败，继续使用当前配置: {e}")
+                return False
+            self.fetcher.close()
+            self.fetcher = fetcher
+            self.schedules, self.run_options = schedules, run_options
+            self.config_reloads += 1
+            self.next_run = self.next_fire(datetime.now())
+            logger.info(f"已重新加载配置文件: {self.config_path}，下次运行: {self._format_time(self.next_run)}")
+            return True
+        finally:
+            self._run_lock.release()
+
+    def trigger(self, reason: str = "schedule") -> bool:
+        """
+        在后台线程中开始一次运行；上一次运行尚未结束时跳过
+
+        Args:
+            reason: 触发原因（schedule / http），记录在运行状态中
+
+        Returns:
+            是否已开始运行
+        """
+        if not self._run_lock.acquire(blocking=False):
+            with self._state_lock:
+                self.runs["skipped"] += 1
+            logger.warning(f"上一次运行尚未结束，跳过本次触发（{reason}）")
+            return False
+        self._worker = threading.Thread(target=self._run, args=(reason,), name="fetch-run", daemon=True)
+        self._worker.start()
+        return True
+
+    def join(self, timeout: float = None):
+        """等待当前运行结束"""
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def _run(self, reason: str):
+        """执行一次抓取（持有运行锁）"""
+        metrics = RunMetrics()
+        started = datetime.now()
+        start = time.perf_counter()
+        error = None
+        fetcher = self.fetcher
+        try:
+            fetcher.metrics = metrics
+            # 未指定数据目录时切换到当天的目录（跨天运行）
+            fetcher.set_data_dir(self.data_dir)
+            fetcher.run_daily_fetch(**self.run_options)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.error(f"定时运行失败: {error}")
+        finally:
+            fetcher.metrics = NULL_METRICS
+            finished = datetime.now()
+            with self._state_lock:
+                self.runs["failure" if error else "success"] += 1
+                self.last_metrics = metrics
+                self.last_run = {
+                    "reason": reason,
+                    "started_at": started.isoformat(timespec='seconds'),
+                    "finished_at": finished.isoformat(timespec='seconds'),
+                    "duration_seconds": round(time.perf_counter() - start, 3),
+                    "status": "failure" if error else "success",
+                    "error": error,
+                    "data_dir": str(fetcher.data_dir),
+                }
+                if error is None:
+                    self.last_success = finished
+            self._run_lock.release()
+
+    @staticmethod
+    def _format_time(moment: Optional[datetime]) -> Optional[str]:
+        return moment.isoformat(timespec='seconds') if moment is not None else None
+
+    def status(self) -> Dict:
+        """
+        健康检查内容
+
+        Returns:
+            状态字典；status 为 running（正在运行）、error（上一次运行失败）或 ok
+        """
+        with self._state_lock:
+            last_run = dict(self.last_run) if self.last_run else None
+            if self.running:
+                state = "running"
+            elif last_run and last_run["status"] == "failure":
+                state = "error"
+            else:
+                state = "ok"
+            return {
+                "status": state,
+                "pid": os.getpid(),
+                "started_at": self._format_time(self.started_at),
+                "uptime_seconds": round((datetime.now() - self.started_at).total_seconds(), 1),
+                "config_file": str(self.config_path),
+                "config_reloads": self.config_reloads,
+                "schedule": [schedule.expression for schedule in self.schedules],
+                "next_run": self._format_time(self.next_run),
+                "runs": dict(self.runs),
+                "last_run": last_run,
+                "last_success": self._format_time(self.last_success),
+            }
+
+    def to_prometheus(self, prefix: str = PROMETHEUS_PREFIX) -> str:
+        """
+        守护进程指标加上最近一次运行的指标（Prometheus 文本格式）
+
+        Args:
+            prefix: 指标名前缀
+
+        Returns:
+            Prometheus exposition 格式文本
+        """
+        with self._state_lock:
+            runs = dict(self.runs)
+            last_success = self.last_success
+            last_metrics = self.last_metrics
+        gauges = [
+            ("daemon_up", "gauge", "Daemon process is running.", 1),
+            ("daemon_start_timestamp_seconds", "gauge", "Daemon start time (unix seconds).",
+             round(self.started_at.timestamp(), 3)),
+            ("daemon_run_in_progress", "gauge", "Whether a fetch run is in progress.", int(self.running)),
+            ("daemon_config_reloads_total", "counter", "Number of successful config reloads.", self.config_reloads),
+        ]
+        if self.next_run is not None:
+            gauges.append(("daemon_next_run_timestamp_seconds", "gauge", "Next scheduled run (unix seconds).",
+                           round(self.next_run.timestamp(), 3)))
+        if last_success is not None:
+            gauges.append(("daemon_last_success_timestamp_seconds", "gauge",
+                           "Finish time of the last successful run (unix seconds).", round(last_success.timestamp(), 3)))
+        lines = []
+        for name, kind, help_text, value in gauges:
+            lines += [f"# HELP {prefix}_{name} {help_text}", f"# TYPE {prefix}_{name} {kind}", f"{prefix}_{name} {value}"]
+        lines += [f"# HELP {prefix}_daemon_runs_total Fetch runs by outcome (skipped = overlapping trigger).",
+                  f"# TYPE {prefix}_daemon_runs_total counter"]
+        lines += [f'{prefix}_daemon_runs_total{{status="{status}"}} {count}' for status, count in runs.items()]
+        text = "\n".join(lines) + "\n"
+        if last_metrics is not None:
+            text += last_metrics.to_prometheus(prefix)
+        return text
+
+    def start_server(self) -> Optional[ThreadingHTTPServer]:
+        """
+        在后台线程中启动状态接口（配置 daemon.port 为 null 时不启动）
+
+        Returns:
+            HTTP 服务器，未启动时为 None
+        """
+        port = self._port if self._port is not None else self.daemon_config.get('port', DEFAULT_PORT)
+        if port is None:
+            return None
+        host = self._host or self.daemon_config.get('host', DEFAULT_HOST)
+        self.server = ThreadingHTTPServer((host, int(port)), _StatusHandler)
+        self.server.daemon_threads = True
+        self.server.fetch_daemon = self
+        threading.Thread(target=self.server.serve_forever, name="status-server", daemon=True).start()
+        logger.info(f"状态接口: http://{host}:{self.server.server_address[1]}/healthz")
+        return self.server
+
+    def stop(self):
+        """请求停止（当前运行结束后退出）"""
+        self._stop.set()
+
+    def shutdown(self):
+        """等待当前运行结束，关闭状态接口和抓取工具"""
+        self.stop()
+        if self.running:
+            logger.info("等待当前运行结束...")
+        self.join()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        self.fetcher.close()
+
+    def run_forever(self):
+        """主循环：到达触发时间时开始运行，定期检查配置文件是否变化，收到 SIGINT / SIGTERM 后退出"""
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: self.stop())
+        self.start_server()
+        self.next_run = self.next_fire(datetime.now())
+        logger.info(f"守护进程已启动，计划: {', '.join(s.expression for s in self.schedules)}，"
+                    f"下次运行: {self._format_time(self.next_run)}")
+        try:
+            next_check = 0.0
+            while not self._stop.is_set():
+                now = datetime.now()
+                if self.next_run is not None and now >= self.next_run:
+                    self.trigger("schedule")
+                    # 从当前时间计算下一次触发（错过的多次触发只补跑一次）
+                    self.next_run = self.next_fire(now)
+                    logger.info(f"下次运行: {self._format_time(self.next_run)}")
+                reload_interval = float(self.daemon_config.get('reload_interval', DEFAULT_RELOAD_INTERVAL))
+                if time.monotonic() >= next_check:
+                    self.check_reload()
+                    next_check = time.monotonic() + reload_interval
+                timeout = reload_interval
+                if self.next_run is not None:
+                    timeout = min(timeout, max(0.0, (self.next_run - datetime.now()).total_seconds()))
+                self._stop.wait(max(timeout, 0.05))
+        finally:
+            self.shutdown()
+            logger.info("守护进程已退出")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+可续跑的抓取检查点
+单查询批量抓取时每完成 N 页，把查询、已完成的页偏移、增量水位线进度和已匹配的论文持久化；
+抓取中途失败时先保存到最后一个完整处理的页，之后用 --resume 从该页继续，失败只损失当前页
+
+检查点目录中有两个文件：
+    state.json     查询与进度（原子替换写入）
+    matches.jsonl  已匹配的论文（追加写入；state.json 记录其有效长度，续跑时截断之后未确认的部分）
+"""
+
+import json
+import logging
+import os
+import shutil
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .paper_store import atomic_write_bytes
+except ImportError:
+    from paper_store import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+
+class FetchCheckpoint:
+    """
+    页级抓取检查点
+
+    API 客户端在每页论文全部产出之后调用 page_done 登记页边界；抓取循环每检查完一批论文调用 advance，
+    已检查的论文数越过某个页边界即确认该页完成，每完成 every_pages 页写入一次检查点。
+    匹配论文按其在结果中的位置暂存，只有位于已确认页内的论文才会写入，续跑时不会重复
+    """
+
+    def __init__(self, directory, every_pages: int = 5):
+        """
+        Args:
+            directory: 检查点目录
+            every_pages: 每完成多少页写入一次检查点
+        """
+        self.directory = Path(directory)
+        self.every_pages = max(1, int(every_pages))
+        self.state_file = self.directory / "state.json"
+        self.matches_file = self.directory / "matches.jsonl"
+        self.state: Optional[Dict] = None
+        # 增量水位线进度（水位线键 -> 已产出论文的最新提交时间），由抓取工具原地更新
+        self.newest: Dict[str, datetime] = {}
+        # 尚未写入的匹配论文：(在结果中的位置, 档案名, JSON 结构)
+        self._pending: List[Tuple[int, Optional[str], Dict]] = []
+        # 已产出但尚未确认的页边界：(下一页偏移, 截至该页本进程已产出的论文数)
+        self._boundaries: deque = deque()
+        # 本进程中已确认（位于完整处理的页内）的论文数，以及其中已计入 state['checked'] 的数量
+        self._confirmed = 0
+        self._saved_confirmed = 0
+        self._pages_since_save = 0
+
+    def load(self) -> Optional[Dict]:
+        """
+        读取检查点状态
+
+        Returns:
+            状态字典；不存在、无法解析或版本不符时返回 None
+        """
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取抓取检查点失败: {e}")
+            return None
+        return state if state.get('version') == CHECKPOINT_VERSION else None
+
+    def begin(self, query: str, max_results: Optional[int], targets: List[Optional[str]], found_date: str):
+        """
+        开始新的检查点（清除旧的检查点）
+
+        Args:
+            query: 本次抓取的查询语句（续跑时沿用，不随当前时间重新计算）
+            max_results: 最大结果数
+            targets: 输出目标（档案名列表，未配置档案时为 [None]）
+            found_date: 本次运行的发现时间
+        """
+        self.clear()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.matches_file.write_bytes(b"")
+        self.state = {
+            "version": CHECKPOINT_VERSION,
+            "query": query,
+            "max_results": max_results,
+            "targets": targets,
+            "found_date": found_date,
+            "offset": 0,
+            "pages": 0,
+            "checked": 0,
+            "matches_bytes": 0,
+            "newest": {},
+            "complete": False,
+        }
+        self.newest = {}
+        self._write_state()
+
+    def resume(self) -> List[Tuple[Optional[str], Dict]]:
+        """
+        载入已有检查点，准备从最后完成的页继续
+
+        Returns:
+            检查点中已匹配的论文 (档案名, JSON 结构) 列表
+
+        Raises:
+            FileNotFoundError: 没有可继续的检查点
+        """
+        state = self.load()
+        if state is None:
+            raise FileNotFoundError(f"没有可继续的抓取检查点: {self.state_file}")
+        self.state = state
+        self.newest = {key: datetime.fromisoformat(value) for key, value in state['newest'].items()}
+        # 截断最后一次写入状态之后追加的（未确认的）匹配论文
+        with open(self.matches_file, 'r+b') as f:
+            f.truncate(state['matches_bytes'])
+            f.seek(0)
+            matches = [json.loads(line) for line in f.read().decode('utf-8').splitlines()]
+        return [(match['profile'], match['paper']) for match in matches]
+
+    def page_done(self, next_offset: int, yielded: int):
+        """
+        API 客户端回调：一页论文已全部产出
+
+        Args:
+            next_offset: 下一页的起始偏移
+            yielded: 本进程截至该页已产出的论文数
+        """
+        self._boundaries.append((next_offset, yielded))
+
+    def add_matches(self, matches: Iterable[Tuple[int, Optional[str], Dict]]):
+        """
+        暂存匹配论文
+
+        Args:
+            matches: (论文在本进程结果中的位置, 档案名, JSON 结构)
+        """
+        self._pending.extend(matches)
+
+    def advance(self, checked: int) -> bool:
+        """
+        已检查 checked 篇论文（本进程），确认其覆盖的页并按间隔写入检查点
+
+        Args:
+            checked: 本进程已检查的论文数
+
+        Returns:
+            是否写入了检查点
+        """
+        while self._boundaries and self._boundaries[0][1] <= checked:
+            offset, self._confirmed = self._boundaries.popleft()
+            self.state['offset'] = offset
+            self.state['pages'] += 1
+            self._pages_since_save += 1
+        if self._pages_since_save >= self.every_pages:
+            self.save()
+            return True
+        return False
+
+    def save(self):
+        """写入已确认页内的匹配论文和当前进度"""
+        confirmed = [m for m in self._pending if m[0] < self._confirmed]
+        self._pending = [m for m in self._pending if m[0] >= self._confirmed]
+        self._append_matches(confirmed)
+        self.state['checked'] += self._confirmed - self._saved_confirmed
+        self._saved_confirmed = self._confirmed
+        self._write_state()
+        self._pages_since_save = 0
+
+    def finish(self, checked: int):
+        """
+        抓取完整结束：写入全部匹配论文并标记完成（之后保存失败时续跑不再重新抓取）
+
+        Args:
+            checked: 本进程已检查的论文数
+        """
+        self._confirmed = checked
+        self._boundaries.clear()
+        self.save()
+        self.state['complete'] = True
+        self._write_state()
+
+    def clear(self):
+        """删除检查点（运行成功保存后调用）"""
+        if self.directory.exists():
+            shutil.rmtree(self.directory, ignore_errors=True)
+        self.state = None
+        self._pending = []
+        self._boundaries.clear()
+        self._confirmed = 0
+        self._saved_confirmed = 0
+        self._pages_since_save = 0
+
+    def _append_matches(self, matches: List[Tuple[int, Optional[str], Dict]]):
+        if not matches:
+            return
+        data = b"".join(
+            (json.dumps({"profile": profile, "paper": paper}, ensure_ascii=False) + "\n").encode('utf-8')
+            for _, profile, paper in matches
+        )
+        with open(self.matches_file, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self.state['matches_bytes'] += len(data)
+
+    def _write_state(self):
+        self.state['newest'] = {key: value.isoformat() for key, value in self.newest.items()}
+        atomic_write_bytes(self.state_file, json.dumps(self.state, ensure_ascii=False, indent=2).encode('utf-8'))
@@ -0,0 +1,669 @@
+#!/usr/bin/env python3
+"""
+关键词匹配器
+将 keywords / system_keywords / categories 配置预编译为一个正则自动机，
+每篇论文只需扫描一次文本，即可同时得到是否匹配以及分类列表；
+整词匹配的关键词改为在分词后的 token 序列上查哈希短语索引（每篇论文只分词一次）
+
+关键词可以是字符串，也可以是带选项的对象：
+    {"keyword": "engine", "whole_word": true, "case_sensitive": false, "proximity": 0}
+未指定的选项取配置 matching 段中的默认值（默认均为子串匹配、不区分大小写，与旧行为一致）
+
+分类还可以按论文的 arXiv 分类（主分类和交叉列出的分类）预筛选：
+    {"keywords": "kv_cache", "arxiv_categories": ["cs.DC", "cs.LG"], "exclude_arxiv_categories": ["astro-ph"]}
+arxiv_categories 非空时只有带其中某个分类的论文才可能命中该分类，带 exclude_arxiv_categories 中任一分类的论文
+不会命中；列表项可以是具体分类（cs.DC）或整个大类（cs、astro-ph）。预筛选编译为 arXiv 分类 -> 分类比特掩码的
+哈希表，所有分类都被排除的论文不做任何文本处理
+"""
+
+import re
+import string
+from typing import Dict, List, Optional, Tuple, Union
+
+
+# 关键词数量不超过该值时，逐个 `in` 检查（C 实现的子串查找）比正则扫描更快
+SUBSTRING_SCAN_LIMIT = 48
+
+
+def _taxonomy_codes(codes) -> List[str]:
+    """规范化预筛选中的 arXiv 分类（"cs.*" 与 "cs" 等价，表示整个大类）"""
+    if isinstance(codes, str):
+        codes = [codes]
+    normalized = []
+    for code in codes or []:
+        code = code.strip()
+        if code.endswith(".*"):
+            code = code[:-2]
+        if code:
+            normalized.append(code)
+    return normalized
+
+
+class _PatternScanner:
+    """在文本中查找一组小写关键词，返回命中的比特掩码"""
+
+    def __init__(self, pattern_masks: Dict[str, int], implied_masks: Dict[str, int]):
+        """
+        Args:
+            pattern_masks: 关键词 -> 自身比特掩码
+            implied_masks: 关键词 -> 命中时应置位的完整掩码（含子串关键词）
+        """
+        self._implied = {p: implied_masks[p] for p in pattern_masks}
+        if len(pattern_masks) <= SUBSTRING_SCAN_LIMIT:
+            # 长关键词优先：命中后通过闭包掩码一并覆盖其子串关键词
+            self._patterns = sorted(pattern_masks, key=len, reverse=True)
+            self._regex = None
+        else:
+            self._patterns = None
+            self._regex = re.compile(_build_trie_regex(pattern_masks))
+
+    def scan(self, text: str, mask: int, stop_mask: int) -> int:
+        """
+        扫描文本，在 mask 基础上置位命中的比特，stop_mask 全部置位后提前结束
+
+        Args:
+            text: 已转换为小写的待检查文本
+            mask: 初始掩码
+            stop_mask: 达到后即可停止扫描的掩码
+
+        Returns:
+            更新后的掩码
+        """
+        implied = self._implied
+        if self._regex is None:
+            for pattern in self._patterns:
+                if mask & stop_mask == stop_mask:
+                    break
+                if implied[pattern] & ~mask and pattern in text:
+                    mask |= implied[pattern]
+            return mask
+
+        search = self._regex.search
+        pos = 0
+        while mask & stop_mask != stop_mask:
+            m = search(text, pos)
+            if m is None:
+                break
+            mask |= implied[m.group()]
+            # 从下一个字符继续，保证重叠的关键词也能被发现
+            pos = m.start() + 1
+        return mask
+
+
+def _close_over_substrings(pattern_masks: Dict[str, int]) -> Dict[str, int]:
+    """
+    计算每个关键词命中时应置位的完整掩码（包含其子串关键词的掩码）
+
+    扫描时每个起始位置只取最长的关键词，较短的关键词若是其子串，
+    则通过该闭包被一并记入，从而与逐个 `in` 检查的语义保持一致。
+    """
+    patterns = sorted(pattern_masks, key=len)
+    implied = {}
+    for i, longer in enumerate(patterns):
+        mask = pattern_masks[longer]
+        for shorter in patterns[:i]:
+            if shorter in longer:
+                mask |= pattern_masks[shorter]
+        implied[longer] = mask
+    return implied
+
+
+def _build_trie_regex(patterns) -> str:
+    """将关键词集合构建为前缀树形式的正则表达式（同一起点优先匹配最长关键词）"""
+    trie: Dict = {}
+    for pattern in patterns:
+        node = trie
+        for ch in pattern:
+            node = node.setdefault(ch, {})
+        node[''] = True
+    return _trie_to_regex(trie)
+
+
+def _trie_to_regex(node: Dict) -> str:
+    """递归地把前缀树节点转换为正则片段"""
+    branches = []
+    for ch in sorted(k for k in node if k):
+        child = node[ch]
+        # 压缩单分支链，减少正则嵌套层数
+        literal = ch
+        while len(child) == 1 and '' not in child:
+            next_ch = next(iter(child))
+            literal += next_ch
+            child = child[next_ch]
+        branches.append(re.escape(literal) + _trie_to_regex(child))
+
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        # 当前位置已是完整关键词：贪婪地尝试更长的关键词，失败则在此结束
+        return '(?:' + body + ')?'
+    return body
+
+
+# 分词时视为分隔符的标点（ASCII 标点以及常见的 Unicode 破折号、引号、省略号）
+_SEPARATORS = set(string.punctuation + "\u2010\u2011\u2012\u2013\u2014\u2015\u2018\u2019\u201c\u201d\u00b7\u2026") - {"_"}
+
+# 词干化缓存的最大条目数（超过后清空重建）
+STEM_CACHE_LIMIT = 200000
+
+# 轻量词干化：去掉一个常见的英文屈折后缀（复数、-ing、-ed），再去掉词尾的 e
+_STEM_RULES = (("sses", "ss", 5), ("ies", "y", 5), ("ing", "", 6), ("ed", "", 5), ("s", "", 4))
+
+
+def stem_token(token: str) -> str:
+    """
+    轻量词干化（systems -> system；cache / caches / cached / caching -> cach）
+
+    Args:
+        token: 单个 token
+
+    Returns:
+        词干
+    """
+    for suffix, replacement, min_len in _STEM_RULES:
+        if len(token) >= min_len and token.endswith(suffix):
+            if suffix != "s" or not token.endswith(("ss", "us", "is")):
+                token = token[:-len(suffix)] + replacement
+            break
+    if len(token) > 4 and token.endswith("e"):
+        token = token[:-1]
+    return token
+
+
+class _PhraseTable:
+    """
+    token 短语索引：连续短语存放在以 token 为键的哈希前缀树中，
+    每个位置只需按后续 token 逐级查字典，扫描代价与 token 数成正比，与关键词数量基本无关
+    """
+
+    def __init__(self):
+        # 前缀树节点：token -> 子节点，键 None 保存在此结束的短语掩码
+        self._trie: Dict = {}
+        # 首 token -> [(后续 token, 最大间隔, 掩码)]：允许中间插入其他词的近邻短语
+        self._near: Dict[str, List[Tuple[Tuple[str, ...], int, int]]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._trie or self._near)
+
+    def add(self, tokens: Tuple[str, ...], mask: int, proximity: int = 0):
+        """
+        Args:
+            tokens: 短语 token（已规范化）
+            mask: 命中时置位的掩码
+            proximity: 相邻两个词之间最多允许插入的 token 数，0 表示必须连续
+        """
+        if proximity > 0 and len(tokens) > 1:
+            self._near.setdefault(tokens[0], []).append((tokens[1:], proximity, mask))
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[None] = node.get(None, 0) | mask
+
+    def scan(self, tokens: List[str]) -> int:
+        """
+        扫描 token 序列
+
+        Args:
+            tokens: 规范化后的 token 序列
+
+        Returns:
+            命中的比特掩码
+        """
+        root, near_of = self._trie, self._near
+        n = len(tokens)
+        mask = 0
+        for i, token in enumerate(tokens):
+            node = root.get(token)
+            j = i + 1
+            while node is not None:
+                mask |= node.get(None, 0)
+                if j >= n:
+                    break
+                node = node.get(tokens[j])
+                j += 1
+            if near_of:
+                near = near_of.get(token)
+                if near is not None:
+                    mask |= self._scan_near(tokens, i, near, mask)
+        return mask
+
+    @staticmethod
+    def _scan_near(tokens: List[str], i: int, near: List[Tuple[Tuple[str, ...], int, int]], mask: int) -> int:
+        """从位置 i 开始检查近邻短语：后续每个词都要在前一个词之后 gap + 1 个 token 内按顺序出现"""
+        n = len(tokens)
+        found = 0
+        for rest, gap, near_mask in near:
+            if not near_mask & ~mask:
+                continue
+            pos = i
+            for word in rest:
+                end = min(n, pos + gap + 2)
+                pos = next((j for j in range(pos + 1, end) if tokens[j] == word), -1)
+                if pos < 0:
+                    break
+            else:
+                found |= near_mask
+        return found
+
+
+class _TokenIndex:
+    """整词关键词匹配：文本只分词一次，分别查不区分 / 区分大小写的短语索引"""
+
+    def __init__(self, stemming: bool = False, fold_hyphens: bool = True):
+        """
+        Args:
+            stemming: 是否对 token 做轻量词干化
+            fold_hyphens: 是否把连字符视为分隔符（all-gather 与 all gather 等价）
+        """
+        self._stemming = stemming
+        # 词干化结果缓存：摘要词汇量有限，绝大多数 token 只需查一次字典
+        self._stems: Dict[str, str] = {}
+        # 标点替换为空格后按空白切分（比 \w+ 正则快数倍）
+        separators = _SEPARATORS if fold_hyphens else _SEPARATORS - {"-"}
+        self._separators = str.maketrans(dict.fromkeys(separators, " "))
+        self.folded = _PhraseTable()
+        self.case_sensitive = _PhraseTable()
+
+    def tokenize(self, text: str, case_sensitive: bool = False) -> List[str]:
+        """
+        将文本切分为规范化的 token 序列
+
+        Args:
+            text: 原始文本
+            case_sensitive: 是否保留大小写
+
+        Returns:
+            token 列表
+        """
+        tokens = (text if case_sensitive else text.lower()).translate(self._separators).split()
+        if self._stemming:
+            stems = self._stems
+            if len(stems) > STEM_CACHE_LIMIT:
+                stems.clear()
+            stemmed = list(map(stems.get, tokens))
+            if None in stemmed:
+                for k, stem in enumerate(stemmed):
+                    if stem is None:
+                        stemmed[k] = stems.setdefault(tokens[k], stem_token(tokens[k]))
+            tokens = stemmed
+        return tokens
+
+    def add(self, keyword: str, mask: int, case_sensitive: bool, proximity: int) -> bool:
+        """登记一个整词关键词，关键词中没有任何 token 时返回 False"""
+        tokens = tuple(self.tokenize(keyword, case_sensitive))
+        if not tokens:
+            return False
+        (self.case_sensitive if case_sensitive else self.folded).add(tokens, mask, proximity)
+        return True
+
+    def scan(self, text: str) -> int:
+        """分词并扫描原始文本，返回命中的比特掩码"""
+        mask = 0
+        if self.folded:
+            mask |= self.folded.scan(self.tokenize(text))
+        if self.case_sensitive:
+            mask |= self.case_sensitive.scan(self.tokenize(text, case_sensitive=True))
+        return mask
+
+
+KeywordSpec = Union[str, Dict]
+
+
+def _keyword_options(keyword: KeywordSpec, defaults: Dict) -> Tuple[str, bool, bool, int]:
+    """
+    解析关键词及其选项
+
+    Args:
+        keyword: 关键词字符串，或 {"keyword": ..., "whole_word": ..., "case_sensitive": ..., "proximity": ...}
+        defaults: 配置 matching 段中的默认选项
+
+    Returns:
+        (关键词, whole_word, case_sensitive, proximity)；proximity 大于 0 时总是按整词匹配
+    """
+    options = dict(defaults)
+    if isinstance(keyword, dict):
+        options.update(keyword)
+        keyword = keyword['keyword']
+    proximity = int(options.get('proximity', 0) or 0)
+    whole_word = bool(options.get('whole_word', False)) or proximity > 0
+    return keyword, whole_word, bool(options.get('case_sensitive', False)), proximity
+
+
+class KeywordMatcher:
+    """预编译的单遍关键词匹配器"""
+
+    def __init__(self, keywords_map: Dict[str, List[KeywordSpec]],
+                 system_keywords: Union[List[KeywordSpec], Dict[str, List[KeywordSpec]]],
+                 categories_config: Dict, matching: Optional[Dict] = None):
+        """
+        根据配置构建匹配器
+
+        Args:
+            keywords_map: 关键词组字典，键为组名，值为关键词列表（字符串或带选项的对象）
+            system_keywords: system 相关关键词列表；也可以是 名称 -> 关键词列表 的字典，
+                此时分类的 requires_system 为对应的名称（多档案合并匹配时每个档案一份）
+            categories_config: 分类配置字典
+            matching: 配置 matching 段：关键词选项默认值（whole_word / case_sensitive / proximity）
+                以及分词选项 stemming / fold_hyphens
+        """
+        matching = dict(matching or {})
+        self._tokens = _TokenIndex(stemming=matching.pop('stemming', False),
+                                   fold_hyphens=matching.pop('fold_hyphens', True))
+
+        # 每个关键词组（以及 system 关键词）分配一个比特位
+        group_bits: Dict[str, int] = {}
+        for category_config in categories_config.values():
+            group = category_config.get('keywords')
+            if group not in group_bits:
+                group_bits[group] = 1 << len(group_bits)
+        # 每份 system 关键词列表分配一个比特位
+        system_lists = system_keywords if isinstance(system_keywords, dict) else {True: system_keywords}
+        system_bits = {key: 1 << (len(group_bits) + i) for i, key in enumerate(system_lists)}
+        self._system_mask = 0
+        for bit in system_bits.values():
+            self._system_mask |= bit
+
+        # 子串关键词 -> 命中后可置位的比特掩码（不区分大小写的转为小写）；整词关键词登记到 token 索引
+        group_patterns: Dict[str, int] = {}
+        system_patterns: Dict[str, int] = {}
+        exact_patterns: Dict[str, int] = {}
+        base_mask = 0
+        keyword_bits = [(kw, bit, group_patterns) for group, bit in group_bits.items()
+                        for kw in keywords_map.get(group) or []]
+        keyword_bits += [(kw, bit, system_patterns) for key, bit in system_bits.items()
+                         for kw in system_lists[key] or []]
+        for spec, bit, patterns in keyword_bits:
+            keyword, whole_word, case_sensitive, proximity = _keyword_options(spec, matching)
+            if whole_word:
+                if not self._tokens.add(keyword, bit, case_sensitive, proximity):
+                    base_mask |= bit
+            elif case_sensitive:
+                exact_patterns[keyword] = exact_patterns.get(keyword, 0) | bit
+            else:
+                key = keyword.lower()
+                patterns[key] = patterns.get(key, 0) | bit
+
+        # 空字符串关键词与原实现一致：总是命中
+        self._base_mask = base_mask | group_patterns.pop('', 0) | system_patterns.pop('', 0)
+        exact_patterns.pop('', None)
+        self._exact_scanner = None
+        if exact_patterns:
+            self._exact_scanner = _PatternScanner(exact_patterns, _close_over_substrings(exact_patterns))
+
+        all_patterns = dict(system_patterns)
+        for pattern, mask in group_patterns.items():
+            all_patterns[pattern] = all_patterns.get(pattern, 0) | mask
+        implied = _close_over_substrings(all_patterns)
+
+        # 先扫描分类关键词；只有当某个需要 system 限制的分类命中时才扫描 system 关键词
+        self._group_scanner = _PatternScanner(group_patterns, implied)
+        self._system_scanner = _PatternScanner(system_patterns, implied)
+
+        self._categories: List[Tuple[str, int]] = []
+        # arXiv 分类预筛选：分类按配置顺序各占一个比特位（与关键词比特位无关）
+        self._all_categories = (1 << len(categories_config)) - 1
+        self._open_categories = 0
+        self._allow: Dict[str, int] = {}
+        self._deny: Dict[str, int] = {}
+        # 配置了预筛选的分类：(指标标签, 比特位)
+        self.prefiltered: List[Tuple[str, int]] = []
+        # 预筛选结果计数（eligible 掩码 -> 论文数），report_prefilter 时按分类展开写入运行指标
+        self._prefilter_counts: Dict[int, int] = {}
+        # system 比特位 -> 需要它的关键词组掩码
+        self._system_requirements: Dict[int, int] = {}
+        self._system_groups = 0
+        self._group_mask = 0
+        for index, (category_name, category_config) in enumerate(categories_config.items()):
+            category_bit = 1 << index
+            allow = _taxonomy_codes(category_config.get('arxiv_categories'))
+            deny = _taxonomy_codes(category_config.get('exclude_arxiv_categories'))
+            if not allow:
+                self._open_categories |= category_bit
+            for code in allow:
+                self._allow[code] = self._allow.get(code, 0) | category_bit
+            for code in deny:
+                self._deny[code] = self._deny.get(code, 0) | category_bit
+            if allow or deny:
+                # 多档案合并匹配时分类名为 (档案名, 分类名)
+                label = category_name if isinstance(category_name, str) else "/".join(category_name)
+                self.prefiltered.append((label, category_bit))
+            need = group_bits[category_config.get('keywords')]
+            self._group_mask |= need
+            requires_system = category_config.get('requires_system', False)
+            if requires_system:
+                system_bit = system_bits[True if requires_system is True else requires_system]
+                self._system_requirements[system_bit] = self._system_requirements.get(system_bit, 0) | need
+                self._system_groups |= need
+                need |= system_bit
+            self._categories.append((category_name, need))
+
+    def eligible(self, arxiv_categories) -> int:
+        """
+        arXiv 分类预筛选：论文可能命中的分类比特掩码（只查哈希表，不处理文本）
+
+        Args:
+            arxiv_categories: 论文的 arXiv 分类（主分类和交叉列出的分类）
+
+        Returns:
+            按配置顺序的分类比特掩码；为 0 时论文不可能命中任何分类
+        """
+        if not self.prefiltered:
+            return self._all_categories
+        allow, deny = self._allow, self._deny
+        allowed = self._open_categories
+        denied = 0
+        for code in arxiv_categories or ():
+            archive = code.split(".", 1)[0]
+            allowed |= allow.get(code, 0) | allow.get(archive, 0)
+            denied |= deny.get(code, 0) | deny.get(archive, 0)
+        return allowed & ~denied
+
+    def prefilter(self, arxiv_categories, count: bool = False) -> int:
+        """
+        预筛选，可选累计结果（每篇论文只做一次字典累加，与分类数量无关）
+
+        Args:
+            arxiv_categories: 论文的 arXiv 分类
+            count: 是否累计，累计结果由 report_prefilter 写入运行指标
+
+        Returns:
+            eligible() 的结果
+        """
+        eligible = self.eligible(arxiv_categories)
+        if count:
+            counts = self._prefilter_counts
+            counts[eligible] = counts.get(eligible, 0) + 1
+        return eligible
+
+    def report_prefilter(self, metrics):
+        """
+        把累计的预筛选结果写入运行指标并清零：各分类的通过数（prefilter_passed）和拒绝数（prefilter_rejected），
+        标签为分类名
+
+        Args:
+            metrics: 运行指标（RunMetrics）
+        """
+        counts, self._prefilter_counts = self._prefilter_counts, {}
+        for eligible, n in counts.items():
+            for label, bit in self.prefiltered:
+                metrics.count("prefilter_passed" if eligible & bit else "prefilter_rejected", n, label=label)
+
+    def filter_categories(self, names: List[str], arxiv_categories) -> List[str]:
+        """
+        按 arXiv 分类预筛选过滤分类名称（用于语义分类等不经过关键词扫描的结果）
+
+        Args:
+            names: 分类名称列表
+            arxiv_categories: 论文的 arXiv 分类
+
+        Returns:
+            预筛选允许的分类名称
+        """
+        if not self.prefiltered or not names:
+            return names
+        eligible = self.eligible(arxiv_categories)
+        return [name for i, (name, _) in enumerate(self._categories) if eligible >> i & 1 and name in names]
+
+    def match_mask(self, text: str) -> int:
+        """
+        扫描文本，返回命中的关键词组比特掩码
+
+        Args:
+            text: 待检查文本（区分大小写的关键词按原文匹配）
+
+        Returns:
+            命中的比特掩码
+        """
+        lowered = text.lower()
+        mask = self._base_mask
+        if self._tokens.folded or self._tokens.case_sensitive:
+            mask |= self._tokens.scan(text)
+        if self._exact_scanner is not None:
+            mask = self._exact_scanner.scan(text, mask, self._group_mask | self._system_mask)
+        mask = self._group_scanner.scan(lowered, mask, self._group_mask)
+        if mask & self._system_groups:
+            # 只扫描命中的分类所需、且尚未命中的 system 关键词
+            needed = 0
+            for system_bit, groups in self._system_requirements.items():
+                if mask & groups:
+                    needed |= system_bit
+            if needed & ~mask:
+                mask = self._system_scanner.scan(lowered, mask, needed)
+        return mask
+
+    def match(self, text: str, eligible: int = None) -> List[str]:
+        """
+        对文本进行分类
+
+        Args:
+            text: 待检查文本
+            eligible: arXiv 分类预筛选得到的分类比特掩码（eligible() 的结果），None 表示不限制
+
+        Returns:
+            命中的分类名称列表（按配置顺序），未命中时为空列表
+        """
+        if eligible is not None and not eligible:
+            return []
+        mask = self.match_mask(text)
+        if not mask & self._group_mask:
+            return []
+        if eligible is None or eligible == self._all_categories:
+            return [name for name, need in self._categories if mask & need == need]
+        return [name for i, (name, need) in enumerate(self._categories)
+                if eligible >> i & 1 and mask & need == need]
+
+    def match_paper(self, paper, count_prefilter: bool = False) -> List[str]:
+        """
+        对论文进行分类（先按 arXiv 分类预筛选，再检查标题和摘要）
+
+        Args:
+            paper: 具有 title、summary 和 categories 属性的论文对象
+            count_prefilter: 是否累计预筛选结果（见 report_prefilter）
+
+        Returns:
+            命中的分类名称列表，未命中时为空列表
+        """
+        if not self.prefiltered:
+            return self.match(f"{paper.title} {paper.summary}")
+        eligible = self.prefilter(paper.categories, count_prefilter)
+        if not eligible:
+            # 所有分类都被预筛选排除：不做文本处理
+            return []
+        return self.match(f"{paper.title} {paper.summary}", eligible)
+
+
+class ProfileMatcher:
+    """
+    多个配置档案共用的单遍匹配器
+
+    各档案的关键词组、system 关键词和分类按档案名加上前缀后合并到同一个 KeywordMatcher 中，
+    每篇论文只扫描一次文本即可得到所有档案的分类；分词选项（stemming / fold_hyphens）不同的档案
+    无法共用 token 索引，按分词选项分组，每组一个匹配器
+    """
+
+    def __init__(self, profiles: Dict[str, Dict]):
+        """
+        Args:
+            profiles: 档案名 -> 配置（keywords / system_keywords / categories / matching 段）
+        """
+        merged: Dict[Tuple[bool, bool], Dict] = {}
+        for name, config in profiles.items():
+            matching = dict(config.get('matching') or {})
+            tokenizer = (bool(matching.pop('stemming', False)), bool(matching.pop('fold_hyphens', True)))
+            group = merged.setdefault(tokenizer, {"keywords": {}, "system_keywords": {}, "categories": {}})
+            # 关键词选项的默认值按各档案的 matching 段展开，合并后不再依赖匹配器的默认值
+            keywords_map = config.get('keywords', {})
+            for keyword_group, keywords in keywords_map.items():
+                group["keywords"][f"{name}\x1f{keyword_group}"] = [
+                    _resolve_keyword(keyword, matching) for keyword in keywords or []
+                ]
+            group["system_keywords"][name] = [
+                _resolve_keyword(keyword, matching) for keyword in config.get('system_keywords', [])
+            ]
+            for category, category_config in config.get('categories', {}).items():
+                group["categories"][(name, category)] = {
+                    "keywords": f"{name}\x1f{category_config.get('keywords')}",
+                    "requires_system": name if category_config.get('requires_system', False) else False,
+                    "arxiv_categories": category_config.get('arxiv_categories'),
+                    "exclude_arxiv_categories": category_config.get('exclude_arxiv_categories'),
+                }
+        self.profiles = list(profiles)
+        self._matchers = [
+            KeywordMatcher(group["keywords"], group["system_keywords"], group["categories"],
+                           {"stemming": stemming, "fold_hyphens": fold_hyphens})
+            for (stemming, fold_hyphens), group in merged.items()
+        ]
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """
+        对文本进行分类
+
+        Args:
+            text: 待检查文本
+
+        Returns:
+            档案名 -> 命中的分类名称列表（按该档案的配置顺序），只包含有命中的档案
+        """
+        matched: Dict[str, List[str]] = {}
+        for matcher in self._matchers:
+            for name, category in matcher.match(text):
+                matched.setdefault(name, []).append(category)
+        return matched
+
+    def match_paper(self, paper, count_prefilter: bool = False) -> Dict[str, List[str]]:
+        """
+        对论文进行分类（先按 arXiv 分类预筛选，再检查标题和摘要；标题和摘要只拼接一次）
+
+        Args:
+            paper: 具有 title、summary 和 categories 属性的论文对象
+            count_prefilter: 是否累计预筛选结果（见 report_prefilter）
+
+        Returns:
+            档案名 -> 命中的分类名称列表，只包含有命中的档案
+        """
+        matched: Dict[str, List[str]] = {}
+        text = None
+        for matcher in self._matchers:
+            eligible = None
+            if matcher.prefiltered:
+                eligible = matcher.prefilter(paper.categories, count_prefilter)
+                if not eligible:
+                    continue
+            if text is None:
+                text = f"{paper.title} {paper.summary}"
+            for name, category in matcher.match(text, eligible):
+                matched.setdefault(name, []).append(category)
+        return matched
+
+    def report_prefilter(self, metrics):
+        """把累计的预筛选结果写入运行指标并清零（标签为 档案名/分类名）"""
+        for matcher in self._matchers:
+            matcher.report_prefilter(metrics)
+
+
+def _resolve_keyword(keyword: KeywordSpec, defaults: Dict) -> Dict:
+    """把关键词及其选项展开为不依赖默认值的对象形式"""
+    keyword, whole_word, case_sensitive, proximity = _keyword_options(keyword, defaults)
+    return {"keyword": keyword, "whole_word": whole_word, "case_sensitive": case_sensitive, "proximity": proximity}
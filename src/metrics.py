@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+运行指标
+记录各阶段耗时、计数（抓取页数、检查论文数、各分类匹配数）、写入字节数和峰值 RSS，
+可导出为 JSON 运行摘要或 Prometheus 文本格式（textfile collector）；
+未启用时使用 NULL_METRICS，所有记录操作都是空操作
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    from .paper_store import atomic_write_bytes
+except ImportError:
+    from paper_store import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_PREFIX = "arxiv_fetcher"
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """当前进程的峰值常驻内存（字节），平台不支持时返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位为 KB，macOS 上为字节
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class _NullStage:
+    """未启用指标时的计时上下文（空操作）"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """阶段计时上下文，退出时把耗时累加到 RunMetrics"""
+
+    __slots__ = ('_metrics', '_name', '_start')
+
+    def __init__(self, metrics: "RunMetrics", name: str):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._metrics.add_time(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class NullMetrics:
+    """未启用的指标记录器：所有操作均为空操作"""
+
+    enabled = False
+
+    def stage(self, name: str):
+        return _NULL_STAGE
+
+    def add_time(self, name: str, seconds: float):
+        pass
+
+    def count(self, name: str, n: int = 1, label: str = None):
+        pass
+
+    def add_bytes(self, stage: str, n: int):
+        pass
+
+    def add_file_bytes(self, stage: str, path):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+class RunMetrics(NullMetrics):
+    """
+    一次运行的指标
+
+    多个线程（分片抓取、流式流水线）可以同时记录；并发阶段的耗时按线程累加，
+    因此可能超过运行的实际时长
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        # 阶段名 -> [累计秒数, 调用次数]
+        self.timers: Dict[str, list] = {}
+        # 计数名 -> {标签: 数值}，无标签的计数使用空字符串作为标签
+        self.counters: Dict[str, Dict[str, int]] = {}
+        # 阶段名 -> 写入字节数
+        self.bytes_written: Dict[str, int] = {}
+
+    def stage(self, name: str) -> _Stage:
+        """
+        阶段计时上下文：with metrics.stage('save'): ...
+
+        Args:
+            name: 阶段名称
+        """
+        return _Stage(self, name)
+
+    def add_time(self, name: str, seconds: float):
+        """累加阶段耗时"""
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = [seconds, 1]
+            else:
+                timer[0] += seconds
+                timer[1] += 1
+
+    def count(self, name: str, n: int = 1, label: str = None):
+        """
+        累加计数
+
+        Args:
+            name: 计数名称（如 pages_fetched、papers_checked）
+            n: 增量
+            label: 可选标签（如匹配分类名）
+        """
+        label = label or ""
+        with self._lock:
+            values = self.counters.setdefault(name, {})
+            values[label] = values.get(label, 0) + n
+
+    def add_bytes(self, stage: str, n: int):
+        """累加某阶段写入的字节数"""
+        with self._lock:
+            self.bytes_written[stage] = self.bytes_written.get(stage, 0) + n
+
+    def add_file_bytes(self, stage: str, path):
+        """按文件大小累加某阶段写入的字节数（文件不存在时忽略）"""
+        try:
+            self.add_bytes(stage, os.path.getsize(path))
+        except OSError:
+            pass
+
+    def to_dict(self) -> Dict:
+        """
+        导出 JSON 运行摘要
+
+        Returns:
+            包含阶段耗时、计数、写入字节数和峰值 RSS 的字典
+        """
+        with self._lock:
+            counters = {
+                name: values[""] if list(values) == [""] else dict(values)
+                for name, values in self.counters.items()
+            }
+            return {
+                "started_at": self.started_at.isoformat(timespec='seconds'),
+                "duration_seconds": round(time.perf_counter() - self._start, 6),
+                "stages": {
+                    name: {"seconds": round(seconds, 6), "calls": calls}
+                    for name, (seconds, calls) in self.timers.items()
+                },
+                "counters": counters,
+                "bytes_written": dict(self.bytes_written),
+                "peak_rss_bytes": peak_rss_bytes(),
+            }
+
+    def to_prometheus(self, prefix: str = PROMETHEUS_PREFIX) -> str:
+        """
+        导出 Prometheus 文本格式
+
+        Args:
+            prefix: 指标名前缀
+
+        Returns:
+            Prometheus exposition 格式文本
+        """
+        summary = self.to_dict()
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                lines.append(f"{prefix}_{name}{{{label_str}}} {value}" if label_str else f"{prefix}_{name} {value}")
+
+        metric("run_start_timestamp_seconds", "gauge", "Run start time (unix seconds).",
+               [({}, round(self.started_at.timestamp(), 3))])
+        metric("run_duration_seconds", "gauge", "Run wall-clock duration.",
+               [({}, summary["duration_seconds"])])
+        metric("stage_seconds_total", "counter", "Time spent per stage, summed across threads.",
+               [({"stage": name}, v["seconds"]) for name, v in summary["stages"].items()])
+        metric("stage_calls_total", "counter", "Number of times each stage ran.",
+               [({"stage": name}, v["calls"]) for name, v in summary["stages"].items()])
+        with self._lock:
+            counter_samples = [
+                ({"name": name, "label": label} if label else {"name": name}, value)
+                for name, values in self.counters.items() for label, value in values.items()
+            ]
+        metric("events_total", "counter", "Event counts (pages fetched, papers checked, matches per category).",
+               counter_samples)
+        metric("bytes_written_total", "counter", "Bytes written per stage.",
+               [({"stage": name}, n) for name, n in summary["bytes_written"].items()])
+        if summary["peak_rss_bytes"] is not None:
+            metric("peak_rss_bytes", "gauge", "Peak resident set size of the process.",
+                   [({}, summary["peak_rss_bytes"])])
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        """原子写入 JSON 运行摘要"""
+        data = json.dumps(self.to_dict(), ensure_ascii=False, indent=2) + "\n"
+        atomic_write_bytes(Path(path), data.encode('utf-8'))
+
+    def write_prometheus(self, path):
+        """原子写入 Prometheus 文本文件（供 node_exporter textfile collector 读取）"""
+        atomic_write_bytes(Path(path), self.to_prometheus().encode('utf-8'))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def run_profiled(func: Callable, output_file, top: int = 25):
+    """
+    在 cProfile 下运行函数，保存 pstats 文件并在日志中输出累计耗时最高的函数
+
+    Args:
+        func: 无参数的可调用对象
+        output_file: pstats 输出路径（可用 python -m pstats 或 snakeviz 查看）
+        top: 日志中输出的函数数量
+
+    Returns:
+        func 的返回值
+    """
+    # 只在启用 --cprofile 时导入（pstats 的导入开销较大）
+    import cProfile
+    import io
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return func()
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(output_file))
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+        logger.info(f"性能分析结果已保存到 {output_file}\n{stream.getvalue()}")
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+OAI-PMH 批量收割
+通过 arXiv 的 OAI-PMH 接口（ListRecords，metadataPrefix=arXivRaw）按 set 和日期范围收割论文元数据，
+用 resumptionToken 翻页；响应按流解析（每条记录处理完即释放），内存中最多只保留一页的论文。
+适合用数月甚至一年的历史论文初始化存档：不受检索接口 max_results 的限制，每页约 1000 条记录
+
+收割的日期范围按 OAI 记录的 datestamp（元数据最后修改日期）筛选，而不是提交日期
+"""
+
+import json
+import logging
+import urllib.parse
+import xml.etree.ElementTree as ET
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+try:
+    from .arxiv_api import (ArxivAPIError, ArxivEntry, RateLimiter, fetch_with_retry, parse_rfc2822,
+                            split_authors)
+    from .metrics import NULL_METRICS
+    from .paper_store import atomic_write_bytes
+except ImportError:
+    from arxiv_api import (ArxivAPIError, ArxivEntry, RateLimiter, fetch_with_retry, parse_rfc2822,
+                           split_authors)
+    from metrics import NULL_METRICS
+    from paper_store import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OAI_URL = "https://oaipmh.arxiv.org/oai"
+
+METADATA_PREFIX = "arXivRaw"
+
+_OAI = "{http://www.openarchives.org/OAI/2.0/}"
+_RAW = "{http://arxiv.org/OAI/arXivRaw/}"
+
+
+class OAIError(ArxivAPIError):
+    """OAI-PMH 接口返回的错误（<error code="...">）"""
+
+    def __init__(self, code: str, message: str = ""):
+        super().__init__(f"OAI-PMH 错误 {code}: {message}")
+        self.code = code
+
+
+class HarvestPage(NamedTuple):
+    """ListRecords 的一页"""
+    records: List[ArxivEntry]
+    # 下一页的 resumptionToken，None 表示已是最后一页
+    token: Optional[str]
+    complete_list_size: Optional[int] = None
+
+
+def parse_raw_record(record: ET.Element) -> Optional[ArxivEntry]:
+    """
+    将一条 arXivRaw 格式的 <record> 转换为 ArxivEntry（论文 ID 带最新版本号，提交时间为 v1 的日期）
+
+    Args:
+        record: OAI-PMH <record> 元素
+
+    Returns:
+        ArxivEntry；已删除或缺少必要字段的记录返回 None
+    """
+    header = record.find(f"{_OAI}header")
+    if header is not None and header.get("status") == "deleted":
+        return None
+    raw = record.find(f"{_OAI}metadata/{_RAW}arXivRaw")
+    if raw is None:
+        return None
+    arxiv_id = (raw.findtext(f"{_RAW}id") or "").strip()
+    versions = [(v.get("version", ""), v.findtext(f"{_RAW}date", "")) for v in raw.iterfind(f"{_RAW}version")]
+    if not arxiv_id or not versions:
+        logger.warning(f"跳过缺少必要字段的记录: {arxiv_id}")
+        return None
+    # 版本日期为 RFC 2822 格式（如 Thu, 2 Jan 2025 08:00:00 GMT）
+    published = parse_rfc2822(versions[0][1])
+    updated = parse_rfc2822(versions[-1][1])
+    if published is None or updated is None:
+        logger.warning(f"跳过版本日期无法解析的记录: {arxiv_id}")
+        return None
+
+    version = versions[-1][0] or f"v{len(versions)}"
+    categories = (raw.findtext(f"{_RAW}categories") or "").split()
+    return ArxivEntry(
+        entry_id=f"http://arxiv.org/abs/{arxiv_id}{version}",
+        title=" ".join((raw.findtext(f"{_RAW}title") or "").split()),
+        summary=(raw.findtext(f"{_RAW}abstract") or "").strip(),
+        authors=split_authors(raw.findtext(f"{_RAW}authors")),
+        published=published,
+        updated=updated,
+        categories=categories,
+        primary_category=categories[0] if categories else "",
+        pdf_url=f"http://arxiv.org/pdf/{arxiv_id}{version}",
+    )
+
+
+def parse_list_records(stream) -> HarvestPage:
+    """
+    流式解析一页 ListRecords 响应：每条记录转换后立即释放对应的 XML 元素
+
+    Args:
+        stream: 响应内容的文件对象
+
+    Returns:
+        HarvestPage
+
+    Raises:
+        OAIError: 响应中包含错误（noRecordsMatch 视为空结果）
+    """
+    records = []
+    token = None
+    complete_list_size = None
+    container = None
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if elem.tag == f"{_OAI}ListRecords":
+                container = elem
+            continue
+        if elem.tag == f"{_OAI}record":
+            entry = parse_raw_record(elem)
+            if entry is not None:
+                records.append(entry)
+            # 释放已处理的记录（父元素中的引用一并清除）
+            elem.clear()
+            if container is not None:
+                container.clear()
+        elif elem.tag == f"{_OAI}resumptionToken":
+            token = (elem.text or "").strip() or None
+            size = elem.get("completeListSize")
+            complete_list_size = int(size) if size and size.isdigit() else None
+        elif elem.tag == f"{_OAI}error":
+            code = elem.get("code", "")
+            if code == "noRecordsMatch":
+                return HarvestPage([], None, 0)
+            raise OAIError(code, (elem.text or "").strip())
+    return HarvestPage(records, token, complete_list_size)
+
+
+class OAIHarvester:
+    """arXiv OAI-PMH ListRecords 客户端"""
+
+    def __init__(self, base_url: str = None, rate_limiter: RateLimiter = None, num_retries: int = 3,
+                 timeout: float = 60.0, metrics=None):
+        """
+        Args:
+            base_url: OAI-PMH 接口地址，默认为 arXiv 官方接口
+            rate_limiter: 共享限速器，默认新建一个 3 秒间隔的限速器
+            num_retries: 请求失败时的重试次数（503 时按 Retry-After 等待）
+            timeout: 单次请求超时（秒）
+            metrics: 运行指标（RunMetrics），None 表示不记录
+        """
+        self.base_url = base_url or DEFAULT_OAI_URL
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.num_retries = num_retries
+        self.timeout = timeout
+        self.metrics = metrics or NULL_METRICS
+
+    def format_url(self, set_spec: str = None, from_date: date = None, until_date: date = None,
+                   token: str = None) -> str:
+        """构建 ListRecords 请求 URL（带 resumptionToken 时不能再带其他参数）"""
+        if token is not None:
+            params = {"verb": "ListRecords", "resumptionToken": token}
+        else:
+            params = {"verb": "ListRecords", "metadataPrefix": METADATA_PREFIX}
+            if set_spec:
+                params["set"] = set_spec
+            if from_date is not None:
+                params["from"] = from_date.isoformat()
+            if until_date is not None:
+                params["until"] = until_date.isoformat()
+        return f"{self.base_url}?{urllib.parse.urlencode(params)}"
+
+    def fetch_page(self, url: str) -> HarvestPage:
+        """
+        请求并流式解析一页，失败时重试（503 时按 Retry-After 等待）
+
+        Args:
+            url: 请求 URL
+
+        Returns:
+            HarvestPage
+        """
+        return fetch_with_retry(url, parse_list_records, self.rate_limiter, self.num_retries, self.timeout,
+                                self.metrics)
+
+    def iter_pages(self, set_spec: str = None, from_date: date = None, until_date: date = None,
+                   token: str = None) -> Iterator[HarvestPage]:
+        """
+        逐页收割一个 set
+
+        Args:
+            set_spec: OAI set（如 cs、physics:hep-th），None 表示全部
+            from_date: datestamp 下限（含）
+            until_date: datestamp 上限（含）
+            token: 从该 resumptionToken 继续（之前中断的收割）；已过期时从头开始
+
+        Yields:
+            HarvestPage（其 token 为下一页的 resumptionToken）
+        """
+        resuming = token is not None
+        while True:
+            try:
+                page = self.fetch_page(self.format_url(set_spec, from_date, until_date, token))
+            except OAIError as e:
+                if not (resuming and e.code == "badResumptionToken"):
+                    raise
+                logger.warning(f"set {set_spec} 的 resumptionToken 已失效，从头开始收割（已保存的论文会被去重跳过）")
+                token = None
+                resuming = False
+                continue
+            resuming = False
+            self.metrics.count("harvest_records", len(page.records))
+            yield page
+            if page.token is None:
+                return
+            token = page.token
+
+
+class HarvestCheckpoint:
+    """收割检查点：记录每个 set 的 resumptionToken 与进度"""
+
+    def __init__(self, path, params: Dict, restart: bool = False):
+        """
+        Args:
+            path: 检查点文件路径
+            params: 本次收割的参数（日期范围、set、分类），与检查点中的不同时忽略旧检查点
+            restart: 忽略已有检查点，从头开始
+        """
+        self.path = Path(path)
+        self.params = params
+        self.sets: Dict[str, Dict] = {}
+        if restart or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except Exception as e:
+            logger.warning(f"读取收割检查点失败，从头开始: {e}")
+            return
+        if data.get('params') != params:
+            logger.info("收割参数已变化，忽略旧检查点")
+            return
+        self.sets = data.get('sets', {})
+        progress = ", ".join(f"{name} 已完成 {state['pages']} 页" for name, state in self.sets.items())
+        logger.info(f"从检查点继续收割：{progress}")
+
+    def state(self, set_spec: str) -> Dict:
+        """set 的进度：token（下一页）、pages、records、complete"""
+        return self.sets.setdefault(set_spec, {"token": None, "pages": 0, "records": 0, "complete": False})
+
+    def advance(self, set_spec: str, page: HarvestPage):
+        """一页已处理并保存：记录下一页的 token 并写入检查点"""
+        state = self.state(set_spec)
+        state['token'] = page.token
+        state['pages'] += 1
+        state['records'] += len(page.records)
+        state['complete'] = page.token is None
+        self.save()
+
+    def save(self):
+        """原子写入检查点"""
+        data = {'params': self.params, 'sets': self.sets}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(self.path, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    def remove(self):
+        """全部完成后删除检查点"""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
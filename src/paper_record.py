@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+紧凑的论文记录
+匹配到的论文以 __slots__ 对象保存（分类/标签字符串驻留共享，arxiv_id 按需计算），
+摘要写入存储后可以释放并在需要时从存储中按偏移读取；
+序列化为旧版 JSON 结构是单独的一步（to_dict）
+"""
+
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+# JSON 中的字段顺序（与旧版 papers_YYYYMMDD.json 保持一致）
+FIELDS = ('id', 'arxiv_id', 'title', 'authors', 'summary', 'published', 'updated',
+          'categories', 'tags', 'pdf_url', 'arxiv_url', 'found_date')
+
+_intern = sys.intern
+
+
+def _intern_all(values: Iterable[str]) -> tuple:
+    return tuple(_intern(v) for v in values)
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class PaperRecord:
+    """
+    一篇匹配论文
+
+    支持 record['title'] / record.get('tags') 按 JSON 字段读取，
+    便于报告渲染等只读取字段的代码直接使用
+    """
+
+    __slots__ = ('entry_id', 'title', 'authors', 'published', 'updated', 'categories', 'tags',
+                 'pdf_url', 'found_date', 'revision_of', '_summary', '_store')
+
+    def __init__(self, entry_id: str, title: str, authors: Iterable[str], summary: Optional[str],
+                 published, updated, categories: Iterable[str], tags: Iterable[str],
+                 pdf_url: Optional[str], found_date: str, revision_of: Optional[str] = None):
+        """
+        Args:
+            entry_id: 论文 entry_id（http://arxiv.org/abs/...）
+            title: 标题
+            authors: 作者姓名
+            summary: 摘要
+            published: 提交时间（datetime 或 ISO 字符串）
+            updated: 更新时间（datetime 或 ISO 字符串）
+            categories: arXiv 分类
+            tags: 匹配到的分类标签
+            pdf_url: PDF 链接
+            found_date: 发现时间（ISO 字符串，同一次运行的记录共用同一个字符串对象）
+            revision_of: 修订版（标题或摘要相对已保存的版本有变化）时为之前的版本（如 v1）
+        """
+        self.entry_id = entry_id
+        self.title = title
+        self.authors = tuple(authors)
+        self._summary = summary
+        self.published = published
+        self.updated = updated
+        self.categories = _intern_all(categories)
+        self.tags = _intern_all(tags)
+        self.pdf_url = pdf_url
+        self.found_date = found_date
+        self.revision_of = revision_of
+        self._store = None
+
+    @classmethod
+    def from_result(cls, paper, tags: Iterable[str], found_date: str) -> "PaperRecord":
+        """
+        由 arxiv.Result / ArxivEntry 构建记录（不保留原对象）
+
+        Args:
+            paper: arxiv 论文对象
+            tags: 匹配到的分类标签
+            found_date: 发现时间
+
+        Returns:
+            PaperRecord
+        """
+        return cls(paper.entry_id, paper.title, [author.name for author in paper.authors], paper.summary,
+                   paper.published, paper.updated, paper.categories, tags, paper.pdf_url, found_date)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PaperRecord":
+        """由 JSON 结构的论文信息构建记录"""
+        return cls(data['id'], data['title'], data.get('authors', []), data.get('summary'),
+                   data.get('published'), data.get('updated'), data.get('categories', []),
+                   data.get('tags', []), data.get('pdf_url'), data.get('found_date'), data.get('revision_of'))
+
+    @property
+    def arxiv_id(self) -> str:
+        """去掉 URL 前缀的 arXiv ID（含版本）"""
+        return self.entry_id.rsplit('/', 1)[-1]
+
+    @property
+    def summary(self) -> Optional[str]:
+        """摘要；已释放时从存储中读取"""
+        if self._summary is None and self._store is not None:
+            stored = self._store.get(self.entry_id)
+            return stored.get('summary') if stored is not None else None
+        return self._summary
+
+    def detach_summary(self, store):
+        """
+        释放内存中的摘要，之后按需从存储读取
+
+        Args:
+            store: 已保存该论文的 PaperStore
+        """
+        self._store = store
+        self._summary = None
+
+    def to_dict(self) -> Dict:
+        """序列化为旧版 JSON 结构（修订版额外带 revision_of 字段）"""
+        data = {
+            'id': self.entry_id,
+            'arxiv_id': self.arxiv_id,
+            'title': self.title,
+            'authors': list(self.authors),
+            'summary': self.summary,
+            'published': _iso(self.published),
+            'updated': _iso(self.updated),
+            'categories': list(self.categories),
+            'tags': list(self.tags),
+            'pdf_url': self.pdf_url,
+            'arxiv_url': self.entry_id,
+            'found_date': self.found_date,
+        }
+        if self.revision_of:
+            data['revision_of'] = self.revision_of
+        return data
+
+    def __getitem__(self, key: str):
+        if key == 'id' or key == 'arxiv_url':
+            return self.entry_id
+        if key == 'published' or key == 'updated':
+            return _iso(getattr(self, key))
+        if key in ('authors', 'categories', 'tags'):
+            return list(getattr(self, key))
+        if key in FIELDS or key == 'revision_of':
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self) -> str:
+        return f"PaperRecord({self.entry_id!r})"
+
+
+def to_json_dict(paper) -> Dict:
+    """将 PaperRecord 或 JSON 结构的字典统一转换为字典"""
+    return paper.to_dict() if isinstance(paper, PaperRecord) else paper
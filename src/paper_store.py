@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+追加写入的 JSONL 论文存储
+每次保存写入一个新的不可变分段文件（可选 gzip），先写临时文件并 fsync，再原子重命名；
+每个分段附带一个偏移索引，读取单篇论文时无需解析整个文件
+"""
+
+import gzip
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".jsonl"
+GZIP_SUFFIX = ".jsonl.gz"
+INDEX_SUFFIX = ".idx"
+# export_json 写出的文件带有此标记，迁移旧版文件时跳过，避免把导出结果再导入一次
+EXPORT_MARKER = "exported_from_segments"
+
+
+def _fsync_dir(directory: Path):
+    """fsync 目录以持久化重命名操作（不支持的平台上忽略）"""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """
+    原子写入文件：写临时文件 -> fsync -> 重命名 -> fsync 目录
+
+    Args:
+        path: 目标文件路径
+        data: 文件内容
+    """
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path.parent)
+
+
+class PaperStore:
+    """按分段追加写入的论文存储"""
+
+    def __init__(self, data_dir, compress: bool = False):
+        """
+        Args:
+            data_dir: 数据目录
+            compress: 新分段是否使用 gzip 压缩（每条记录一个 gzip 成员，仍可随机读取）
+        """
+        self.data_dir = Path(data_dir)
+        self.compress = compress
+        self._index: Optional[Dict[str, Tuple[Path, int, int]]] = None
+
+    def segments(self, date_str: str = None) -> List[Path]:
+        """
+        列出分段文件（按写入顺序）
+
+        Args:
+            date_str: 只列出该日期（YYYYMMDD）的分段，None 表示全部
+
+        Returns:
+            分段文件路径列表
+        """
+        prefix = f"papers_{date_str}." if date_str else "papers_"
+        found = [
+            p for p in self.data_dir.glob(f"{prefix}*")
+            if p.name.endswith(SEGMENT_SUFFIX) or p.name.endswith(GZIP_SUFFIX)
+        ]
+        return sorted(found, key=lambda p: p.name)
+
+    def open_segment(self, date_str: str = None) -> "SegmentWriter":
+        """
+        打开一个新分段用于流式写入，close() 时才原子地发布
+
+        Args:
+            date_str: 分段日期（YYYYMMDD），默认今天
+
+        Returns:
+            SegmentWriter
+        """
+        date_str = date_str or datetime.now().strftime("%Y%m%d")
+        seq = max((self._segment_seq(p) for p in self.segments(date_str)), default=0) + 1
+        suffix = GZIP_SUFFIX if self.compress else SEGMENT_SUFFIX
+        while True:
+            segment = self.data_dir / f"papers_{date_str}.{seq:04d}{suffix}"
+            if not segment.exists():
+                try:
+                    return SegmentWriter(self, segment)
+                except FileExistsError:
+                    # 另一个写入器正在写同一序号的分段
+                    pass
+            seq += 1
+
+    @staticmethod
+    def segment_date(segment: Path) -> str:
+        """分段文件名中的日期（papers_YYYYMMDD.NNNN.jsonl -> YYYYMMDD）"""
+        return segment.name.split(".")[0][len("papers_"):]
+
+    @staticmethod
+    def _segment_seq(segment: Path) -> int:
+        """分段文件名中的序号（papers_YYYYMMDD.NNNN.jsonl -> NNNN）"""
+        parts = segment.name.split(".")
+        return int(parts[1]) if len(parts) > 2 and parts[1].isdigit() else 0
+
+    def append(self, papers: List[Dict], date_str: str = None) -> Optional[Path]:
+        """
+        将论文写入一个新的分段文件
+
+        Args:
+            papers: 论文信息列表
+            date_str: 分段日期（YYYYMMDD），默认今天
+
+        Returns:
+            新分段路径，没有论文时返回 None
+        """
+        if not papers:
+            return None
+        writer = self.open_segment(date_str)
+        try:
+            for paper in papers:
+                writer.write(paper)
+        except Exception:
+            writer.abort()
+            raise
+        return writer.close()
+
+    def append_by_date(self, groups: Dict[Optional[str], List[Dict]]) -> List[Path]:
+        """
+        将论文按日期写入各自的新分段：所有分段写完后才依次发布，任何一篇写入失败时全部丢弃
+
+        Args:
+            groups: 分段日期（YYYYMMDD，None 表示今天） -> 论文信息列表
+
+        Returns:
+            新分段路径列表
+        """
+        writers = []
+        try:
+            for date_str, papers in groups.items():
+                if not papers:
+                    continue
+                writer = self.open_segment(date_str)
+                writers.append(writer)
+                for paper in papers:
+                    writer.write(paper)
+        except Exception:
+            for writer in writers:
+                writer.abort()
+            raise
+        return [writer.close() for writer in writers]
+
+    def replace(self, papers: List[Dict]) -> List[Path]:
+        """
+        原地更新已保存的论文：每条记录写入与其当前所在分段同一日期的新分段，覆盖旧记录
+
+        Args:
+            papers: 更新后的论文信息（按 id 对应已保存的记录；不存在的写入今天的分段）
+
+        Returns:
+            新分段路径列表
+        """
+        index = self._load_index()
+        by_date: Dict[Optional[str], List[Dict]] = {}
+        for paper in papers:
+            location = index.get(paper['id'])
+            by_date.setdefault(self.segment_date(location[0]) if location else None, []).append(paper)
+        return self.append_by_date(by_date)
+
+    @staticmethod
+    def _index_path(segment: Path) -> Path:
+        return segment.with_name(segment.name + INDEX_SUFFIX)
+
+    def _segment_published(self, segment: Path):
+        """分段发布后更新内存中的索引"""
+        if self._index is not None:
+            with open(self._index_path(segment), 'r', encoding='utf-8') as f:
+                self._add_index_entries(self._index, segment, f)
+
+    @staticmethod
+    def _add_index_entries(index: Dict, segment: Path, lines):
+        # 后写入的分段覆盖先前的记录（例如离线重放后重新打标签）
+        for line in lines:
+            paper_id, offset, length = line.rstrip("\n").split("\t")
+            index[paper_id] = (segment, int(offset), int(length))
+
+    def _load_index(self) -> Dict[str, Tuple[Path, int, int]]:
+        if self._index is None:
+            # 先完整构建再赋值，其他线程不会看到只加载了一部分的索引
+            index = {}
+            for segment in self.segments():
+                index_path = self._index_path(segment)
+                if not index_path.exists():
+                    logger.warning(f"分段缺少索引，跳过: {segment}")
+                    continue
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    self._add_index_entries(index, segment, f)
+            self._index = index
+        return self._index
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self._load_index()
+
+    def get(self, paper_id: str) -> Optional[Dict]:
+        """
+        通过偏移索引读取单篇论文
+
+        Args:
+            paper_id: 论文 id（entry_id）
+
+        Returns:
+            论文信息字典，不存在时返回 None
+        """
+        location = self._load_index().get(paper_id)
+        if location is None:
+            return None
+        segment, offset, length = location
+        with open(segment, 'rb') as f:
+            f.seek(offset)
+            raw = f.read(length)
+        if segment.name.endswith(GZIP_SUFFIX):
+            raw = gzip.decompress(raw)
+        return json.loads(raw)
+
+    def iter_papers(self, date_str: str = None) -> Iterator[Dict]:
+        """
+        按写入顺序流式读取论文（同一 id 只返回最后一次写入的记录）
+
+        Args:
+            date_str: 只读取该日期（YYYYMMDD）的分段，None 表示全部
+        """
+        for segment in self.segments(date_str):
+            yield from self.iter_segment(segment)
+
+    def iter_segment(self, segment: Path) -> Iterator[Dict]:
+        """
+        按写入顺序读取单个分段中仍为最新的记录（已被后续分段覆盖的记录跳过）
+
+        Args:
+            segment: 分段文件路径
+        """
+        index = self._load_index()
+        index_path = self._index_path(segment)
+        if not index_path.exists():
+            return
+        opener = gzip.open if segment.name.endswith(GZIP_SUFFIX) else open
+        # 分段中的记录与索引行一一对应，只输出索引指向的（最新）记录
+        with opener(segment, 'rt', encoding='utf-8') as f, open(index_path, 'r', encoding='utf-8') as idx:
+            for line, entry in zip(f, idx):
+                paper_id, offset, _ = entry.split("\t")
+                current = index.get(paper_id)
+                if current is not None and current[0] == segment and current[1] == int(offset):
+                    yield json.loads(line)
+
+    def migrate_legacy_files(self) -> int:
+        """
+        将数据目录中的旧版 papers_YYYYMMDD.json 转换为分段，并重命名为 .json.migrated
+        （由 export_json 导出的文件不会被迁移）
+
+        Returns:
+            迁移的文件数量
+        """
+        migrated = 0
+        for legacy_file in sorted(self.data_dir.glob("papers_*.json")):
+            date_str = legacy_file.stem[len("papers_"):]
+            if not date_str.isdigit() or self.segments(date_str):
+                continue
+            try:
+                with open(legacy_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.warning(f"读取旧版论文文件失败 ({legacy_file}): {e}")
+                continue
+            if data.get(EXPORT_MARKER):
+                continue
+            self.append(data.get('papers', []), date_str)
+            legacy_file.replace(legacy_file.with_name(legacy_file.name + ".migrated"))
+            migrated += 1
+        return migrated
+
+    def export_json(self, filepath, date_str: str = None) -> int:
+        """
+        导出为旧版 papers_YYYYMMDD.json 格式（{'fetch_date', 'total_papers', 'papers'}）
+
+        Args:
+            filepath: 输出文件路径
+            date_str: 只导出该日期（YYYYMMDD）的分段，None 表示全部
+
+        Returns:
+            导出的论文数量
+        """
+        papers = list(self.iter_papers(date_str))
+        data = {
+            'fetch_date': datetime.now().isoformat(),
+            'total_papers': len(papers),
+            'papers': papers,
+            EXPORT_MARKER: True
+        }
+        atomic_write_bytes(Path(filepath), json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
+        return len(papers)
+
+
+class SegmentWriter:
+    """
+    流式分段写入器
+    记录和偏移索引分别逐条写入临时文件（内存占用与论文数量无关），
+    close() 时 fsync 并原子重命名为正式分段，再发布偏移索引
+    """
+
+    def __init__(self, store: PaperStore, segment: Path):
+        self.store = store
+        self.segment = segment
+        self.count = 0
+        self.bytes_written = 0
+        self._tmp_path = segment.with_name(f".{segment.name}.tmp")
+        # 独占创建临时文件，避免两个写入器写同一个分段
+        self._file = open(self._tmp_path, 'xb')
+        index_path = store._index_path(segment)
+        self._index_tmp_path = index_path.with_name(f".{index_path.name}.tmp")
+        self._index_file = open(self._index_tmp_path, 'w', encoding='utf-8')
+
+    def write(self, paper: Dict):
+        """写入一篇论文"""
+        line = (json.dumps(paper, ensure_ascii=False) + "\n").encode('utf-8')
+        if self.store.compress:
+            line = gzip.compress(line)
+        self._file.write(line)
+        self._index_file.write(f"{paper['id']}\t{self.bytes_written}\t{len(line)}\n")
+        self.bytes_written += len(line)
+        self.count += 1
+
+    def close(self) -> Optional[Path]:
+        """
+        发布分段（没有写入任何论文时丢弃）
+
+        Returns:
+            分段路径，没有论文时返回 None
+        """
+        if self.count == 0:
+            self.abort()
+            return None
+        for f in (self._file, self._index_file):
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+        # 先发布分段再发布索引：索引存在即代表分段完整
+        os.replace(self._tmp_path, self.segment)
+        index_path = self.store._index_path(self.segment)
+        os.replace(self._index_tmp_path, index_path)
+        _fsync_dir(self.segment.parent)
+        self.store._segment_published(self.segment)
+        return self.segment
+
+    def abort(self):
+        """丢弃未发布的临时文件"""
+        for f, path in ((self._file, self._tmp_path), (self._index_file, self._index_tmp_path)):
+            if not f.closed:
+                f.close()
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
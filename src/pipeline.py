@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+流式抓取流水线
+生产者线程逐页拉取论文，匹配阶段在调用线程中分类，写入线程把匹配结果
+同时写入 JSONL 分段和各分类报告（配置了多个档案时写入所属档案的分段和报告）；各阶段之间通过有界队列连接，
+网络等待与匹配、写盘相互重叠；内存中只保留匹配论文的摘要（用于打印统计），
+不保留论文内容
+"""
+
+import logging
+import queue
+import threading
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from .report_renderer import StreamingReportWriter
+except ImportError:
+    from report_renderer import StreamingReportWriter
+
+logger = logging.getLogger(__name__)
+
+# 队列结束标记
+_DONE = object()
+
+
+class _StageError:
+    """在队列中传递上游阶段的异常"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class StreamingPipeline:
+    """抓取 -> 匹配 -> 写入 的流式流水线"""
+
+    def __init__(self, fetcher, queue_size: int = 1000):
+        """
+        Args:
+            fetcher: ArxivPaperFetcher 实例（提供 _classify_targets 以及各输出目标的 paper_store 等）
+            queue_size: 各阶段之间队列的容量
+        """
+        self.fetcher = fetcher
+        self.queue_size = queue_size
+        self.total_checked = 0
+        self.total_matched = 0
+
+    def _put(self, q: queue.Queue, item, stop: threading.Event) -> bool:
+        """向有界队列放入元素；下游已停止时返回 False"""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue, stop: threading.Event):
+        """从队列取出元素；流水线已停止时返回结束标记"""
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _produce(self, results: Iterable, out: queue.Queue, stop: threading.Event):
+        """生产者：拉取论文（网络分页在此线程中进行）"""
+        try:
+            for paper in results:
+                if not self._put(out, paper, stop):
+                    return
+            self._put(out, _DONE, stop)
+        except BaseException as e:
+            self._put(out, _StageError(e), stop)
+
+    def _sink(self, source: queue.Queue, stop: threading.Event, segment_writers: Dict,
+              report_writers: Dict[object, StreamingReportWriter], summaries: Dict[object, List[Dict]],
+              errors: List):
+        """写入阶段：追加所属输出目标的 JSONL 分段与分类报告"""
+        try:
+            while True:
+                item = self._get(source, stop)
+                if item is _DONE:
+                    return
+                target, paper = item
+                # 序列化为 JSON 结构；与已保存记录完全相同的论文（离线重放时标签未变化）不再重复写入
+                data = paper.to_dict()
+                if target.paper_store.get(data['id']) != data:
+                    segment_writers[target].write(data)
+                report_writer = report_writers.get(target)
+                if report_writer is not None:
+                    report_writer.add(paper)
+                # 只保留打印统计所需的字段
+                summaries[target].append({'title': paper.title, 'arxiv_id': paper.arxiv_id, 'tags': list(paper.tags)})
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    def run(self, results: Iterable, generate_report: bool = True, retag: bool = False) -> Dict[object, List[Dict]]:
+        """
+        运行流水线
+
+        Args:
+            results: 论文对象迭代器（在生产者线程中消费）
+            generate_report: 是否生成 Markdown 报告
+            retag: 重新打标签（离线重放），不跳过已记录的论文
+
+        Returns:
+            输出目标（抓取工具本身或各档案）-> 匹配论文的摘要列表（title / arxiv_id / tags），用于打印分类统计
+        """
+        fetcher = self.fetcher
+        targets = fetcher.targets
+        stop = threading.Event()
+        papers_queue: queue.Queue = queue.Queue(self.queue_size)
+        matched_queue: queue.Queue = queue.Queue(self.queue_size)
+        segment_writers = {target: target.paper_store.open_segment() for target in targets}
+        report_writers = {}
+        if generate_report:
+            report_writers = {target: target.report_engine().stream() for target in targets}
+        summaries: Dict[object, List[Dict]] = {target: [] for target in targets}
+        sink_errors: List[BaseException] = []
+
+        producer = threading.Thread(target=self._produce, args=(results, papers_queue, stop),
+                                    name="pipeline-producer", daemon=True)
+        sink = threading.Thread(target=self._sink,
+                                args=(matched_queue, stop, segment_writers, report_writers, summaries, sink_errors),
+                                name="pipeline-sink", daemon=True)
+        producer.start()
+        sink.start()
+
+        try:
+            done = False
+            while not done:
+                # 写入阶段失败时 stop 被设置，生产者不会再放入结束标记，不能无限期阻塞
+                batch = [self._get(papers_queue, stop)]
+                # 生产者领先时顺带取出队列中已有的论文，凑成一批分类（不等待）
+                while len(batch) < fetcher.classify_batch_size and not isinstance(batch[-1], _StageError) \
+                        and batch[-1] is not _DONE:
+                    try:
+                        batch.append(papers_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if batch[-1] is _DONE:
+                    done = True
+                    batch.pop()
+                elif isinstance(batch[-1], _StageError):
+                    raise batch[-1].error
+                self.total_checked += len(batch)
+                for routed in fetcher._classify_targets(batch, retag=retag):
+                    self.total_matched += 1
+                    if not self._put(matched_queue, routed, stop):
+                        done = True
+                        break
+            self._put(matched_queue, _DONE, stop)
+            sink.join()
+            if sink_errors:
+                raise sink_errors[0]
+        except BaseException:
+            stop.set()
+            sink.join()
+            for segment_writer in segment_writers.values():
+                segment_writer.abort()
+            for report_writer in report_writers.values():
+                report_writer.abort()
+            raise
+        finally:
+            stop.set()
+
+        for target in targets:
+            segment_writer = segment_writers[target]
+            segment = segment_writer.close()
+            if segment is not None:
+                logger.info(f"已保存 {segment_writer.count} 篇论文到 {segment}")
+                fetcher.metrics.add_file_bytes("save", segment)
+                if target.search_index is not None:
+                    # 从刚发布的分段流式读取并索引，不在内存中保留论文内容
+                    target.search_index.add_many(target.paper_store.iter_segment(segment), target.data_dir)
+                target._save_recorded_papers()
+            if target in report_writers:
+                for path in report_writers[target].close():
+                    fetcher.metrics.add_file_bytes("report", path)
+
+        logger.info(f"共检查 {self.total_checked} 篇论文，找到 {self.total_matched} 篇匹配论文")
+        return summaries
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+服务端查询规划
+把各输出目标（档案）的分类关键词编译为 arXiv 查询条件 (abs:"..." OR ti:"...")，可选再用 cat: 限定分类，
+让服务端只返回可能匹配的论文；本地匹配器仍对返回的论文做确认并分配分类。
+查询长度超过上限时拆分为多个查询，由调用方合并去重
+
+下推的条件是本地匹配的超集近似：
+    - 只下推分类关键词，requires_system 的 system 条件留给本地确认
+    - 区分大小写的关键词按不区分大小写下推（arXiv 检索不区分大小写）
+    - proximity 关键词下推为各个词分别出现在标题或摘要中
+    - 子串关键词按词/短语下推，arXiv 的词干还原覆盖常见词形变化，但不能匹配词中间的子串
+最后一点（以及 arXiv 自身的分词方式）可能漏掉少量论文，可用 plan --verify 与全量扫描比较召回率
+"""
+
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .keyword_matcher import _keyword_options
+except ImportError:
+    from keyword_matcher import _keyword_options
+
+logger = logging.getLogger(__name__)
+
+# 单个查询语句的最大长度（字符数，URL 编码前）；arXiv 接口对过长的 URL 会直接拒绝
+MAX_QUERY_LENGTH = 1000
+
+# arXiv 检索的分词边界：非字母数字字符
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+
+def _term(field: str, tokens: Tuple[str, ...]) -> str:
+    """单个字段条件：多个词时加引号按短语检索"""
+    text = " ".join(tokens)
+    return f'{field}:"{text}"' if len(tokens) > 1 else f"{field}:{text}"
+
+
+def _either(tokens: Tuple[str, ...]) -> str:
+    """词或短语出现在摘要或标题中"""
+    return f"{_term('abs', tokens)} OR {_term('ti', tokens)}"
+
+
+def _contains(phrase: Tuple[str, ...], inner: Tuple[str, ...]) -> bool:
+    """inner 是否是 phrase 中连续的一段词"""
+    n = len(inner)
+    return any(phrase[i:i + n] == inner for i in range(len(phrase) - n + 1))
+
+
+class QueryPlanner:
+    """把关键词配置编译为服务端查询条件，并按长度上限拆分"""
+
+    def __init__(self, rule_sets: Iterable[Tuple[Dict, Dict, Optional[Dict]]], categories: Iterable[str] = None,
+                 max_length: int = MAX_QUERY_LENGTH):
+        """
+        Args:
+            rule_sets: 各输出目标的 (keywords_map, categories_config, matching 配置)
+            categories: 限定的 arXiv 分类（如 cs.DC、cs.LG），为空则不限定
+            max_length: 单个查询语句的最大长度
+
+        Raises:
+            ValueError: 某个关键词无法下推（如空关键词总是命中，服务端无法表达）
+        """
+        self.categories = list(categories or [])
+        self.max_length = max_length
+        phrases = set()
+        proximity_groups = set()
+        for keywords_map, categories_config, matching in rule_sets:
+            defaults = {k: v for k, v in (matching or {}).items() if k not in ('stemming', 'fold_hyphens')}
+            groups = {config.get('keywords') for config in categories_config.values()}
+            for group in groups:
+                for spec in keywords_map.get(group) or []:
+                    keyword, _, _, proximity = _keyword_options(spec, defaults)
+                    tokens = tuple(_TOKEN_RE.findall(keyword.lower()))
+                    if not tokens:
+                        raise ValueError(f"关键词 {keyword!r} 无法下推到服务端查询")
+                    if proximity > 0 and len(tokens) > 1:
+                        proximity_groups.add(tuple(sorted(set(tokens))))
+                    else:
+                        phrases.add(tokens)
+        # 包含另一个短语的短语是冗余的（如 "video generation model" 已被 "video generation" 覆盖）
+        kept = [p for p in phrases if not any(q != p and _contains(p, q) for q in phrases)]
+        kept_words = {p[0] for p in kept if len(p) == 1}
+        self.terms: List[str] = [_either(p) for p in sorted(kept)]
+        for group in sorted(proximity_groups):
+            if kept_words & set(group):
+                continue
+            self.terms.append("(" + " AND ".join(f"({_either((token,))})" for token in group) + ")")
+
+    def filters(self, reserve: int = 0) -> List[str]:
+        """
+        把全部条件按长度上限打包为若干过滤表达式（每个与基础查询用 AND 连接）
+
+        Args:
+            reserve: 基础查询（日期、分片分类条件）的长度
+
+        Returns:
+            过滤表达式列表，各表达式的结果并集覆盖全部关键词
+
+        Raises:
+            ValueError: 单个条件加上基础查询就超过长度上限
+        """
+        prefix = ""
+        if self.categories:
+            prefix = "(" + " OR ".join(f"cat:{category}" for category in self.categories) + ") AND "
+        # 基础查询 + " AND " + 分类前缀 + "(" ... ")"
+        budget = self.max_length - reserve - len(" AND ") - len(prefix) - 2
+        filters = []
+        current: List[str] = []
+        length = 0
+        for term in self.terms:
+            added = len(term) + (len(" OR ") if current else 0)
+            if current and length + added > budget:
+                filters.append(current)
+                current, length = [], 0
+                added = len(term)
+            if added > budget:
+                raise ValueError(f"查询条件超过长度上限 {self.max_length}: {term}")
+            current.append(term)
+            length += added
+        if current:
+            filters.append(current)
+        return [f"{prefix}({' OR '.join(group)})" for group in filters]
+
+    def queries(self, base: str) -> List[str]:
+        """
+        基础查询与各过滤表达式组合后的查询列表
+
+        Args:
+            base: 基础查询（如 submittedDate 区间）
+
+        Returns:
+            查询语句列表
+        """
+        return [f"{base} AND {f}" for f in self.filters(len(base))]
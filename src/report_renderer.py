@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+报告渲染引擎
+论文按分类只分组一次，每个分类通过带缓冲的写入器逐篇写出，同一遍生成 Markdown / HTML / JSON Feed；
+模板在模块加载时预编译为字面量与字段列表，渲染只做拼接。
+每个分类文件记录其论文集合的内容哈希，论文集合与上次运行相同的文件不再重新生成
+"""
+
+import hashlib
+import html
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from string import Formatter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    from .paper_store import atomic_write_bytes
+except ImportError:
+    from paper_store import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+# 模板版本：模板变化后所有报告文件都会重新生成
+TEMPLATE_VERSION = 3
+
+# 内容哈希清单文件（位于数据目录中）
+MANIFEST_FILE = ".report_manifest.json"
+
+# 写入器缓冲区大小
+WRITE_BUFFER = 1 << 16
+
+
+def safe_category_name(category: str) -> str:
+    """生成分类文件名主干（移除特殊字符）"""
+    return category.replace(" ", "_").replace("(", "").replace(")", "").replace("/", "_")
+
+
+def category_filename(category: str, extension: str = ".md") -> str:
+    """分类报告文件名（不加日期）"""
+    return f"{safe_category_name(category)}{extension}"
+
+
+class CompiledTemplate:
+    """
+    预编译模板：构造时把 str.format 风格的模板（只支持 {字段名}）拆成字面量与字段名，
+    渲染时按顺序拼接，不再解析模板
+    """
+
+    __slots__ = ('_literals', '_fields')
+
+    def __init__(self, text: str):
+        literals, fields = [], []
+        pending = ""
+        for literal, field, spec, conversion in Formatter().parse(text):
+            pending += literal
+            if field is None:
+                continue
+            if spec or conversion:
+                raise ValueError(f"模板字段不支持格式说明: {field}")
+            literals.append(pending)
+            fields.append(field)
+            pending = ""
+        literals.append(pending)
+        self._literals = tuple(literals)
+        self._fields = tuple(fields)
+
+    def render(self, values: Dict[str, str]) -> str:
+        """用字段值渲染模板"""
+        literals = self._literals
+        parts = [literals[0]]
+        for field, literal in zip(self._fields, literals[1:]):
+            parts.append(values[field])
+            parts.append(literal)
+        return "".join(parts)
+
+
+class ReportFormat(NamedTuple):
+    """一种报告输出格式"""
+    name: str
+    extension: str
+    header: CompiledTemplate
+    entry: CompiledTemplate
+    footer: CompiledTemplate
+    # 相邻两篇论文之间的分隔符
+    separator: str
+    # 由论文基础字段生成模板字段值
+    values: Callable[[Dict[str, str], Dict], Dict[str, str]]
+    # 总览模板（None 表示该格式不生成总览）
+    overview: Optional[CompiledTemplate]
+    overview_item: Optional[CompiledTemplate]
+
+
+def _markdown_values(base: Dict[str, str], paper: Dict) -> Dict[str, str]:
+    return base
+
+
+def _html_values(base: Dict[str, str], paper: Dict) -> Dict[str, str]:
+    values = {key: html.escape(value) for key, value in base.items()}
+    # 摘要中的换行在 HTML 中保留为段落内换行
+    values['summary'] = values['summary'].replace("\n", "<br>\n")
+    return values
+
+
+def _json_feed_values(base: Dict[str, str], paper: Dict) -> Dict[str, str]:
+    item = {
+        "id": base['arxiv_url'] or base['arxiv_id'],
+        "url": base['arxiv_url'],
+        "title": base['title'],
+        "content_text": base['summary'],
+        "date_published": base['published'],
+        "authors": [{"name": name} for name in paper.get('authors') or []],
+        "tags": list(paper.get('tags') or []),
+    }
+    if base['pdf_url']:
+        item["attachments"] = [{"url": base['pdf_url'], "mime_type": "application/pdf"}]
+    if paper.get('revision_of'):
+        # JSON Feed 扩展字段以下划线开头
+        item["_arxiv"] = {"revision_of": paper.get('revision_of')}
+    return {"item": json.dumps(item, ensure_ascii=False)}
+
+
+def _json_feed_header(category: str, count: int, generated_at: datetime) -> Dict[str, str]:
+    return {"head": json.dumps({
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": f"{category} - arXiv 论文报告",
+        "description": f"{category}：{count} 篇论文（生成时间 {generated_at.strftime('%Y-%m-%d %H:%M:%S')}）",
+    }, ensure_ascii=False)[:-1]}
+
+
+MARKDOWN = ReportFormat(
+    name="markdown",
+    extension=".md",
+    header=CompiledTemplate(
+        "# {category} - arXiv 论文报告\n\n"
+        "**生成时间**: {generated_at}\n\n"
+        "**分类**: {category}\n\n"
+        "**论文数量**: {count} 篇\n\n"
+        "---\n\n"
+    ),
+    entry=CompiledTemplate(
+        "## {idx}. {title}{revision}\n\n"
+        "- **arXiv ID**: [{arxiv_id}]({arxiv_url})\n"
+        "- **作者**: {authors}\n"
+        "- **发布时间**: {published}\n"
+        "- **arXiv分类**: {categories}\n"
+        "- **标签**: {tags}\n"
+        "- **PDF**: [下载链接]({pdf_url})\n\n"
+        "**摘要**:\n"
+        "{summary}\n\n"
+        "---\n\n"
+    ),
+    footer=CompiledTemplate(""),
+    separator="",
+    values=_markdown_values,
+    overview=CompiledTemplate(
+        "# arXiv 论文筛选报告 - 总览\n\n"
+        "**生成时间**: {generated_at}\n\n"
+        "**总计**: {total} 篇论文\n\n"
+        "## 📊 分类统计\n\n"
+        "{items}\n\n"
+        "---\n\n"
+        "## 📁 详细报告\n\n"
+        "每个分类的详细报告已单独生成，请点击上方链接查看。\n\n"
+    ),
+    overview_item=CompiledTemplate("- **[{category}]({filename})**: {count} 篇"),
+)
+
+HTML = ReportFormat(
+    name="html",
+    extension=".html",
+    header=CompiledTemplate(
+        "<!DOCTYPE html>\n<html lang=\"zh\">\n<head>\n<meta charset=\"utf-8\">\n"
+        "<title>{category} - arXiv 论文报告</title>\n</head>\n<body>\n"
+        "<h1>{category} - arXiv 论文报告</h1>\n"
+        "<p><strong>生成时间</strong>: {generated_at}</p>\n"
+        "<p><strong>分类</strong>: {category}</p>\n"
+        "<p><strong>论文数量</strong>: {count} 篇</p>\n<hr>\n"
+    ),
+    entry=CompiledTemplate(
+        "<article>\n<h2>{idx}. {title}{revision}</h2>\n<ul>\n"
+        "<li><strong>arXiv ID</strong>: <a href=\"{arxiv_url}\">{arxiv_id}</a></li>\n"
+        "<li><strong>作者</strong>: {authors}</li>\n"
+        "<li><strong>发布时间</strong>: {published}</li>\n"
+        "<li><strong>arXiv分类</strong>: {categories}</li>\n"
+        "<li><strong>标签</strong>: {tags}</li>\n"
+        "<li><strong>PDF</strong>: <a href=\"{pdf_url}\">下载链接</a></li>\n"
+        "</ul>\n<p><strong>摘要</strong>:<br>\n{summary}</p>\n</article>\n<hr>\n"
+    ),
+    footer=CompiledTemplate("</body>\n</html>\n"),
+    separator="",
+    values=_html_values,
+    overview=CompiledTemplate(
+        "<!DOCTYPE html>\n<html lang=\"zh\">\n<head>\n<meta charset=\"utf-8\">\n"
+        "<title>arXiv 论文筛选报告 - 总览</title>\n</head>\n<body>\n"
+        "<h1>arXiv 论文筛选报告 - 总览</h1>\n"
+        "<p><strong>生成时间</strong>: {generated_at}</p>\n"
+        "<p><strong>总计</strong>: {total} 篇论文</p>\n"
+        "<h2>📊 分类统计</h2>\n<ul>\n{items}\n</ul>\n</body>\n</html>\n"
+    ),
+    overview_item=CompiledTemplate("<li><strong><a href=\"{filename}\">{category}</a></strong>: {count} 篇</li>"),
+)
+
+JSON_FEED = ReportFormat(
+    name="json_feed",
+    extension=".json",
+    # 头部由 _json_feed_header 生成（feed 对象去掉结尾的 "}"），论文以数组元素逐篇写出
+    header=CompiledTemplate("{head}, \"items\": [\n"),
+    entry=CompiledTemplate("{item}"),
+    footer=CompiledTemplate("\n]}}\n"),
+    separator=",\n",
+    values=_json_feed_values,
+    overview=None,
+    overview_item=None,
+)
+
+REPORT_FORMATS: Dict[str, ReportFormat] = {fmt.name: fmt for fmt in (MARKDOWN, HTML, JSON_FEED)}
+
+
+def resolve_formats(names: Iterable[str]) -> List[ReportFormat]:
+    """
+    按名称查找报告格式
+
+    Args:
+        names: 格式名称（markdown / html / json_feed）
+
+    Returns:
+        报告格式列表
+    """
+    formats = []
+    for name in names:
+        if name not in REPORT_FORMATS:
+            raise ValueError(f"未知的报告格式: {name}（可选: {', '.join(REPORT_FORMATS)}）")
+        formats.append(REPORT_FORMATS[name])
+    return formats
+
+
+def group_papers(papers: Iterable[Dict], category_order: List[str]) -> Dict[str, List[Dict]]:
+    """
+    按分类分组（只分组一次，报告与分类统计共用）
+
+    Args:
+        papers: 论文列表
+        category_order: 分类显示顺序（只保留其中的分类）
+
+    Returns:
+        {分类名称: 论文列表}，按 category_order 排序，不含没有论文的分类
+    """
+    groups: Dict[str, List[Dict]] = {category: [] for category in category_order}
+    for paper in papers:
+        for tag in paper.get('tags') or ['Other']:
+            group = groups.get(tag)
+            if group is not None:
+                group.append(paper)
+    return {category: group for category, group in groups.items() if group}
+
+
+def _paper_values(idx: int, paper: Dict) -> Dict[str, str]:
+    """论文的基础模板字段（各格式共用，每篇论文每个分类只计算一次）"""
+    authors = paper.get('authors') or []
+    authors_str = ", ".join(authors[:5])
+    if len(authors) > 5:
+        authors_str += f" et al. ({len(authors)} authors)"
+    tags = paper.get('tags') or []
+    revision_of = paper.get('revision_of')
+    return {
+        'idx': str(idx),
+        'title': paper.get('title') or "",
+        # 标题或摘要有变化的修订版
+        'revision': f" [修订版，更新自 {revision_of}]" if revision_of else "",
+        'arxiv_id': paper.get('arxiv_id') or "",
+        'arxiv_url': paper.get('arxiv_url') or "",
+        'authors': authors_str,
+        'published': str(paper.get('published') or ""),
+        'categories': ", ".join(paper.get('categories') or []),
+        'tags': ", ".join(tags) if tags else "Other",
+        'pdf_url': paper.get('pdf_url') or "",
+        'summary': paper.get('summary') or "",
+    }
+
+
+def _header_values(fmt: ReportFormat, category: str, count: int, generated_at: datetime) -> Dict[str, str]:
+    if fmt is JSON_FEED:
+        return _json_feed_header(category, count, generated_at)
+    values = {'category': category, 'count': str(count), 'generated_at': generated_at.strftime("%Y-%m-%d %H:%M:%S")}
+    return {key: html.escape(value) for key, value in values.items()} if fmt is HTML else values
+
+
+def _paper_key(paper: Dict) -> str:
+    """决定报告内容的论文标识：带版本的 ID（内容变化即新版本）、更新时间与标签"""
+    return f"{paper.get('id')}\t{paper.get('updated')}\t{'|'.join(paper.get('tags') or [])}\n"
+
+
+class _FileWriter:
+    """带缓冲的报告文件写入器：写入临时文件，commit 时原子替换目标文件"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.tmp_path = path.with_name(f".{path.name}.tmp")
+        self._file = open(self.tmp_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER)
+        self.write = self._file.write
+
+    def commit(self):
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+class ReportEngine:
+    """分类报告与总览报告的生成器（多种格式同一遍写出，论文集合未变化的文件跳过）"""
+
+    def __init__(self, data_dir, category_order: List[str], formats: Iterable[str] = ("markdown",),
+                 overview_file: str = "arxiv_report.md"):
+        """
+        Args:
+            data_dir: 报告输出目录
+            category_order: 分类显示顺序（只为其中的分类生成文件）
+            formats: 输出格式名称（markdown / html / json_feed）
+            overview_file: Markdown 总览文件名（其他格式使用相同主干、各自的扩展名）
+        """
+        self.data_dir = Path(data_dir)
+        self.category_order = list(category_order)
+        self.formats = resolve_formats(formats)
+        self.overview_stem = Path(overview_file).stem
+        self.manifest_path = self.data_dir / MANIFEST_FILE
+        self._manifest = self._load_manifest()
+        # 本次写入的文件与跳过的文件数
+        self.written: List[Path] = []
+        self.skipped = 0
+
+    def _load_manifest(self) -> Dict[str, str]:
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"读取报告内容哈希清单失败，重新生成全部报告: {e}")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save_manifest(self):
+        atomic_write_bytes(self.manifest_path,
+                           json.dumps(self._manifest, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+
+    @staticmethod
+    def _digest(hasher) -> str:
+        return f"v{TEMPLATE_VERSION}:{hasher.hexdigest()}"
+
+    def _unchanged(self, filename: str, digest: str) -> bool:
+        return self._manifest.get(filename) == digest and (self.data_dir / filename).exists()
+
+    def _stale_formats(self, category: str, digest: str) -> List[ReportFormat]:
+        """论文集合有变化（或文件不存在）需要重新生成的格式"""
+        stale = []
+        for fmt in self.formats:
+            if self._unchanged(category_filename(category, fmt.extension), digest):
+                self.skipped += 1
+            else:
+                stale.append(fmt)
+        return stale
+
+    def _write_category(self, category: str, papers: List[Dict], formats: List[ReportFormat],
+                        generated_at: datetime, digest: str):
+        """把一个分类的论文逐篇写入各格式的文件"""
+        writers = []
+        try:
+            for fmt in formats:
+                writer = _FileWriter(self.data_dir / category_filename(category, fmt.extension))
+                writers.append(writer)
+                writer.write(fmt.header.render(_header_values(fmt, category, len(papers), generated_at)))
+            for idx, paper in enumerate(papers, 1):
+                base = _paper_values(idx, paper)
+                for fmt, writer in zip(formats, writers):
+                    if idx > 1 and fmt.separator:
+                        writer.write(fmt.separator)
+                    writer.write(fmt.entry.render(fmt.values(base, paper)))
+            for fmt, writer in zip(formats, writers):
+                writer.write(fmt.footer.render({}))
+                writer.commit()
+                self._record(writer.path, digest)
+        except BaseException:
+            for writer in writers:
+                writer.abort()
+            raise
+
+    def _record(self, path: Path, digest: str):
+        self._manifest[path.name] = digest
+        self.written.append(path)
+        logger.info(f"已生成分类报告: {path}")
+
+    def _write_overview(self, counts: List[Tuple[str, int]], total: int, generated_at: datetime):
+        """生成各格式的总览报告（分类统计未变化时跳过）"""
+        hasher = hashlib.sha256(json.dumps([counts, total], ensure_ascii=False).encode('utf-8'))
+        digest = self._digest(hasher)
+        for fmt in self.formats:
+            if fmt.overview is None:
+                continue
+            filename = f"{self.overview_stem}{fmt.extension}"
+            if self._unchanged(filename, digest):
+                self.skipped += 1
+                continue
+            escape = html.escape if fmt is HTML else str
+            items = "\n".join(
+                fmt.overview_item.render({'category': escape(category), 'count': str(count),
+                                          'filename': escape(category_filename(category, fmt.extension))})
+                for category, count in counts
+            )
+            path = self.data_dir / filename
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(fmt.overview.render({'generated_at': generated_at.strftime("%Y-%m-%d %H:%M:%S"),
+                                             'total': str(total), 'items': items}))
+            self._manifest[filename] = digest
+            self.written.append(path)
+            logger.info(f"已生成总览报告: {path}")
+
+    def write(self, grouped: Dict[str, List[Dict]], total: int) -> List[Path]:
+        """
+        生成全部报告
+
+        Args:
+            grouped: group_papers 的分组结果
+            total: 论文总数（总览中显示）
+
+        Returns:
+            本次实际写入的文件路径列表
+        """
+        generated_at = datetime.now()
+        try:
+            for category in self.category_order:
+                papers = grouped.get(category)
+                if not papers:
+                    continue
+                hasher = hashlib.sha256()
+                for paper in papers:
+                    hasher.update(_paper_key(paper).encode('utf-8'))
+                digest = self._digest(hasher)
+                stale = self._stale_formats(category, digest)
+                if stale:
+                    try:
+                        self._write_category(category, papers, stale, generated_at, digest)
+                    except Exception as e:
+                        logger.error(f"生成分类报告失败 ({category}): {e}")
+            counts = [(category, len(grouped[category])) for category in self.category_order if category in grouped]
+            self._write_overview(counts, total, generated_at)
+        finally:
+            self._save_manifest()
+        if self.skipped:
+            logger.info(f"{self.skipped} 个报告文件的论文集合与上次相同，未重新生成")
+        return self.written
+
+    def stream(self) -> "StreamingReportWriter":
+        """创建边抓取边写入的流式写入器"""
+        return StreamingReportWriter(self)
+
+
+class StreamingReportWriter:
+    """
+    流式报告写入器
+    论文到达时即追加到各分类、各格式的临时正文文件，并累积内容哈希；
+    close() 时补上头部（论文数量）与结尾，论文集合未变化的文件丢弃正文、保留原文件
+    """
+
+    def __init__(self, engine: ReportEngine):
+        """
+        Args:
+            engine: 报告引擎（提供输出目录、分类顺序、格式与内容哈希清单）
+        """
+        self.engine = engine
+        self.total = 0
+        self._order = set(engine.category_order)
+        self._counts: Dict[str, int] = {}
+        self._hashers: Dict[str, object] = {}
+        self._bodies: Dict[str, List] = {}
+
+    def _body_path(self, category: str, fmt: ReportFormat) -> Path:
+        return self.engine.data_dir / f".{category_filename(category, fmt.extension)}.body.tmp"
+
+    def add(self, paper: Dict):
+        """追加一篇论文到其所属的各分类报告"""
+        self.total += 1
+        key = None
+        for tag in paper.get('tags') or ['Other']:
+            if tag not in self._order:
+                continue
+            bodies = self._bodies.get(tag)
+            if bodies is None:
+                bodies = self._bodies[tag] = [
+                    open(self._body_path(tag, fmt), 'w', encoding='utf-8', buffering=WRITE_BUFFER)
+                    for fmt in self.engine.formats
+                ]
+                self._hashers[tag] = hashlib.sha256()
+            idx = self._counts[tag] = self._counts.get(tag, 0) + 1
+            if key is None:
+                key = _paper_key(paper).encode('utf-8')
+            self._hashers[tag].update(key)
+            base = _paper_values(idx, paper)
+            for fmt, body in zip(self.engine.formats, bodies):
+                if idx > 1 and fmt.separator:
+                    body.write(fmt.separator)
+                body.write(fmt.entry.render(fmt.values(base, paper)))
+
+    def close(self) -> List[Path]:
+        """
+        生成最终的分类报告与总览报告
+
+        Returns:
+            本次实际写入的文件路径列表
+        """
+        engine = self.engine
+        generated_at = datetime.now()
+        try:
+            for category in engine.category_order:
+                bodies = self._bodies.pop(category, None)
+                if bodies is None:
+                    continue
+                for body in bodies:
+                    body.close()
+                digest = engine._digest(self._hashers[category])
+                stale = set(engine._stale_formats(category, digest))
+                for fmt in engine.formats:
+                    body_path = self._body_path(category, fmt)
+                    try:
+                        if fmt in stale:
+                            self._assemble(category, fmt, body_path, generated_at, digest)
+                    except Exception as e:
+                        logger.error(f"生成分类报告失败 ({category}): {e}")
+                    finally:
+                        body_path.unlink(missing_ok=True)
+            if self.total:
+                counts = [(c, self._counts[c]) for c in engine.category_order if c in self._counts]
+                engine._write_overview(counts, self.total, generated_at)
+        finally:
+            engine._save_manifest()
+        return engine.written
+
+    def _assemble(self, category: str, fmt: ReportFormat, body_path: Path, generated_at: datetime, digest: str):
+        """头部 + 正文 + 结尾写入临时文件后原子替换"""
+        writer = _FileWriter(self.engine.data_dir / category_filename(category, fmt.extension))
+        try:
+            writer.write(fmt.header.render(_header_values(fmt, category, self._counts[category], generated_at)))
+            with open(body_path, 'r', encoding='utf-8') as src:
+                shutil.copyfileobj(src, writer._file, WRITE_BUFFER)
+            writer.write(fmt.footer.render({}))
+            writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+        self.engine._record(writer.path, digest)
+
+    def abort(self):
+        """丢弃所有临时正文文件"""
+        for category, bodies in self._bodies.items():
+            for fmt, body in zip(self.engine.formats, bodies):
+                body.close()
+                self._body_path(category, fmt).unlink(missing_ok=True)
+        self._bodies.clear()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+arXiv API 原始响应缓存
+按（接口地址, 规范化查询, 起始偏移, 页大小）缓存原始 Atom 页面，支持 TTL、按总大小的 LRU 淘汰，
+以及基于 ETag / Last-Modified 的条件请求重新验证；离线重放模式只读取缓存。
+每页记录查询的 submittedDate 区间，离线重放只解压和解析与重放窗口重叠的页面
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_KEY_CLAUSE = "base_url = ? AND query = ? AND start = ? AND page_size = ?"
+
+_SUBMITTED_WINDOW_RE = re.compile(r"submittedDate:\[\s*(\d{8})\d*\s+TO\s+(\d{8})\d*\s*\]")
+
+
+def normalize_query(query: str) -> str:
+    """规范化查询语句（合并空白），使等价查询命中同一缓存项"""
+    return " ".join(query.split())
+
+
+def query_window(query: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    查询的 submittedDate 区间
+
+    Args:
+        query: arXiv 查询语句
+
+    Returns:
+        (起始日期, 结束日期)，格式 YYYYMMDD；查询不带日期区间时为 (None, None)
+    """
+    match = _SUBMITTED_WINDOW_RE.search(query)
+    return match.groups() if match else (None, None)
+
+
+class CachedPage(NamedTuple):
+    """一条缓存的响应页面"""
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    fresh: bool
+
+
+class AtomResponseCache:
+    """基于 SQLite 的原始响应缓存（线程安全）"""
+
+    def __init__(self, db_path, ttl_seconds: float = 24 * 3600, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            db_path: 缓存数据库路径
+            ttl_seconds: 缓存有效期（秒），过期后需要重新验证
+            max_bytes: 缓存内容总大小上限（压缩后），超出时按最近最少使用淘汰
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(pages)")]
+        if columns and "base_url" not in columns:
+            # 旧版缓存的主键不含接口地址，无法区分不同的镜像/测试服务器，直接丢弃
+            logger.info("缓存格式已更新，丢弃旧版缓存")
+            self._conn.execute("DROP TABLE pages")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " base_url TEXT NOT NULL,"
+            " query TEXT NOT NULL,"
+            " start INTEGER NOT NULL,"
+            " page_size INTEGER NOT NULL,"
+            " body BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " fetched_at REAL NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " PRIMARY KEY (base_url, query, start, page_size)"
+            ")"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(pages)")]
+        if "window_start" not in columns:
+            # 旧版缓存没有日期区间列：添加后按已缓存的查询语句回填
+            self._conn.execute("ALTER TABLE pages ADD COLUMN window_start TEXT")
+            self._conn.execute("ALTER TABLE pages ADD COLUMN window_end TEXT")
+            queries = [row[0] for row in self._conn.execute("SELECT DISTINCT query FROM pages")]
+            self._conn.executemany("UPDATE pages SET window_start = ?, window_end = ? WHERE query = ?",
+                                   ((*query_window(query), query) for query in queries))
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_window ON pages (base_url, window_end)")
+        self._conn.commit()
+        # 读取过的页面的最近访问时间先保存在内存中，在写入、每次运行结束或关闭时批量更新
+        self._accessed: Dict[Tuple[str, str, int, int], float] = {}
+
+    def get(self, base_url: str, query: str, start: int, page_size: int) -> Optional[CachedPage]:
+        """
+        读取缓存页面（无论是否过期），并记录最近访问时间（不立即写入数据库）
+
+        Returns:
+            CachedPage，未缓存时返回 None
+        """
+        key = (base_url, normalize_query(query), start, page_size)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM pages"
+                f" WHERE {_KEY_CLAUSE}", key
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            self._accessed[key] = now
+        body, etag, last_modified, fetched_at = row
+        return CachedPage(zlib.decompress(body), etag, last_modified, fetched_at,
+                          now - fetched_at < self.ttl_seconds)
+
+    def put(self, base_url: str, query: str, start: int, page_size: int, body: bytes,
+            etag: str = None, last_modified: str = None):
+        """写入（或替换）一页缓存，并按大小上限淘汰"""
+        compressed = zlib.compress(body)
+        now = time.time()
+        query = normalize_query(query)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages"
+                " (base_url, query, start, page_size, body, size, etag, last_modified, fetched_at, last_access,"
+                " window_start, window_end)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (base_url, query, start, page_size, compressed, len(compressed),
+                 etag, last_modified, now, now, *query_window(query)),
+            )
+            self._accessed.pop((base_url, query, start, page_size), None)
+            # 淘汰前先写入最近访问时间
+            self._flush_access()
+            self._evict()
+            self._conn.commit()
+
+    def revalidated(self, base_url: str, query: str, start: int, page_size: int):
+        """服务器返回 304 时调用：刷新缓存项的获取时间"""
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE pages SET fetched_at = ? WHERE {_KEY_CLAUSE}",
+                (time.time(), base_url, normalize_query(query), start, page_size),
+            )
+            self._conn.commit()
+
+    def discard(self, base_url: str, query: str, start: int, page_size: int):
+        """删除一页缓存（例如内容无效时）"""
+        with self._lock:
+            self._conn.execute(
+                f"DELETE FROM pages WHERE {_KEY_CLAUSE}",
+                (base_url, normalize_query(query), start, page_size),
+            )
+            self._conn.commit()
+
+    def flush_access(self):
+        """批量写入读取过的页面的最近访问时间（每次运行结束时调用）"""
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+
+    def _flush_access(self):
+        """写入最近访问时间（调用方持有锁并负责提交）"""
+        if not self._accessed:
+            return
+        self._conn.executemany(f"UPDATE pages SET last_access = ? WHERE {_KEY_CLAUSE}",
+                               ((now, *key) for key, now in self._accessed.items()))
+        self._accessed.clear()
+
+    def _evict(self):
+        """按最近最少使用淘汰，直到总大小不超过上限"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT rowid, size FROM pages ORDER BY last_access").fetchall()
+        evicted = 0
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE rowid = ?", (rowid,))
+            total -= size
+            evicted += 1
+        logger.info(f"缓存超出大小上限，已淘汰 {evicted} 页")
+
+    def iter_pages(self, base_url: str = None, first_day: str = None, last_day: str = None) -> Iterator[bytes]:
+        """
+        遍历缓存页面（用于离线重放，不更新最近访问时间）
+
+        Args:
+            base_url: 只遍历该接口地址的页面，None 表示全部
+            first_day: 只遍历查询区间在该日期（YYYYMMDD）及之后结束的页面
+            last_day: 只遍历查询区间在该日期（YYYYMMDD）及之前开始的页面
+                （查询不带日期区间的页面总是包含在内）
+        """
+        conditions = []
+        params = []
+        if base_url is not None:
+            conditions.append("base_url = ?")
+            params.append(base_url)
+        if first_day is not None:
+            conditions.append("(window_end IS NULL OR window_end >= ?)")
+            params.append(first_day)
+        if last_day is not None:
+            conditions.append("(window_start IS NULL OR window_start <= ?)")
+            params.append(last_day)
+        sql = "SELECT rowid FROM pages"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            rowids = [r[0] for r in self._conn.execute(sql + " ORDER BY query, start", params)]
+        # 逐页读取，内存占用与缓存总量无关
+        for rowid in rowids:
+            with self._lock:
+                row = self._conn.execute("SELECT body FROM pages WHERE rowid = ?", (rowid,)).fetchone()
+            if row is not None:
+                yield zlib.decompress(row[0])
+
+    def total_bytes(self) -> int:
+        """缓存内容总大小（压缩后）"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def close(self):
+        """写入最近访问时间并关闭数据库连接"""
+        self.flush_access()
+        self._conn.close()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+历史论文重新打标签
+将论文存储中的记录按块流式分发给进程池重新分类（每个工作进程只构建一次关键词匹配器），
+标签有变化的记录按原顺序追加写入同一日期的新分段（后写入的分段覆盖旧记录）；
+每处理完一个分段推进一次检查点，中断后重新运行会跳过已完成的分段
+"""
+
+import hashlib
+import json
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from .keyword_matcher import KeywordMatcher
+    from .paper_store import PaperStore, atomic_write_bytes
+    from .semantic_classifier import EmbeddingCache, SemanticClassifier, embedding_key
+except ImportError:
+    from keyword_matcher import KeywordMatcher
+    from paper_store import PaperStore, atomic_write_bytes
+    from semantic_classifier import EmbeddingCache, SemanticClassifier, embedding_key
+
+logger = logging.getLogger(__name__)
+
+# 工作进程内的关键词匹配器与语义分类器（由 _init_worker 构建一次）
+_worker_matcher: Optional[KeywordMatcher] = None
+_worker_semantic: Optional[SemanticClassifier] = None
+_worker_categories: List[str] = []
+
+
+def _init_worker(keywords_map: Dict[str, List], system_keywords: List, categories_config: Dict[str, Dict],
+                 matching: Optional[Dict] = None, semantic: Optional[Dict] = None):
+    """工作进程初始化：编译关键词匹配器；启用语义分类时构建分类质心并打开向量缓存"""
+    global _worker_matcher, _worker_semantic, _worker_categories
+    _worker_matcher = KeywordMatcher(keywords_map, system_keywords, categories_config, matching)
+    _worker_categories = list(categories_config)
+    _worker_semantic = None
+    if semantic:
+        classifier = SemanticClassifier(keywords_map, categories_config, semantic)
+        if classifier:
+            if semantic.get('cache_path'):
+                classifier.cache = EmbeddingCache(semantic['cache_path'], classifier.vectorizer.signature)
+            _worker_semantic = classifier
+
+
+def _classify_chunk(texts: List[Tuple[str, str, str, List[str]]]) -> List[List[str]]:
+    """
+    对一块论文重新分类（与 _classify_results 一致：按 arXiv 分类预筛选后做关键词分类，并上语义分类，
+    未命中时为 ["Other"]）
+
+    Args:
+        texts: (向量缓存键, 标题, 摘要, arXiv 分类) 列表
+
+    Returns:
+        与输入顺序一致的标签列表
+    """
+    matcher = _worker_matcher
+    if matcher.prefiltered:
+        tags_list = [matcher.match(f"{title} {summary}", matcher.eligible(categories))
+                     for _, title, summary, categories in texts]
+    else:
+        tags_list = [matcher.match(f"{title} {summary}") for _, title, summary, _ in texts]
+    if _worker_semantic is not None:
+        semantic = _worker_semantic.classify_batch([(key, f"{title} {summary}") for key, title, summary, _ in texts])
+        for i, extra in enumerate(semantic):
+            extra = matcher.filter_categories(extra, texts[i][3])
+            if any(c not in tags_list[i] for c in extra):
+                found = set(tags_list[i]).union(extra)
+                tags_list[i] = [c for c in _worker_categories if c in found]
+    return [tags or ["Other"] for tags in tags_list]
+
+
+def config_digest(keywords_map: Dict, system_keywords: List, categories_config: Dict,
+                  matching: Optional[Dict] = None, semantic: Optional[Dict] = None) -> str:
+    """分类配置（含匹配选项与语义分类选项）的摘要：配置变化后旧检查点失效"""
+    payload = json.dumps([keywords_map, system_keywords, categories_config, matching or {}, semantic or {}],
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class RetagCheckpoint:
+    """重新打标签的检查点：记录已处理完成的分段"""
+
+    def __init__(self, path, digest: str, restart: bool = False):
+        """
+        Args:
+            path: 检查点文件路径
+            digest: 当前分类配置摘要
+            restart: 忽略已有检查点，从头开始
+        """
+        self.path = Path(path)
+        self.digest = digest
+        self.completed = set()
+        if restart or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except Exception as e:
+            logger.warning(f"读取重新打标签检查点失败，从头开始: {e}")
+            return
+        if data.get('config_digest') != digest:
+            logger.info("分类配置已变化，忽略旧检查点")
+            return
+        self.completed = set(data.get('completed', []))
+        logger.info(f"从检查点继续：已完成 {len(self.completed)} 个分段")
+
+    @staticmethod
+    def key(segment: Path) -> str:
+        return str(segment.resolve())
+
+    def is_done(self, segment: Path) -> bool:
+        return self.key(segment) in self.completed
+
+    def mark_done(self, segment: Path):
+        self.completed.add(self.key(segment))
+
+    def save(self):
+        """原子写入检查点"""
+        data = {'config_digest': self.digest, 'completed': sorted(self.completed)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(self.path, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    def remove(self):
+        """全部完成后删除检查点"""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class _Chunk:
+    """一块待分类的论文（不跨分段）"""
+
+    __slots__ = ('store', 'segment', 'papers', 'last')
+
+    def __init__(self, store: PaperStore, segment: Path, papers: List[Dict], last: bool):
+        self.store = store
+        self.segment = segment
+        self.papers = papers
+        # 是否为该分段的最后一块
+        self.last = last
+
+
+class ArchiveRetagger:
+    """使用进程池对论文存储中的全部记录重新打标签"""
+
+    def __init__(self, keywords_map: Dict[str, List], system_keywords: List,
+                 categories_config: Dict[str, Dict], matching: Optional[Dict] = None,
+                 semantic: Optional[Dict] = None, workers: int = None,
+                 chunk_size: int = 2000, checkpoint_file=None, restart: bool = False, checkpoint_every: int = 100,
+                 search_index=None):
+        """
+        Args:
+            keywords_map: 关键词组字典
+            system_keywords: system 关键词列表
+            categories_config: 分类配置字典
+            matching: 配置 matching 段（整词 / 大小写 / 近邻等匹配选项）
+            semantic: 配置 semantic 段（含向量缓存路径 cache_path），None 表示不做语义分类
+            workers: 工作进程数，默认 CPU 核数；为 1 时在当前进程中分类
+            chunk_size: 每块论文数
+            checkpoint_file: 检查点文件路径，None 表示不记录检查点
+            restart: 忽略已有检查点
+            checkpoint_every: 没有写入时每处理多少个分段保存一次检查点
+            search_index: 全文检索索引（PaperSearchIndex），标签更新后同步更新，None 表示不更新
+        """
+        self.search_index = search_index
+        self._config = (keywords_map, system_keywords, categories_config, matching, semantic)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.chunk_size = max(1, chunk_size)
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint = None
+        if checkpoint_file is not None:
+            self.checkpoint = RetagCheckpoint(checkpoint_file, config_digest(*self._config), restart=restart)
+        self.checked = 0
+        self.changed = 0
+        self.segments_done = 0
+
+    def _iter_chunks(self, stores: Iterable[PaperStore]) -> Iterator[_Chunk]:
+        """按分段顺序流式切块；已完成（检查点中）的分段跳过"""
+        for store in stores:
+            # 先固定分段列表：本次运行写入的新分段不再处理
+            for segment in store.segments():
+                if self.checkpoint is not None and self.checkpoint.is_done(segment):
+                    continue
+                chunk: List[Dict] = []
+                for paper in store.iter_segment(segment):
+                    chunk.append(paper)
+                    if len(chunk) >= self.chunk_size:
+                        yield _Chunk(store, segment, chunk, False)
+                        chunk = []
+                yield _Chunk(store, segment, chunk, True)
+
+    @staticmethod
+    def _texts(chunk: _Chunk) -> List[Tuple[str, str, str, List[str]]]:
+        # 只把分类需要的字段发送给工作进程
+        return [(embedding_key(paper['id']), paper.get('title', ''), paper.get('summary') or '',
+                 paper.get('categories') or [])
+                for paper in chunk.papers]
+
+    def _classified(self, chunks: Iterator[_Chunk]) -> Iterator[Tuple[_Chunk, List[List[str]]]]:
+        """按输入顺序产出 (块, 新标签)；同时在途的块数有上限，内存占用与归档大小无关"""
+        if self.workers == 1:
+            _init_worker(*self._config)
+            for chunk in chunks:
+                yield chunk, _classify_chunk(self._texts(chunk))
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=self._config) as pool:
+            pending = deque()
+            try:
+                for chunk in chunks:
+                    pending.append((chunk, pool.submit(_classify_chunk, self._texts(chunk))))
+                    if len(pending) >= self.workers * 2:
+                        chunk, future = pending.popleft()
+                        yield chunk, future.result()
+                while pending:
+                    chunk, future = pending.popleft()
+                    yield chunk, future.result()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    def run(self, stores: Iterable[PaperStore]) -> Dict:
+        """
+        重新打标签
+
+        Args:
+            stores: 论文存储列表
+
+        Returns:
+            统计信息（checked / changed / segments）
+        """
+        writer = None
+        unsaved = 0
+        try:
+            for chunk, tags_list in self._classified(self._iter_chunks(stores)):
+                for paper, tags in zip(chunk.papers, tags_list):
+                    self.checked += 1
+                    if tags == paper.get('tags'):
+                        continue
+                    if writer is None:
+                        writer = chunk.store.open_segment(PaperStore.segment_date(chunk.segment))
+                    paper['tags'] = tags
+                    writer.write(paper)
+                    self.changed += 1
+                if not chunk.last:
+                    continue
+                self.segments_done += 1
+                wrote = writer is not None
+                if wrote:
+                    segment = writer.close()
+                    writer = None
+                    logger.info(f"已更新 {chunk.segment.name} 中的标签，写入 {segment.name}")
+                    if self.search_index is not None:
+                        self.search_index.add_many(chunk.store.iter_segment(segment), chunk.store.data_dir)
+                if self.checkpoint is not None:
+                    self.checkpoint.mark_done(chunk.segment)
+                    if wrote:
+                        # 新分段已按当前配置打标签，续跑时同样跳过
+                        self.checkpoint.mark_done(segment)
+                    unsaved += 1
+                    # 写入新分段后立即保存检查点；否则定期保存（重复处理未保存的分段不会产生变化）
+                    if wrote or unsaved >= self.checkpoint_every:
+                        self.checkpoint.save()
+                        unsaved = 0
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            if self.checkpoint is not None:
+                self.checkpoint.save()
+            raise
+
+        if self.checkpoint is not None:
+            self.checkpoint.remove()
+        logger.info(f"重新打标签完成：检查 {self.checked} 篇论文，{self.changed} 篇标签有变化，"
+                    f"处理 {self.segments_done} 个分段")
+        return {'checked': self.checked, 'changed': self.changed, 'segments': self.segments_done}
+
+
+def archive_stores(data_dirs: Iterable, compress: bool = False) -> List[PaperStore]:
+    """
+    打开归档中的论文存储（旧版 papers_*.json 会先转换为分段）
+
+    Args:
+        data_dirs: 数据目录列表
+        compress: 新分段是否使用 gzip 压缩
+
+    Returns:
+        PaperStore 列表
+    """
+    stores = []
+    for data_dir in data_dirs:
+        store = PaperStore(data_dir, compress=compress)
+        if store.migrate_legacy_files():
+            logger.info(f"已将 {data_dir} 中的旧版论文 JSON 文件转换为 JSONL 分段")
+        stores.append(store)
+    return stores
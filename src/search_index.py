@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+本地全文检索索引
+基于 SQLite FTS5（外部内容表 + porter 词干化）索引所有已保存论文的标题、摘要、作者、标签和 arXiv 分类；
+保存论文时在同一个事务中增量更新，查询支持 BM25 排序、短语查询以及按标签/日期过滤
+"""
+
+import logging
+import sqlite3
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# BM25 列权重：标题、摘要、作者、标签、arXiv 分类
+BM25_WEIGHTS = (10.0, 1.0, 2.0, 3.0, 3.0)
+
+_FTS_COLUMNS = "title, summary, authors, tags, categories"
+
+# FTS5 查询语法错误的特征（区别于数据库本身的错误）
+_QUERY_ERRORS = ("fts5", "syntax error", "unterminated string", "no such column")
+
+
+class SearchHit(NamedTuple):
+    """一条检索结果"""
+    id: str
+    arxiv_id: str
+    title: str
+    published: str
+    tags: List[str]
+    data_dir: str
+    score: Optional[float]
+    snippet: str
+
+
+def _fts_values(paper: Dict) -> tuple:
+    """论文在全文索引中的各列文本（列表字段按行拼接，保证标签、作者之间不会组成短语）"""
+    return (
+        paper.get('title') or "",
+        paper.get('summary') or "",
+        "\n".join(paper.get('authors') or []),
+        "\n".join(paper.get('tags') or []),
+        " ".join(paper.get('categories') or []),
+    )
+
+
+def _quote_terms(query: str) -> str:
+    """将普通文本转换为逐词加引号的 FTS5 查询（用于原查询语法错误时的回退）"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+class PaperSearchIndex:
+    """已保存论文的全文检索索引（线程安全）"""
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path: 索引数据库路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            " rowid INTEGER PRIMARY KEY,"
+            " id TEXT NOT NULL UNIQUE,"
+            " arxiv_id TEXT,"
+            " published TEXT,"
+            " data_dir TEXT,"
+            f" {_FTS_COLUMNS.replace(',', ' TEXT,')} TEXT"
+            ")"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS papers_published ON papers (published)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS paper_tags ("
+            " tag TEXT NOT NULL,"
+            " paper INTEGER NOT NULL,"
+            " PRIMARY KEY (tag, paper)"
+            ") WITHOUT ROWID"
+        )
+        # 外部内容表：文本只在 papers 中保存一份，FTS5 只保存倒排索引
+        self._conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5({_FTS_COLUMNS},"
+            " content='papers', content_rowid='rowid', tokenize='porter unicode61 remove_diacritics 2')"
+        )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def _upsert(self, paper: Dict, data_dir: str):
+        """插入或更新一篇论文（调用方负责事务）"""
+        conn = self._conn
+        values = _fts_values(paper)
+        row = conn.execute(f"SELECT rowid, {_FTS_COLUMNS} FROM papers WHERE id = ?", (paper['id'],)).fetchone()
+        if row is not None:
+            rowid = row[0]
+            if tuple(row[1:]) != values:
+                # 外部内容表删除索引项时需要提供旧内容
+                conn.execute(f"INSERT INTO papers_fts (papers_fts, rowid, {_FTS_COLUMNS})"
+                             " VALUES ('delete', ?, ?, ?, ?, ?, ?)", row)
+                conn.execute(f"INSERT INTO papers_fts (rowid, {_FTS_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                             (rowid, *values))
+            conn.execute("UPDATE papers SET arxiv_id = ?, published = ?, data_dir = ?,"
+                         " title = ?, summary = ?, authors = ?, tags = ?, categories = ? WHERE rowid = ?",
+                         (paper.get('arxiv_id'), paper.get('published'), data_dir, *values, rowid))
+            conn.execute("DELETE FROM paper_tags WHERE paper = ?", (rowid,))
+        else:
+            rowid = conn.execute(f"INSERT INTO papers (id, arxiv_id, published, data_dir, {_FTS_COLUMNS})"
+                                 " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 (paper['id'], paper.get('arxiv_id'), paper.get('published'), data_dir,
+                                  *values)).lastrowid
+            conn.execute(f"INSERT INTO papers_fts (rowid, {_FTS_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                         (rowid, *values))
+        conn.executemany("INSERT OR IGNORE INTO paper_tags (tag, paper) VALUES (?, ?)",
+                         ((tag, rowid) for tag in paper.get('tags') or []))
+
+    def add_many(self, papers: Iterable[Dict], data_dir) -> int:
+        """
+        在单个事务中索引一批论文（已索引的论文按最新内容更新）
+
+        Args:
+            papers: 论文信息（JSON 结构）
+            data_dir: 论文所在数据目录
+
+        Returns:
+            索引的论文数量
+        """
+        count = 0
+        with self._lock, self._conn:
+            for paper in papers:
+                self._upsert(paper, str(data_dir))
+                count += 1
+        return count
+
+    def rebuild(self, stores: Iterable) -> int:
+        """
+        清空并从论文存储重建索引
+
+        Args:
+            stores: PaperStore 列表
+
+        Returns:
+            索引的论文数量
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM paper_tags")
+            self._conn.execute("DELETE FROM papers")
+            self._conn.execute("INSERT INTO papers_fts (papers_fts) VALUES ('delete-all')")
+        total = 0
+        for store in stores:
+            total += self.add_many(store.iter_papers(), store.data_dir)
+        self.optimize()
+        return total
+
+    def optimize(self):
+        """合并 FTS5 的倒排索引段（大批量写入后执行可降低查询延迟）"""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO papers_fts (papers_fts) VALUES ('optimize')")
+
+    def search(self, query: str = None, tags: List[str] = None, since: date = None, until: date = None,
+               limit: int = 20) -> List[SearchHit]:
+        """
+        检索论文
+
+        Args:
+            query: FTS5 查询（支持 "短语"、AND/OR/NOT、前缀 token*、列过滤 title:xxx）；
+                语法错误时按逐词加引号的普通文本重试；为空时只按过滤条件返回最新论文
+            tags: 只返回带有其中任一标签的论文
+            since: 提交日期下限（含）
+            until: 提交日期上限（含）
+            limit: 最大结果数
+
+        Returns:
+            检索结果（有查询时按 BM25 相关度排序，否则按提交时间从新到旧）
+        """
+        if not query or not query.strip():
+            # 无查询：标签过滤用 IN 子查询（由标签表驱动），再按提交时间索引排序
+            filters, params = self._date_filters("p.published", since, until)
+            if tags:
+                filters.append(f"p.rowid IN (SELECT paper FROM paper_tags WHERE tag IN ({', '.join('?' * len(tags))}))")
+                params.extend(tags)
+            where = f"WHERE {' AND '.join(filters)}" if filters else ""
+            sql = (f"SELECT p.id, p.arxiv_id, p.title, p.published, p.tags, p.data_dir, NULL, ''"
+                   f" FROM papers p {where} ORDER BY p.published DESC LIMIT ?")
+            return self._fetch(sql, [*params, limit])
+
+        try:
+            return self._ranked(query, tags, since, until, limit)
+        except sqlite3.OperationalError as e:
+            if not any(marker in str(e) for marker in _QUERY_ERRORS):
+                raise
+            logger.debug(f"FTS5 查询语法错误，按普通文本重试: {e}")
+            return self._ranked(_quote_terms(query), tags, since, until, limit)
+
+    @staticmethod
+    def _date_filters(column: str, since: Optional[date], until: Optional[date]) -> Tuple[List[str], list]:
+        """提交日期过滤条件（published 为 ISO 字符串，上限取次日零点之前）"""
+        filters, params = [], []
+        if since is not None:
+            filters.append(f"{column} >= ?")
+            params.append(since.isoformat())
+        if until is not None:
+            filters.append(f"{column} < ?")
+            params.append((until + timedelta(days=1)).isoformat())
+        return filters, params
+
+    def _ranked(self, query: str, tags: Optional[List[str]], since: Optional[date], until: Optional[date],
+                limit: int) -> List[SearchHit]:
+        """
+        两阶段检索：先只在倒排索引上计算 BM25 取前 limit 个 rowid，
+        再为这些论文读取字段并生成摘要片段（snippet 代价高，不能对全部命中计算）
+        """
+        # 过滤条件写成按 rowid 的相关子查询，只对命中的论文逐条检查，不物化整个标签/日期集合
+        filters, params = self._date_filters("(SELECT published FROM papers WHERE rowid = papers_fts.rowid)",
+                                             since, until)
+        if tags:
+            filters.append(f"EXISTS (SELECT 1 FROM paper_tags WHERE tag IN ({', '.join('?' * len(tags))})"
+                           f" AND paper = papers_fts.rowid)")
+            params.extend(tags)
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        with self._lock:
+            ranked = self._conn.execute(
+                f"SELECT rowid, bm25(papers_fts, {weights}) AS score FROM papers_fts"
+                f" WHERE papers_fts MATCH ? {''.join(' AND ' + f for f in filters)} ORDER BY score LIMIT ?",
+                [query, *params, limit],
+            ).fetchall()
+            if not ranked:
+                return []
+            scores = dict(ranked)
+            rows = self._conn.execute(
+                f"SELECT p.rowid, p.id, p.arxiv_id, p.title, p.published, p.tags, p.data_dir,"
+                f" snippet(papers_fts, 1, '[', ']', '...', 16)"
+                f" FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid"
+                f" WHERE papers_fts MATCH ? AND papers_fts.rowid IN ({', '.join('?' * len(scores))})",
+                [query, *scores],
+            ).fetchall()
+        hits = [
+            SearchHit(pid, arxiv_id, title, published, tags.split("\n") if tags else [], data_dir,
+                      scores[rowid], snippet)
+            for rowid, pid, arxiv_id, title, published, tags, data_dir, snippet in rows
+        ]
+        hits.sort(key=lambda hit: hit.score)
+        return hits
+
+    def _fetch(self, sql: str, params: list) -> List[SearchHit]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            SearchHit(pid, arxiv_id, title, published, tags.split("\n") if tags else [], data_dir, score, snippet)
+            for pid, arxiv_id, title, published, tags, data_dir, score, snippet in rows
+        ]
+
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
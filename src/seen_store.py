@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+全局已记录论文索引
+基于 SQLite（WAL 模式）保存所有已处理过的论文（arXiv ID + 版本），
+跨日期目录去重，成员检查走主键索引，写入为追加插入而非整体重写；
+按基础 arXiv ID 记录已保存论文的最新版本和标题+摘要的内容哈希，修订版据此判断内容是否真的变化；
+同一数据库中还保存增量抓取的水位线（每个查询分片已处理的最新提交时间）
+和已处理的 arXiv 公告批次
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import unicodedata
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_VERSION_RE = re.compile(r"^(.*?)(?:v(\d+))?$")
+
+
+def split_arxiv_id(entry_id: str) -> Tuple[str, int]:
+    """
+    将 entry_id 拆分为基础 arXiv ID 和版本号
+
+    Args:
+        entry_id: 论文 entry_id（如 http://arxiv.org/abs/2501.00001v2）或 arXiv ID
+
+    Returns:
+        (基础 ID, 版本号)，无版本后缀时版本号为 0
+    """
+    if "/abs/" in entry_id:
+        entry_id = entry_id.split("/abs/", 1)[1]
+    base, version = _VERSION_RE.match(entry_id).groups()
+    return base, int(version) if version else 0
+
+
+def content_hash(title: str, summary: str) -> str:
+    """
+    标题+摘要的内容哈希（Unicode NFC 规范化并合并空白，换行和缩进的差异不算内容变化）
+
+    Args:
+        title: 标题
+        summary: 摘要
+
+    Returns:
+        十六进制哈希
+    """
+    text = unicodedata.normalize("NFC", f"{title or ''}\x1f{summary or ''}")
+    normalized = "\x1f".join(" ".join(part.split()) for part in text.split("\x1f"))
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class PaperVersion(NamedTuple):
+    """一篇已保存论文的最新版本"""
+    version: int
+    content_hash: str
+    # 存储中的记录 ID（内容未变化的修订版沿用原记录）及其数据目录
+    entry_id: str
+    data_dir: Optional[str]
+
+
+class SeenPaperStore:
+    """已记录论文的持久化集合，支持 `in` 与 `add`，与原先的 Set[str] 用法兼容"""
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path: SQLite 数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_papers ("
+            " arxiv_id TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " first_seen TEXT NOT NULL,"
+            " PRIMARY KEY (arxiv_id, version)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS paper_versions ("
+            " arxiv_id TEXT PRIMARY KEY,"
+            " version INTEGER NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " entry_id TEXT NOT NULL,"
+            " data_dir TEXT,"
+            " updated_at TEXT NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+        # 尚未提交的记录先保存在内存中，避免在整个抓取期间持有写锁
+        self._pending = set()
+        self._pending_versions: Dict[str, PaperVersion] = {}
+
+    def __contains__(self, entry_id: str) -> bool:
+        if entry_id in self._pending:
+            return True
+        row = self._conn.execute(
+            "SELECT 1 FROM seen_papers WHERE arxiv_id = ? AND version = ?",
+            split_arxiv_id(entry_id),
+        ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        """已提交的论文数量"""
+        return self._conn.execute("SELECT COUNT(*) FROM seen_papers").fetchone()[0]
+
+    def add(self, entry_id: str, content_hash: str = None, data_dir=None):
+        """
+        记录一篇论文（在 commit 之前不会持久化）
+
+        Args:
+            entry_id: 论文 entry_id
+            content_hash: 标题+摘要的内容哈希，指定时同时记录为该论文的最新版本
+            data_dir: 论文保存到的数据目录
+        """
+        self.add_many([entry_id])
+        if content_hash is not None:
+            base, version = split_arxiv_id(entry_id)
+            current = self._pending_versions.get(base)
+            if current is None or version >= current.version:
+                self._pending_versions[base] = PaperVersion(
+                    version, content_hash, entry_id, str(data_dir) if data_dir is not None else None
+                )
+
+    def previous_version(self, entry_id: str) -> Optional[PaperVersion]:
+        """
+        论文的较早版本：同一基础 ID 已保存过更低的版本时返回其记录（v1 不查询）
+
+        Args:
+            entry_id: 论文 entry_id
+
+        Returns:
+            PaperVersion，不是修订版或之前的版本没有内容哈希时返回 None
+        """
+        base, version = split_arxiv_id(entry_id)
+        if version <= 1:
+            return None
+        latest = self._pending_versions.get(base)
+        if latest is None:
+            row = self._conn.execute(
+                "SELECT version, content_hash, entry_id, data_dir FROM paper_versions WHERE arxiv_id = ?", (base,)
+            ).fetchone()
+            latest = PaperVersion(*row) if row else None
+        return latest if latest is not None and latest.version < version else None
+
+    def record_unchanged_revisions(self, entry_ids: Iterable[str]):
+        """
+        立即记录内容未变化的修订版：新版本号加入已记录集合，版本表中的内容哈希和存储位置沿用原记录
+
+        Args:
+            entry_ids: 修订版的 entry_id
+        """
+        now = datetime.now().isoformat()
+        rows = [split_arxiv_id(entry_id) for entry_id in entry_ids]
+        if not rows:
+            return
+        with self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO seen_papers (arxiv_id, version, first_seen) VALUES (?, ?, ?)",
+                                   ((base, version, now) for base, version in rows))
+            self._conn.executemany("UPDATE paper_versions SET version = ?, updated_at = ? "
+                                   "WHERE arxiv_id = ? AND version < ?",
+                                   ((version, now, base, version) for base, version in rows))
+
+    def add_many(self, entry_ids: Iterable[str]):
+        """批量记录论文（在 commit 之前不会持久化）"""
+        self._pending.update(entry_ids)
+
+    def commit(self):
+        """持久化本次记录的论文和最新版本（单个事务内追加插入）"""
+        if not self._pending:
+            return
+        now = datetime.now().isoformat()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_papers (arxiv_id, version, first_seen) VALUES (?, ?, ?)",
+                ((*split_arxiv_id(entry_id), now) for entry_id in self._pending),
+            )
+            self._conn.executemany(
+                "INSERT INTO paper_versions (arxiv_id, version, content_hash, entry_id, data_dir, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(arxiv_id) DO UPDATE SET "
+                "version = excluded.version, content_hash = excluded.content_hash, entry_id = excluded.entry_id, "
+                "data_dir = excluded.data_dir, updated_at = excluded.updated_at "
+                "WHERE excluded.version >= paper_versions.version",
+                ((base, *version, now) for base, version in self._pending_versions.items()),
+            )
+        self._pending.clear()
+        self._pending_versions.clear()
+
+    def rollback(self):
+        """丢弃尚未提交的记录（运行失败、论文未保存时调用）"""
+        self._pending.clear()
+        self._pending_versions.clear()
+
+    def import_legacy_file(self, json_file) -> int:
+        """
+        导入旧版 recorded_papers.json 中的论文 ID
+
+        Args:
+            json_file: recorded_papers.json 路径
+
+        Returns:
+            读取到的论文 ID 数量
+        """
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                paper_ids = json.load(f).get('paper_ids', [])
+        except Exception as e:
+            logger.warning(f"读取旧版已记录论文失败: {e}")
+            return 0
+        self.add_many(paper_ids)
+        self.commit()
+        return len(paper_ids)
+
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
+
+
+class WatermarkStore:
+    """增量抓取水位线：每个查询分片已处理论文的最新提交时间（UTC）"""
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path: SQLite 数据库文件路径（与 SeenPaperStore 共用）
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS watermarks ("
+            " shard TEXT PRIMARY KEY,"
+            " watermark TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL"
+            ")"
+        )
+        self._conn.commit()
+        # 本次运行中推进的水位线，commit 之前不会持久化
+        self._pending: Dict[str, datetime] = {}
+
+    def get(self, shard: str) -> Optional[datetime]:
+        """
+        读取分片的已提交水位线
+
+        Args:
+            shard: 分片键（arXiv 分类，或 "*" 表示不分分类）
+
+        Returns:
+            带时区的 UTC 时间，没有水位线时返回 None
+        """
+        row = self._conn.execute("SELECT watermark FROM watermarks WHERE shard = ?", (shard,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def advance(self, shard: str, timestamp: datetime):
+        """推进分片水位线（只会变大，commit 之前不会持久化）"""
+        timestamp = timestamp.astimezone(timezone.utc)
+        current = self._pending.get(shard)
+        if current is None or timestamp > current:
+            self._pending[shard] = timestamp
+
+    def commit(self):
+        """持久化本次推进的水位线"""
+        if not self._pending:
+            return
+        now = datetime.now().isoformat()
+        with self._conn:
+            for shard, timestamp in self._pending.items():
+                current = self.get(shard)
+                if current is None or timestamp > current:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO watermarks (shard, watermark, updated_at) VALUES (?, ?, ?)",
+                        (shard, timestamp.isoformat(), now),
+                    )
+        self._pending.clear()
+
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
+
+
+class AnnouncementLog:
+    """已处理的 arXiv 公告批次（每个分类每个公告日一批），保证每批只处理一次"""
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path: SQLite 数据库文件路径（与 SeenPaperStore 共用）
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS announcement_batches ("
+            " batch_id TEXT PRIMARY KEY,"
+            " category TEXT NOT NULL,"
+            " announced TEXT NOT NULL,"
+            " papers INTEGER NOT NULL,"
+            " fetched_at TEXT NOT NULL"
+            ")"
+        )
+        self._conn.commit()
+        # 本次运行处理的批次，commit 之前不会持久化
+        self._pending: List[Tuple[str, str, date, int]] = []
+
+    def latest(self, category: str) -> Optional[date]:
+        """
+        读取分类最近一个已处理批次的公告日期
+
+        Args:
+            category: arXiv 分类
+
+        Returns:
+            公告日期，没有处理过该分类时返回 None
+        """
+        row = self._conn.execute("SELECT MAX(announced) FROM announcement_batches WHERE category = ?",
+                                 (category,)).fetchone()
+        return date.fromisoformat(row[0]) if row and row[0] else None
+
+    def add(self, batch_id: str, category: str, announced: date, papers: int):
+        """记录一个已处理的批次（commit 之前不会持久化）"""
+        self._pending.append((batch_id, category, announced, papers))
+
+    def commit(self):
+        """持久化本次处理的批次"""
+        if not self._pending:
+            return
+        now = datetime.now().isoformat()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO announcement_batches (batch_id, category, announced, papers, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(batch_id, category, announced.isoformat(), papers, now)
+                 for batch_id, category, announced, papers in self._pending],
+            )
+        self._pending.clear()
+
+    def rollback(self):
+        """丢弃本次处理但尚未提交的批次"""
+        self._pending.clear()
+
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
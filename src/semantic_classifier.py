@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+语义分类阶段
+用特征哈希把标题和摘要向量化（一元词 + 相邻二元词，次线性词频，L2 归一化），
+与各分类的质心向量计算余弦相似度，超过分类阈值即打上该分类标签；
+用于补充关键词匹配漏掉的同义表述（例如没有写 "KV cache" 的 "attention state reuse"）。
+向量按 arXiv ID 缓存在磁盘上（SQLite），重复运行时不再重新计算
+"""
+
+import logging
+import sqlite3
+import threading
+import zlib
+from array import array
+from collections import Counter
+from math import hypot, log, sqrt
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from .keyword_matcher import _SEPARATORS, stem_token
+except ImportError:
+    from keyword_matcher import _SEPARATORS, stem_token
+
+logger = logging.getLogger(__name__)
+
+# 稀疏向量：(特征下标数组, 权重数组)，下标升序
+SparseVector = Tuple[array, array]
+
+# 哈希空间维度（2^18，冲突概率足够低）
+DEFAULT_DIM = 1 << 18
+
+# 默认语义阈值（余弦相似度）
+DEFAULT_THRESHOLD = 0.1
+
+# 不参与向量化的常见虚词
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or our that the their this "
+    "to was we were which with these those can via using use based show than such also both".split()
+)
+
+_TRANSLATION = str.maketrans(dict.fromkeys(_SEPARATORS, " "))
+
+# 次线性词频 1 + log(tf) 的查表（tf 较小时）
+_SUBLINEAR_TF = [0.0] + [1.0 + log(tf) for tf in range(1, 64)]
+
+
+def embedding_key(entry_id: str) -> str:
+    """向量缓存键：带版本的 arXiv ID（新版本的摘要可能变化，需要重新计算）"""
+    return entry_id.split("/abs/", 1)[-1]
+
+
+class HashingVectorizer:
+    """无状态的特征哈希向量化器（不需要语料统计，任意进程中结果一致）"""
+
+    def __init__(self, dim: int = DEFAULT_DIM, ngram: int = 2, stemming: bool = True):
+        """
+        Args:
+            dim: 哈希空间维度
+            ngram: 最大 n 元词长度（1 或 2）
+            stemming: 是否对 token 做轻量词干化
+        """
+        self.dim = dim
+        self.ngram = max(1, min(2, ngram))
+        self.stemming = stemming
+        # 原始词 -> 词干的稳定哈希（同一个词只做一次词干化和 CRC32）
+        self._hashes: Dict[str, int] = {}
+
+    @property
+    def signature(self) -> str:
+        """向量化参数签名：参数变化后磁盘缓存中的旧向量失效"""
+        return f"hash-v2:{self.dim}:{self.ngram}:{int(self.stemming)}"
+
+    def _token_hashes(self, text: str) -> List[int]:
+        """小写、去标点、去虚词并词干化后各 token 的哈希"""
+        hashes = self._hashes
+        if len(hashes) > 200000:
+            hashes.clear()
+        words = [w for w in text.lower().translate(_TRANSLATION).split() if w not in STOP_WORDS]
+        for word in words:
+            if word not in hashes:
+                token = stem_token(word) if self.stemming else word
+                hashes[word] = zlib.crc32(token.encode('utf-8'))
+        return list(map(hashes.__getitem__, words))
+
+    def transform(self, text: str) -> SparseVector:
+        """
+        向量化一段文本
+
+        Args:
+            text: 文本
+
+        Returns:
+            L2 归一化的稀疏向量
+        """
+        hashes = self._token_hashes(text)
+        dim = self.dim
+        features = [h % dim for h in hashes]
+        if self.ngram > 1:
+            # 二元词的哈希由两个 token 的哈希组合得到，不需要拼接字符串
+            features += [(a * 0x9E3779B1 ^ b) % dim for a, b in zip(hashes, hashes[1:])]
+        counts = Counter(features)
+        if not counts:
+            return array('I'), array('f')
+        indices = sorted(counts)
+        weights = [_SUBLINEAR_TF[c] if c < len(_SUBLINEAR_TF) else 1.0 + log(c)
+                   for c in map(counts.__getitem__, indices)]
+        scale = 1.0 / hypot(*weights)
+        return array('I', indices), array('f', [w * scale for w in weights])
+
+
+class EmbeddingCache:
+    """论文向量的磁盘缓存（SQLite，按 arXiv ID 索引，线程安全，可被多个进程共享）"""
+
+    def __init__(self, db_path, signature: str):
+        """
+        Args:
+            db_path: 数据库路径
+            signature: 向量化参数签名，与缓存记录不一致时视为未命中
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.signature = signature
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " arxiv_id TEXT PRIMARY KEY,"
+            " signature TEXT NOT NULL,"
+            " indices BLOB NOT NULL,"
+            " weights BLOB NOT NULL"
+            ")"
+        )
+        self._conn.commit()
+
+    def get_many(self, arxiv_ids: Sequence[str]) -> Dict[str, SparseVector]:
+        """
+        批量读取缓存的向量
+
+        Args:
+            arxiv_ids: arXiv ID 列表
+
+        Returns:
+            命中的 {arXiv ID: 向量}
+        """
+        found: Dict[str, SparseVector] = {}
+        ids = list(dict.fromkeys(arxiv_ids))
+        with self._lock:
+            # SQLite 单条语句的参数个数有上限，分批查询
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT arxiv_id, indices, weights FROM embeddings"
+                    f" WHERE signature = ? AND arxiv_id IN ({', '.join('?' * len(batch))})",
+                    (self.signature, *batch),
+                ).fetchall()
+                for arxiv_id, indices, weights in rows:
+                    vector = (array('I'), array('f'))
+                    vector[0].frombytes(indices)
+                    vector[1].frombytes(weights)
+                    found[arxiv_id] = vector
+        return found
+
+    def put_many(self, vectors: Dict[str, SparseVector]):
+        """在单个事务中写入一批向量"""
+        if not vectors:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (arxiv_id, signature, indices, weights) VALUES (?, ?, ?, ?)",
+                ((arxiv_id, self.signature, indices.tobytes(), weights.tobytes())
+                 for arxiv_id, (indices, weights) in vectors.items()),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        self._conn.close()
+
+
+class SemanticClassifier:
+    """
+    基于分类质心的语义分类器
+    只有在 categories 配置中带有 semantic 段的分类参与，例如：
+        "KV Cache": {"keywords": "kv_cache",
+                     "semantic": {"threshold": 0.1, "examples": ["reuse of attention states across requests"]}}
+    质心为该分类关键词组中各关键词与 examples 的向量均值（L2 归一化）
+    """
+
+    def __init__(self, keywords_map: Dict[str, List], categories_config: Dict[str, Dict],
+                 options: Optional[Dict] = None, cache: Optional[EmbeddingCache] = None):
+        """
+        Args:
+            keywords_map: 关键词组字典
+            categories_config: 分类配置字典
+            options: 配置 semantic 段（dim / ngram / stemming）
+            cache: 向量磁盘缓存，None 表示不缓存
+        """
+        options = options or {}
+        self.vectorizer = HashingVectorizer(options.get('dim', DEFAULT_DIM), options.get('ngram', 2),
+                                            options.get('stemming', True))
+        self.cache = cache
+        # 累计的磁盘缓存命中数
+        self.cache_hits = 0
+        self.categories: List[str] = []
+        self.thresholds: List[float] = []
+        # 质心的倒排表：特征下标 -> ((分类序号, 权重), ...)；论文只需查其自身的特征
+        postings: Dict[int, List[Tuple[int, float]]] = {}
+        for category, config in categories_config.items():
+            semantic = config.get('semantic')
+            if not semantic:
+                continue
+            texts = [kw if isinstance(kw, str) else kw.get('keyword', '')
+                     for kw in keywords_map.get(config.get('keywords'), [])]
+            texts.extend(semantic.get('examples', []))
+            centroid = self._centroid(texts)
+            if not centroid:
+                logger.warning(f"分类 {category} 没有可用于语义匹配的关键词或示例，已跳过")
+                continue
+            position = len(self.categories)
+            self.categories.append(category)
+            self.thresholds.append(float(semantic.get('threshold', DEFAULT_THRESHOLD)))
+            for index, weight in centroid.items():
+                postings.setdefault(index, []).append((position, weight))
+        self._postings = {index: tuple(entries) for index, entries in postings.items()}
+
+    def __bool__(self) -> bool:
+        return bool(self.categories)
+
+    def _centroid(self, texts: Iterable[str]) -> Dict[int, float]:
+        """各文本向量的均值（L2 归一化）"""
+        total: Dict[int, float] = {}
+        for text in texts:
+            indices, weights = self.vectorizer.transform(text)
+            for index, weight in zip(indices, weights):
+                total[index] = total.get(index, 0.0) + weight
+        norm = sqrt(sum(w * w for w in total.values()))
+        return {index: weight / norm for index, weight in total.items()} if norm else {}
+
+    def scores(self, vector: SparseVector) -> List[float]:
+        """论文向量与各分类质心的余弦相似度（与 self.categories 顺序一致）"""
+        scores = [0.0] * len(self.categories)
+        postings = self._postings
+        for index, weight in zip(*vector):
+            entries = postings.get(index)
+            if entries:
+                for position, centroid_weight in entries:
+                    scores[position] += weight * centroid_weight
+        return scores
+
+    def embed_batch(self, papers: Sequence[Tuple[str, str]]) -> List[SparseVector]:
+        """
+        批量向量化（先查磁盘缓存，未命中的计算后在一个事务中写回）
+
+        Args:
+            papers: (arXiv ID, 文本) 列表
+
+        Returns:
+            与输入顺序一致的向量列表
+        """
+        cached = self.cache.get_many([arxiv_id for arxiv_id, _ in papers]) if self.cache is not None else {}
+        computed: Dict[str, SparseVector] = {}
+        vectors = []
+        for arxiv_id, text in papers:
+            vector = cached.get(arxiv_id) or computed.get(arxiv_id)
+            if vector is None:
+                vector = computed[arxiv_id] = self.vectorizer.transform(text)
+            vectors.append(vector)
+        if self.cache is not None:
+            self.cache.put_many(computed)
+        self.cache_hits += len(papers) - len(computed)
+        return vectors
+
+    def classify_batch(self, papers: Sequence[Tuple[str, str]]) -> List[List[str]]:
+        """
+        对一批论文做语义分类
+
+        Args:
+            papers: (arXiv ID, 标题 + 摘要) 列表
+
+        Returns:
+            与输入顺序一致的语义分类列表（按配置顺序）
+        """
+        if not self.categories or not papers:
+            return [[] for _ in papers]
+        categories, thresholds = self.categories, self.thresholds
+        results = []
+        for vector in self.embed_batch(papers):
+            scores = self.scores(vector)
+            results.append([categories[i] for i, score in enumerate(scores) if score >= thresholds[i]])
+        return results
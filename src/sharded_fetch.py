@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+分片并发抓取
+将日期窗口按天拆分（可选再按 arXiv 分类拆分），用有界线程池并发抓取，
+所有分片共享同一个限速器，结果按 entry_id 合并去重；
+各分片逐页拉取的论文经有界队列交给调用方，不在内存中缓存整个分片
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+try:
+    from .arxiv_api import ArxivAPIClient, ArxivEntry
+except ImportError:
+    from arxiv_api import ArxivAPIClient, ArxivEntry
+
+logger = logging.getLogger(__name__)
+
+# 分片抓取完成标记
+_SHARD_DONE = object()
+
+
+class _ShardError:
+    """在队列中传递分片抓取的异常"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class Shard(NamedTuple):
+    """一个查询分片"""
+    label: str
+    query: str
+    category: str = ""
+    day: Optional[date] = None
+
+    @property
+    def watermark_key(self) -> str:
+        """增量抓取水位线的键：同一分类的各天分片共用一条水位线"""
+        return self.category or "*"
+
+
+def build_shards(start_date: date, end_date: date, categories: Iterable[str] = None,
+                 filters: List[str] = None) -> List[Shard]:
+    """
+    构建查询分片：每天一个 submittedDate 子窗口，指定分类时再与 cat: 条件组合
+
+    Args:
+        start_date: 起始日期（含）
+        end_date: 结束日期（含）
+        categories: arXiv 分类列表（如 cs.DC、cs.LG），为空则不按分类拆分
+        filters: 服务端关键词过滤表达式（QueryPlanner.filters），每个分片再按表达式拆分，结果取并集
+
+    Returns:
+        分片列表（按日期从新到旧）
+    """
+    if filters:
+        return [
+            Shard(f"{shard.label}/q{i}", f"{shard.query} AND {expression}", shard.category, shard.day)
+            for shard in build_shards(start_date, end_date, categories)
+            for i, expression in enumerate(filters, 1)
+        ]
+    categories = list(categories or [])
+    shards = []
+    day = end_date
+    while day >= start_date:
+        day_str = day.strftime("%Y%m%d")
+        date_clause = f"submittedDate:[{day_str}000000 TO {day_str}235959]"
+        if categories:
+            for category in categories:
+                shards.append(Shard(f"{day_str}/{category}", f"cat:{category} AND {date_clause}", category, day))
+        else:
+            shards.append(Shard(day_str, date_clause, day=day))
+        day -= timedelta(days=1)
+    return shards
+
+
+class ShardedFetcher:
+    """使用有界线程池并发抓取多个分片"""
+
+    def __init__(self, client: ArxivAPIClient, workers: int = 4, max_results_per_shard: Optional[int] = None,
+                 queue_size: int = 1000, cutoffs: Dict[str, datetime] = None):
+        """
+        Args:
+            client: arXiv API 客户端（其限速器在所有工作线程之间共享）
+            workers: 最大并发分片数
+            max_results_per_shard: 每个分片的结果上限，None 表示不限制
+            queue_size: 工作线程与调用方之间的队列容量（论文数）
+            cutoffs: 增量抓取截止时间（键为 Shard.watermark_key）：结果按提交时间从新到旧排列，
+                遇到不晚于截止时间的论文即停止翻页
+        """
+        self.client = client
+        self.workers = max(1, workers)
+        self.max_results_per_shard = max_results_per_shard
+        self.queue_size = queue_size
+        self.cutoffs = cutoffs or {}
+
+    @staticmethod
+    def _put(out: queue.Queue, item, stop: threading.Event) -> bool:
+        """向有界队列放入元素；调用方已停止时返回 False"""
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fetch_shard(self, shard: Shard, out: queue.Queue, stop: threading.Event):
+        """逐页抓取单个分片，论文逐条放入队列，结束时放入完成标记或异常"""
+        count = 0
+        cutoff = self.cutoffs.get(shard.watermark_key)
+        try:
+            for entry in self.client.results(shard.query, max_results=self.max_results_per_shard):
+                if cutoff is not None and entry.published <= cutoff:
+                    break
+                if not self._put(out, entry, stop):
+                    return
+                count += 1
+        except BaseException as e:
+            self._put(out, _ShardError(e), stop)
+            return
+        logger.info(f"分片 {shard.label} 获取 {count} 篇论文")
+        self._put(out, _SHARD_DONE, stop)
+
+    def _before_cutoff(self, shard: Shard) -> bool:
+        """分片所在日期整天早于截止时间（无需请求）"""
+        cutoff = self.cutoffs.get(shard.watermark_key)
+        return cutoff is not None and shard.day is not None and shard.day < cutoff.date()
+
+    def iter_fetch(self, shards: List[Shard]) -> Iterator[ArxivEntry]:
+        """
+        并发抓取所有分片，论文一到达就产出（只在内存中保留已产出的 entry_id 用于去重）
+
+        Args:
+            shards: 分片列表
+
+        Yields:
+            按 entry_id 去重后的论文（按到达顺序）
+        """
+        shards = [shard for shard in shards if not self._before_cutoff(shard)]
+        seen_ids = set()
+        out: queue.Queue = queue.Queue(self.queue_size)
+        stop = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="arxiv-shard")
+        try:
+            for shard in shards:
+                pool.submit(self._fetch_shard, shard, out, stop)
+            remaining = len(shards)
+            while remaining:
+                item = out.get()
+                if item is _SHARD_DONE:
+                    remaining -= 1
+                elif isinstance(item, _ShardError):
+                    raise item.error
+                elif item.entry_id not in seen_ids:
+                    seen_ids.add(item.entry_id)
+                    yield item
+        finally:
+            # 某个分片失败或调用方提前停止时，取消尚未开始的分片，并让运行中的分片尽快退出
+            stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+        logger.info(f"共 {len(shards)} 个分片，合并去重后 {len(seen_ids)} 篇论文")
+
+    def fetch(self, shards: List[Shard]) -> List[ArxivEntry]:
+        """
+        并发抓取所有分片并按 entry_id 去重合并
+
+        Args:
+            shards: 分片列表
+
+        Returns:
+            去重后的论文列表（按提交时间从新到旧）
+        """
+        return sorted(self.iter_fetch(shards), key=lambda e: e.published, reverse=True)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+本地 arXiv API 替身：在本地 HTTP 端口上按查询条件返回 Atom 响应，用于离线测试
+"""
+
+import hashlib
+import re
+import threading
+import time
+import urllib.parse
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+_DATE_RE = re.compile(r"submittedDate:\[(\d{14}) TO (\d{14})\]")
+_QUERY_TOKEN_RE = re.compile(r'\(|\)|\bAND\b|\bOR\b|\w+:\[[^\]]*\]|\w+:"[^"]*"|\w+:[^\s()]+')
+_WORD_RE = re.compile(r"[0-9a-z]+")
+
+
+def make_entry(arxiv_id: str, title: str, summary: str, submitted: str,
+               categories: List[str] = None, authors: List[str] = None, updated: str = None) -> Dict:
+    """
+    构造一个测试论文条目
+
+    Args:
+        arxiv_id: 论文编号（含版本，如 2501.00001v1）
+        title: 标题
+        summary: 摘要
+        submitted: 提交时间，格式 YYYY-MM-DDTHH:MM:SSZ
+        categories: arXiv 分类列表
+        authors: 作者列表
+        updated: 更新时间，默认与提交时间相同
+    """
+    return {
+        "id": arxiv_id,
+        "title": title,
+        "summary": summary,
+        "published": submitted,
+        "updated": updated or submitted,
+        "categories": categories or ["cs.LG"],
+        "authors": authors or ["Alice", "Bob"],
+    }
+
+
+@lru_cache(maxsize=65536)
+def _words(text: str) -> List[str]:
+    """近似 arXiv 检索的分词：小写、按非字母数字切分、去掉复数 s"""
+    return [w[:-1] if len(w) > 3 and w.endswith("s") else w for w in _WORD_RE.findall(text.lower())]
+
+
+def _field_matches(entry: Dict, field: str, value: str) -> bool:
+    """单个字段条件"""
+    if field == "submittedDate":
+        low, high = _DATE_RE.match(f"{field}:{value}").groups()
+        return low <= re.sub(r"\D", "", entry["published"])[:14] <= high
+    if field == "cat":
+        return value in entry["categories"]
+    texts = {"ti": [entry["title"]], "abs": [entry["summary"]], "all": [entry["title"], entry["summary"]]}[field]
+    phrase = _words(value.strip('"'))
+    for text in texts:
+        words = _words(text)
+        if any(words[i:i + len(phrase)] == phrase for i in range(len(words) - len(phrase) + 1)):
+            return True
+    return False
+
+
+def entry_matches(entry: Dict, query: str) -> bool:
+    """判断条目是否满足查询（支持 submittedDate 区间、cat:/ti:/abs:/all: 条件、AND/OR 与括号，AND 优先）"""
+    tokens = _QUERY_TOKEN_RE.findall(query)
+    pos = 0
+
+    def parse_or() -> bool:
+        nonlocal pos
+        result = parse_and()
+        while pos < len(tokens) and tokens[pos] == "OR":
+            pos += 1
+            result = parse_and() or result
+        return result
+
+    def parse_and() -> bool:
+        nonlocal pos
+        result = parse_term()
+        while pos < len(tokens) and tokens[pos] == "AND":
+            pos += 1
+            result = parse_term() and result
+        return result
+
+    def parse_term() -> bool:
+        nonlocal pos
+        token = tokens[pos]
+        pos += 1
+        if token == "(":
+            result = parse_or()
+            pos += 1  # ")"
+            return result
+        field, value = token.split(":", 1)
+        return _field_matches(entry, field, value)
+
+    return parse_or() if tokens else True
+
+
+def render_feed(entries: List[Dict], total: int, start: int) -> bytes:
+    """渲染 Atom 响应"""
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">',
+        '<title>arXiv Query</title>',
+        f'<opensearch:totalResults>{total}</opensearch:totalResults>',
+        f'<opensearch:startIndex>{start}</opensearch:startIndex>',
+        f'<opensearch:itemsPerPage>{len(entries)}</opensearch:itemsPerPage>',
+    ]
+    for e in entries:
+        parts.append("<entry>")
+        parts.append(f"<id>http://arxiv.org/abs/{e['id']}</id>")
+        parts.append(f"<updated>{e['updated']}</updated>")
+        parts.append(f"<published>{e['published']}</published>")
+        parts.append(f"<title>{escape(e['title'])}</title>")
+        parts.append(f"<summary>{escape(e['summary'])}</summary>")
+        for name in e["authors"]:
+            parts.append(f"<author><name>{escape(name)}</name></author>")
+        parts.append(f'<link href="http://arxiv.org/abs/{e["id"]}" rel="alternate" type="text/html"/>')
+        parts.append(f'<link title="pdf" href="http://arxiv.org/pdf/{e["id"]}" rel="related" type="application/pdf"/>')
+        parts.append(f'<arxiv:primary_category term="{e["categories"][0]}"/>')
+        for cat in e["categories"]:
+            parts.append(f'<category term="{cat}" scheme="http://arxiv.org/schemas/atom"/>')
+        parts.append("</entry>")
+    parts.append("</feed>")
+    return "\n".join(parts).encode("utf-8")
+
+
+class AtomFixtureServer:
+    """在后台线程中运行的 Atom 测试服务器，记录收到的每个请求"""
+
+    def __init__(self, entries: List[Dict], fail_requests: int = 0, fail_starts=()):
+        """
+        Args:
+            entries: 测试论文条目
+            fail_requests: 前多少个请求返回 503（用于测试重试）
+            fail_starts: 这些起始偏移的请求总是返回 503（用于测试中途失败）
+        """
+        self.entries = sorted(entries, key=lambda e: e["published"], reverse=True)
+        self.requests: List[Dict] = []
+        self.fail_requests = fail_requests
+        self.fail_starts = set(fail_starts)
+        self._lock = threading.Lock()
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+                query = params.get("search_query", [""])[0]
+                start = int(params.get("start", ["0"])[0])
+                page_size = int(params.get("max_results", ["10"])[0])
+                matched = [e for e in fixture.entries if entry_matches(e, query)]
+                body = render_feed(matched[start:start + page_size], len(matched), start)
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                not_modified = self.headers.get("If-None-Match") == etag
+                with fixture._lock:
+                    fixture.requests.append({"query": query, "start": start, "time": time.monotonic(),
+                                             "not_modified": not_modified, "client": self.client_address})
+                    failing = len(fixture.requests) <= fixture.fail_requests or start in fixture.fail_starts
+                if failing:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if not_modified:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/atom+xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """查询接口地址"""
+        return f"http://127.0.0.1:{self._server.server_address[1]}/api/query"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,28 @@
+"""
+pytest 公共夹具
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import arxiv_fetcher
+from arxiv_fetcher import ArxivPaperFetcher
+
+
+@pytest.fixture(autouse=True)
+def isolated_result_dir(tmp_path, monkeypatch):
+    """将默认结果目录（全局去重索引、响应缓存）指向临时目录，避免测试之间共享状态"""
+    result_dir = tmp_path / "result"
+    monkeypatch.setattr(arxiv_fetcher, "RESULT_DIR", result_dir)
+    return result_dir
+
+
+@pytest.fixture
+def fetcher(tmp_path):
+    """使用项目 config.json 的抓取工具，数据目录位于临时目录"""
+    return ArxivPaperFetcher(data_dir=str(tmp_path / "test_output"), config_file="config.json")
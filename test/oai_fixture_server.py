@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+本地 arXiv OAI-PMH 替身：按 set / from / until 返回 arXivRaw 格式的 ListRecords 响应，
+用 resumptionToken 分页，用于离线测试批量收割
+"""
+
+import threading
+import urllib.parse
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+
+def _rfc2822(stamp: str) -> str:
+    """YYYY-MM-DDTHH:MM:SSZ -> Thu, 2 Jan 2025 08:00:00 GMT"""
+    return datetime.strptime(stamp, "%Y-%m-%dT%H:%M:%SZ").strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+
+def in_set(entry: Dict, set_spec: str) -> bool:
+    """set 为分类本身（cs.LG）或其前缀（cs）"""
+    return not set_spec or any(c == set_spec or c.startswith(set_spec + ".") for c in entry["categories"])
+
+
+def render_record(entry: Dict, deleted: bool = False) -> str:
+    """渲染一条 arXivRaw 记录（make_entry 构造的条目；版本号取 ID 后缀，v1 为提交时间，最新版本为更新时间）"""
+    base_id, version = entry["id"].rsplit("v", 1)
+    status = ' status="deleted"' if deleted else ""
+    header = (f'<header{status}><identifier>oai:arXiv.org:{base_id}</identifier>'
+              f'<datestamp>{entry["updated"][:10]}</datestamp></header>')
+    if deleted:
+        return f"<record>{header}</record>"
+    versions = []
+    for n in range(1, int(version) + 1):
+        stamp = entry["published"] if n == 1 else entry["updated"]
+        versions.append(f'<version version="v{n}"><date>{_rfc2822(stamp)}</date><size>1kb</size></version>')
+    authors = ", ".join(entry["authors"][:-1]) + " and " + entry["authors"][-1] \
+        if len(entry["authors"]) > 1 else entry["authors"][0]
+    return (
+        f"<record>{header}<metadata>"
+        '<arXivRaw xmlns="http://arxiv.org/OAI/arXivRaw/">'
+        f"<id>{base_id}</id><submitter>{escape(entry['authors'][0])}</submitter>{''.join(versions)}"
+        f"<title>{escape(entry['title'])}</title><authors>{escape(authors)}</authors>"
+        f"<categories>{' '.join(entry['categories'])}</categories>"
+        f"<abstract>  {escape(entry['summary'])}\n</abstract>"
+        "</arXivRaw></metadata></record>"
+    )
+
+
+def render_response(body: str) -> bytes:
+    """渲染 OAI-PMH 响应"""
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">'
+        f"<responseDate>2025-01-01T00:00:00Z</responseDate><request>http://localhost/oai</request>{body}"
+        "</OAI-PMH>"
+    ).encode("utf-8")
+
+
+class OAIFixtureServer:
+    """在后台线程中运行的 OAI-PMH 测试服务器，记录收到的每个请求的参数"""
+
+    def __init__(self, entries: List[Dict], page_size: int = 2, deleted_ids=(), fail_requests: int = 0):
+        """
+        Args:
+            entries: 测试论文条目（atom_fixture_server.make_entry 构造）
+            page_size: 每页记录数
+            deleted_ids: 以已删除记录返回的论文编号
+            fail_requests: 前多少个请求返回 503（Retry-After: 0）
+        """
+        self.entries = entries
+        self.page_size = page_size
+        self.deleted_ids = set(deleted_ids)
+        self.fail_requests = fail_requests
+        self.requests: List[Dict] = []
+        # 失效的 resumptionToken（下一次使用时返回 badResumptionToken）
+        self.expired_tokens = set()
+        # 该请求序号（从 1 开始）之后的请求都返回 503，模拟收割中途失败
+        self.fail_after = None
+        self._lock = threading.Lock()
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, code: int, body: bytes = b"", headers: Dict = None):
+                self.send_response(code)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "text/xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                params = {k: v[0] for k, v in urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query).items()}
+                with fixture._lock:
+                    fixture.requests.append(params)
+                    count = len(fixture.requests)
+                if count <= fixture.fail_requests or (fixture.fail_after is not None and count > fixture.fail_after):
+                    self._send(503, headers={"Retry-After": "0"})
+                    return
+                token = params.get("resumptionToken")
+                if token is not None:
+                    if token in fixture.expired_tokens:
+                        # 只失效一次：从头收割时重新签发的同名 token 有效
+                        fixture.expired_tokens.discard(token)
+                        self._send(200, render_response('<error code="badResumptionToken">expired</error>'))
+                        return
+                    set_spec, from_date, until_date, offset = token.split("|")
+                    offset = int(offset)
+                else:
+                    set_spec, from_date, until_date = (params.get(k, "") for k in ("set", "from", "until"))
+                    offset = 0
+                matched = [e for e in fixture.entries if in_set(e, set_spec)
+                           and (not from_date or e["updated"][:10] >= from_date)
+                           and (not until_date or e["updated"][:10] <= until_date)]
+                if not matched:
+                    self._send(200, render_response('<error code="noRecordsMatch">none</error>'))
+                    return
+                page = matched[offset:offset + fixture.page_size]
+                records = "".join(render_record(e, e["id"] in fixture.deleted_ids) for e in page)
+                next_offset = offset + len(page)
+                next_token = f"{set_spec}|{from_date}|{until_date}|{next_offset}" if next_offset < len(matched) else ""
+                resumption = (f'<resumptionToken cursor="{offset}" completeListSize="{len(matched)}">'
+                              f"{escape(next_token)}</resumptionToken>")
+                self._send(200, render_response(f"<ListRecords>{records}{resumption}</ListRecords>"))
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """OAI-PMH 接口地址"""
+        return f"http://127.0.0.1:{self._server.server_address[1]}/oai"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+本地 arXiv 公告 RSS 源替身：/rss/<分类> 返回该分类当前的公告批次，用于离线测试按公告批次抓取
+"""
+
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from xml.sax.saxutils import escape
+
+
+def render_item(entry: Dict, announce_type: str, announced: datetime) -> str:
+    """渲染一条公告（make_entry 构造的条目）"""
+    categories = "".join(f"<category>{c}</category>" for c in entry["categories"])
+    return (
+        f"<item><title>{escape(entry['title'])}</title>"
+        f"<link>https://arxiv.org/abs/{entry['id'].rsplit('v', 1)[0]}</link>"
+        f"<description>arXiv:{entry['id']} Announce Type: {announce_type} \n"
+        f"Abstract: {escape(entry['summary'])}</description>"
+        f'<guid isPermaLink="false">oai:arXiv.org:{entry["id"]}</guid>{categories}'
+        f"<pubDate>{format_datetime(announced)}</pubDate>"
+        f"<arxiv:announce_type>{announce_type}</arxiv:announce_type>"
+        f"<dc:creator>{escape(', '.join(entry['authors']))}</dc:creator></item>"
+    )
+
+
+def render_feed(category: str, announced: datetime, items: List[Tuple[Dict, str]]) -> bytes:
+    """渲染一个分类的 RSS 公告源（items 为 (条目, 公告类型)）"""
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss xmlns:arxiv="http://arxiv.org/schemas/atom" xmlns:dc="http://purl.org/dc/elements/1.1/" version="2.0">'
+        f"<channel><title>{category} updates on arXiv.org</title>"
+        f"<pubDate>{format_datetime(announced)}</pubDate>"
+        f"{''.join(render_item(entry, kind, announced) for entry, kind in items)}"
+        "</channel></rss>"
+    ).encode("utf-8")
+
+
+def announcement_time(day: str) -> datetime:
+    """公告日 YYYY-MM-DD 的公告时间（UTC 00:00）"""
+    return datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+class RSSFixtureServer:
+    """在后台线程中运行的公告源测试服务器，记录请求的分类"""
+
+    def __init__(self, batches: Dict[str, Tuple[str, List[Tuple[Dict, str]]]]):
+        """
+        Args:
+            batches: {分类: (公告日 YYYY-MM-DD, [(条目, 公告类型)])}，测试中可直接修改以模拟下一个公告日
+        """
+        self.batches = batches
+        self.requests: List[str] = []
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                category = self.path.rstrip("/").rsplit("/", 1)[-1]
+                fixture.requests.append(category)
+                day, items = fixture.batches.get(category, ("2025-01-01", []))
+                body = render_feed(category, announcement_time(day), items)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """RSS 源地址前缀"""
+        return f"http://127.0.0.1:{self._server.server_address[1]}/rss"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
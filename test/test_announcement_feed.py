@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+测试按公告批次抓取：RSS 公告源解析、公告类型筛选、交叉列出去重、每个批次只处理一次
+"""
+
+import io
+import sys
+from datetime import date
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from announcement_feed import parse_feed
+from atom_fixture_server import make_entry
+from rss_fixture_server import RSSFixtureServer, announcement_time, render_feed
+
+KV = make_entry("2501.00001v1", "Paged KV Cache", "A kv cache allocator.", "2025-01-01T08:00:00Z",
+                categories=["cs.DC"], authors=["Alice", "Bob", "Carol"])
+COMM = make_entry("2501.00002v1", "Fast Collectives", "We speed up allreduce for LLM training.",
+                  "2025-01-01T09:00:00Z", categories=["cs.LG", "cs.DC"])
+OTHER = make_entry("2501.00003v1", "Unrelated study", "Image classification.", "2025-01-01T10:00:00Z")
+VIDEO = make_entry("2412.00004v2", "Video Generation Serving System", "A system for video generation.",
+                   "2024-12-01T10:00:00Z", categories=["cs.DC"])
+KV2 = make_entry("2501.00005v1", "Another KV Cache", "kv cache compression.", "2025-01-01T11:00:00Z")
+
+
+def test_parse_feed():
+    """测试公告条目转换：论文编号、公告类型、摘要、作者与分类；没有公告时批次为空"""
+    batch = parse_feed(io.BytesIO(render_feed("cs.DC", announcement_time("2025-01-02"),
+                                              [(KV, "new"), (VIDEO, "replace")])), "cs.DC")
+    assert batch.batch_id == "cs.DC/2025-01-02"
+    assert [item.announce_type for item in batch.items] == ["new", "replace"]
+    entry = batch.items[0].entry
+    assert entry.entry_id == "http://arxiv.org/abs/2501.00001v1"
+    assert entry.title == "Paged KV Cache" and entry.summary == "A kv cache allocator."
+    assert [a.name for a in entry.authors] == ["Alice", "Bob", "Carol"]
+    assert entry.categories == ["cs.DC"] and entry.published == announcement_time("2025-01-02")
+    assert batch.items[1].entry.entry_id.endswith("2412.00004v2")
+
+    empty = parse_feed(io.BytesIO(render_feed("cs.DC", announcement_time("2025-01-04"), [])), "cs.DC")
+    assert empty.announced is None and empty.items == [] and empty.batch_id == ""
+
+
+def test_each_batch_processed_once(tmp_path):
+    """测试同一批公告只处理一次，交叉列出的论文只保存一次，替换版本按配置跳过，下一个公告日只处理新批次"""
+    from arxiv_fetcher import ArxivPaperFetcher
+
+    batches = {
+        "cs.DC": ("2025-01-02", [(KV, "new"), (COMM, "cross"), (OTHER, "new"), (VIDEO, "replace")]),
+        "cs.LG": ("2025-01-02", [(COMM, "new"), (KV2, "new")]),
+    }
+    with RSSFixtureServer(batches) as server:
+        fetcher = ArxivPaperFetcher(data_dir=str(tmp_path / "data"), config_file="config.json")
+        fetcher.fetch_config["request_interval"] = 0
+        fetcher.config["announcements"] = {"base_url": server.base_url, "categories": ["cs.DC", "cs.LG", "cs.CL"],
+                                           "types": ["new", "cross"]}
+
+        def saved():
+            return sorted(p["arxiv_id"] for p in fetcher.paper_store.iter_papers())
+
+        fetcher.run_daily_fetch(generate_report=False, announcements=True)
+        assert saved() == ["2501.00001v1", "2501.00002v1", "2501.00005v1"]
+        assert server.requests == ["cs.DC", "cs.LG", "cs.CL"]
+        assert fetcher.announcement_log.latest("cs.DC") == date(2025, 1, 2)
+        # cs.CL 没有公告，不记录批次
+        assert fetcher.announcement_log.latest("cs.CL") is None
+
+        # 同一公告日再次运行：批次已处理，不再分类
+        fetcher.run_daily_fetch(generate_report=False, announcements=True)
+        assert saved() == ["2501.00001v1", "2501.00002v1", "2501.00005v1"]
+
+        # 下一个公告日只有 cs.DC 发布了新批次
+        fetcher.config["announcements"]["types"] = ["new", "cross", "replace"]
+        batches["cs.DC"] = ("2025-01-03", [(VIDEO, "replace")])
+        fetcher.run_daily_fetch(generate_report=False, announcements=True)
+        assert saved() == ["2412.00004v2", "2501.00001v1", "2501.00002v1", "2501.00005v1"]
+        assert fetcher.announcement_log.latest("cs.DC") == date(2025, 1, 3)
+        assert fetcher.announcement_log.latest("cs.LG") == date(2025, 1, 2)
+        fetcher.close()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+测试 asyncio arXiv 客户端（使用本地 Atom 测试服务器）
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from arxiv_api import ArxivAPIError
+from async_arxiv_api import AsyncArxivClient, AsyncRateLimiter
+from atom_fixture_server import AtomFixtureServer, make_entry
+
+ENTRIES = [
+    make_entry(f"2501.{i:05d}v1", f"Paper {i}", "text", f"2025-01-{1 + i % 3:02d}T08:00:00Z",
+               ["cs.DC", "cs.LG"] if i % 2 else ["cs.LG"])
+    for i in range(25)
+]
+
+
+def test_paging_reuses_pooled_connections():
+    """测试分页请求复用 keep-alive 连接，记录字段与同步客户端一致"""
+    async def run(base_url):
+        async with AsyncArxivClient(base_url, page_size=4, rate_limiter=AsyncRateLimiter(0)) as client:
+            entries = [e async for e in client.results("cat:cs.LG")]
+            return entries, client.network_requests, client.connections_opened
+
+    with AtomFixtureServer(ENTRIES) as server:
+        entries, requests, connections = asyncio.run(run(server.base_url))
+
+    assert len(entries) == 25 and requests == 7
+    assert connections == 1
+    assert len({r["client"] for r in server.requests}) == 1
+    first = entries[0]
+    assert first.entry_id.startswith("http://arxiv.org/abs/")
+    assert first.authors[0].name == "Alice"
+    assert first.pdf_url.startswith("http://arxiv.org/pdf/")
+    assert first.published.tzinfo is not None and first.categories
+
+
+def test_concurrent_queries_dedup_and_rate_limit():
+    """测试并发查询去重合并，并共享限速"""
+    async def run(base_url):
+        async with AsyncArxivClient(base_url, page_size=5, concurrency=3,
+                                    rate_limiter=AsyncRateLimiter(0.05)) as client:
+            return [e async for e in client.results_many(["cat:cs.DC", "cat:cs.LG"])]
+
+    with AtomFixtureServer(ENTRIES) as server:
+        entries = asyncio.run(run(server.base_url))
+
+    assert len(entries) == len({e.entry_id for e in entries}) == 25
+    # 第 k 个请求不早于第一个请求之后 k 个间隔；时间由服务器线程记录，第一个请求可能被记晚，允许半个间隔的误差
+    times = sorted(r["time"] for r in server.requests)
+    assert all(t - times[0] >= k * 0.05 - 0.025 for k, t in enumerate(times))
+
+
+def test_retry_with_jittered_backoff():
+    """测试服务器出错时退避重试，超过重试次数后抛出异常"""
+    async def run(base_url, retries):
+        async with AsyncArxivClient(base_url, page_size=50, num_retries=retries, backoff_base=0.01,
+                                    rate_limiter=AsyncRateLimiter(0)) as client:
+            return [e async for e in client.results("cat:cs.LG")]
+
+    with AtomFixtureServer(ENTRIES, fail_requests=2) as server:
+        assert len(asyncio.run(run(server.base_url, 2))) == 25
+        assert len(server.requests) == 3
+
+    with AtomFixtureServer(ENTRIES, fail_requests=10) as server:
+        with pytest.raises(ArxivAPIError):
+            asyncio.run(run(server.base_url, 1))
+
+    client = AsyncArxivClient(backoff_base=1.0, backoff_max=5.0)
+    assert all(0 <= client._backoff(n) <= min(5.0, 2 ** n) for n in range(6) for _ in range(20))
+
+
+def test_queued_queries_do_not_time_out_waiting_for_rate_limit():
+    """测试排队查询数超过 timeout / min_interval 时，等待限速和连接池名额的时间不计入请求超时"""
+    queries = [f"cat:cs.C{i}" for i in range(10)]
+
+    async def run(base_url):
+        async with AsyncArxivClient(base_url, page_size=50, concurrency=4, num_retries=0, timeout=0.3,
+                                    rate_limiter=AsyncRateLimiter(0.1)) as client:
+            entries = [e async for e in client.results_many(queries)]
+            return entries, client.network_requests
+
+    with AtomFixtureServer(ENTRIES) as server:
+        entries, requests = asyncio.run(run(server.base_url))
+
+    assert entries == [] and requests == 10
+    assert sorted(r["query"] for r in server.requests) == sorted(queries)
+    times = sorted(r["time"] for r in server.requests)
+    assert times[-1] - times[0] >= 9 * 0.1 - 0.05
@@ -13,21 +13,21 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from arxiv_fetcher import ArxivPaperFetcher
 
 
-def test_config_loading():
+def test_config_loading(tmp_path):
     """测试配置文件加载"""
     print("=" * 60)
     print("测试 1: 配置文件加载")
     print("=" * 60)
     
     # 测试加载存在的配置文件
-    fetcher1 = ArxivPaperFetcher(data_dir="test_output", config_file="config.json")
+    fetcher1 = ArxivPaperFetcher(data_dir=str(tmp_path / "test_output"), config_file="config.json")
     print(f"✓ 成功加载配置文件")
     print(f"  分类数量: {len(fetcher1.categories_config)}")
     print(f"  System关键词数量: {len(fetcher1.system_keywords)}")
     print(f"  关键词组数量: {len(fetcher1.keywords_map)}")
     
     # 测试默认配置（不存在的配置文件）
-    fetcher2 = ArxivPaperFetcher(data_dir="test_output", config_file="nonexistent.json")
+    fetcher2 = ArxivPaperFetcher(data_dir=str(tmp_path / "test_output"), config_file="nonexistent.json")
     print(f"\n✓ 使用默认配置（配置文件不存在）")
     print(f"  分类数量: {len(fetcher2.categories_config)}")
     print(f"  System关键词数量: {len(fetcher2.system_keywords)}")
@@ -196,7 +196,8 @@ def main():
     print("=" * 60)
     
     # 测试1: 配置加载
-    fetcher = test_config_loading()
+    import tempfile
+    fetcher = test_config_loading(Path(tempfile.mkdtemp()))
     
     # 测试2: 关键词匹配
     match_ok = test_keyword_matching(fetcher)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+测试守护进程模式：cron 计划、防止重叠运行、状态接口和配置热重载
+"""
+
+import json
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from daemon import CronSchedule, FetchDaemon
+
+
+def _write_config(path: Path, **overrides) -> Path:
+    config = json.loads((Path(__file__).parent.parent / "config.json").read_text(encoding='utf-8'))
+    config.update(cache={"enabled": False}, daemon={"schedule": "*/5 * * * *", "port": 0})
+    config.update(overrides)
+    path.write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+    return path
+
+
+def _get(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, response.read().decode('utf-8')
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode('utf-8')
+
+
+def test_cron_schedule_next_fire():
+    """测试 cron 表达式的下一次触发时间（步长、范围、别名、日/星期“或”语义）"""
+    friday_evening = datetime(2025, 1, 3, 17, 50)
+    assert CronSchedule("*/15 9-17 * * 1-5").next_after(friday_evening) == datetime(2025, 1, 6, 9, 0)
+    assert CronSchedule("@daily").next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 2)
+    assert CronSchedule("30 2 * * *").next_after(datetime(2025, 1, 1, 2, 29, 59)) == datetime(2025, 1, 1, 2, 30)
+    # 13 号或星期五
+    assert CronSchedule("0 0 13 * 5").next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 3)
+    assert CronSchedule("0 0 29 2 *").next_after(datetime(2025, 3, 1)) == datetime(2028, 2, 29)
+    for expression in ("61 * * * *", "* * *", "0 0 31 2 *", "*/0 * * * *", "a * * * *"):
+        with pytest.raises(ValueError):
+            CronSchedule(expression)
+
+
+def test_overlapping_runs_are_skipped_and_status_is_served(tmp_path):
+    """测试上一次运行未结束时跳过新的触发，并通过 /healthz 与 /metrics 暴露状态"""
+    daemon = FetchDaemon(config_file=str(_write_config(tmp_path / "config.json")),
+                         data_dir=str(tmp_path / "day"))
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(**options):
+        calls.append(options)
+        release.wait(5)
+
+    daemon.fetcher.run_daily_fetch = slow_fetch
+    base_url = f"http://127.0.0.1:{daemon.start_server().server_address[1]}"
+    try:
+        assert daemon.trigger()
+        assert not daemon.trigger()
+        status, body = _get(f"{base_url}/healthz")
+        assert status == 200 and json.loads(body)["status"] == "running"
+        request = urllib.request.Request(f"{base_url}/run", method="POST")
+        with pytest.raises(urllib.error.HTTPError) as conflict:
+            urllib.request.urlopen(request, timeout=5)
+        assert conflict.value.code == 409
+
+        release.set()
+        daemon.join(5)
+        status, body = _get(f"{base_url}/healthz")
+        health = json.loads(body)
+        assert status == 200 and health["status"] == "ok"
+        assert health["runs"] == {"success": 1, "failure": 0, "skipped": 2}
+        assert health["schedule"] == ["*/5 * * * *"]
+        assert calls == [daemon.run_options] and calls[0]["days_back"] == 1
+
+        status, body = _get(f"{base_url}/metrics")
+        assert 'arxiv_fetcher_daemon_runs_total{status="skipped"} 2' in body
+        assert "arxiv_fetcher_daemon_last_success_timestamp_seconds" in body
+
+        def failing_fetch(**options):
+            raise RuntimeError("boom")
+
+        daemon.fetcher.run_daily_fetch = failing_fetch
+        assert daemon.trigger("http")
+        daemon.join(5)
+        status, body = _get(f"{base_url}/healthz")
+        assert status == 503 and json.loads(body)["last_run"]["error"] == "RuntimeError: boom"
+    finally:
+        release.set()
+        daemon.shutdown()
+
+
+def test_config_hot_reload(tmp_path):
+    """测试配置文件变化后热重载；无效配置保持当前配置；运行中推迟重载"""
+    config_file = _write_config(tmp_path / "config.json")
+    daemon = FetchDaemon(config_file=str(config_file), data_dir=str(tmp_path / "day"))
+    old_fetcher = daemon.fetcher
+    assert not daemon.check_reload()
+
+    def touch(path: Path):
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    config_file.write_text("{not json", encoding='utf-8')
+    touch(config_file)
+    assert not daemon.check_reload()
+    assert daemon.fetcher is old_fetcher
+
+    _write_config(config_file, keywords={"moe": ["mixture of experts"]},
+                  categories={"MoE": {"keywords": "moe"}}, daemon={"schedule": ["0 6 * * 1"], "port": 0})
+    touch(config_file)
+    with daemon._run_lock:
+        # 正在运行时不替换抓取工具
+        assert not daemon.check_reload()
+    assert daemon.check_reload()
+    assert daemon.fetcher is not old_fetcher and list(daemon.fetcher.categories_config) == ["MoE"]
+    assert [s.expression for s in daemon.schedules] == ["0 6 * * 1"]
+    assert daemon.next_run.weekday() == 0 and daemon.next_run.hour == 6
+    assert daemon.config_reloads == 1
+
+    _write_config(config_file, daemon={"run": {"days": 3}})
+    touch(config_file)
+    assert not daemon.check_reload()
+    daemon.shutdown()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+测试可续跑的抓取检查点：中途失败时保存到最后完成的页，--resume 从该页继续
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from arxiv_api import ArxivAPIError
+from atom_fixture_server import AtomFixtureServer, make_entry
+from fetch_checkpoint import FetchCheckpoint
+
+
+def _stamp(offset_hours: int) -> str:
+    return (datetime.now() - timedelta(hours=offset_hours)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def test_checkpoint_only_saves_confirmed_pages(tmp_path):
+    """测试只有完整处理的页内的匹配论文才会写入，续跑时截断之后追加的部分"""
+    checkpoint = FetchCheckpoint(tmp_path / "cp", every_pages=1)
+    checkpoint.begin("q", 10, [None], "2025-01-01T00:00:00")
+    checkpoint.page_done(2, 2)
+    checkpoint.add_matches([(0, None, {"id": "a"}), (2, None, {"id": "c"})])
+    assert checkpoint.advance(3)
+    assert checkpoint.state["offset"] == 2 and checkpoint.state["checked"] == 2
+
+    reopened = FetchCheckpoint(tmp_path / "cp")
+    with open(reopened.matches_file, "ab") as f:
+        f.write(b'{"profile": null, "paper": {"id": "partial"}}\n')
+    assert reopened.resume() == [(None, {"id": "a"})]
+    assert reopened.state["query"] == "q"
+
+
+def test_resume_continues_from_last_completed_page(tmp_path):
+    """测试抓取中途失败后不提交去重索引，--resume 只请求剩余的页，结果与完整运行一致"""
+    from arxiv_fetcher import ArxivPaperFetcher
+
+    entries = [make_entry(f"2501.{i:05d}v1", f"KV Cache {i}", "A kv cache allocator.", _stamp(i + 1))
+               for i in range(7)]
+    with AtomFixtureServer(entries, fail_starts={4}) as server:
+        fetcher = ArxivPaperFetcher(data_dir=str(tmp_path / "day"), config_file="config.json")
+        fetcher.fetch_config.update({"base_url": server.base_url, "request_interval": 0, "page_size": 2,
+                                     "checkpoint_pages": 1})
+        with pytest.raises(ArxivAPIError):
+            fetcher.run_daily_fetch(days_back=1, generate_report=False)
+        assert "http://arxiv.org/abs/2501.00000v1" not in fetcher.recorded_paper_ids
+        assert not list(fetcher.paper_store.iter_papers())
+        state = FetchCheckpoint(fetcher.result_dir / "fetch_checkpoint").load()
+        assert state["offset"] == 4 and state["pages"] == 2
+
+        server.fail_starts.clear()
+        before = len(server.requests)
+        fetcher.run_daily_fetch(days_back=1, generate_report=False, resume=True)
+        assert [r["start"] for r in server.requests[before:]] == [4, 6]
+
+    assert [p["arxiv_id"] for p in fetcher.paper_store.iter_papers()] == [e["id"] for e in entries]
+    assert not (fetcher.result_dir / "fetch_checkpoint").exists()
+    fetcher.close()
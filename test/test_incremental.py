@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+测试基于水位线的增量抓取
+"""
+
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from arxiv_api import ArxivAPIClient, RateLimiter
+from atom_fixture_server import AtomFixtureServer, make_entry
+from seen_store import WatermarkStore
+from sharded_fetch import ShardedFetcher, build_shards
+
+
+def _stamp(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def test_watermark_store_only_moves_forward(tmp_path):
+    """测试水位线只增不减，且 commit 之前不持久化"""
+    store = WatermarkStore(tmp_path / "seen.db")
+    t1 = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    store.advance("cs.DC", t1)
+    assert store.get("cs.DC") is None
+    store.commit()
+    store.advance("cs.DC", t1 - timedelta(days=1))
+    store.commit()
+    assert WatermarkStore(tmp_path / "seen.db").get("cs.DC") == t1
+
+
+def test_incremental_run_stops_at_watermark(tmp_path):
+    """测试增量运行只处理水位线之后的新论文，并在到达水位线时停止翻页"""
+    from arxiv_fetcher import ArxivPaperFetcher
+
+    now = datetime.now(timezone.utc)
+    entries = [
+        make_entry("2501.00001v1", "KV Cache A", "kv cache", _stamp(now - timedelta(hours=3))),
+        make_entry("2501.00002v1", "KV Cache B", "kv cache", _stamp(now - timedelta(hours=30))),
+    ]
+    with AtomFixtureServer(entries) as server:
+        fetcher = ArxivPaperFetcher(data_dir=str(tmp_path / "day"), config_file="config.json")
+        fetcher.fetch_config.update({"base_url": server.base_url, "request_interval": 0, "page_size": 1,
+                                     "watermark_overlap_hours": 0})
+        fetcher.run_daily_fetch(days_back=2, generate_report=False, incremental=True)
+        assert fetcher.watermarks.get("*") == now.replace(microsecond=0) - timedelta(hours=3)
+
+        server.entries.insert(0, make_entry("2501.00003v1", "KV Cache C", "kv cache",
+                                            _stamp(now - timedelta(hours=1))))
+        first_run_requests = len(server.requests)
+        fetcher.run_daily_fetch(days_back=2, generate_report=False, incremental=True)
+
+    assert len(server.requests) - first_run_requests == 2
+    assert {p['arxiv_id'] for p in fetcher.paper_store.iter_papers()} == {
+        "2501.00001v1", "2501.00002v1", "2501.00003v1"
+    }
+    assert fetcher.watermarks.get("*") == now.replace(microsecond=0) - timedelta(hours=1)
+
+
+def test_sharded_cutoff_skips_old_days():
+    """测试分片模式下早于水位线的整天分片不再请求"""
+    today = date.today()
+    entries = [make_entry(f"2501.{i:05d}v1", f"Paper {i}", "text",
+                          (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%dT08:00:00Z"))
+               for i in range(3)]
+    with AtomFixtureServer(entries) as server:
+        client = ArxivAPIClient(base_url=server.base_url, rate_limiter=RateLimiter(0))
+        cutoff = datetime.combine(today - timedelta(days=1), datetime.min.time(), timezone.utc)
+        fetcher = ShardedFetcher(client, workers=2, cutoffs={"*": cutoff})
+        results = fetcher.fetch(build_shards(today - timedelta(days=2), today))
+
+    assert len(server.requests) == 2
+    assert [r.entry_id.split("/")[-1] for r in results] == ["2501.00000v1", "2501.00001v1"]
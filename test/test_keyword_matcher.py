@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+测试预编译关键词匹配器
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from keyword_matcher import KeywordMatcher, SUBSTRING_SCAN_LIMIT
+
+
+def legacy_categorize(text, keywords_map, system_keywords, categories_config):
+    """原实现的分类逻辑，作为对照"""
+    categories = []
+    for category_name, category_config in categories_config.items():
+        keywords = keywords_map.get(category_config.get('keywords'), [])
+        if any(kw.lower() in text for kw in keywords):
+            if category_config.get('requires_system', False):
+                if any(sys_kw.lower() in text for sys_kw in system_keywords):
+                    categories.append(category_name)
+            else:
+                categories.append(category_name)
+    return categories
+
+
+def test_overlapping_and_nested_keywords():
+    """测试重叠、嵌套关键词与 system 限制"""
+    keywords_map = {
+        "video": ["video generation", "video generation model"],
+        "serving": ["serving system"],
+        "gather": ["all-ga", "gather op"],
+    }
+    categories = {
+        "Video (System)": {"keywords": "video", "requires_system": True},
+        "Serving": {"keywords": "serving", "requires_system": False},
+        "Gather": {"keywords": "gather", "requires_system": False},
+    }
+    matcher = KeywordMatcher(keywords_map, ["system", "engine"], categories)
+
+    assert matcher.match("a video generation model") == []
+    assert matcher.match("a video generation model serving system") == ["Video (System)", "Serving"]
+    assert matcher.match("all-gather op") == ["Gather"]
+    assert matcher.match("unrelated text") == []
+
+
+def test_equivalent_to_legacy_on_random_texts():
+    """测试在随机文本上与原实现结果一致（同时覆盖 in 扫描与正则扫描两种策略）"""
+    rng = random.Random(7)
+    alphabet = "abc -"
+    for group_count in (3, SUBSTRING_SCAN_LIMIT + 5):
+        keywords_map = {
+            f"g{i}": ["".join(rng.choices(alphabet, k=rng.randint(1, 4))) for _ in range(3)]
+            for i in range(group_count)
+        }
+        system_keywords = ["".join(rng.choices(alphabet, k=rng.randint(2, 4))) for _ in range(4)]
+        categories = {
+            f"C{i}": {"keywords": f"g{i}", "requires_system": i % 2 == 0}
+            for i in range(group_count)
+        }
+        categories["Missing"] = {"keywords": "not_a_group", "requires_system": False}
+        matcher = KeywordMatcher(keywords_map, system_keywords, categories)
+        for _ in range(300):
+            text = "".join(rng.choices(alphabet, k=rng.randint(0, 30)))
+            assert matcher.match(text) == legacy_categorize(
+                text, keywords_map, system_keywords, categories
+            ), text
+
+
+def test_fetcher_uses_matcher(fetcher):
+    """测试抓取工具的 _check_keywords 与 _categorize_paper"""
+    class MockPaper:
+        title = "Efficient KV Cache Management"
+        summary = "We design an inference system."
+
+    assert fetcher._check_keywords(MockPaper)
+    assert fetcher._categorize_paper(MockPaper) == ["KV Cache"]
+
+    MockPaper.title = "Nothing relevant"
+    assert not fetcher._check_keywords(MockPaper)
+    assert fetcher._categorize_paper(MockPaper) == ["Other"]
+
+
+def test_whole_word_token_matching():
+    """测试整词匹配、连字符折叠、词干化、区分大小写与近邻短语选项"""
+    keywords_map = {
+        "kv": ["kv cache"],
+        "comm": ["all-gather", {"keyword": "NCCL", "case_sensitive": True}],
+        "near": [{"keyword": "cache eviction", "proximity": 2}],
+        "sub": [{"keyword": "quantiz", "whole_word": False}],
+    }
+    categories = {
+        "KV": {"keywords": "kv", "requires_system": True},
+        "Comm": {"keywords": "comm"},
+        "Near": {"keywords": "near"},
+        "Sub": {"keywords": "sub"},
+    }
+    matcher = KeywordMatcher(keywords_map, ["system", "engine"], categories,
+                             {"whole_word": True, "stemming": True})
+
+    # 子串 system / engine 不再命中 ecosystem / engineering
+    assert matcher.match("KV caches in the ecosystem of prompt engineering") == []
+    assert matcher.match("KV-caches for a serving system") == ["KV"]
+    assert matcher.match("an all gather primitive") == ["Comm"]
+    assert matcher.match("nccl collectives") == []
+    assert matcher.match("NCCL collectives") == ["Comm"]
+    assert matcher.match("cache aware eviction policy") == ["Near"]
+    assert matcher.match("cache is never used for eviction") == []
+    assert matcher.match("weight quantization") == ["Sub"]
+
+
+def test_arxiv_category_prefilter():
+    """测试按 arXiv 分类预筛选：允许/排除列表（具体分类或大类）、全部排除时不读取文本、各分类的通过/拒绝计数"""
+    from types import SimpleNamespace
+
+    from keyword_matcher import ProfileMatcher
+    from metrics import RunMetrics
+
+    keywords_map = {"kv": ["kv cache"], "video": ["video generation"], "serving": ["serving"]}
+    categories = {
+        "KV": {"keywords": "kv", "arxiv_categories": ["cs.DC", "cs.LG"]},
+        "Video": {"keywords": "video", "exclude_arxiv_categories": ["astro-ph"]},
+        "Serving": {"keywords": "serving"},
+    }
+    matcher = KeywordMatcher(keywords_map, [], categories)
+    text = "KV cache and video generation serving"
+
+    def paper(*arxiv_categories):
+        return SimpleNamespace(title=text, summary="", categories=list(arxiv_categories))
+
+    assert matcher.match_paper(paper("cs.DC")) == ["KV", "Video", "Serving"]
+    assert matcher.match_paper(paper("cs.LG", "astro-ph.CO")) == ["KV", "Serving"]
+    assert matcher.match_paper(paper("astro-ph.GA")) == ["Serving"]
+    assert matcher.filter_categories(["KV", "Video"], ["math.OC"]) == ["Video"]
+
+    restricted = KeywordMatcher(keywords_map, [], {
+        "KV": {"keywords": "kv", "arxiv_categories": ["cs.*"]},
+        "Video": {"keywords": "video", "arxiv_categories": "cs.CV"},
+    })
+
+    class Untouchable:
+        """被预筛选拒绝的论文不应读取标题和摘要"""
+        categories = ["math.OC"]
+
+        @property
+        def title(self):
+            raise AssertionError("读取了被预筛选拒绝的论文文本")
+
+    assert restricted.match_paper(Untouchable(), count_prefilter=True) == []
+    assert restricted.match_paper(paper("cs.CV"), count_prefilter=True) == ["KV", "Video"]
+    assert restricted.match_paper(paper("cs.DC"), count_prefilter=True) == ["KV"]
+    metrics = RunMetrics()
+    restricted.report_prefilter(metrics)
+    counters = metrics.to_dict()["counters"]
+    assert counters["prefilter_passed"] == {"KV": 2, "Video": 1}
+    assert counters["prefilter_rejected"] == {"KV": 1, "Video": 2}
+
+    profiles = ProfileMatcher({
+        "sys": {"keywords": keywords_map, "categories": categories},
+        "open": {"keywords": keywords_map, "categories": {"KV": {"keywords": "kv"}}},
+    })
+    assert profiles.match_paper(paper("astro-ph.GA"), count_prefilter=True) == {"sys": ["Serving"], "open": ["KV"]}
+    profiles.report_prefilter(metrics)
+    counters = metrics.to_dict()["counters"]
+    assert counters["prefilter_rejected"]["sys/KV"] == 1 and counters["prefilter_rejected"]["sys/Video"] == 1
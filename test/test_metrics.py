@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+测试运行指标
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from atom_fixture_server import AtomFixtureServer, make_entry
+from metrics import NULL_METRICS, RunMetrics
+
+
+def test_null_metrics_is_noop():
+    """测试未启用时所有记录操作为空操作"""
+    with NULL_METRICS.stage("fetch"):
+        NULL_METRICS.count("papers_checked")
+        NULL_METRICS.add_bytes("save", 10)
+    assert not NULL_METRICS.enabled
+
+
+def test_run_metrics_exports(tmp_path):
+    """测试阶段计时、计数与 JSON / Prometheus 导出"""
+    metrics = RunMetrics()
+    with metrics.stage("save"):
+        metrics.add_bytes("save", 128)
+    metrics.count("papers_checked", 3)
+    metrics.count("papers_matched", label='KV Cache "v2"')
+
+    metrics.write_json(tmp_path / "run.json")
+    summary = json.loads((tmp_path / "run.json").read_text(encoding='utf-8'))
+    assert summary["stages"]["save"]["calls"] == 1
+    assert summary["counters"] == {"papers_checked": 3, "papers_matched": {'KV Cache "v2"': 1}}
+    assert summary["bytes_written"] == {"save": 128}
+
+    text = metrics.to_prometheus()
+    assert 'arxiv_fetcher_events_total{name="papers_checked"} 3' in text
+    assert 'arxiv_fetcher_events_total{name="papers_matched",label="KV Cache \\"v2\\""} 1' in text
+    assert 'arxiv_fetcher_bytes_written_total{stage="save"} 128' in text
+
+
+def test_fetch_run_records_metrics(tmp_path):
+    """测试一次完整抓取记录页数、检查/匹配数和写入字节数"""
+    from arxiv_fetcher import ArxivPaperFetcher
+
+    stamp = (datetime.now(timezone.utc) - timedelta(hours=2)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    entries = [make_entry("2501.00001v1", "KV Cache Paper", "kv cache for llm inference", stamp),
+               make_entry("2501.00002v1", "Unrelated", "nothing relevant", stamp)]
+    metrics = RunMetrics()
+    with AtomFixtureServer(entries) as server:
+        fetcher = ArxivPaperFetcher(data_dir=str(tmp_path / "day"), config_file="config.json", metrics=metrics)
+        fetcher.fetch_config.update({"base_url": server.base_url, "request_interval": 0, "page_size": 1})
+        fetcher.run_daily_fetch(days_back=1)
+
+    summary = metrics.to_dict()
+    assert summary["counters"]["pages_fetched"] == 2
+    assert summary["counters"]["papers_checked"] == 2
+    assert summary["counters"]["papers_matched"]["KV Cache"] == 1
+    assert {"fetch", "network", "parse", "match", "save", "report"} <= set(summary["stages"])
+    assert summary["bytes_written"]["save"] > 0 and summary["bytes_written"]["report"] > 0
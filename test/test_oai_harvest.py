@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+测试 OAI-PMH 批量收割：arXivRaw 记录解析、按 resumptionToken 翻页、中断后从检查点继续、token 失效时从头开始
+"""
+
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from atom_fixture_server import make_entry
+from oai_fixture_server import OAIFixtureServer, render_record, render_response
+from oai_harvest import parse_list_records
+
+ENTRIES = [
+    make_entry("2403.00001v3", "Paged KV Cache", "A kv cache allocator for LLM serving.",
+               "2024-02-20T08:00:00Z", authors=["Alice", "Bob", "Carol"], updated="2024-03-02T09:30:00Z"),
+    make_entry("2403.00002v1", "Unrelated study 2", "Image classification.", "2024-03-03T08:00:00Z"),
+    make_entry("2403.00003v1", "Fast Collectives", "We speed up allreduce for LLM training.",
+               "2024-03-04T08:00:00Z", categories=["cs.DC"]),
+    make_entry("2403.00004v1", "Unrelated study 4", "Graph coloring.", "2024-03-05T08:00:00Z"),
+    make_entry("2403.00005v1", "Video Generation Serving System", "A system for video generation.",
+               "2024-03-06T08:00:00Z"),
+    make_entry("2403.00006v1", "Unrelated study 6", "Protein folding.", "2024-03-07T08:00:00Z"),
+    make_entry("2403.00007v1", "Another KV Cache", "kv cache compression.", "2024-03-08T08:00:00Z"),
+    # 不在 cs set 中
+    make_entry("2403.00008v1", "Holographic KV Cache", "kv cache in hep-th.", "2024-03-09T08:00:00Z",
+               categories=["hep-th"]),
+    # datestamp 不在收割范围内
+    make_entry("2405.00001v1", "Late KV Cache", "kv cache.", "2024-05-01T08:00:00Z"),
+]
+EXPECTED = ["2403.00001v3", "2403.00003v1", "2403.00005v1", "2403.00007v1"]
+
+
+def test_parse_list_records():
+    """测试 arXivRaw 记录转换：最新版本号、v1 日期为提交时间、作者拆分、跳过已删除记录、读取 resumptionToken"""
+    body = ("<ListRecords>" + render_record(ENTRIES[0]) + render_record(ENTRIES[1], deleted=True)
+            + '<resumptionToken cursor="0" completeListSize="9">next|1</resumptionToken></ListRecords>')
+    page = parse_list_records(io.BytesIO(render_response(body)))
+    assert page.token == "next|1" and page.complete_list_size == 9
+    [entry] = page.records
+    assert entry.entry_id == "http://arxiv.org/abs/2403.00001v3"
+    assert entry.title == "Paged KV Cache"
+    assert entry.summary == "A kv cache allocator for LLM serving."
+    assert [a.name for a in entry.authors] == ["Alice", "Bob", "Carol"]
+    assert entry.published.isoformat() == "2024-02-20T08:00:00+00:00"
+    assert entry.updated.isoformat() == "2024-03-02T09:30:00+00:00"
+    assert entry.categories == ["cs.LG"] and entry.primary_category == "cs.LG"
+
+    last = parse_list_records(io.BytesIO(render_response(
+        "<ListRecords>" + render_record(ENTRIES[1]) + '<resumptionToken completeListSize="9"/></ListRecords>')))
+    assert last.token is None and len(last.records) == 1
+    empty = parse_list_records(io.BytesIO(render_response('<error code="noRecordsMatch">none</error>')))
+    assert empty.records == [] and empty.token is None
+
+
+def _fetcher(tmp_path, server):
+    from arxiv_fetcher import ArxivPaperFetcher
+
+    fetcher = ArxivPaperFetcher(data_dir=str(tmp_path / "data"), config_file="config.json")
+    fetcher.fetch_config["request_interval"] = 0
+    fetcher.config["harvest"] = {"base_url": server.base_url, "sets": ["cs"], "categories": []}
+    return fetcher
+
+
+def _saved_ids(fetcher):
+    return sorted(p["arxiv_id"] for p in fetcher.paper_store.iter_papers())
+
+
+def test_harvest_resumes_from_checkpoint(tmp_path):
+    """测试收割中途失败后，已保存的论文保留，再次运行从检查点的 resumptionToken 继续"""
+    from arxiv_api import ArxivAPIError
+    from datetime import date
+
+    with OAIFixtureServer(ENTRIES, page_size=2, deleted_ids={"2403.00006v1"}, fail_requests=1) as server:
+        server.fail_after = 3
+        fetcher = _fetcher(tmp_path, server)
+        with pytest.raises(ArxivAPIError):
+            fetcher.harvest_archive(date(2024, 3, 1), date(2024, 3, 31), generate_report=False)
+        # 第 1 个请求 503 后重试成功，前两页已保存
+        assert _saved_ids(fetcher) == ["2403.00001v3", "2403.00003v1"]
+        checkpoint = fetcher.result_dir / "harvest_checkpoint.json"
+        assert checkpoint.exists()
+        fetcher.close()
+
+        server.fail_after = None
+        resumed_from = len(server.requests)
+        fetcher = _fetcher(tmp_path, server)
+        stats = fetcher.harvest_archive(date(2024, 3, 1), date(2024, 3, 31), generate_report=False)
+        assert server.requests[resumed_from] == {"verb": "ListRecords", "resumptionToken": "cs|2024-03-01|2024-03-31|4"}
+        assert stats == {"pages": 2, "records": 2, "matched": 2}
+        assert _saved_ids(fetcher) == EXPECTED
+        assert not checkpoint.exists()
+        assert server.requests[0] == {"verb": "ListRecords", "metadataPrefix": "arXivRaw", "set": "cs",
+                                      "from": "2024-03-01", "until": "2024-03-31"}
+        fetcher.close()
+
+
+def test_harvest_restarts_on_expired_token(tmp_path):
+    """测试检查点中的 resumptionToken 失效时从头收割该 set，已保存的论文不会重复保存"""
+    from arxiv_api import ArxivAPIError
+    from datetime import date
+
+    with OAIFixtureServer(ENTRIES, page_size=2) as server:
+        server.fail_after = 1
+        fetcher = _fetcher(tmp_path, server)
+        with pytest.raises(ArxivAPIError):
+            fetcher.harvest_archive(date(2024, 3, 1), date(2024, 3, 31), generate_report=False)
+        fetcher.close()
+
+        server.fail_after = None
+        server.expired_tokens.add("cs|2024-03-01|2024-03-31|2")
+        fetcher = _fetcher(tmp_path, server)
+        stats = fetcher.harvest_archive(date(2024, 3, 1), date(2024, 3, 31), generate_report=False)
+        assert stats["matched"] == 3
+        assert _saved_ids(fetcher) == EXPECTED
+        fetcher.close()
+
+
+def test_harvest_writes_submission_date_segments_and_aborts_failed_page(tmp_path, monkeypatch):
+    """测试收割的论文写入各自提交日期的分段；保存一页失败时丢弃该页的分段，不提交去重索引，再次运行从该页继续"""
+    from datetime import date
+    from paper_store import PaperStore, SegmentWriter
+
+    original_write = SegmentWriter.write
+    calls = []
+
+    def failing_write(self, paper):
+        calls.append(paper["arxiv_id"])
+        if paper["arxiv_id"] == "2403.00003v1":
+            raise OSError("disk full")
+        original_write(self, paper)
+
+    with OAIFixtureServer(ENTRIES, page_size=4) as server:
+        fetcher = _fetcher(tmp_path, server)
+        monkeypatch.setattr(SegmentWriter, "write", failing_write)
+        with pytest.raises(OSError):
+            fetcher.harvest_archive(date(2024, 3, 1), date(2024, 3, 31), generate_report=False)
+        # 第一页的两篇匹配论文都没有发布
+        assert calls == ["2403.00001v3", "2403.00003v1"]
+        assert fetcher.paper_store.segments() == []
+        assert not [p for p in fetcher.data_dir.iterdir() if p.name.endswith(".tmp")]
+        assert "http://arxiv.org/abs/2403.00001v3" not in fetcher.recorded_paper_ids
+        fetcher.close()
+
+        monkeypatch.setattr(SegmentWriter, "write", original_write)
+        fetcher = _fetcher(tmp_path, server)
+        fetcher.harvest_archive(date(2024, 3, 1), date(2024, 3, 31), generate_report=False)
+        assert _saved_ids(fetcher) == EXPECTED
+        dates = {PaperStore.segment_date(s) for s in fetcher.paper_store.segments()}
+        assert dates == {"20240220", "20240304", "20240306", "20240308"}
+        fetcher.close()
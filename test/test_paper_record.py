@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+测试紧凑论文记录
+"""
+
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from arxiv_api import ArxivEntry, Author
+from paper_record import FIELDS, PaperRecord
+from paper_store import PaperStore
+
+
+def _entry(i: int) -> ArxivEntry:
+    published = datetime(2025, 1, 2, 8, i, tzinfo=timezone.utc)
+    return ArxivEntry(f"http://arxiv.org/abs/2501.{i:05d}v2", f"Title {i}", f"Summary {i}",
+                      [Author("Alice"), Author("Bob")], published, published,
+                      ["cs.LG", "cs.DC"], "cs.LG", f"http://arxiv.org/pdf/2501.{i:05d}v2")
+
+
+def test_record_serializes_to_legacy_shape():
+    """测试序列化结果与旧版字典结构一致，并支持按字段读取"""
+    record = PaperRecord.from_result(_entry(1), ["KV Cache"], "2025-01-02T10:00:00")
+    data = record.to_dict()
+    assert tuple(data) == FIELDS
+    assert data['arxiv_id'] == "2501.00001v2" == record['arxiv_id']
+    assert data['published'] == "2025-01-02T08:01:00+00:00" == record['published']
+    assert data['authors'] == ["Alice", "Bob"] and data['tags'] == ["KV Cache"]
+    assert record.get('missing', 'x') == 'x'
+    assert PaperRecord.from_dict(data).to_dict() == data
+
+
+def test_interned_strings_and_lazy_summary(tmp_path):
+    """测试分类字符串共享，以及保存后摘要从存储中读取"""
+    a = PaperRecord.from_result(_entry(1), ["KV Cache"], "t")
+    b = PaperRecord.from_result(_entry(2), ["KV Cache"], "t")
+    assert a.categories[0] is b.categories[0]
+
+    store = PaperStore(tmp_path)
+    store.append([a.to_dict()])
+    a.detach_summary(store)
+    assert a._summary is None
+    assert a['summary'] == "Summary 1"
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+测试追加写入的 JSONL 论文存储
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from paper_store import PaperStore
+
+
+def _paper(i: int) -> dict:
+    return {"id": f"http://arxiv.org/abs/2501.{i:05d}v1", "title": f"论文 {i}", "tags": ["KV Cache"]}
+
+
+def test_append_get_and_export(tmp_path):
+    """测试追加分段、随机读取、跨分段去重与兼容导出（含 gzip 分段）"""
+    store = PaperStore(tmp_path)
+    store.append([_paper(1), _paper(2)], "20250101")
+    PaperStore(tmp_path, compress=True).append([_paper(2), _paper(3)], "20250101")
+
+    store = PaperStore(tmp_path)
+    assert [p.name for p in store.segments("20250101")] == [
+        "papers_20250101.0001.jsonl", "papers_20250101.0002.jsonl.gz"
+    ]
+    assert store.get(_paper(3)["id"])["title"] == "论文 3"
+    assert store.get(_paper(2)["id"]) == _paper(2)
+    assert store.get("missing") is None
+
+    count = store.export_json(tmp_path / "papers_20250101.json", "20250101")
+    data = json.loads((tmp_path / "papers_20250101.json").read_text(encoding='utf-8'))
+    assert count == data['total_papers'] == 3
+    assert set(data) == {'fetch_date', 'total_papers', 'papers', 'exported_from_segments'}
+    assert [p['id'] for p in data['papers']] == [_paper(i)['id'] for i in (1, 2, 3)]
+
+
+def test_leftover_temp_file_is_ignored_and_legacy_migrated(tmp_path):
+    """测试中断写入留下的临时文件被忽略，旧版 JSON 被转换为分段"""
+    (tmp_path / ".papers_20250101.0001.jsonl.tmp").write_text("{partial", encoding='utf-8')
+    (tmp_path / "papers_20250102.json").write_text(
+        json.dumps({"fetch_date": "", "total_papers": 1, "papers": [_paper(9)]}), encoding='utf-8'
+    )
+    store = PaperStore(tmp_path)
+    assert store.migrate_legacy_files() == 1
+    assert list(store.iter_papers()) == [_paper(9)]
+    assert (tmp_path / "papers_20250102.json.migrated").exists()
+
+
+def test_segment_sequence_and_exported_files(tmp_path):
+    """测试分段序号取最大值加一、临时文件独占创建，以及导出文件不会被再次迁移"""
+    store = PaperStore(tmp_path)
+    for i in range(3):
+        store.append([_paper(i)], "20250101")
+    (tmp_path / "papers_20250101.0002.jsonl").unlink()
+    (tmp_path / ".papers_20250101.0004.jsonl.tmp").write_text("", encoding='utf-8')
+
+    assert store.append([_paper(5)], "20250101").name == "papers_20250101.0005.jsonl"
+
+    store.export_json(tmp_path / "papers_20250102.json")
+    assert PaperStore(tmp_path).migrate_legacy_files() == 0
+    assert (tmp_path / "papers_20250102.json").exists()
+    assert not PaperStore(tmp_path).segments("20250102")
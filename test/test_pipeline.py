@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+测试流式抓取流水线
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from atom_fixture_server import AtomFixtureServer, make_entry
+
+
+def _day(offset: int) -> str:
+    return (datetime.now() - timedelta(days=offset)).strftime("%Y-%m-%dT08:00:00Z")
+
+
+ENTRIES = [
+    make_entry(f"2501.{i:05d}v1", f"KV Cache Paper {i}", "We optimize the kv cache of an LLM inference system.", _day(0))
+    for i in range(7)
+] + [make_entry("2501.09999v1", "Unrelated", "Nothing.", _day(0))]
+
+
+def test_streaming_matches_batch_output(tmp_path, monkeypatch):
+    """测试流式模式与批量模式生成相同的数据与报告（生成时间除外）"""
+    import arxiv_fetcher
+    outputs = {}
+    with AtomFixtureServer(ENTRIES) as server:
+        for mode in ("batch", "streaming"):
+            # 两种模式各用独立的去重索引
+            monkeypatch.setattr(arxiv_fetcher, "RESULT_DIR", tmp_path / mode / "result")
+            fetcher = arxiv_fetcher.ArxivPaperFetcher(data_dir=str(tmp_path / mode / "day"), config_file="config.json")
+            fetcher.fetch_config.update({"base_url": server.base_url, "request_interval": 0, "page_size": 3})
+            fetcher.run_daily_fetch(days_back=1, streaming=(mode == "streaming"))
+            papers = list(fetcher.paper_store.iter_papers())
+            reports = {
+                p.name: "\n".join(l for l in p.read_text(encoding='utf-8').splitlines() if "生成时间" not in l)
+                for p in sorted(fetcher.data_dir.glob("*.md"))
+            }
+            outputs[mode] = ([(p['id'], p['tags']) for p in papers], reports)
+            assert "http://arxiv.org/abs/2501.00000v1" in fetcher.recorded_paper_ids
+
+    assert len(outputs["batch"][0]) == 7
+    assert outputs["batch"] == outputs["streaming"]
+    assert not list((tmp_path / "streaming" / "day").glob(".*tmp"))
+
+
+class Paper:
+    entry_id = "http://arxiv.org/abs/2501.00001v1"
+    title = "KV Cache"
+    summary = "kv cache"
+    authors = []
+    published = updated = datetime.now()
+    categories = ["cs.LG"]
+    pdf_url = ""
+
+
+def test_streaming_failure_discards_partial_output(tmp_path):
+    """测试上游出错时流水线丢弃未发布的分段与临时报告"""
+    from arxiv_fetcher import ArxivPaperFetcher
+    from pipeline import StreamingPipeline
+
+    fetcher = ArxivPaperFetcher(data_dir=str(tmp_path / "day"), config_file="config.json")
+
+    def results():
+        yield Paper
+        raise ConnectionError("network blip")
+
+    with pytest.raises(ConnectionError):
+        StreamingPipeline(fetcher).run(results())
+    assert list(fetcher.data_dir.iterdir()) == []
+
+
+def test_sink_failure_does_not_hang(tmp_path, monkeypatch):
+    """测试写入阶段出错（生产者仍在慢速产出）时流水线抛出该错误而不是挂起"""
+    import time
+    from arxiv_fetcher import ArxivPaperFetcher
+    from paper_store import SegmentWriter
+    from pipeline import StreamingPipeline
+
+    fetcher = ArxivPaperFetcher(data_dir=str(tmp_path / "day"), config_file="config.json")
+
+    def failing_write(self, paper):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(SegmentWriter, "write", failing_write)
+
+    def results():
+        for i in range(100):
+            paper = Paper()
+            paper.entry_id = f"http://arxiv.org/abs/2501.{i:05d}v1"
+            yield paper
+            time.sleep(0.05)
+
+    started = time.time()
+    with pytest.raises(OSError, match="disk full"):
+        StreamingPipeline(fetcher).run(results())
+    assert time.time() - started < 2
+    assert list(fetcher.data_dir.iterdir()) == []
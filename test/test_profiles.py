@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+测试多档案抓取：一次抓取，按多个关键词配置分别筛选和输出
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from atom_fixture_server import AtomFixtureServer, make_entry
+from keyword_matcher import KeywordMatcher, ProfileMatcher
+
+KV_PROFILE = {
+    "keywords": {"kv": ["kv cache"], "serve": ["LLM serving"]},
+    "system_keywords": ["system"],
+    "categories": {"KV Cache": {"keywords": "kv"}, "Serving (System)": {"keywords": "serve", "requires_system": True}},
+    "matching": {"whole_word": True, "stemming": True},
+}
+MOE_PROFILE = {
+    "keywords": {"moe": ["mixture of experts", {"keyword": "MoE", "case_sensitive": True}], "kv": ["expert cache"]},
+    "system_keywords": ["engine", "runtime"],
+    "categories": {"MoE (System)": {"keywords": "moe", "requires_system": True}, "Caching": {"keywords": "kv"}},
+}
+
+
+def test_profile_matcher_agrees_with_separate_matchers():
+    """测试合并匹配器与各档案单独的匹配器结果一致（各自的 system 关键词、匹配选项和分词选项）"""
+    profiles = {"kv": KV_PROFILE, "moe": MOE_PROFILE}
+    separate = {
+        name: KeywordMatcher(config["keywords"], config["system_keywords"], config["categories"], config.get("matching"))
+        for name, config in profiles.items()
+    }
+    combined = ProfileMatcher(profiles)
+    texts = [
+        "Paged KV caches for LLM serving systems",
+        "A MoE runtime with an expert cache",
+        "moe engine without the case-sensitive keyword",
+        "Sparse mixture of experts serving system",
+        "LLM serving with a new engine",
+        "Nothing relevant here",
+    ]
+    for text in texts:
+        expected = {name: matcher.match(text) for name, matcher in separate.items() if matcher.match(text)}
+        assert combined.match(text) == expected, text
+
+
+def _stamp(offset_hours: int) -> str:
+    return (datetime.now() - timedelta(hours=offset_hours)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def test_profiles_share_one_fetch(tmp_path):
+    """测试多档案只抓取一次窗口，各档案的数据、报告和去重索引相互独立"""
+    from arxiv_fetcher import ArxivPaperFetcher
+
+    for name, config in (("kv", KV_PROFILE), ("moe", MOE_PROFILE)):
+        (tmp_path / f"{name}.json").write_text(json.dumps(config), encoding='utf-8')
+    entries = [
+        make_entry("2501.00001v1", "Paged KV Cache", "A kv cache allocator.", _stamp(2)),
+        make_entry("2501.00002v1", "MoE Runtime", "A mixture of experts runtime with expert cache.", _stamp(3)),
+        make_entry("2501.00003v1", "Unrelated", "Nothing.", _stamp(4)),
+    ]
+    with AtomFixtureServer(entries) as server:
+        fetcher = ArxivPaperFetcher(data_dir=str(tmp_path / "day"), config_file="config.json",
+                                    profiles={"kv": str(tmp_path / "kv.json"), "moe": str(tmp_path / "moe.json")})
+        fetcher.fetch_config.update({"base_url": server.base_url, "request_interval": 0})
+        fetcher.run_daily_fetch(days_back=1)
+        assert len(server.requests) == 1
+
+        kv, moe = fetcher.profiles["kv"], fetcher.profiles["moe"]
+        assert kv.data_dir == tmp_path / "day" / "kv"
+        assert [(p['arxiv_id'], p['tags']) for p in kv.paper_store.iter_papers()] == [("2501.00001v1", ["KV Cache"])]
+        assert [(p['arxiv_id'], p['tags']) for p in moe.paper_store.iter_papers()] == [
+            ("2501.00002v1", ["MoE (System)", "Caching"])
+        ]
+        assert (kv.data_dir / "arxiv_report.md").exists() and (moe.data_dir / "arxiv_report.md").exists()
+        assert kv.seen_db_file != moe.seen_db_file
+        assert "http://arxiv.org/abs/2501.00001v1" in kv.recorded_paper_ids
+        assert "http://arxiv.org/abs/2501.00001v1" not in moe.recorded_paper_ids
+
+        # 流式模式：已被所有档案记录的论文跳过，新论文只写入匹配的档案
+        server.entries.insert(0, make_entry("2501.00004v1", "KV Cache Serving",
+                                            "kv cache and expert cache in an engine.", _stamp(1)))
+        fetcher.run_daily_fetch(days_back=1, streaming=True)
+        assert len(server.requests) == 2
+        assert [p['arxiv_id'] for p in kv.paper_store.iter_papers()] == ["2501.00001v1", "2501.00004v1"]
+        assert [p['arxiv_id'] for p in moe.paper_store.iter_papers()] == ["2501.00002v1", "2501.00004v1"]
+        fetcher.close()
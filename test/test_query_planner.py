@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+测试服务端查询规划：关键词编译为 abs:/ti: 条件、按长度拆分查询、抓取结果与全量扫描一致
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from atom_fixture_server import AtomFixtureServer, entry_matches, make_entry
+from query_planner import QueryPlanner
+
+KEYWORDS = {
+    "kv": ["KV cache", "kv cache", "KVCache"],
+    "video": ["video generation", "video generation model"],
+    "comm": ["all-gather", {"keyword": "gradient compression", "proximity": 3}],
+}
+CATEGORIES = {
+    "KV Cache": {"keywords": "kv"},
+    "Video (System)": {"keywords": "video", "requires_system": True},
+    "Comm": {"keywords": "comm"},
+}
+
+
+def test_planner_compiles_minimal_terms_and_splits_by_length():
+    """测试大小写重复和被包含的短语只下推一次，proximity 关键词拆为各词条件，拆分后每个查询不超过长度上限"""
+    planner = QueryPlanner([(KEYWORDS, CATEGORIES, {"whole_word": True})])
+    assert planner.terms == [
+        'abs:"all gather" OR ti:"all gather"',
+        'abs:"kv cache" OR ti:"kv cache"',
+        'abs:kvcache OR ti:kvcache',
+        'abs:"video generation" OR ti:"video generation"',
+        '((abs:compression OR ti:compression) AND (abs:gradient OR ti:gradient))',
+    ]
+    base = "submittedDate:[20250101000000 TO 20250102235959]"
+    assert len(planner.queries(base)) == 1
+
+    planner = QueryPlanner([(KEYWORDS, CATEGORIES, None)], categories=["cs.DC", "cs.LG"], max_length=160)
+    queries = planner.queries(base)
+    assert len(queries) > 1
+    assert all(len(q) <= 160 and q.startswith(base + " AND (cat:cs.DC OR cat:cs.LG) AND (") for q in queries)
+    assert sorted(t for t in planner.terms for q in queries if t in q) == sorted(planner.terms)
+
+    with pytest.raises(ValueError):
+        QueryPlanner([({"kv": [""]}, {"KV": {"keywords": "kv"}}, None)])
+
+
+def _stamp(offset_hours: int) -> str:
+    return (datetime.now() - timedelta(hours=offset_hours)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def test_pushdown_fetch_matches_full_scan(tmp_path, monkeypatch):
+    """测试服务端过滤（拆分为多个查询、分片模式）保存的论文与全量扫描相同，但只下载可能匹配的论文"""
+    import arxiv_fetcher
+    from arxiv_fetcher import ArxivPaperFetcher
+
+    entries = [make_entry(f"2501.{i:05d}v1", f"Unrelated study {i}", "Image classification.", _stamp(i + 1))
+               for i in range(20)]
+    entries += [
+        make_entry("2501.10001v1", "Paged KV Cache", "A kv cache allocator.", _stamp(2)),
+        make_entry("2501.10002v1", "Fast Collectives", "We speed up allreduce for LLM training.", _stamp(3)),
+        make_entry("2501.10003v1", "Video Generation Serving System", "A system for video generation.", _stamp(4)),
+    ]
+    with AtomFixtureServer(entries) as server:
+        fetcher = ArxivPaperFetcher(data_dir=str(tmp_path / "full"), config_file="config.json")
+        fetcher.fetch_config.update({"base_url": server.base_url, "request_interval": 0, "page_size": 5})
+        fetcher.response_cache = None
+        fetcher.run_daily_fetch(days_back=1, generate_report=False)
+        expected = sorted(p["arxiv_id"] for p in fetcher.paper_store.iter_papers())
+        assert expected == ["2501.10001v1", "2501.10002v1", "2501.10003v1"]
+
+        for sharded in (False, True):
+            # 独立的结果目录（去重索引）
+            monkeypatch.setattr(arxiv_fetcher, "RESULT_DIR", tmp_path / f"result_{sharded}")
+            planned = ArxivPaperFetcher(data_dir=str(tmp_path / f"planned_{sharded}"), config_file="config.json")
+            planned.fetch_config.update({"base_url": server.base_url, "request_interval": 0, "page_size": 5,
+                                         "pushdown": True, "max_query_length": 400})
+            planned.response_cache = None
+            queries = planned.plan_queries()
+            assert len(queries) > 1
+            planned.run_daily_fetch(days_back=1, generate_report=False, sharded=sharded)
+            assert sorted(p["arxiv_id"] for p in planned.paper_store.iter_papers()) == expected
+
+        report = planned.verify_query_plan(days_back=1)
+    assert report["recall"] == 1.0 and report["missed"] == []
+    assert report["full_scan"]["papers"] == len(entries)
+    assert report["pushdown"]["papers"] == 3
+    assert report["pushdown"]["bytes"] < report["full_scan"]["bytes"]
+    # 替身服务器按 abs:/ti: 条件过滤
+    assert entry_matches(entries[-1], 'abs:"video generation" OR ti:kvcache')
+    fetcher.close()
+    planned.close()
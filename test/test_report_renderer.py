@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+测试报告渲染引擎
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from report_renderer import CompiledTemplate, ReportEngine, group_papers
+
+ORDER = ["KV Cache", "LLM Inference (System)"]
+FORMATS = ["markdown", "html", "json_feed"]
+
+
+def _paper(i: int, tags: list, title: str = None) -> dict:
+    return {"id": f"http://arxiv.org/abs/2501.{i:05d}v1", "arxiv_id": f"2501.{i:05d}v1",
+            "arxiv_url": f"http://arxiv.org/abs/2501.{i:05d}v1", "pdf_url": f"http://arxiv.org/pdf/2501.{i:05d}v1",
+            "title": title or f"Paper {i}", "authors": [f"Author {k}" for k in range(i)],
+            "summary": "kv cache <b>&</b> serving", "published": "2025-01-02T08:00:00",
+            "updated": "2025-01-02T08:00:00", "categories": ["cs.LG"], "tags": tags}
+
+
+PAPERS = [_paper(1, ["KV Cache"]), _paper(7, ["KV Cache", "LLM Inference (System)"], "A <fast> engine"),
+          _paper(3, ["Other"])]
+
+
+def _strip_time(text: str) -> str:
+    return "\n".join(line for line in text.splitlines() if "生成时间" not in line)
+
+
+def test_compiled_template_and_grouping():
+    """测试预编译模板与按配置顺序分组"""
+    assert CompiledTemplate("{a} and {{literal}} {b}.").render({"a": "x", "b": "y"}) == "x and {literal} y."
+    grouped = group_papers(PAPERS, ORDER)
+    assert list(grouped) == ORDER
+    assert [p["arxiv_id"] for p in grouped["KV Cache"]] == ["2501.00001v1", "2501.00007v1"]
+
+
+def test_all_formats_in_one_pass(tmp_path):
+    """测试同一遍生成 Markdown / HTML / JSON Feed 以及总览"""
+    written = ReportEngine(tmp_path, ORDER, FORMATS).write(group_papers(PAPERS, ORDER), len(PAPERS))
+    assert sorted(p.name for p in written) == sorted([
+        "KV_Cache.md", "KV_Cache.html", "KV_Cache.json", "LLM_Inference_System.md", "LLM_Inference_System.html",
+        "LLM_Inference_System.json", "arxiv_report.md", "arxiv_report.html"])
+
+    markdown = (tmp_path / "KV_Cache.md").read_text(encoding='utf-8')
+    assert "**论文数量**: 2 篇" in markdown and "## 2. A <fast> engine" in markdown
+    assert "Author 0, Author 1, Author 2, Author 3, Author 4 et al. (7 authors)" in markdown
+    page = (tmp_path / "KV_Cache.html").read_text(encoding='utf-8')
+    assert "A &lt;fast&gt; engine" in page and "<b>" not in page
+    feed = json.loads((tmp_path / "KV_Cache.json").read_text(encoding='utf-8'))
+    assert feed["version"] == "https://jsonfeed.org/version/1.1"
+    assert [item["id"] for item in feed["items"]] == ["http://arxiv.org/abs/2501.00001v1",
+                                                      "http://arxiv.org/abs/2501.00007v1"]
+    assert feed["items"][1]["tags"] == ["KV Cache", "LLM Inference (System)"]
+    overview = (tmp_path / "arxiv_report.md").read_text(encoding='utf-8')
+    assert "**总计**: 3 篇论文" in overview and "[KV Cache](KV_Cache.md)**: 2 篇" in overview
+
+
+def test_unchanged_categories_are_skipped(tmp_path):
+    """测试论文集合未变化的分类文件不重新生成，只有变化的分类被重写"""
+    ReportEngine(tmp_path, ORDER, FORMATS).write(group_papers(PAPERS, ORDER), len(PAPERS))
+    assert ReportEngine(tmp_path, ORDER, FORMATS).write(group_papers(PAPERS, ORDER), len(PAPERS)) == []
+
+    retagged = PAPERS[:2] + [_paper(3, ["LLM Inference (System)"])]
+    written = ReportEngine(tmp_path, ORDER, FORMATS).write(group_papers(retagged, ORDER), len(retagged))
+    assert sorted(p.name for p in written) == sorted([
+        "LLM_Inference_System.md", "LLM_Inference_System.html", "LLM_Inference_System.json",
+        "arxiv_report.md", "arxiv_report.html"])
+
+    # 报告文件被删除后只重新生成该文件
+    (tmp_path / "KV_Cache.md").unlink()
+    written = ReportEngine(tmp_path, ORDER, FORMATS).write(group_papers(retagged, ORDER), len(retagged))
+    assert [p.name for p in written] == ["KV_Cache.md"]
+
+
+def test_streaming_writer_matches_batch(tmp_path):
+    """测试流式写入器与批量生成的内容一致（生成时间除外），且同样跳过未变化的文件"""
+    (tmp_path / "batch").mkdir()
+    (tmp_path / "stream").mkdir()
+    ReportEngine(tmp_path / "batch", ORDER, FORMATS).write(group_papers(PAPERS, ORDER), len(PAPERS))
+    writer = ReportEngine(tmp_path / "stream", ORDER, FORMATS).stream()
+    for paper in PAPERS:
+        writer.add(paper)
+    assert len(writer.close()) == 8
+
+    for path in sorted((tmp_path / "batch").iterdir()):
+        assert _strip_time(path.read_text(encoding='utf-8')) == _strip_time(
+            (tmp_path / "stream" / path.name).read_text(encoding='utf-8')), path.name
+    assert not list((tmp_path / "stream").glob(".*tmp"))
+
+    writer = ReportEngine(tmp_path / "stream", ORDER, FORMATS).stream()
+    for paper in PAPERS:
+        writer.add(paper)
+    assert writer.close() == []
+    assert not list((tmp_path / "stream").glob(".*tmp"))
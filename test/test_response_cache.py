@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+测试原始响应缓存与离线重放
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from arxiv_api import ArxivAPIClient, CacheMissError, RateLimiter
+from atom_fixture_server import AtomFixtureServer, make_entry
+from response_cache import AtomResponseCache
+
+
+def _day(offset: int) -> str:
+    return (datetime.now() - timedelta(days=offset)).strftime("%Y-%m-%dT08:00:00Z")
+
+
+ENTRIES = [
+    make_entry("2501.00001v1", "Efficient KV Cache Compression", "We study kv cache.", _day(0)),
+    make_entry("2501.00002v1", "Speculative Decoding", "A faster decoding runtime.", _day(1)),
+]
+
+
+def test_cache_hit_revalidation_and_offline(tmp_path):
+    """测试已结束窗口的缓存命中、过期后的条件请求（304）以及离线缓存未命中"""
+    entries = [make_entry("2401.00001v1", "Old Paper", "kv cache", "2024-01-10T08:00:00Z")]
+    with AtomFixtureServer(entries) as server:
+        cache = AtomResponseCache(tmp_path / "cache.db", ttl_seconds=3600)
+        client = ArxivAPIClient(base_url=server.base_url, rate_limiter=RateLimiter(0), cache=cache)
+        query = "submittedDate:[20240101000000 TO 20240131235959]"
+        assert len(list(client.results(query))) == 1
+        assert len(list(client.results("  " + query))) == 1
+        assert client.network_requests == 1
+
+        cache.ttl_seconds = 0
+        assert len(list(client.results(query))) == 1
+        assert server.requests[-1]["not_modified"]
+
+        # 缓存按接口地址区分
+        other = ArxivAPIClient(base_url="http://127.0.0.1:9/unused", cache=cache, offline=True)
+        with pytest.raises(CacheMissError):
+            list(other.results(query))
+
+    offline = ArxivAPIClient(base_url=server.base_url, cache=cache, offline=True)
+    assert len(list(offline.results(query))) == 1
+    with pytest.raises(CacheMissError):
+        list(offline.results("cat:cs.DC"))
+
+
+def test_open_window_is_revalidated(tmp_path):
+    """测试覆盖最近几天的查询即使缓存未过期也会发送条件请求"""
+    with AtomFixtureServer(ENTRIES) as server:
+        cache = AtomResponseCache(tmp_path / "cache.db", ttl_seconds=3600)
+        client = ArxivAPIClient(base_url=server.base_url, rate_limiter=RateLimiter(0), cache=cache)
+        query = "submittedDate:[20000101000000 TO 29991231235959]"
+        assert len(list(client.results(query))) == 2
+        assert len(list(client.results(query))) == 2
+        assert client.network_requests == 2
+        assert server.requests[-1]["not_modified"]
+
+
+def test_lru_eviction_by_size(tmp_path):
+    """测试超出大小上限时淘汰最久未使用的页面"""
+    cache = AtomResponseCache(tmp_path / "cache.db", max_bytes=2000)
+    payload = os.urandom(800)
+    cache.put("u", "q1", 0, 10, payload)
+    cache.put("u", "q2", 0, 10, payload)
+    assert cache.get("u", "q1", 0, 10) is not None
+    cache.put("u", "q3", 0, 10, payload)
+    assert cache.get("u", "q2", 0, 10) is None
+    assert cache.get("u", "q1", 0, 10) is not None
+    assert cache.total_bytes() <= 2000
+
+
+def test_replay_reads_only_overlapping_windows(tmp_path):
+    """测试离线重放只读取查询区间与窗口重叠的页面，读取时不立即写入最近访问时间"""
+    cache = AtomResponseCache(tmp_path / "cache.db")
+    cache.put("u", "submittedDate:[20250101000000 TO 20250101235959]", 0, 10, b"jan1")
+    cache.put("u", "submittedDate:[20250102000000 TO 20250103235959] AND cat:cs.DC", 0, 10, b"jan2-3")
+    cache.put("u", "submittedDate:[20250105000000 TO 20250105235959]", 0, 10, b"jan5")
+    cache.put("u", "cat:cs.DC", 0, 10, b"undated")
+    cache.put("v", "submittedDate:[20250103000000 TO 20250103235959]", 0, 10, b"other")
+    assert sorted(cache.iter_pages("u", "20250103", "20250104")) == [b"jan2-3", b"undated"]
+    assert len(list(cache.iter_pages("u"))) == 4
+
+    def last_access():
+        return cache._conn.execute("SELECT last_access FROM pages WHERE query = 'cat:cs.DC'").fetchone()[0]
+
+    before = last_access()
+    assert cache.get("u", "cat:cs.DC", 0, 10).body == b"undated"
+    assert last_access() == before
+    cache.flush_access()
+    assert last_access() > before
+
+
+def test_offline_replay_retags_recorded_papers(tmp_path):
+    """测试修改关键词后离线重放缓存页面：不访问网络，已记录的论文也会重新打标签"""
+    from arxiv_fetcher import ArxivPaperFetcher
+
+    with AtomFixtureServer(ENTRIES) as server:
+        fetcher = ArxivPaperFetcher(data_dir=str(tmp_path / "day"), config_file="config.json")
+        fetcher.fetch_config.update({"base_url": server.base_url, "request_interval": 0})
+        fetcher.run_daily_fetch(days_back=2)
+        assert [p['arxiv_id'] for p in fetcher.paper_store.iter_papers()] == ["2501.00001v1"]
+        found_date = fetcher.paper_store.get("http://arxiv.org/abs/2501.00001v1")["found_date"]
+        request_count = len(server.requests)
+
+    fetcher = ArxivPaperFetcher(data_dir=str(tmp_path / "day"), config_file="config.json")
+    fetcher.fetch_config["base_url"] = server.base_url
+    fetcher.keywords_map["kv_cache"].append("speculative decoding")
+    fetcher.keywords_map["llm_inference"].append("kv cache")
+    fetcher.keyword_matcher = type(fetcher.keyword_matcher)(
+        fetcher.keywords_map, fetcher.system_keywords, fetcher.categories_config
+    )
+    fetcher.run_daily_fetch(days_back=2, offline=True)
+    assert len(server.requests) == request_count
+
+    papers = {p['arxiv_id']: p for p in fetcher.paper_store.iter_papers()}
+    assert set(papers) == {"2501.00001v1", "2501.00002v1"}
+    assert papers["2501.00001v1"]['tags'] == ["KV Cache", "LLM Inference"]
+    assert papers["2501.00001v1"]['found_date'] == found_date
+    report = (tmp_path / "day" / "KV_Cache.md").read_text(encoding='utf-8')
+    assert "Efficient KV Cache Compression" in report and "Speculative Decoding" in report
+
+    # 标签未变化时再次重放不会写入新分段
+    segments = fetcher.paper_store.segments()
+    fetcher.run_daily_fetch(days_back=2, offline=True)
+    assert fetcher.paper_store.segments() == segments
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+测试历史论文重新打标签
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import retag
+from paper_store import PaperStore
+from retag import ArchiveRetagger
+
+KEYWORDS = {"kv": ["kv cache"], "moe": ["mixture of experts"]}
+OLD_CATEGORIES = {"KV Cache": {"keywords": "kv"}}
+NEW_CATEGORIES = {"KV Cache": {"keywords": "kv"}, "MoE": {"keywords": "moe"}}
+
+
+def _paper(i: int, summary: str) -> dict:
+    return {"id": f"http://arxiv.org/abs/2501.{i:05d}v1", "arxiv_id": f"2501.{i:05d}v1",
+            "title": f"Paper {i}", "summary": summary, "tags": ["KV Cache"], "found_date": "2025-01-02"}
+
+
+def _archive(tmp_path) -> list:
+    """两个数据目录，每个目录两个日期的分段"""
+    dirs = []
+    for d in range(2):
+        (tmp_path / f"paper_data_{d}").mkdir()
+        store = PaperStore(tmp_path / f"paper_data_{d}")
+        for day in ("20250101", "20250102"):
+            base = d * 100 + int(day[-1]) * 10
+            store.append([_paper(base + k, "kv cache with mixture of experts" if k % 2 else "kv cache")
+                          for k in range(5)], day)
+        dirs.append(store.data_dir)
+    return dirs
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_retag_rewrites_changed_tags_in_order(tmp_path, workers):
+    """测试只重写标签有变化的论文，顺序不变，且仍归属原日期"""
+    dirs = _archive(tmp_path)
+    retagger = ArchiveRetagger(KEYWORDS, [], NEW_CATEGORIES, workers=workers, chunk_size=2,
+                               checkpoint_file=tmp_path / "ckpt.json")
+    stats = retagger.run(retag.archive_stores(dirs))
+
+    assert stats == {"checked": 20, "changed": 8, "segments": 4}
+    assert not (tmp_path / "ckpt.json").exists()
+    store = PaperStore(dirs[0])
+    tags = {p["arxiv_id"]: p["tags"] for p in store.iter_papers("20250101")}
+    assert tags == {f"2501.{10 + k:05d}v1": ["KV Cache", "MoE"] if k % 2 else ["KV Cache"] for k in range(5)}
+    # 更新的记录在新分段中保持原顺序
+    assert [p["arxiv_id"] for p in store.iter_segment(store.segments("20250101")[-1])] == [
+        "2501.00011v1", "2501.00013v1"]
+    assert len(list(store.iter_papers())) == 10
+    # 再次运行没有变化，不写入新分段
+    segments = store.segments()
+    assert ArchiveRetagger(KEYWORDS, [], NEW_CATEGORIES, workers=1).run([store])["changed"] == 0
+    assert store.segments() == segments
+
+
+def test_retag_resumes_from_checkpoint(tmp_path, monkeypatch):
+    """测试中断后从检查点继续，已完成的分段不再处理"""
+    dirs = _archive(tmp_path)
+    checkpoint = tmp_path / "ckpt.json"
+    classify = retag._classify_chunk
+    calls = []
+
+    def interrupted(texts):
+        calls.append(len(texts))
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return classify(texts)
+
+    monkeypatch.setattr(retag, "_classify_chunk", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        ArchiveRetagger(KEYWORDS, [], NEW_CATEGORIES, workers=1, checkpoint_file=checkpoint).run(
+            retag.archive_stores(dirs))
+    # 第一个目录的两个源分段及其输出分段已完成
+    assert len(json.loads(checkpoint.read_text())["completed"]) == 4
+
+    # 分类配置变化后旧检查点失效
+    assert not ArchiveRetagger(KEYWORDS, [], OLD_CATEGORIES, checkpoint_file=checkpoint).checkpoint.completed
+
+    monkeypatch.setattr(retag, "_classify_chunk", classify)
+    stats = ArchiveRetagger(KEYWORDS, [], NEW_CATEGORIES, workers=1, checkpoint_file=checkpoint).run(
+        retag.archive_stores(dirs))
+    assert stats["segments"] == 2
+    tags = [p["tags"] for d in dirs for p in PaperStore(d).iter_papers()]
+    assert tags.count(["KV Cache", "MoE"]) == 8
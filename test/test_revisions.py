@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+测试按内容哈希处理修订版：标题和摘要未变化的修订版只更新已保存记录的更新时间，
+有变化的修订版重新分类、保存并在报告中标记
+"""
+
+import sys
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from atom_fixture_server import make_entry
+from report_renderer import ReportEngine, group_papers
+from rss_fixture_server import RSSFixtureServer
+from seen_store import SeenPaperStore, content_hash
+
+V1 = make_entry("2501.00001v1", "Paged KV Cache", "A kv cache allocator.", "2025-01-01T08:00:00Z",
+                categories=["cs.DC"])
+# 只有换行和空白不同
+V2 = make_entry("2501.00001v2", "Paged  KV Cache", "A kv cache\n  allocator.", "2025-01-01T08:00:00Z",
+                categories=["cs.DC"])
+V3 = make_entry("2501.00001v3", "Paged KV Cache", "A kv cache allocator with prefix sharing.",
+                "2025-01-01T08:00:00Z", categories=["cs.DC"])
+
+
+def test_content_hash_and_versions(tmp_path):
+    """测试内容哈希忽略空白差异，previous_version 只对更高版本返回已保存的版本"""
+    assert content_hash("A  b", "c\nd ") == content_hash("A b", "c d")
+    assert content_hash("A b", "c d") != content_hash("A b", "c e")
+
+    store = SeenPaperStore(tmp_path / "seen.db")
+    store.add("http://arxiv.org/abs/2501.00001v1", content_hash("t", "s"), tmp_path)
+    assert store.previous_version("http://arxiv.org/abs/2501.00001v1") is None
+    assert store.previous_version("http://arxiv.org/abs/2501.00001v2").version == 1
+    store.commit()
+    store.record_unchanged_revisions(["http://arxiv.org/abs/2501.00001v2"])
+    assert "http://arxiv.org/abs/2501.00001v2" in store
+    previous = store.previous_version("http://arxiv.org/abs/2501.00001v3")
+    assert previous.version == 2 and previous.entry_id == "http://arxiv.org/abs/2501.00001v1"
+    assert previous.data_dir == str(tmp_path)
+    # 没有内容哈希的论文（旧版本索引）按新论文处理
+    store.add("http://arxiv.org/abs/2501.00009v1")
+    store.commit()
+    assert store.previous_version("http://arxiv.org/abs/2501.00009v2") is None
+    store.close()
+
+
+def test_unchanged_revision_updates_in_place(tmp_path):
+    """测试内容未变化的修订版只更新记录的更新时间，内容有变化的修订版作为新记录保存并标记"""
+    from arxiv_fetcher import ArxivPaperFetcher
+
+    batches = {"cs.DC": ("2025-01-02", [(V1, "new")])}
+    with RSSFixtureServer(batches) as server:
+        fetcher = ArxivPaperFetcher(data_dir=str(tmp_path / "data"), config_file="config.json")
+        fetcher.fetch_config["request_interval"] = 0
+        fetcher.config["announcements"] = {"base_url": server.base_url, "categories": ["cs.DC"],
+                                           "types": ["new", "replace"]}
+
+        def saved():
+            return {p["arxiv_id"]: p for p in fetcher.paper_store.iter_papers()}
+
+        fetcher.run_daily_fetch(generate_report=False, announcements=True)
+        assert list(saved()) == ["2501.00001v1"]
+
+        batches["cs.DC"] = ("2025-01-03", [(V2, "replace")])
+        fetcher.run_daily_fetch(generate_report=False, announcements=True)
+        papers = saved()
+        assert list(papers) == ["2501.00001v1"]
+        assert papers["2501.00001v1"]["updated"].startswith("2025-01-03")
+        assert "revision_of" not in papers["2501.00001v1"]
+        assert "http://arxiv.org/abs/2501.00001v2" in fetcher.recorded_paper_ids
+
+        batches["cs.DC"] = ("2025-01-06", [(V3, "replace")])
+        fetcher.run_daily_fetch(generate_report=False, announcements=True)
+        papers = saved()
+        assert sorted(papers) == ["2501.00001v1", "2501.00001v3"]
+        assert papers["2501.00001v3"]["revision_of"] == "v2"
+
+        (tmp_path / "report").mkdir()
+        engine = ReportEngine(tmp_path / "report", ["KV Cache"])
+        engine.write(group_papers([papers["2501.00001v3"]], ["KV Cache"]), 1)
+        text = "".join(p.read_text(encoding="utf-8") for p in (tmp_path / "report").glob("*.md"))
+        assert "[修订版，更新自 v2]" in text
+        fetcher.close()
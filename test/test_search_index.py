@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+测试全文检索索引
+"""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from paper_store import PaperStore
+from retag import ArchiveRetagger
+from search_index import PaperSearchIndex
+
+
+def _paper(i: int, title: str, summary: str, tags: list, published: str = "2025-01-02T00:00:00") -> dict:
+    return {"id": f"http://arxiv.org/abs/2501.{i:05d}v1", "arxiv_id": f"2501.{i:05d}v1", "title": title,
+            "summary": summary, "authors": ["Alice Smith", "Bob Lee"], "categories": ["cs.CL", "cs.LG"],
+            "published": published, "tags": tags}
+
+
+def _index(tmp_path) -> PaperSearchIndex:
+    index = PaperSearchIndex(tmp_path / "search.db")
+    index.add_many([
+        _paper(1, "Efficient KV Cache Compression", "we compress the cache of keys and values", ["KV Cache"],
+               "2025-01-01T08:00:00"),
+        _paper(2, "Mixture of Experts Routing", "a kv cache is mentioned only in the abstract",
+               ["MoE", "KV Cache"], "2025-01-02T08:00:00"),
+        _paper(3, "Speculative Decoding", "cache kv pairs for faster decoding", ["Other"], "2025-01-03T08:00:00"),
+    ], "paper_data_test")
+    return index
+
+
+def test_phrase_query_and_bm25_title_boost(tmp_path):
+    """测试短语查询只匹配相邻词，且标题命中排在摘要命中之前"""
+    index = _index(tmp_path)
+    hits = index.search('"kv cache"')
+    assert [h.arxiv_id for h in hits] == ["2501.00001v1", "2501.00002v1"]
+    assert hits[0].tags == ["KV Cache"] and hits[0].data_dir == "paper_data_test"
+    # 词干化：decoding 与 decode 匹配；作者与 arXiv 分类也被索引
+    assert [h.arxiv_id for h in index.search("decode")] == ["2501.00003v1"]
+    assert len(index.search('authors:"alice smith"')) == 3
+    assert len(index.search("cs.CL")) == 3
+
+
+def test_tag_and_date_filters(tmp_path):
+    """测试标签与日期过滤（日期上限包含当天）"""
+    index = _index(tmp_path)
+    assert [h.arxiv_id for h in index.search("cache", tags=["MoE"])] == ["2501.00002v1"]
+    assert [h.arxiv_id for h in index.search("cache", since=date(2025, 1, 2), until=date(2025, 1, 2))] == [
+        "2501.00002v1"]
+    # 无查询时按提交时间从新到旧列出
+    assert [h.arxiv_id for h in index.search(tags=["KV Cache"])] == ["2501.00002v1", "2501.00001v1"]
+
+
+def test_upsert_and_syntax_fallback(tmp_path):
+    """测试重复索引按最新内容更新，语法错误的查询按普通文本重试"""
+    index = _index(tmp_path)
+    index.add_many([_paper(3, "Speculative Decoding", "draft models", ["Speculative"])], "paper_data_test")
+    assert len(index) == 3
+    assert index.search("pairs") == []
+    assert [h.arxiv_id for h in index.search("draft", tags=["Speculative"])] == ["2501.00003v1"]
+    assert index.search("cache", tags=["Other"]) == []
+    assert [h.arxiv_id for h in index.search('decoding "')] == ["2501.00003v1"]
+
+
+def test_save_and_retag_update_index(fetcher, tmp_path):
+    """测试保存论文与重新打标签时同步更新索引"""
+    fetcher.save_papers([_paper(7, "Paged Attention", "kv cache paging for llm serving", ["KV Cache"])])
+    assert [h.arxiv_id for h in fetcher.search_index.search("paging")] == ["2501.00007v1"]
+
+    ArchiveRetagger({"serve": ["llm serving"]}, [], {"Serving": {"keywords": "serve"}}, workers=1,
+                    search_index=fetcher.search_index).run([PaperStore(fetcher.data_dir)])
+    assert [h.tags for h in fetcher.search_index.search("paging")] == [["Serving"]]
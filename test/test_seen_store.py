@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+测试全局已记录论文索引
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from seen_store import SeenPaperStore, split_arxiv_id
+
+
+def test_split_arxiv_id():
+    """测试 entry_id 拆分"""
+    assert split_arxiv_id("http://arxiv.org/abs/2501.00001v2") == ("2501.00001", 2)
+    assert split_arxiv_id("http://arxiv.org/abs/hep-th/9901001v1") == ("hep-th/9901001", 1)
+    assert split_arxiv_id("2501.00001") == ("2501.00001", 0)
+
+
+def test_store_persists_only_after_commit(tmp_path):
+    """测试成员检查、版本区分以及提交语义"""
+    db = tmp_path / "seen.db"
+    store = SeenPaperStore(db)
+    store.add("http://arxiv.org/abs/2501.00001v1")
+    assert "http://arxiv.org/abs/2501.00001v1" in store
+    assert "http://arxiv.org/abs/2501.00001v2" not in store
+    store.close()
+
+    store = SeenPaperStore(db)
+    assert len(store) == 0
+    store.add_many(["http://arxiv.org/abs/2501.00001v1", "http://arxiv.org/abs/2501.00002v1"])
+    store.commit()
+    store.close()
+
+    assert len(SeenPaperStore(db)) == 2
+
+
+def test_fetcher_shares_store_across_days(tmp_path, isolated_result_dir):
+    """测试不同日期目录共享同一个索引，并迁移旧版 recorded_papers.json"""
+    from arxiv_fetcher import ArxivPaperFetcher
+
+    day1 = tmp_path / "paper_data_2025.01.01"
+    day1.mkdir()
+    (day1 / "recorded_papers.json").write_text(
+        json.dumps({"paper_ids": ["http://arxiv.org/abs/2501.00001v1"]}), encoding='utf-8'
+    )
+    fetcher1 = ArxivPaperFetcher(data_dir=str(day1), config_file="config.json")
+    assert not (day1 / "recorded_papers.json").exists()
+
+    fetcher2 = ArxivPaperFetcher(data_dir=str(tmp_path / "paper_data_2025.01.02"), config_file="config.json")
+    assert fetcher2.seen_db_file == fetcher1.seen_db_file == isolated_result_dir / "seen_papers.db"
+    assert "http://arxiv.org/abs/2501.00001v1" in fetcher2.recorded_paper_ids
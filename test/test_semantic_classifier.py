@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+测试语义分类阶段
+"""
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from paper_store import PaperStore
+from retag import ArchiveRetagger
+from semantic_classifier import EmbeddingCache, HashingVectorizer, SemanticClassifier
+
+KEYWORDS = {"kv": ["kv cache"], "video": ["video generation"]}
+CATEGORIES = {
+    "KV Cache": {"keywords": "kv", "semantic": {
+        "threshold": 0.1, "examples": ["reuse of attention states across requests"]}},
+    "Video": {"keywords": "video"},
+}
+RELEVANT = ("Prefix state sharing", "We store and reuse attention states of shared prompt prefixes across "
+            "requests, evicting entries under memory pressure to reduce prefill latency.")
+UNRELATED = ("Reward modeling", "Reinforcement learning from human feedback improves alignment of language "
+             "models on dialogue tasks.")
+
+
+def _result(i: int, title: str, summary: str) -> SimpleNamespace:
+    stamp = datetime(2025, 1, 2, 8, 0)
+    return SimpleNamespace(entry_id=f"http://arxiv.org/abs/2501.{i:05d}v1", title=title, summary=summary,
+                           authors=[SimpleNamespace(name="Alice")], published=stamp, updated=stamp,
+                           categories=["cs.LG"], pdf_url=None)
+
+
+def test_vectorizer_is_deterministic_and_normalized():
+    """测试向量化与进程无关（稳定哈希）且为单位向量"""
+    vectorizer = HashingVectorizer(dim=1 << 12)
+    indices, weights = vectorizer.transform("Caching caches: the cached KV-cache!")
+    assert list(indices) == sorted(indices) and all(i < 1 << 12 for i in indices)
+    assert sum(w * w for w in weights) == pytest.approx(1.0, rel=1e-5)
+    assert vectorizer.transform("kv cache") == vectorizer.transform("KV caches")
+
+
+def test_classify_batch_uses_centroid_threshold_and_cache(tmp_path):
+    """测试按质心阈值分类，向量按 arXiv ID 缓存，向量化参数变化后缓存失效"""
+    classifier = SemanticClassifier(KEYWORDS, CATEGORIES)
+    cache = EmbeddingCache(tmp_path / "emb.db", classifier.vectorizer.signature)
+    classifier.cache = cache
+    papers = [("2501.00001v1", " ".join(RELEVANT)), ("2501.00002v1", " ".join(UNRELATED))]
+    assert classifier.categories == ["KV Cache"]
+    assert classifier.classify_batch(papers) == [["KV Cache"], []]
+    assert len(cache) == 2 and classifier.cache_hits == 0
+
+    # 再次运行只读缓存，不重新向量化
+    classifier.vectorizer.transform = None
+    assert classifier.classify_batch(papers) == [["KV Cache"], []]
+    assert classifier.cache_hits == 2
+    assert EmbeddingCache(tmp_path / "emb.db", "hash-v1:other").get_many(["2501.00001v1"]) == {}
+
+
+def test_fetcher_semantic_stage_and_retag(tmp_path):
+    """测试抓取时语义分类补充关键词漏掉的论文，重新打标签时保留语义标签"""
+    from arxiv_fetcher import ArxivPaperFetcher
+
+    config = json.loads((Path(__file__).parent.parent / "config.json").read_text(encoding='utf-8'))
+    config.update({"keywords": KEYWORDS, "categories": CATEGORIES,
+                   "semantic": {"enabled": True, "batch_size": 8}})
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(config), encoding='utf-8')
+    fetcher = ArxivPaperFetcher(data_dir=str(tmp_path / "day"), config_file=str(config_file))
+
+    records = fetcher._classify_results([_result(1, *RELEVANT), _result(2, *UNRELATED),
+                                         _result(3, "KV cache paging", "paged kv cache"), _result(1, *RELEVANT)])
+    assert [(r.arxiv_id, list(r.tags)) for r in records] == [("2501.00001v1", ["KV Cache"]),
+                                                            ("2501.00003v1", ["KV Cache"])]
+    assert len(fetcher.semantic_classifier.cache) == 3
+    fetcher.save_papers(records)
+
+    stats = ArchiveRetagger(KEYWORDS, [], CATEGORIES, semantic=fetcher.semantic_config, workers=1).run(
+        [PaperStore(fetcher.data_dir)])
+    assert stats["changed"] == 0
+    # 不启用语义分类时，只靠语义命中的论文会被改为 Other
+    assert ArchiveRetagger(KEYWORDS, [], CATEGORIES, workers=1).run([PaperStore(fetcher.data_dir)])["changed"] == 1
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+测试分片并发抓取（使用本地 Atom 测试服务器）
+"""
+
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from arxiv_api import ArxivAPIClient, RateLimiter
+from atom_fixture_server import AtomFixtureServer, make_entry
+from sharded_fetch import ShardedFetcher, build_shards
+
+
+def _day(offset: int) -> str:
+    return (datetime.now() - timedelta(days=offset)).strftime("%Y-%m-%dT08:00:00Z")
+
+
+def test_build_shards():
+    """测试按天与按分类拆分"""
+    shards = build_shards(date(2025, 1, 1), date(2025, 1, 3), ["cs.DC", "cs.LG"])
+    assert len(shards) == 6
+    assert shards[0].query == "cat:cs.DC AND submittedDate:[20250103000000 TO 20250103235959]"
+    assert [s.label for s in build_shards(date(2025, 1, 1), date(2025, 1, 2))] == ["20250102", "20250101"]
+
+
+def test_sharded_fetch_merges_and_dedups():
+    """测试多分片分页抓取、交叉分类去重以及共享限速"""
+    entries = [
+        make_entry(f"2501.{i:05d}v1", f"Paper {i}", "text", _day(i % 3), ["cs.DC", "cs.LG"] if i % 2 else ["cs.LG"])
+        for i in range(25)
+    ]
+    entries.append(make_entry("2501.99999v1", "Math", "text", _day(0), ["math.OC"]))
+
+    class RecordingLimiter(RateLimiter):
+        """记录每次放行的时间（在客户端侧测量，不受服务器线程调度影响）"""
+        times = []
+
+        def wait(self):
+            super().wait()
+            self.times.append(time.monotonic())
+
+    with AtomFixtureServer(entries) as server:
+        limiter = RecordingLimiter(0.02)
+        client = ArxivAPIClient(base_url=server.base_url, page_size=4, rate_limiter=limiter)
+        shards = build_shards(date.today() - timedelta(days=2), date.today(), ["cs.DC", "cs.LG"])
+        results = ShardedFetcher(client, workers=4).fetch(shards)
+
+        assert len(results) == 25
+        assert len({r.entry_id for r in results}) == 25
+        assert all(r.pdf_url.startswith("http://arxiv.org/pdf/") for r in results)
+
+        times = sorted(limiter.times)
+        assert len(times) == len(server.requests)
+        # 第 k 次放行不早于第一次之后 k 个间隔（允许少量线程调度误差）
+        assert all(t - times[0] >= k * 0.02 - 0.01 for k, t in enumerate(times))
+
+
+def test_fetcher_sharded_mode(tmp_path):
+    """测试 ArxivPaperFetcher 的分片抓取模式"""
+    from arxiv_fetcher import ArxivPaperFetcher
+
+    entries = [
+        make_entry("2501.00001v1", "Efficient KV Cache Compression", "We study kv cache.", _day(0)),
+        make_entry("2501.00002v1", "Unrelated", "Nothing here.", _day(1)),
+    ]
+    with AtomFixtureServer(entries) as server:
+        fetcher = ArxivPaperFetcher(data_dir=str(tmp_path), config_file="config.json")
+        fetcher.fetch_config.update({"base_url": server.base_url, "request_interval": 0})
+        papers = fetcher.fetch_daily_papers(days_back=2, sharded=True)
+
+    assert [p['arxiv_id'] for p in papers] == ["2501.00001v1"]
+    assert papers[0]['tags'] == ["KV Cache"]
+
+
+def test_failed_shard_cancels_pending_shards():
+    """测试某个分片失败后不再继续抓取尚未开始的分片"""
+    import pytest
+    from arxiv_api import ArxivAPIError
+
+    class FailingClient:
+        def __init__(self):
+            self.queries = []
+
+        def results(self, query, max_results=None):
+            self.queries.append(query)
+            raise ArxivAPIError("boom")
+
+    client = FailingClient()
+    shards = build_shards(date(2025, 1, 1), date(2025, 1, 10))
+    with pytest.raises(ArxivAPIError):
+        ShardedFetcher(client, workers=1).fetch(shards)
+    assert len(client.queries) < len(shards)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+测试命令行启动路径：导入没有副作用、较重的模块按需导入、search 命令不创建抓取工具
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import arxiv_fetcher
+from bench_startup import LAZY_MODULES
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def test_import_is_lazy_and_side_effect_free():
+    """测试导入 arxiv_fetcher 和 src 包时不加载 arxiv 库等按需导入的模块，也不配置日志"""
+    code = (
+        "import json, logging, sys\n"
+        "sys.path.insert(0, 'src')\n"
+        "import src\n"
+        "package_loaded = 'src.arxiv_fetcher' in sys.modules\n"
+        "import arxiv_fetcher\n"
+        f"lazy = [m for m in {LAZY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps([package_loaded, lazy, len(logging.getLogger().handlers)]))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                            check=True)
+    assert json.loads(result.stdout) == [False, [], 0]
+
+
+def test_search_command_does_not_create_fetcher(tmp_path, monkeypatch, isolated_result_dir, capsys):
+    """测试 search 命令只打开全文检索索引，不创建当天的数据目录和去重索引"""
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"search": {"enabled": True}}), encoding='utf-8')
+    index = arxiv_fetcher.open_search_index({})
+    index.add_many([{"id": "http://arxiv.org/abs/2501.00001v1", "arxiv_id": "2501.00001v1",
+                     "title": "Paged KV cache", "summary": "kv cache paging", "authors": ["A"],
+                     "tags": ["KV Cache"], "categories": ["cs.LG"], "published": "2025-01-02T08:00:00"}],
+                   tmp_path / "day")
+    index.close()
+
+    monkeypatch.setattr(arxiv_fetcher, "setup_logging", lambda: None)
+    monkeypatch.setattr(sys, "argv", ["run.py", "--config", str(config_file), "search", "paging", "--json"])
+    arxiv_fetcher.main()
+
+    hits = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [hit["arxiv_id"] for hit in hits] == ["2501.00001v1"]
+    # 只有检索索引（及其 WAL 文件）
+    assert all(p.name.startswith("search_index.db") for p in isolated_result_dir.iterdir())